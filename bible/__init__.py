@@ -0,0 +1,19 @@
+"""
+Read-side access to bible.db for Python services.
+
+    from bible import Bible
+
+    bible = Bible()                                  # server/bible.db
+    bible.chapter("KJV", 43, 3)                      # [Row(verse, text), ...]
+    bible.book_by_name("VDCL", "Ioan")               # Row(book_id, name, chapters)
+    bible.passages([("KJV", 43, 3, 16, 17), ("WEB", 1, 1)])
+    bible.complete("KJV", "gr")                      # [("god", 4683), ("grace", 4486), ...]
+    bible.suggest("KJV", "grase")                    # [("grace", 1, 4486), ...]
+
+Safe to share across threads; from asyncio use `await bible.run(...)`.
+"""
+
+from .db import DEFAULT_DB, Bible, LRUCache, fold_book_name
+from .vocabulary import Vocabulary, fold_term
+
+__all__ = ["Bible", "DEFAULT_DB", "LRUCache", "Vocabulary", "fold_book_name", "fold_term"]
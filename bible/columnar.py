@@ -0,0 +1,104 @@
+"""
+Zero-copy columnar view of the corpus (requires numpy).
+
+server/scripts/columnar_export.py writes one directory per translation:
+
+    <CODE>/book_id.npy   uint8    one entry per verse, (book, chapter, verse) order
+    <CODE>/chapter.npy   uint16
+    <CODE>/verse.npy     uint16
+    <CODE>/tokens.npy    uint16   estimated model tokens (scripts/token_counts.py)
+    <CODE>/offsets.npy   uint64   verse i is text[offsets[i]:offsets[i + 1]]
+    <CODE>/text.npy      uint8    UTF-8 text of every verse, concatenated
+
+Every array is opened with np.load(mmap_mode="r"): loading costs no reads,
+and a corpus-wide pass (length distributions, token budgets, …) is a
+vectorized operation over pages the OS maps in on demand.
+
+    from bible.columnar import load_all
+
+    corpus = load_all()
+    for code, cols in corpus.items():
+        print(code, np.percentile(cols.byte_lengths(), [50, 95, 99]))
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_DIR = Path(__file__).resolve().parent.parent / "server" / "columnar"
+MANIFEST_NAME = "manifest.json"
+
+COLUMNS = {
+    "book_id": np.uint8,
+    "chapter": np.uint16,
+    "verse": np.uint16,
+    "tokens": np.uint16,
+    "offsets": np.uint64,
+    "text": np.uint8,
+}
+
+
+class Columns:
+    """One translation's verses as memory-mapped arrays."""
+
+    def __init__(self, directory: Path, translation: str):
+        self.translation = translation
+        self.path = Path(directory) / translation
+        for name in COLUMNS:
+            setattr(self, name, np.load(self.path / f"{name}.npy", mmap_mode="r"))
+        self._chapter_keys = None
+
+    def __len__(self):
+        return len(self.verse)
+
+    def __repr__(self):
+        return f"<Columns {self.translation}: {len(self):,} verses, {len(self.text):,} text bytes>"
+
+    def text_of(self, i: int) -> str:
+        return bytes(self.text[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+    def texts(self, start: int = 0, stop: int | None = None) -> list[str]:
+        """Decoded text of verses start..stop-1 (one decode of the whole span)."""
+        stop = len(self) if stop is None else stop
+        if start >= stop:
+            return []
+        base = int(self.offsets[start])
+        bounds = (self.offsets[start:stop + 1] - base).tolist()
+        span = bytes(self.text[base:base + bounds[-1]])
+        return [span[a:b].decode("utf-8") for a, b in zip(bounds, bounds[1:])]
+
+    def byte_lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def char_lengths(self) -> np.ndarray:
+        """Characters per verse: UTF-8 bytes that are not continuation bytes, counted per span."""
+        starts = (self.text & 0xC0) != 0x80
+        counts = np.concatenate(([0], np.cumsum(starts, dtype=np.uint64)))
+        return counts[self.offsets[1:]] - counts[self.offsets[:-1]]
+
+    def chapter_keys(self) -> np.ndarray:
+        """book_id << 16 | chapter per verse — sorted, so np.searchsorted finds chapters."""
+        if self._chapter_keys is None:
+            self._chapter_keys = (self.book_id.astype(np.uint32) << 16) | self.chapter
+        return self._chapter_keys
+
+    def chapter_slice(self, book_id: int, chapter: int) -> slice:
+        """Index range of one chapter's verses (empty if absent)."""
+        keys = self.chapter_keys()
+        key = (book_id << 16) | chapter
+        return slice(int(np.searchsorted(keys, key, "left")), int(np.searchsorted(keys, key, "right")))
+
+
+def manifest(directory: Path = DEFAULT_DIR) -> dict:
+    path = Path(directory) / MANIFEST_NAME
+    return json.loads(path.read_text()) if path.exists() else {"translations": {}}
+
+
+def load(translation: str, directory: Path = DEFAULT_DIR) -> Columns:
+    return Columns(directory, translation)
+
+
+def load_all(directory: Path = DEFAULT_DIR) -> dict[str, Columns]:
+    """Every exported translation, by code."""
+    return {code: Columns(directory, code) for code in sorted(manifest(directory)["translations"])}
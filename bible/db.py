@@ -0,0 +1,265 @@
+"""
+Thread-safe read-only access to bible.db.
+
+Every thread gets its own read-only connection (sqlite3 connections must not
+be shared across threads), opened with a memory-mapped window over the file
+so hot pages are read straight from the OS page cache. Chapters and
+cross-references go through a bounded LRU cache shared by all threads.
+Results are lists of sqlite3.Row (immutable; index by name or position).
+"""
+
+import asyncio
+import functools
+import json
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+from . import queries
+from .vocabulary import Vocabulary, fold_term
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "server" / "bible.db"
+
+MMAP_SIZE = 1 << 30     # map up to 1 GB of the file
+CACHE_SIZE_KB = 64000   # per-connection page cache, as server/lib/db.ts
+LRU_ENTRIES = 4096
+
+
+def fold_book_name(name: str) -> str:
+    """
+    Same folding as server/scripts/book_aliases.py fold() and db.ts
+    foldBookName(): case-folded, so "Ιωάννης" → "ιωαννησ" and "Straße" → "strasse".
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(ch for ch in decomposed if ch.isalnum()).casefold()
+
+
+class LRUCache:
+    """A bounded mapping, least recently used entries evicted first. Thread-safe."""
+
+    def __init__(self, maxsize: int = LRU_ENTRIES):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        # Computed outside the lock: two threads may both miss, both store the same value
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+
+class Bible:
+    """
+    Queries of server/lib/db.ts over one bible.db. Share one instance across
+    threads; from asyncio, `await bible.run(bible.chapter, "KJV", 43, 3)`.
+    """
+
+    def __init__(self, path: Path | str = DEFAULT_DB, mmap_size: int = MMAP_SIZE, cache_entries: int = LRU_ENTRIES):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Database not found at {self.path}")
+        self.mmap_size = mmap_size
+        self.cache = LRUCache(cache_entries)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._vocabularies = {}
+        self._sql = None
+
+    # ------------------------------------------------------------
+    # connections
+    # ------------------------------------------------------------
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's read-only connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # check_same_thread off only so close() can run from any thread;
+            # each connection is still used by the thread that opened it
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+            conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Close every thread's connection (call once the pool is done)."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _statements(self) -> dict:
+        """The schema-dependent SQL for this database (queries.for_schema), picked on first use."""
+        if self._sql is None:
+            tables = {r[0] for r in self.connection().execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            self._sql = queries.for_schema(tables)
+        return self._sql
+
+    def _all(self, sql: str, params=()) -> list:
+        return self.connection().execute(sql, params).fetchall()
+
+    def _cached(self, key: tuple, sql: str, params) -> list:
+        # Rows are immutable; the list is copied so callers may modify theirs
+        return list(self.cache.get(key, lambda: tuple(self._all(sql, params))))
+
+    async def run(self, method, *args, executor=None):
+        """Run a query method in an executor (default: the loop's thread pool)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(method, *args))
+
+    # ------------------------------------------------------------
+    # queries (server/lib/db.ts)
+    # ------------------------------------------------------------
+
+    def resolve_translation(self, translation: str, book_id: int) -> str:
+        """Translation that holds a book's text for `translation` (server/api/bible.ts)."""
+        row = self.connection().execute(self._statements()["book_source"], (translation, book_id)).fetchone()
+        if row:
+            return row[0]
+        if book_id >= queries.NC_MIN_BOOK_ID:
+            return queries.NC_TRANSLATION
+        if book_id >= queries.DC_MIN_BOOK_ID:
+            return queries.DC_FALLBACK
+        return translation
+
+    def translations(self) -> list:
+        return self._all(queries.TRANSLATIONS)
+
+    def books(self, translation: str) -> list:
+        return self._all(self._statements()["books"], (translation,))
+
+    def chapter(self, translation: str, book_id: int, chapter: int) -> list:
+        source = self.resolve_translation(translation, book_id)
+        return self._cached(("chapter", source, book_id, chapter), queries.CHAPTER, (source, book_id, chapter))
+
+    def verse_range(self, translation: str, book_id: int, chapter: int, from_verse: int, to_verse: int) -> list:
+        source = self.resolve_translation(translation, book_id)
+        return self._all(queries.VERSE_RANGE, (source, book_id, chapter, from_verse, to_verse))
+
+    def verse(self, translation: str, book_id: int, chapter: int, verse: int) -> str | None:
+        source = self.resolve_translation(translation, book_id)
+        row = self.connection().execute(queries.VERSE, (source, book_id, chapter, verse)).fetchone()
+        return row[0] if row else None
+
+    def search(self, translation: str, query: str) -> list:
+        return self._all(queries.SEARCH, (translation, query))
+
+    def chapter_cross_refs(self, translation: str, book_id: int, chapter: int) -> list:
+        source = self.resolve_translation(translation, book_id)
+        return self._cached(
+            ("chapter_cross_refs", source, book_id, chapter), queries.CHAPTER_CROSS_REFS, (source, book_id, chapter)
+        )
+
+    def cross_refs_for_range(self, translation: str, book_id: int, chapter: int,
+                             from_verse: int, to_verse: int) -> list:
+        source = self.resolve_translation(translation, book_id)
+        return self._cached(
+            ("cross_refs_for_range", source, book_id, chapter, from_verse, to_verse),
+            queries.CROSS_REFS_FOR_RANGE, (source, book_id, chapter, from_verse, to_verse),
+        )
+
+    def cross_refs(self, translation: str, book_id: int, chapter: int, verse: int) -> list:
+        return self._cached(
+            ("cross_refs", translation, book_id, chapter, verse),
+            queries.CROSS_REFS, (translation, translation, book_id, chapter, verse),
+        )
+
+    def book_by_name(self, translation: str, name: str) -> sqlite3.Row | None:
+        """
+        Any name or abbreviation ("1 Cor", "I Corinthiens", "ioan") via
+        book_aliases; without that table, the book's exact name in any case.
+        """
+        sql = self._statements()["book_by_name"]
+        if sql is None:
+            return self.connection().execute(queries.BOOK_BY_EXACT_NAME, (translation, name)).fetchone()
+        return self.connection().execute(sql, (translation, fold_book_name(name))).fetchone()
+
+    def aligned_chapter(self, translations: list[str], book_id: int, chapter: int) -> list:
+        """One chapter in canonical (KJV) numbering across translations (scripts/versification.py)."""
+        return self._all(self._statements()["aligned_chapter"], (json.dumps(translations), book_id, chapter))
+
+    # ------------------------------------------------------------
+    # vocabulary (server/scripts/vocabulary_index.py)
+    # ------------------------------------------------------------
+
+    def vocabulary(self, translation: str) -> Vocabulary:
+        """The in-memory vocabulary of a translation's language, loaded once and shared."""
+        row = self.connection().execute(
+            "SELECT language FROM translations WHERE short_name = ?", (translation,)
+        ).fetchone()
+        language = row[0] if row else ""
+        with self._lock:
+            vocabulary = self._vocabularies.get(language)
+        if vocabulary is None:
+            vocabulary = Vocabulary(self.connection(), language)
+            with self._lock:
+                vocabulary = self._vocabularies.setdefault(language, vocabulary)
+        return vocabulary
+
+    def complete(self, translation: str, prefix: str, k: int = 10) -> list[tuple[str, int]]:
+        """Top-k search-term completions (term, frequency) for what the user has typed so far."""
+        term = fold_term(prefix)
+        return self.vocabulary(translation).complete(term, k) if term else []
+
+    def suggest(self, translation: str, word: str, k: int = 5) -> list[tuple[str, int, int]]:
+        """Top-k spelling corrections (term, edit distance, frequency) for a word."""
+        term = fold_term(word)
+        return self.vocabulary(translation).correct(term, k) if term else []
+
+    # ------------------------------------------------------------
+    # bulk
+    # ------------------------------------------------------------
+
+    def passages(self, refs) -> list[list]:
+        """
+        Resolve many verse ranges in one statement. `refs` holds
+        (translation, book_id, chapter[, from_verse[, to_verse]]) tuples;
+        returns one list of (verse, text) rows per ref, in order. A ref with
+        a from_verse but no to_verse reads to the end of the chapter, as the
+        chat tools' fetchVerses (server/api/chat.ts) does.
+        """
+        payload = []
+        for ref in refs:
+            translation, book_id, chapter, *bounds = ref
+            from_verse = bounds[0] if bounds else None
+            to_verse = bounds[1] if len(bounds) > 1 else (999 if from_verse is not None else None)
+            payload.append([translation, book_id, chapter, from_verse, to_verse])
+        results = [[] for _ in payload]
+        for idx, verse, text in self.connection().execute(self._statements()["passages"], (json.dumps(payload),)):
+            results[idx].append((verse, text))
+        return results
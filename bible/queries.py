@@ -0,0 +1,210 @@
+"""
+SQL for the read side of bible.db — the statements of server/lib/db.ts, so
+Python services answer exactly what the API serves. Keep the two in step.
+"""
+
+# Non-canonical books live under ENC, deuterocanonical fallback is KJV
+# (server/api/bible.ts resolveTranslation)
+NC_TRANSLATION = "ENC"
+DC_FALLBACK = "KJV"
+NC_MIN_BOOK_ID = 90
+DC_MIN_BOOK_ID = 67
+
+TRANSLATIONS = "SELECT short_name, full_name, language, direction FROM translations ORDER BY language, short_name"
+
+BOOKS = (
+    "SELECT book_id, name, chapters, chron_order, testament FROM translation_books "
+    "WHERE translation = ? ORDER BY book_id"
+)
+
+# Without translation_books: the same merge done per request
+BOOKS_FALLBACK = """
+    SELECT book_id, name, chapters, chron_order, testament FROM books WHERE translation = ?1
+    UNION ALL
+    SELECT f.book_id, f.name, f.chapters, f.chron_order, f.testament
+    FROM books f
+    WHERE ((f.translation = 'KJV' AND f.testament = 'DC') OR (f.translation = 'ENC' AND f.testament = 'NC'))
+      AND EXISTS (SELECT 1 FROM books t WHERE t.translation = ?1)
+      AND NOT EXISTS (SELECT 1 FROM books t WHERE t.translation = ?1 AND t.book_id = f.book_id)
+    ORDER BY book_id
+"""
+
+BOOK_SOURCE = "SELECT source FROM translation_books WHERE translation = ? AND book_id = ?"
+
+
+def fallback_source(translation: str, book_id: str) -> str:
+    """
+    SQL for the translation serving a book without translation_books: ENC for
+    the non-canonical books, KJV for a deuterocanonical book the translation
+    does not have itself, else its own text.
+    """
+    return f"""CASE WHEN {book_id} >= {NC_MIN_BOOK_ID} THEN '{NC_TRANSLATION}'
+                   WHEN {book_id} >= {DC_MIN_BOOK_ID} AND NOT EXISTS (
+                     SELECT 1 FROM verses WHERE translation = {translation} AND book_id = {book_id}
+                       AND chapter = 1 AND verse = 1
+                   ) THEN '{DC_FALLBACK}'
+                   ELSE {translation} END"""
+
+
+BOOK_SOURCE_FALLBACK = f"SELECT {fallback_source('?1', '?2')} AS source"
+
+CHAPTER = "SELECT verse, text FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? ORDER BY verse"
+
+SEARCH = """
+    SELECT translation, book_id, chapter, verse,
+           highlight(verses_fts, 0, '<mark>', '</mark>') as text
+    FROM verses_fts
+    WHERE translation = ? AND text MATCH ?
+    ORDER BY rank
+    LIMIT 50
+"""
+
+CHAPTER_CROSS_REFS = """
+    SELECT cr.from_verse, cr.to_book, cr.to_chapter, cr.to_verse,
+           cr.to_end_verse, cr.relevance, b.name as book_name
+    FROM cross_references cr
+    LEFT JOIN books b ON b.translation = ? AND b.book_id = cr.to_book
+    WHERE cr.from_book = ? AND cr.from_chapter = ?
+    ORDER BY cr.from_verse, cr.relevance DESC
+"""
+
+VERSE = "SELECT text FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? AND verse = ?"
+
+# Translation serving book ?2 for each requested code (?1)
+PICKED_SOURCES = """picked(translation, source, ord) AS (
+        SELECT j.value, COALESCE(tb.source, j.value), j.key
+        FROM json_each(?1) j
+        LEFT JOIN translation_books tb ON tb.translation = j.value AND tb.book_id = ?2
+    )"""
+
+PICKED_SOURCES_FALLBACK = f"""picked(translation, source, ord) AS (
+        SELECT j.value, {fallback_source('j.value', '?2')}, j.key
+        FROM json_each(?1) j
+    )"""
+
+ALIGNED_CHAPTER = """
+    WITH {picked}
+    SELECT p.translation, v.verse AS canonical_verse, v.chapter, v.verse, v.text, p.ord
+    FROM picked p
+    JOIN verses v ON v.translation = p.source AND v.book_id = ?2 AND v.chapter = ?3
+    WHERE NOT EXISTS (
+        SELECT 1 FROM verse_map m
+        WHERE m.translation = v.translation AND m.book_id = v.book_id
+          AND m.chapter = v.chapter AND m.verse = v.verse
+    )
+    UNION ALL
+    SELECT p.translation, m.canonical_verse, m.chapter, m.verse, v.text, p.ord
+    FROM picked p
+    JOIN verse_map m ON m.translation = p.source AND m.book_id = ?2 AND m.canonical_chapter = ?3
+    JOIN verses v ON v.translation = m.translation AND v.book_id = m.book_id
+                 AND v.chapter = m.chapter AND v.verse = m.verse
+    ORDER BY 2, 6, 3, 4
+"""
+
+# Without verse_map, each translation's own numbering is served as is
+ALIGNED_CHAPTER_FALLBACK = """
+    WITH {picked}
+    SELECT p.translation, v.verse AS canonical_verse, v.chapter, v.verse, v.text, p.ord
+    FROM picked p
+    JOIN verses v ON v.translation = p.source AND v.book_id = ?2 AND v.chapter = ?3
+    ORDER BY 2, 6, 3, 4
+"""
+
+BOOK_BY_ALIAS = """
+    SELECT b.book_id, b.name, b.chapters
+    FROM book_aliases a
+    JOIN books b ON b.translation = ?1 AND b.book_id = a.book_id
+    WHERE a.alias = ?2
+    ORDER BY a.translation = ?1 DESC, a.translation = '' DESC
+    LIMIT 1
+"""
+
+# Exact (case-insensitive) name match, for a bible.db without book_aliases
+BOOK_BY_EXACT_NAME = (
+    "SELECT book_id, name, chapters FROM books WHERE translation = ? AND name = ? COLLATE NOCASE LIMIT 1"
+)
+
+VERSE_RANGE = (
+    "SELECT verse, text FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? "
+    "AND verse >= ? AND verse <= ? ORDER BY verse"
+)
+
+CROSS_REFS_FOR_RANGE = """
+    SELECT cr.from_verse, cr.to_book, cr.to_chapter, cr.to_verse,
+           cr.to_end_verse, cr.relevance, b.name as book_name
+    FROM cross_references cr
+    LEFT JOIN books b ON b.translation = ? AND b.book_id = cr.to_book
+    WHERE cr.from_book = ? AND cr.from_chapter = ? AND cr.from_verse >= ? AND cr.from_verse <= ?
+    ORDER BY cr.from_verse, cr.relevance DESC
+"""
+
+CROSS_REFS = """
+    SELECT cr.to_book, cr.to_chapter, cr.to_verse,
+           cr.to_end_book, cr.to_end_chapter, cr.to_end_verse,
+           cr.relevance,
+           v.text, b.name as book_name
+    FROM cross_references cr
+    LEFT JOIN verses v ON v.translation = ? AND v.book_id = cr.to_book
+                          AND v.chapter = cr.to_chapter AND v.verse = cr.to_verse
+    LEFT JOIN books b ON b.translation = ? AND b.book_id = cr.to_book
+    WHERE cr.from_book = ? AND cr.from_chapter = ? AND cr.from_verse = ?
+    ORDER BY cr.relevance DESC
+    LIMIT 20
+"""
+
+# Python only: many verse ranges in one statement. ?1 is a JSON array of
+# [translation, book_id, chapter, from_verse, to_verse] (the verse bounds may
+# be null for the whole chapter); rows come back tagged with the range's
+# index. The book's source translation is resolved like resolveTranslation.
+PASSAGES = """
+    WITH wanted(idx, translation, book_id, chapter, from_verse, to_verse) AS (
+        SELECT j.key,
+               json_extract(j.value, '$[0]'),
+               json_extract(j.value, '$[1]'),
+               json_extract(j.value, '$[2]'),
+               COALESCE(json_extract(j.value, '$[3]'), 0),
+               COALESCE(json_extract(j.value, '$[4]'), 999)
+        FROM json_each(?1) j
+    ),
+    resolved(idx, source, book_id, chapter, from_verse, to_verse) AS (
+        {resolved}
+    )
+    SELECT r.idx, v.verse, v.text
+    FROM resolved r
+    JOIN verses v ON v.translation = r.source AND v.book_id = r.book_id AND v.chapter = r.chapter
+                 AND v.verse >= r.from_verse AND v.verse <= r.to_verse
+    ORDER BY r.idx, v.verse
+"""
+
+PASSAGES_RESOLVED = f"""SELECT w.idx,
+               COALESCE(tb.source, CASE
+                   WHEN w.book_id >= {NC_MIN_BOOK_ID} THEN '{NC_TRANSLATION}'
+                   WHEN w.book_id >= {DC_MIN_BOOK_ID} THEN '{DC_FALLBACK}'
+                   ELSE w.translation END),
+               w.book_id, w.chapter, w.from_verse, w.to_verse
+        FROM wanted w
+        LEFT JOIN translation_books tb ON tb.translation = w.translation AND tb.book_id = w.book_id"""
+
+PASSAGES_RESOLVED_FALLBACK = f"""SELECT w.idx, {fallback_source('w.translation', 'w.book_id')},
+               w.book_id, w.chapter, w.from_verse, w.to_verse
+        FROM wanted w"""
+
+
+def for_schema(tables: set[str]) -> dict:
+    """
+    The statements that differ by schema, picked for a database's tables as
+    db.ts picks them at startup: a bible.db built before translation_books,
+    book_aliases or verse_map keeps answering with the older lookups.
+    """
+    has_translation_books = "translation_books" in tables
+    picked = PICKED_SOURCES if has_translation_books else PICKED_SOURCES_FALLBACK
+    aligned = ALIGNED_CHAPTER if "verse_map" in tables else ALIGNED_CHAPTER_FALLBACK
+    return {
+        "books": BOOKS if has_translation_books else BOOKS_FALLBACK,
+        "book_source": BOOK_SOURCE if has_translation_books else BOOK_SOURCE_FALLBACK,
+        "aligned_chapter": aligned.format(picked=picked),
+        "book_by_name": BOOK_BY_ALIAS if "book_aliases" in tables else None,
+        "passages": PASSAGES.format(
+            resolved=PASSAGES_RESOLVED if has_translation_books else PASSAGES_RESOLVED_FALLBACK
+        ),
+    }
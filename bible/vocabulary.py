@@ -0,0 +1,179 @@
+"""
+Search-term completion and spelling correction over one language's vocabulary.
+
+The tables are built by server/scripts/vocabulary_index.py:
+
+    vocabulary(language, term, freq)                 every index term and its frequency
+    term_prefixes(language, prefix, rank, term, freq) top completions of short prefixes
+    term_deletes(language, variant, term)             symmetric-delete spelling index
+
+A Vocabulary loads one language into memory, so lookups are dictionary and
+bisect operations with no SQL on the query path. Corrections use symmetric
+delete (as SymSpell): a misspelling and a term within MAX_DISTANCE edits
+share a variant obtained by deleting characters from both, so candidates
+come from a hash lookup per delete of the input instead of a scan.
+"""
+
+import sqlite3
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from heapq import nlargest
+from itertools import combinations
+
+MAX_DISTANCE = 2
+# Deletes are generated from this many leading characters only (SymSpell's
+# prefix length) — bounds the index to O(terms) whatever the term lengths
+PREFIX_LENGTH = 7
+# Prefixes up to this length have their top completions precomputed
+PREFIX_TABLE_LENGTH = 3
+TOP_COMPLETIONS = 10
+
+# Same tokenizer as verses_fts (server/scripts/import_bible.py build_fts_index)
+TOKENIZE = "unicode61"
+
+
+def deletes(term: str, max_distance: int = MAX_DISTANCE, prefix_length: int = PREFIX_LENGTH) -> set[str]:
+    """Every string obtained by deleting up to max_distance characters from the term's prefix."""
+    key = term[:prefix_length]
+    variants = {key}
+    for n in range(1, min(max_distance, len(key) - 1) + 1):
+        for drop in combinations(range(len(key)), n):
+            variants.add("".join(ch for i, ch in enumerate(key) if i not in drop))
+    return variants
+
+
+def edit_distance(a: str, b: str, limit: int = MAX_DISTANCE) -> int:
+    """Optimal string alignment distance (adjacent transpositions count as one edit); limit + 1 if beyond limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # Shared prefix and suffix cost nothing — most candidates differ in a few middle characters
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    # Keep one character of context so a transposition straddling the cut is still seen
+    start = max(start - 1, 0)
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return len(a) + len(b) if len(a) + len(b) <= limit else limit + 1
+
+    # Banded: only cells within `limit` of the diagonal can stay within the limit
+    big = limit + 1
+    n = len(b)
+    before, prev = None, list(range(n + 1))
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        low, high = max(1, i - limit), min(n, i + limit)
+        cur = [big] * (n + 1)
+        cur[0] = i if i <= limit else big
+        best = cur[0]
+        for j in range(low, high + 1):
+            cb = b[j - 1]
+            d = prev[j - 1] if ca == cb else prev[j - 1] + 1
+            if prev[j] + 1 < d:
+                d = prev[j] + 1
+            if cur[j - 1] + 1 < d:
+                d = cur[j - 1] + 1
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb and before[j - 2] + 1 < d:
+                d = before[j - 2] + 1
+            cur[j] = d
+            if d < best:
+                best = d
+        if best > limit:
+            return big
+        before, prev = prev, cur
+    return prev[n] if prev[n] <= limit else big
+
+
+class TermFolder:
+    """Folds a word into its index term by running it through the FTS tokenizer itself."""
+
+    def __init__(self):
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.execute(f"CREATE VIRTUAL TABLE probe USING fts5(text, tokenize='{TOKENIZE}')")
+        self._conn.execute("CREATE VIRTUAL TABLE probe_instance USING fts5vocab(probe, 'instance')")
+        self._lock = threading.Lock()
+        self.fold = lru_cache(maxsize=8192)(self._fold)
+
+    def _fold(self, word: str) -> str | None:
+        with self._lock:
+            self._conn.execute("DELETE FROM probe")
+            self._conn.execute("INSERT INTO probe (text) VALUES (?)", (word,))
+            row = self._conn.execute("SELECT term FROM probe_instance ORDER BY offset LIMIT 1").fetchone()
+        return row[0] if row else None
+
+
+_folder = None
+_folder_lock = threading.Lock()
+
+
+def fold_term(word: str) -> str | None:
+    """The index term for `word` (lowercased, Latin diacritics removed, … exactly as verses_fts)."""
+    global _folder
+    if _folder is None:
+        with _folder_lock:
+            if _folder is None:
+                _folder = TermFolder()
+    return _folder.fold(word)
+
+
+class Vocabulary:
+    """One language's vocabulary in memory. Read-only after loading, so safe to share across threads."""
+
+    def __init__(self, conn: sqlite3.Connection, language: str):
+        self.language = language
+        rows = conn.execute(
+            "SELECT term, freq FROM vocabulary WHERE language = ? ORDER BY term", (language,)
+        ).fetchall()
+        self.terms = [term for term, _ in rows]
+        self.freq = dict(rows)
+        self.prefixes = {}
+        for prefix, term, freq in conn.execute(
+            "SELECT prefix, term, freq FROM term_prefixes WHERE language = ? ORDER BY prefix, rank", (language,)
+        ):
+            self.prefixes.setdefault(prefix, []).append((term, freq))
+        self.deletes = {}
+        for variant, term in conn.execute(
+            "SELECT variant, term FROM term_deletes WHERE language = ?", (language,)
+        ):
+            self.deletes.setdefault(variant, []).append(term)
+        # Typed queries repeat: a hit skips the edit-distance checks (~50-500 µs) entirely
+        self._corrections = lru_cache(maxsize=8192)(self._correct)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, term: str):
+        return term in self.freq
+
+    def complete(self, prefix: str, k: int = TOP_COMPLETIONS) -> list[tuple[str, int]]:
+        """Top-k (term, freq) starting with `prefix` (already folded), most frequent first."""
+        if not prefix:
+            return []
+        if len(prefix) <= PREFIX_TABLE_LENGTH and k <= TOP_COMPLETIONS:
+            return self.prefixes.get(prefix, [])[:k]
+        # Longer prefixes cover few terms: a sorted-range slice
+        start = bisect_left(self.terms, prefix)
+        end = bisect_left(self.terms, prefix + "\U0010ffff", start)
+        return nlargest(k, ((t, self.freq[t]) for t in self.terms[start:end]), key=lambda tf: tf[1])
+
+    def correct(self, term: str, k: int = 5, max_distance: int = MAX_DISTANCE) -> list[tuple[str, int, int]]:
+        """Top-k (term, distance, freq) within max_distance edits of `term` (already folded), closest first."""
+        if not term:
+            return []
+        return list(self._corrections(term, min(max_distance, MAX_DISTANCE))[:k])
+
+    def _correct(self, term: str, max_distance: int) -> tuple:
+        found = {}
+        for variant in deletes(term, max_distance):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate not in found:
+                    found[candidate] = edit_distance(term, candidate, max_distance)
+        return tuple(sorted(
+            ((t, d, self.freq[t]) for t, d in found.items() if d <= max_distance),
+            key=lambda tdf: (tdf[1], -tdf[2], tdf[0]),
+        ))
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Koinonia Chat Capacity Simulator
+================================
+Discrete-event simulation of concurrent chat load on the Bun server and the
+Anthropic API, built on the message profiles in pricing_analysis.py.
+
+Every simulated user opens a study session at a random time in the window and
+sends a series of messages separated by exponential think times. Message types
+follow the pricing engine's Markov chain (MESSAGE_TRANSITIONS), and each
+message carries the history its conversation has built up so far. Each message
+runs its profile's tool rounds as separate API requests. Requests pass through
+token-bucket limiters for requests/min, input tokens/min and output tokens/min
+(continuous refill, like the provider's limits); when a bucket is empty the
+request waits in a FIFO queue on the server.
+
+Reports peak RPM/ITPM/OTPM per minute against the limits and against what the
+buckets could admit in that minute, queueing latency, end-to-end message
+latency and the concurrency (in-flight API calls, open SSE streams) the server
+has to hold.
+
+Usage:
+    python capacity_sim.py                                # 10k users over one hour
+    python capacity_sim.py --users 100000 --minutes 60    # Peak-hour stress test
+    python capacity_sim.py --rpm 4000 --itpm 2000000 --otpm 400000 --model haiku
+"""
+
+import argparse
+import heapq
+import itertools
+import random
+import time
+from array import array
+
+from pricing_analysis import (
+    CACHED_PREFIX_TOKENS,
+    MAX_CONVERSATION_LENGTH,
+    MEAN_GAP_MINUTES,
+    MESSAGE_TRANSITIONS,
+    START_DISTRIBUTION,
+    message_round_tokens,
+    profiles,
+)
+
+# Default provider limits (Anthropic build tier 4, Claude Sonnet)
+DEFAULT_RPM = 4_000
+DEFAULT_ITPM = 2_000_000
+DEFAULT_OTPM = 400_000
+
+# Streaming speed: time to first token (s) and output tokens per second
+MODEL_SPEED = {
+    "sonnet": {"ttft": 1.5, "tokens_per_sec": 60},
+    "haiku": {"ttft": 0.7, "tokens_per_sec": 130},
+}
+
+# Server-side tool execution between rounds (SQLite lookups, web search)
+TOOL_SECONDS = 0.5
+
+# Event kinds
+MESSAGE = 0   # user sends a message
+REQUEST = 1   # a round is ready to call the API
+DONE = 2      # an API request finished streaming
+RETRY = 3     # rate-limit buckets may have refilled for the queue head
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(pct / 100 * len(sorted_values)))
+    return sorted_values[idx]
+
+
+def simulate(users=10_000, minutes=60, msgs_per_session=10, model="sonnet",
+             rpm=DEFAULT_RPM, itpm=DEFAULT_ITPM, otpm=DEFAULT_OTPM,
+             mean_gap_minutes=MEAN_GAP_MINUTES, seed=1):
+    """
+    Run the simulation and return a stats dict.
+
+    Session lengths are uniform on [1, 2 * msgs_per_session - 1], capped at
+    MAX_CONVERSATION_LENGTH. Each user's message types are drawn from the
+    chain as pricing_analysis.sample_conversation() draws them. Input tokens count toward ITPM except cache reads
+    (the prefix is only counted on a conversation's first request, when it is
+    written).
+    """
+    if msgs_per_session < 1:
+        raise ValueError(f"msgs_per_session must be at least 1 (got {msgs_per_session})")
+    rng = random.Random(seed)
+    speed = MODEL_SPEED[model]
+    mean_gap_seconds = mean_gap_minutes * 60
+
+    names = list(profiles)
+    start_weights = list(itertools.accumulate(START_DISTRIBUTION[n] for n in names))
+    transition_weights = {
+        name: list(itertools.accumulate(MESSAGE_TRANSITIONS[name][n] for n in names)) for name in names
+    }
+    contribution = {name: profiles[name]["history_contribution"] for name in names}
+    max_len = min(2 * msgs_per_session - 1, MAX_CONVERSATION_LENGTH)
+
+    # (profile, first message?, history tokens) -> [(itpm_tokens, output_tokens, service_seconds), ...]
+    round_table = {}
+
+    def rounds_for(name, pos, history_tokens):
+        key = (name, pos == 1, history_tokens)
+        rounds = round_table.get(key)
+        if rounds is None:
+            rounds = round_table[key] = []
+            for idx, (uncached, output) in enumerate(message_round_tokens(profiles[name], pos, history_tokens)):
+                counted = uncached + (CACHED_PREFIX_TOKENS if pos == 1 and idx == 0 else 0)
+                rounds.append((counted, output, speed["ttft"] + output / speed["tokens_per_sec"]))
+        return rounds
+
+    # Per-user state, indexed by user id
+    remaining = [rng.randint(1, max_len) for _ in range(users)]
+    position = [0] * users
+    message_type = [None] * users  # type of the user's previous message
+    history = [0] * users
+    current = [None] * users      # rounds of the message in progress
+    round_idx = [0] * users
+    msg_started = array("d", bytes(8 * users))
+
+    # Token buckets: [level, capacity, refill per second]
+    buckets = [[float(limit), float(limit), limit / 60.0] for limit in (rpm, itpm, otpm)]
+    bucket_time = 0.0
+    # Bucket levels as each minute began: the most a minute can admit is that
+    # level plus a minute of refill (up to twice the limit when full)
+    minute_start = {0: [b[0] for b in buckets]}
+
+    queue = []            # FIFO of (user, enqueued_at); head index below
+    queue_head = 0
+    retry_pending = False
+
+    heap = []
+    seq = 0
+    for uid in range(users):
+        heapq.heappush(heap, (rng.uniform(0, minutes * 60), seq, MESSAGE, uid))
+        seq += 1
+
+    per_minute = {}       # minute -> [requests, itpm tokens, otpm tokens]
+    queue_waits = array("d")
+    message_latencies = array("d")
+    requests = 0
+    messages = 0
+    throttled = 0
+
+    inflight = 0
+    streams = 0
+    max_inflight = 0
+    max_streams = 0
+    max_queue = 0
+    inflight_area = 0.0
+    streams_area = 0.0
+    last_t = 0.0
+    events = 0
+
+    def refill(t):
+        nonlocal bucket_time
+        dt = t - bucket_time
+        if dt > 0:
+            minute = int(t // 60)
+            if minute != int(bucket_time // 60):
+                to_boundary = minute * 60 - bucket_time
+                minute_start[minute] = [min(b[1], b[0] + to_boundary * b[2]) for b in buckets]
+            for b in buckets:
+                b[0] = min(b[1], b[0] + dt * b[2])
+            bucket_time = t
+
+    def needs(uid):
+        itpm_tokens, output, _ = current[uid][round_idx[uid]]
+        # A single request larger than a whole minute's budget would never fit
+        return (1.0, min(itpm_tokens, buckets[1][1]), min(output, buckets[2][1]))
+
+    def admit(uid, t, enqueued_at):
+        nonlocal seq, inflight, max_inflight, requests
+        itpm_tokens, output, service = current[uid][round_idx[uid]]
+        for b, need in zip(buckets, needs(uid)):
+            b[0] -= need
+        inflight += 1
+        max_inflight = max(max_inflight, inflight)
+        requests += 1
+        queue_waits.append(t - enqueued_at)
+        stats = per_minute.setdefault(int(t // 60), [0, 0, 0])
+        stats[0] += 1
+        stats[1] += itpm_tokens
+        stats[2] += output
+        heapq.heappush(heap, (t + service, seq, DONE, uid))
+        seq += 1
+
+    def wait_time(uid):
+        return max(0.0, max((need - b[0]) / b[2] for b, need in zip(buckets, needs(uid))))
+
+    def schedule_retry(t):
+        nonlocal seq, retry_pending
+        if queue_head < len(queue) and not retry_pending:
+            uid, _ = queue[queue_head]
+            heapq.heappush(heap, (t + wait_time(uid) + 1e-6, seq, RETRY, -1))
+            seq += 1
+            retry_pending = True
+
+    while heap:
+        t, _, kind, uid = heapq.heappop(heap)
+        events += 1
+        inflight_area += inflight * (t - last_t)
+        streams_area += streams * (t - last_t)
+        last_t = t
+
+        if kind == MESSAGE:
+            position[uid] += 1
+            remaining[uid] -= 1
+            previous = message_type[uid]
+            if previous is None:
+                name = rng.choices(names, cum_weights=start_weights)[0]
+            else:
+                history[uid] += contribution[previous]
+                name = rng.choices(names, cum_weights=transition_weights[previous])[0]
+            message_type[uid] = name
+            current[uid] = rounds_for(name, position[uid], history[uid])
+            round_idx[uid] = 0
+            msg_started[uid] = t
+            messages += 1
+            streams += 1
+            max_streams = max(max_streams, streams)
+            kind = REQUEST
+
+        if kind == REQUEST:
+            refill(t)
+            if queue_head == len(queue) and wait_time(uid) == 0.0:
+                admit(uid, t, t)
+            else:
+                throttled += 1
+                queue.append((uid, t))
+                max_queue = max(max_queue, len(queue) - queue_head)
+                schedule_retry(t)
+
+        elif kind == DONE:
+            inflight -= 1
+            round_idx[uid] += 1
+            if round_idx[uid] < len(current[uid]):
+                heapq.heappush(heap, (t + TOOL_SECONDS, seq, REQUEST, uid))
+                seq += 1
+            else:
+                streams -= 1
+                message_latencies.append(t - msg_started[uid])
+                if remaining[uid] > 0:
+                    think = rng.expovariate(1 / mean_gap_seconds)
+                    heapq.heappush(heap, (t + think, seq, MESSAGE, uid))
+                    seq += 1
+
+        elif kind == RETRY:
+            retry_pending = False
+            refill(t)
+            while queue_head < len(queue):
+                head, enqueued_at = queue[queue_head]
+                if wait_time(head) > 0.0:
+                    break
+                admit(head, t, enqueued_at)
+                queue_head += 1
+            if queue_head == len(queue):
+                queue.clear()
+                queue_head = 0
+            elif queue_head > 65_536:
+                del queue[:queue_head]
+                queue_head = 0
+            schedule_retry(t)
+
+    queue_waits = sorted(queue_waits)
+    message_latencies = sorted(message_latencies)
+    duration = last_t or 1.0
+    # Share of what each bucket could admit, per minute
+    limits = (rpm, itpm, otpm)
+    bucket_use = [
+        [used / (minute_start[minute][i] + limits[i]) for i, used in enumerate(counts)]
+        for minute, counts in per_minute.items()
+    ]
+    return {
+        "users": users,
+        "model": model,
+        "limits": {"rpm": rpm, "itpm": itpm, "otpm": otpm},
+        "messages": messages,
+        "requests": requests,
+        "throttled_requests": throttled,
+        "events": events,
+        "simulated_seconds": duration,
+        "peak_rpm": max((m[0] for m in per_minute.values()), default=0),
+        "peak_itpm": max((m[1] for m in per_minute.values()), default=0),
+        "peak_otpm": max((m[2] for m in per_minute.values()), default=0),
+        "peak_rpm_use": max((u[0] for u in bucket_use), default=0.0),
+        "peak_itpm_use": max((u[1] for u in bucket_use), default=0.0),
+        "peak_otpm_use": max((u[2] for u in bucket_use), default=0.0),
+        "minutes_over_80pct": sum(1 for u in bucket_use if max(u) > 0.8),
+        "queue_wait_p50": _percentile(queue_waits, 50),
+        "queue_wait_p95": _percentile(queue_waits, 95),
+        "queue_wait_p99": _percentile(queue_waits, 99),
+        "queue_wait_max": queue_waits[-1] if queue_waits else 0.0,
+        "message_latency_p50": _percentile(message_latencies, 50),
+        "message_latency_p95": _percentile(message_latencies, 95),
+        "message_latency_p99": _percentile(message_latencies, 99),
+        "max_inflight": max_inflight,
+        "mean_inflight": inflight_area / duration,
+        "max_streams": max_streams,
+        "mean_streams": streams_area / duration,
+        "max_queue": max_queue,
+    }
+
+
+def print_simulation_report(stats, wall_seconds):
+    limits = stats["limits"]
+    print("=" * 80)
+    print("  KOINONIA CHAT CAPACITY SIMULATION")
+    print(f"  {stats['users']:,} users | model: {stats['model']} | "
+          f"{stats['simulated_seconds'] / 60:.0f} simulated minutes")
+    print("=" * 80)
+
+    print(f"\n  Messages:            {stats['messages']:,}")
+    print(f"  API requests:        {stats['requests']:,}")
+    print(f"  Throttled requests:  {stats['throttled_requests']:,} "
+          f"({stats['throttled_requests'] / max(stats['requests'], 1):.1%})")
+
+    print("\n\n🚦 PROVIDER RATE LIMITS (peak minute)")
+    print("-" * 80)
+    print(f"  {'':<20} {'Peak minute':>12}   {'Limit':>12}  {'Of limit':>8}  {'Bucket use':>10}")
+    for label, peak, limit, use in [
+        ("Requests/min", stats["peak_rpm"], limits["rpm"], stats["peak_rpm_use"]),
+        ("Input tokens/min", stats["peak_itpm"], limits["itpm"], stats["peak_itpm_use"]),
+        ("Output tokens/min", stats["peak_otpm"], limits["otpm"], stats["peak_otpm_use"]),
+    ]:
+        print(f"  {label:<20} {peak:>12,} / {limit:>12,}  {peak / limit:>8.1%}  {use:>10.1%}")
+    print("  Bucket use: share of what the bucket could admit that minute. The buckets")
+    print("  start full and refill continuously, so a burst minute can reach 2x a limit.")
+    print(f"  Minutes above 80% bucket use: {stats['minutes_over_80pct']}")
+
+    print("\n\n⏱️  LATENCY (seconds)")
+    print("-" * 80)
+    print(f"  {'':<22} {'p50':>8} {'p95':>8} {'p99':>8}")
+    print(f"  {'Queue wait':<22} {stats['queue_wait_p50']:>8.2f} "
+          f"{stats['queue_wait_p95']:>8.2f} {stats['queue_wait_p99']:>8.2f}")
+    print(f"  {'Message end-to-end':<22} {stats['message_latency_p50']:>8.2f} "
+          f"{stats['message_latency_p95']:>8.2f} {stats['message_latency_p99']:>8.2f}")
+    print(f"  Worst queue wait: {stats['queue_wait_max']:.1f}s")
+
+    print("\n\n🖥️  BUN SERVER CONCURRENCY")
+    print("-" * 80)
+    print(f"  In-flight API requests:  max {stats['max_inflight']:,}  mean {stats['mean_inflight']:,.1f}")
+    print(f"  Open SSE streams:        max {stats['max_streams']:,}  mean {stats['mean_streams']:,.1f}")
+    print(f"  Rate-limit queue depth:  max {stats['max_queue']:,}")
+
+    print(f"\n  Simulated {stats['events']:,} events in {wall_seconds:.1f}s "
+          f"({stats['events'] / max(wall_seconds, 1e-9):,.0f} events/s)")
+
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1 (got {value})")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent chat load against API rate limits")
+    parser.add_argument("--users", "-u", type=_positive_int, default=10_000, help="Simulated users (default: 10000)")
+    parser.add_argument("--minutes", type=float, default=60, help="Window in which sessions start (default: 60)")
+    parser.add_argument("--msgs", type=_positive_int, default=10, help="Average messages per session (default: 10)")
+    parser.add_argument("--model", choices=sorted(MODEL_SPEED), default="sonnet")
+    parser.add_argument("--rpm", type=int, default=DEFAULT_RPM, help="Requests per minute limit")
+    parser.add_argument("--itpm", type=int, default=DEFAULT_ITPM, help="Input tokens per minute limit")
+    parser.add_argument("--otpm", type=int, default=DEFAULT_OTPM, help="Output tokens per minute limit")
+    parser.add_argument("--gap", type=float, default=MEAN_GAP_MINUTES, help="Mean think time between messages (minutes)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = simulate(
+        users=args.users, minutes=args.minutes, msgs_per_session=args.msgs, model=args.model,
+        rpm=args.rpm, itpm=args.itpm, otpm=args.otpm, mean_gap_minutes=args.gap, seed=args.seed,
+    )
+    print_simulation_report(stats, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Koinonia Cost Accounting
+========================
+Running monthly AI spend per user, priced from real token usage with the
+pricing engine's rate tables, and a cost-based budget check for every chat
+request.
+
+The message caps in server/lib/tierConfig.ts assume an average message, so a
+user who sends nothing but web-search studies costs several times what the
+tier allows for. Here each API request's `usage` (the same fields as a
+pricing_replay.py record) is priced as it completes — five multiply-adds
+against a per-token rate row built once from MODEL_RATES — and added to the
+user's in-memory counter for the billing period. Counters touched since the
+last write are upserted to a local SQLite store in one batch every
+FLUSH_BATCH users or FLUSH_SECONDS, and on close:
+
+    user_spend(user_id, period_start, tier, spend, messages, requests, updated)
+        PRIMARY KEY (user_id, period_start)
+
+A user's budget is the AI spend the engine sizes the tier for
+(pricing_analysis.tier_ai_budget: price less infrastructure, less the
+margin). Checking it reads the in-memory counter; only the first touch of a
+user in a process reads the store. The ledger assumes it is the store's only
+writer.
+
+Usage:
+    python cost_accounting.py --replay logs/usage.jsonl      # Feed usage logs into the store
+    python cost_accounting.py --user u_1 --tier believer     # Spend and remaining budget
+    python cost_accounting.py --top 20                       # Biggest spenders this period
+    python cost_accounting.py --bench 1000000                # Updates/s and checks/s
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pricing_analysis import (
+    MODEL_RATES,
+    TIER_MODELS,
+    TIER_PLANS,
+    cost_per_message,
+    tier_ai_budget,
+)
+
+DEFAULT_DB = Path(__file__).resolve().parent / "server" / "cost_ledger.db"
+
+# Write dirty counters after this many distinct users or this many seconds
+FLUSH_BATCH = 1_000
+FLUSH_SECONDS = 5.0
+
+# Monthly AI budget per tier, $
+TIER_BUDGETS = {tier: tier_ai_budget(plan) for tier, plan in TIER_PLANS.items()}
+
+# Counter fields (a list per user, updated in place)
+PERIOD, SPEND, MESSAGES, REQUESTS, TIER = range(5)
+
+
+def rate_row(model: str) -> tuple:
+    """$/token for (input, output, cache read, cache write, 1h cache write)."""
+    rates = MODEL_RATES[model]
+    return tuple(rates[k] / 1_000_000 for k in ("input", "output", "cache_read", "cache_write", "cache_write_1h"))
+
+
+def model_key(model: str | None, tier: str | None = None) -> str:
+    """Map a model id (or, without one, the tier's model) to a MODEL_RATES key."""
+    model = model or TIER_MODELS.get(tier, "sonnet")
+    return "sonnet" if "sonnet" in model else "haiku"
+
+
+def month_period(ts: float | None = None) -> tuple[int, int]:
+    """(start, end) in epoch ms of the UTC calendar month containing ts (default: now)."""
+    now = datetime.fromtimestamp(time.time() if ts is None else ts, timezone.utc)
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_spend (
+            user_id      TEXT    NOT NULL,
+            period_start INTEGER NOT NULL,
+            tier         TEXT,
+            spend        REAL    NOT NULL,
+            messages     INTEGER NOT NULL,
+            requests     INTEGER NOT NULL,
+            updated      REAL    NOT NULL,
+            PRIMARY KEY (user_id, period_start)
+        ) WITHOUT ROWID
+    """)
+
+
+UPSERT_SQL = """
+    INSERT INTO user_spend (user_id, period_start, tier, spend, messages, requests, updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (user_id, period_start) DO UPDATE SET
+        tier = excluded.tier, spend = excluded.spend, messages = excluded.messages,
+        requests = excluded.requests, updated = excluded.updated
+"""
+
+
+class CostLedger:
+    """Per-user running spend for the current billing period. Safe to share across threads."""
+
+    def __init__(self, path: Path = DEFAULT_DB, flush_batch: int = FLUSH_BATCH,
+                 flush_seconds: float = FLUSH_SECONDS, budgets: dict | None = None):
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        ensure_schema(self._conn)
+        self._conn.commit()
+        self.budgets = budgets or TIER_BUDGETS
+        self.flush_batch = flush_batch
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        # user_id -> [period_start, spend, messages, requests, tier]
+        self._counters = {}
+        self._dirty = set()
+        # Counters of a finished period still to be written
+        self._retired = []
+        # Model id / tier -> rate row, filled on first sight
+        self._rates = {}
+        self._period = (0, 0)
+        self._next_flush = time.monotonic() + flush_seconds
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def current_period(self) -> int:
+        """Start (epoch ms) of the current UTC month; recomputed only when it ends."""
+        if time.time() * 1000 >= self._period[1]:
+            self._period = month_period()
+        return self._period[0]
+
+    def _counter(self, user_id: str, period_start: int, tier: str | None) -> list:
+        """The user's counter for a period, loaded from the store on first touch (lock held)."""
+        counter = self._counters.get(user_id)
+        if counter is not None and counter[PERIOD] == period_start:
+            return counter
+        if counter is not None and user_id in self._dirty:
+            self._retired.append(self._row(user_id, counter, time.time()))
+            self._dirty.discard(user_id)
+        if self._retired:
+            # The period being loaded may be one retired above (A, B, A): write it first
+            self._conn.executemany(UPSERT_SQL, self._retired)
+            self._conn.commit()
+            self._retired = []
+        row = self._conn.execute(
+            "SELECT spend, messages, requests, tier FROM user_spend WHERE user_id = ? AND period_start = ?",
+            (user_id, period_start),
+        ).fetchone()
+        counter = [period_start, row[0], row[1], row[2], row[3]] if row else [period_start, 0.0, 0, 0, tier]
+        self._counters[user_id] = counter
+        return counter
+
+    def record(self, user_id: str, tier: str, model: str | None = None, input_tokens: int = 0,
+               output_tokens: int = 0, cache_read: int = 0, cache_write: int = 0, cache_write_1h: int = 0,
+               message: bool = True, period_start: int | None = None) -> float:
+        """Add one API request's cost to the user's spend. Returns the new period spend ($)."""
+        rates = self._rates.get(model or tier)
+        if rates is None:
+            rates = self._rates[model or tier] = rate_row(model_key(model, tier))
+        cost = (input_tokens * rates[0] + output_tokens * rates[1] + cache_read * rates[2]
+                + cache_write * rates[3] + cache_write_1h * rates[4])
+        with self._lock:
+            counter = self._counter(user_id, period_start or self.current_period(), tier)
+            counter[SPEND] += cost
+            counter[MESSAGES] += message
+            counter[REQUESTS] += 1
+            counter[TIER] = tier
+            self._dirty.add(user_id)
+            if len(self._dirty) >= self.flush_batch or time.monotonic() >= self._next_flush:
+                self._flush()
+            return counter[SPEND]
+
+    def record_usage(self, user_id: str, tier: str, usage: dict, model: str | None = None,
+                     message: bool = True, period_start: int | None = None) -> float:
+        """record() from an API response's `usage` (finalMessage.usage or a usage log record)."""
+        cache_write = usage.get("cache_creation_input_tokens", 0) or 0
+        one_hour = (usage.get("cache_creation") or {}).get("ephemeral_1h_input_tokens", 0) or 0
+        return self.record(
+            user_id, tier, model,
+            usage.get("input_tokens", 0) or 0,
+            usage.get("output_tokens", 0) or 0,
+            usage.get("cache_read_input_tokens", 0) or 0,
+            cache_write - one_hour,
+            one_hour,
+            message,
+            period_start,
+        )
+
+    def spend(self, user_id: str, period_start: int | None = None) -> float:
+        with self._lock:
+            return self._counter(user_id, period_start or self.current_period(), None)[SPEND]
+
+    def remaining(self, user_id: str, tier: str, period_start: int | None = None) -> float:
+        """Budget left this period ($, negative once over)."""
+        return self.budgets[tier] - self.spend(user_id, period_start)
+
+    def allow(self, user_id: str, tier: str, period_start: int | None = None) -> bool:
+        """Whether the user may send another message under the tier's cost budget."""
+        return self.remaining(user_id, tier, period_start) > 0
+
+    def status(self, user_id: str, tier: str, period_start: int | None = None) -> dict:
+        """Spend, budget and (at the tier model's average message cost) messages left."""
+        with self._lock:
+            counter = list(self._counter(user_id, period_start or self.current_period(), tier))
+        remaining = self.budgets[tier] - counter[SPEND]
+        return {
+            "user_id": user_id,
+            "tier": tier,
+            "period_start": counter[PERIOD],
+            "spend": counter[SPEND],
+            "budget": self.budgets[tier],
+            "remaining": remaining,
+            "messages": counter[MESSAGES],
+            "requests": counter[REQUESTS],
+            "messages_left": max(int(remaining / cost_per_message(model_key(None, tier))), 0),
+        }
+
+    @staticmethod
+    def _row(user_id: str, counter: list, now: float) -> tuple:
+        return (user_id, counter[PERIOD], counter[TIER], counter[SPEND], counter[MESSAGES], counter[REQUESTS], now)
+
+    def _flush(self):
+        """Upsert every dirty counter in one transaction (lock held)."""
+        now = time.time()
+        rows = self._retired + [self._row(user_id, self._counters[user_id], now) for user_id in self._dirty]
+        if rows:
+            self._conn.executemany(UPSERT_SQL, rows)
+            self._conn.commit()
+        self._retired = []
+        self._dirty.clear()
+        self._next_flush = time.monotonic() + self.flush_seconds
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def top(self, n: int = 10, period_start: int | None = None) -> list[tuple]:
+        """(user_id, tier, spend, messages) of the biggest spenders in a period."""
+        self.flush()
+        return self._conn.execute(
+            "SELECT user_id, tier, spend, messages FROM user_spend WHERE period_start = ? "
+            "ORDER BY spend DESC LIMIT ?",
+            (period_start or self.current_period(), n),
+        ).fetchall()
+
+
+# ============================================================
+# REPLAY + BENCHMARK
+# ============================================================
+
+def replay_logs(ledger: CostLedger, paths) -> tuple[int, int]:
+    """
+    Feed JSONL usage logs (pricing_replay.py format) into the ledger. Lines
+    that are not a usage record are skipped, as pricing_replay.py does.
+    Returns (records applied, malformed lines).
+    """
+    applied = malformed = 0
+    period = (0, 0)
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    if not isinstance(record, dict):
+                        raise TypeError(f"usage record is a {type(record).__name__}")
+                    ts = record.get("ts") or time.time()
+                    if isinstance(ts, bool) or not isinstance(ts, (int, float)):
+                        raise TypeError(f"non-numeric ts {ts!r}")
+                    # Logs are roughly in time order: recompute the month only when it changes
+                    if not period[0] <= ts * 1000 < period[1]:
+                        period = month_period(ts)
+                    ledger.record_usage(
+                        record.get("user_id", "anonymous"), record.get("tier", "free"), record,
+                        record.get("model"), record.get("round", 0) == 0, period[0],
+                    )
+                except (ValueError, TypeError, AttributeError, OverflowError):
+                    malformed += 1
+                    continue
+                applied += 1
+    ledger.flush()
+    return applied, malformed
+
+
+def bench(updates: int = 1_000_000, users: int = 10_000, seed: int = 1):
+    """Updates/s and budget checks/s against a throwaway store."""
+    rng = random.Random(seed)
+    tiers = list(TIER_BUDGETS)
+    user_tiers = [(f"u_{i}", rng.choice(tiers)) for i in range(users)]
+    requests = [
+        (*rng.choice(user_tiers), rng.randint(20, 3000), rng.randint(50, 2500), 9_200 if rng.random() < 0.9 else 0)
+        for _ in range(min(updates, 100_000))
+    ]
+    with tempfile.TemporaryDirectory() as tmp, CostLedger(Path(tmp) / "bench.db") as ledger:
+        for user_id, tier in user_tiers:
+            ledger.record(user_id, tier, message=False)
+        ledger.flush()
+
+        record = ledger.record
+        started = time.perf_counter()
+        for i in range(updates):
+            user_id, tier, input_tokens, output_tokens, cache_read = requests[i % len(requests)]
+            record(user_id, tier, None, input_tokens, output_tokens, cache_read)
+        update_seconds = time.perf_counter() - started
+
+        allow = ledger.allow
+        started = time.perf_counter()
+        for i in range(updates):
+            user_id, tier = requests[i % len(requests)][:2]
+            allow(user_id, tier)
+        check_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        ledger.flush()
+        flush_seconds = time.perf_counter() - started
+        over = sum(1 for user_id, tier in user_tiers if not allow(user_id, tier))
+
+    print(f"  {updates:,} updates over {users:,} users")
+    print(f"  record(): {updates / update_seconds:>12,.0f} updates/s  ({update_seconds / updates * 1e6:.2f} µs)")
+    print(f"  allow():  {updates / check_seconds:>12,.0f} checks/s   ({check_seconds / updates * 1e6:.2f} µs)")
+    print(f"  Final flush: {flush_seconds * 1000:.1f} ms; {over:,} users over budget")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-user AI cost accounting and budget checks")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"Ledger path (default: {DEFAULT_DB})")
+    parser.add_argument("--replay", type=Path, nargs="+", metavar="LOG", help="Apply JSONL usage logs to the ledger")
+    parser.add_argument("--user", help="Print one user's spend and remaining budget")
+    parser.add_argument("--tier", choices=sorted(TIER_BUDGETS), default="free", help="Tier for --user")
+    parser.add_argument("--top", type=int, metavar="N", help="Print the N biggest spenders this period")
+    parser.add_argument("--bench", type=int, metavar="N", help="Benchmark N updates against a temporary ledger")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench)
+        return
+
+    with CostLedger(args.db) as ledger:
+        if args.replay:
+            started = time.perf_counter()
+            applied, malformed = replay_logs(ledger, args.replay)
+            print(f"Applied {applied:,} usage records in {time.perf_counter() - started:.1f}s")
+            if malformed:
+                print(f"  Malformed lines: {malformed:,} (skipped)")
+        if args.user:
+            for key, value in ledger.status(args.user, args.tier).items():
+                print(f"  {key:14s} {value:,.4f}" if isinstance(value, float) else f"  {key:14s} {value}")
+        if args.top:
+            for user_id, tier, spend, messages in ledger.top(args.top):
+                print(f"  {user_id:24s} {tier or '':10s} ${spend:>9,.4f}  {messages:>6,} messages")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,21 @@ Koinonia Bible Study App — Deep Pricing Analysis
 =================================================
 Calculates exact AI costs per message, per session, per month,
 and recommends pricing tiers based on real token measurements.
+
+Usage:
+    python pricing_analysis.py                        # Print the full report
+    python pricing_analysis.py --optimize             # Solve tier caps/models only
+    python pricing_analysis.py --replay usage.jsonl   # Replay real usage logs (see pricing_replay.py)
+    python pricing_analysis.py --bible-db server/bible.db   # Measure passage sizes from bible.db
 """
 
+import argparse
+import math
+import random
+import time
+import unicodedata
+from pathlib import Path
+
 # ============================================================
 # 1. MEASURED TOKEN COUNTS FROM THE ACTUAL CODEBASE
 # ============================================================
@@ -33,6 +46,7 @@ SONNET_INPUT_PER_MTOK = 3.00       # $/MTok
 SONNET_OUTPUT_PER_MTOK = 15.00     # $/MTok
 SONNET_CACHE_WRITE_PER_MTOK = 3.75 # $/MTok (25% premium)
 SONNET_CACHE_READ_PER_MTOK = 0.30  # $/MTok (90% discount)
+SONNET_CACHE_WRITE_1H_PER_MTOK = 6.00  # $/MTok (1-hour TTL, 2× base input)
 
 # ============================================================
 # 3. CLAUDE HAIKU 4.5 PRICING (for comparison)
@@ -42,6 +56,39 @@ HAIKU_INPUT_PER_MTOK = 1.00
 HAIKU_OUTPUT_PER_MTOK = 5.00
 HAIKU_CACHE_WRITE_PER_MTOK = 1.25
 HAIKU_CACHE_READ_PER_MTOK = 0.10
+HAIKU_CACHE_WRITE_1H_PER_MTOK = 2.00
+
+# Rate tables keyed by the model names used throughout this file
+MODEL_RATES = {
+    "sonnet": {
+        "input": SONNET_INPUT_PER_MTOK,
+        "output": SONNET_OUTPUT_PER_MTOK,
+        "cache_write": SONNET_CACHE_WRITE_PER_MTOK,
+        "cache_read": SONNET_CACHE_READ_PER_MTOK,
+        "cache_write_1h": SONNET_CACHE_WRITE_1H_PER_MTOK,
+    },
+    "haiku": {
+        "input": HAIKU_INPUT_PER_MTOK,
+        "output": HAIKU_OUTPUT_PER_MTOK,
+        "cache_write": HAIKU_CACHE_WRITE_PER_MTOK,
+        "cache_read": HAIKU_CACHE_READ_PER_MTOK,
+        "cache_write_1h": HAIKU_CACHE_WRITE_1H_PER_MTOK,
+    },
+}
+
+# Model served per subscription tier (mirrors server/lib/tierConfig.ts)
+TIER_MODELS = {
+    "free": "haiku",
+    "student": "haiku",
+    "believer": "sonnet",
+    "ministry": "sonnet",
+    "seminary": "sonnet",
+}
+
+
+def get_rates(model):
+    """Return the $/MTok rate table for a model (anything but sonnet bills as haiku)."""
+    return MODEL_RATES["sonnet"] if model == "sonnet" else MODEL_RATES["haiku"]
 
 # ============================================================
 # 4. TYPICAL MESSAGE PROFILES (measured from Bible study patterns)
@@ -86,6 +133,7 @@ profiles = {
         "tool_use_output_tokens": [200],             # read_passage tool_use block
         "text_output_tokens": 800,                   # substantive Bible study response
         "tool_result_input_tokens": [1500],          # passage text (10-20 verses)
+        "passage_verses": 15,                         # verses returned by read_passage in round 1
         "history_contribution": 1200,
     },
     "deep_study": {
@@ -97,6 +145,7 @@ profiles = {
         "tool_use_output_tokens": [250],              # read_passage with cross_refs
         "text_output_tokens": 1500,                   # detailed study with Greek/Hebrew
         "tool_result_input_tokens": [2500],           # passage + cross-refs
+        "passage_verses": 15,                         # verses returned by read_passage in round 1
         "history_contribution": 1800,
     },
     "web_search_study": {
@@ -108,6 +157,7 @@ profiles = {
         "tool_use_output_tokens": [200, 0],            # read_passage, web_search is server-managed
         "text_output_tokens": 2000,                    # very detailed response with citations
         "tool_result_input_tokens": [1500, 3000],      # passage + search results
+        "passage_verses": 15,                         # verses returned by read_passage in round 1
         "history_contribution": 2500,
     },
     "journal_write": {
@@ -119,6 +169,7 @@ profiles = {
         "tool_use_output_tokens": [200, 800],          # read_passage + write_journal (long content)
         "text_output_tokens": 300,                     # brief confirmation
         "tool_result_input_tokens": [1500, 100],       # passage text + journal success
+        "passage_verses": 15,                         # verses returned by read_passage in round 1
         "history_contribution": 1500,
     },
 }
@@ -127,52 +178,270 @@ profiles = {
 total_freq = sum(p["frequency"] for p in profiles.values())
 assert abs(total_freq - 1.0) < 0.001, f"Frequencies sum to {total_freq}, not 1.0"
 
+# ============================================================
+# 4b. PROMPT CACHE STRATEGIES
+# ============================================================
+# Anthropic prompt caching: a cache_control breakpoint caches everything up to it.
+# Entries live for the TTL after their last hit (5 min default, 1 h at 2× input).
+# Tool rounds inside one message are seconds apart, so only the gap between
+# messages (the user reading and typing) can let the cache expire.
+
+# Average minutes between a response and the user's next message.
+# Gaps are modelled as exponential, so P(cache expired) = exp(-ttl / mean gap).
+MEAN_GAP_MINUTES = 4.0
+
+CACHE_STRATEGIES = {
+    "prefix_only": {
+        "description": "System prompt + tools cached, history billed as input (current server)",
+        "history_breakpoints": False,
+        "ttl_minutes": 5,
+    },
+    "history_5m": {
+        "description": "Breakpoint after the newest message, 5-min TTL",
+        "history_breakpoints": True,
+        "ttl_minutes": 5,
+    },
+    "history_1h": {
+        "description": "Breakpoint after the newest message, 1-hour TTL",
+        "history_breakpoints": True,
+        "ttl_minutes": 60,
+    },
+}
+
+
+def cache_expiry_probability(ttl_minutes, mean_gap_minutes=MEAN_GAP_MINUTES):
+    """Probability the cache has expired by the next message, for exponential gaps."""
+    if mean_gap_minutes <= 0:
+        return 0.0
+    return math.exp(-ttl_minutes / mean_gap_minutes)
+
 
 # ============================================================
-# 5. COST CALCULATION ENGINE
+# 4c. CONVERSATION COMPOSITION (Markov chain over message types)
 # ============================================================
+# Each message adds its profile's history_contribution to every later request.
+# Message types follow a Markov chain: with MESSAGE_TYPE_STICKINESS the user
+# stays on the same kind of question, otherwise the next type is drawn from
+# the profile frequencies. This keeps the frequencies as the stationary mix
+# while letting e.g. web-search studies cluster and build up history faster.
+
+MESSAGE_TYPE_STICKINESS = 0.35
 
-def calculate_message_cost(profile, msg_position_in_convo, model="sonnet"):
+# Longest conversation the per-position tables are precomputed for
+MAX_CONVERSATION_LENGTH = 50
+
+
+def build_transitions(stickiness=MESSAGE_TYPE_STICKINESS):
+    """Transition probabilities P(next type | current type) as nested dicts."""
+    return {
+        current: {
+            nxt: (stickiness if nxt == current else 0.0) + (1 - stickiness) * profiles[nxt]["frequency"]
+            for nxt in profiles
+        }
+        for current in profiles
+    }
+
+
+MESSAGE_TRANSITIONS = build_transitions()
+
+# Type of the first message in a conversation
+START_DISTRIBUTION = {name: p["frequency"] for name, p in profiles.items()}
+
+_composition_table = None
+
+
+def composition_table():
     """
-    Calculate the exact cost of one message exchange.
+    Per-position message-type marginals and expected history, for positions
+    1..MAX_CONVERSATION_LENGTH (index 0 unused).
+
+    Forward recursion over the chain, O(N · types²):
+        π_n(p)  = Σ_q π_{n-1}(q) T(q, p)
+        A_n(p)  = Σ_q (A_{n-1}(q) + π_{n-1}(q) h(q)) T(q, p)    (A_n = E[H_n; X_n = p])
+        B_n(p)  = Σ_q π_{n-1}(q) h(q) T(q, p)                   (B_n = E[h(X_{n-1}); X_n = p])
+    Each row holds "marginal" π_n, "history" E[H_n | X_n = p] and "last"
+    E[h(X_{n-1}) | X_n = p] — the previous message's share of that history.
+    """
+    global _composition_table
+    if _composition_table is not None and len(_composition_table) > MAX_CONVERSATION_LENGTH:
+        return _composition_table
+
+    names = list(profiles)
+    contribution = {name: profiles[name]["history_contribution"] for name in names}
+    marginal = dict(START_DISTRIBUTION)
+    joint_history = {name: 0.0 for name in names}
+    joint_last = {name: 0.0 for name in names}
+
+    table = [None]
+    for pos in range(1, MAX_CONVERSATION_LENGTH + 1):
+        if pos > 1:
+            marginal, joint_history, joint_last = (
+                {p: sum(marginal[q] * MESSAGE_TRANSITIONS[q][p] for q in names) for p in names},
+                {p: sum((joint_history[q] + marginal[q] * contribution[q]) * MESSAGE_TRANSITIONS[q][p]
+                        for q in names) for p in names},
+                {p: sum(marginal[q] * contribution[q] * MESSAGE_TRANSITIONS[q][p] for q in names)
+                 for p in names},
+            )
+        table.append({
+            "marginal": marginal,
+            "history": {p: joint_history[p] / marginal[p] if marginal[p] else 0.0 for p in names},
+            "last": {p: joint_last[p] / marginal[p] if marginal[p] else 0.0 for p in names},
+        })
+
+    _composition_table = table
+    return table
+
+
+def _profile_name(profile):
+    """Name of a profile, also for modified copies (matched by description)."""
+    for name, known in profiles.items():
+        if known is profile or known["description"] == profile.get("description"):
+            return name
+    return None
+
+
+def expected_history(msg_position_in_convo, profile=None):
+    """
+    Expected (history tokens, previous message's contribution) at a position.
 
-    msg_position_in_convo: 1-based position (1 = first message, affects history size)
+    Conditioned on the message type when the profile is known, otherwise
+    averaged over the position's type marginals.
     """
-    if model == "sonnet":
-        input_rate = SONNET_INPUT_PER_MTOK
-        output_rate = SONNET_OUTPUT_PER_MTOK
-        cache_write_rate = SONNET_CACHE_WRITE_PER_MTOK
-        cache_read_rate = SONNET_CACHE_READ_PER_MTOK
-    else:
-        input_rate = HAIKU_INPUT_PER_MTOK
-        output_rate = HAIKU_OUTPUT_PER_MTOK
-        cache_write_rate = HAIKU_CACHE_WRITE_PER_MTOK
-        cache_read_rate = HAIKU_CACHE_READ_PER_MTOK
+    if msg_position_in_convo > MAX_CONVERSATION_LENGTH:
+        raise ValueError(f"Position {msg_position_in_convo} exceeds MAX_CONVERSATION_LENGTH "
+                         f"({MAX_CONVERSATION_LENGTH})")
+    row = composition_table()[msg_position_in_convo]
+    name = _profile_name(profile) if profile is not None else None
+    if name is not None:
+        return round(row["history"][name]), round(row["last"][name])
+    history = sum(row["marginal"][p] * row["history"][p] for p in profiles)
+    last = sum(row["marginal"][p] * row["last"][p] for p in profiles)
+    return round(history), round(last)
 
-    # Estimate conversation history tokens based on position
-    # Each prior message pair adds ~history_contribution tokens on average
-    avg_history_per_msg = 800  # average across all profile types
-    history_tokens = (msg_position_in_convo - 1) * avg_history_per_msg
 
-    total_input_cost = 0.0
-    total_output_cost = 0.0
-    total_input_tokens = 0
-    total_output_tokens = 0
+def expected_history_per_msg():
+    """Stationary average of history_contribution under the chain."""
+    return sum(p["frequency"] * p["history_contribution"] for p in profiles.values())
+
+
+def sample_conversation(length, rng=random):
+    """
+    Draw one conversation from the chain.
+
+    Returns a list of (profile name, history tokens, previous message's history
+    tokens) per position, ready for calculate_message_cost's history overrides.
+    """
+    names = list(profiles)
+    conversation = []
+    history = 0
+    prev_history = 0
+    name = rng.choices(names, [START_DISTRIBUTION[n] for n in names])[0]
+    for pos in range(1, length + 1):
+        if pos > 1:
+            row = MESSAGE_TRANSITIONS[name]
+            prev_history = history
+            history += profiles[name]["history_contribution"]
+            name = rng.choices(names, [row[n] for n in names])[0]
+        conversation.append((name, history, prev_history))
+    return conversation
+
+
+# ============================================================
+# 4d. PASSAGE SIZES FROM bible.db
+# ============================================================
+# The read_passage results above assume ~1,500 tokens for "10-20 verses".
+# When a bible.db with chapter_tokens (server/scripts/token_counts.py) is
+# available, the passage part of each profile's first tool result is derived
+# from the real text instead; any extra (cross-refs, search results) is kept.
+
+PASSAGE_ESTIMATE_TOKENS = 1500
+
+# read_passage wraps each verse as {"verse": n, "text": "..."} plus a
+# reference/translation envelope
+VERSE_JSON_TOKENS = 8
+PASSAGE_ENVELOPE_TOKENS = 30
+
+
+def passage_tokens(db_path, translation="KJV", verses=15):
+    """
+    Mean token size of a read_passage result of `verses` consecutive verses,
+    over every window in every chapter of a translation (whole chapter when
+    the chapter is shorter). Each window is one prefix-sum difference.
+    """
+    import sqlite3
+    import sys
+    from array import array
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            "SELECT cumulative FROM chapter_tokens WHERE translation = ?", (translation,)
+        ).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        raise ValueError(f"No chapter_tokens for {translation} in {db_path} — run server/scripts/token_counts.py")
+
+    total = 0
+    windows = 0
+    for (blob,) in rows:
+        cumulative = array("I")
+        cumulative.frombytes(blob)
+        if sys.byteorder == "big":
+            cumulative.byteswap()
+        last = len(cumulative) - 1
+        if last <= verses:
+            total += cumulative[last] - cumulative[0] + last * VERSE_JSON_TOKENS
+            windows += 1
+            continue
+        count = last - verses + 1
+        # Σ_s (C[s+w-1] - C[s-1]) for s = 1..count
+        total += sum(cumulative[verses:last + 1]) - sum(cumulative[0:count])
+        total += count * verses * VERSE_JSON_TOKENS
+        windows += count
+    return PASSAGE_ENVELOPE_TOKENS + total / windows
+
+
+def apply_passage_sizes(db_path, translation="KJV"):
+    """
+    Replace the passage estimate in each reading profile's first tool result
+    with the size measured from bible.db. Returns {profile: (old, new)}.
+    """
+    changes = {}
+    sizes = {}
+    for name, p in profiles.items():
+        verses = p.get("passage_verses")
+        if not verses:
+            continue
+        if verses not in sizes:
+            sizes[verses] = round(passage_tokens(db_path, translation, verses))
+        old = p["tool_result_input_tokens"][0]
+        new = old - PASSAGE_ESTIMATE_TOKENS + sizes[verses]
+        p["tool_result_input_tokens"][0] = new
+        changes[name] = (old, new)
+    _position_costs.clear()
+    return changes
 
-    # Cache behavior: first message in conversation writes cache, subsequent reads
-    is_first_in_convo = msg_position_in_convo == 1
+
+# ============================================================
+# 5. COST CALCULATION ENGINE
+# ============================================================
+
+def message_round_tokens(profile, msg_position_in_convo, history_tokens=None):
+    """
+    Token counts for each API request (round) of one message exchange.
+
+    Returns a list of (uncached_input_tokens, output_tokens) per round. The
+    cached prefix (CACHED_PREFIX_TOKENS) is sent on top of every round.
+    history_tokens defaults to the expected history for this profile and position.
+    """
+    if history_tokens is None:
+        history_tokens, _ = expected_history(msg_position_in_convo, profile)
+    rounds = []
 
     for round_idx in range(profile["rounds"]):
         # --- INPUT TOKENS ---
 
-        # Cached prefix (system prompt + tools)
-        if is_first_in_convo and round_idx == 0:
-            # First request: cache write
-            cached_cost = CACHED_PREFIX_TOKENS * cache_write_rate / 1_000_000
-        else:
-            # Subsequent: cache read
-            cached_cost = CACHED_PREFIX_TOKENS * cache_read_rate / 1_000_000
-
         # Non-cached input
         uncached_tokens = CONTEXT_BLOCK_TOKENS  # panel context
 
@@ -192,11 +461,6 @@ def calculate_message_cost(profile, msg_position_in_convo, model="sonnet"):
                 if prev_r < len(profile["tool_use_output_tokens"]):
                     uncached_tokens += profile["tool_use_output_tokens"][prev_r]
 
-        uncached_cost = uncached_tokens * input_rate / 1_000_000
-        round_input = uncached_tokens + CACHED_PREFIX_TOKENS
-        total_input_tokens += round_input
-        total_input_cost += cached_cost + uncached_cost
-
         # --- OUTPUT TOKENS ---
         round_output = 0
 
@@ -212,341 +476,749 @@ def calculate_message_cost(profile, msg_position_in_convo, model="sonnet"):
         if round_idx == profile["rounds"] - 1:
             round_output += profile["text_output_tokens"]
 
+        rounds.append((uncached_tokens, round_output))
+
+    return rounds
+
+
+def calculate_message_cost(profile, msg_position_in_convo, model="sonnet",
+                           cache_strategy=None, mean_gap_minutes=MEAN_GAP_MINUTES,
+                           history_tokens=None, prev_history_tokens=None):
+    """
+    Calculate the exact cost of one message exchange.
+
+    msg_position_in_convo: 1-based position (1 = first message, affects history size)
+    history_tokens / prev_history_tokens: history sent with this and with the
+        previous message, e.g. from sample_conversation(). Default to the
+        composition engine's expectation for this profile and position.
+    cache_strategy: key of CACHE_STRATEGIES. None keeps the original assumption:
+        prefix written at message #1, read forever after, history never cached.
+    mean_gap_minutes: average time between messages, used for TTL expiry.
+
+    With a strategy, costs are expected values: round 0 of every later message
+    finds the cache cold with probability cache_expiry_probability(), in which
+    case everything it sends is re-written.
+    """
+    rates = get_rates(model)
+    input_rate = rates["input"]
+    output_rate = rates["output"]
+    cache_write_rate = rates["cache_write"]
+    cache_read_rate = rates["cache_read"]
+
+    strategy = CACHE_STRATEGIES[cache_strategy] if cache_strategy else None
+    if strategy:
+        if strategy["ttl_minutes"] > 5:
+            cache_write_rate = rates["cache_write_1h"]
+        p_expired = cache_expiry_probability(strategy["ttl_minutes"], mean_gap_minutes)
+
+    total_input_cost = 0.0
+    total_output_cost = 0.0
+    total_input_tokens = 0
+    total_output_tokens = 0
+    total_cache_read_tokens = 0.0
+    total_cache_write_tokens = 0.0
+
+    if history_tokens is None:
+        history_tokens, last_contribution = expected_history(msg_position_in_convo, profile)
+        prev_history_tokens = history_tokens - last_contribution
+    elif prev_history_tokens is None:
+        prev_history_tokens = history_tokens
+
+    # Uncached tokens the previous request already sent (and may have cached)
+    if msg_position_in_convo > 1:
+        prev_sent_tokens = CONTEXT_BLOCK_TOKENS + prev_history_tokens
+    else:
+        prev_sent_tokens = 0
+
+    # Cache behavior: first message in conversation writes cache, subsequent reads
+    is_first_in_convo = msg_position_in_convo == 1
+
+    rounds = message_round_tokens(profile, msg_position_in_convo, history_tokens)
+    for round_idx, (uncached_tokens, round_output) in enumerate(rounds):
+        # --- INPUT COST ---
+
+        # Cached prefix (system prompt + tools)
+        if is_first_in_convo and round_idx == 0:
+            # First request: cache write
+            cached_cost = CACHED_PREFIX_TOKENS * cache_write_rate / 1_000_000
+        else:
+            # Subsequent: cache read
+            cached_cost = CACHED_PREFIX_TOKENS * cache_read_rate / 1_000_000
+
+        round_input = uncached_tokens + CACHED_PREFIX_TOKENS
+        total_input_tokens += round_input
+
+        if strategy is None:
+            uncached_cost = uncached_tokens * input_rate / 1_000_000
+            total_input_cost += cached_cost + uncached_cost
+            if is_first_in_convo and round_idx == 0:
+                total_cache_write_tokens += CACHED_PREFIX_TOKENS
+            else:
+                total_cache_read_tokens += CACHED_PREFIX_TOKENS
+        else:
+            # Warm: read what the previous request cached, pay for the rest
+            if strategy["history_breakpoints"]:
+                warm_read = CACHED_PREFIX_TOKENS + prev_sent_tokens
+                warm_write = uncached_tokens - prev_sent_tokens
+                warm_input = 0
+                # Cold: the whole request is written again
+                cold_write = round_input
+                cold_input = 0
+            else:
+                warm_read = CACHED_PREFIX_TOKENS
+                warm_write = 0
+                warm_input = uncached_tokens
+                cold_write = CACHED_PREFIX_TOKENS
+                cold_input = uncached_tokens
+
+            if is_first_in_convo and round_idx == 0:
+                p_cold = 1.0
+            elif round_idx == 0:
+                p_cold = p_expired
+            else:
+                p_cold = 0.0
+
+            read_tokens = (1 - p_cold) * warm_read
+            write_tokens = (1 - p_cold) * warm_write + p_cold * cold_write
+            input_tokens = (1 - p_cold) * warm_input + p_cold * cold_input
+            total_cache_read_tokens += read_tokens
+            total_cache_write_tokens += write_tokens
+            total_input_cost += (
+                read_tokens * cache_read_rate
+                + write_tokens * cache_write_rate
+                + input_tokens * input_rate
+            ) / 1_000_000
+
+        prev_sent_tokens = uncached_tokens
+
+        # --- OUTPUT COST ---
         total_output_tokens += round_output
         total_output_cost += round_output * output_rate / 1_000_000
 
     return {
         "input_tokens": total_input_tokens,
         "output_tokens": total_output_tokens,
+        "cache_read_tokens": total_cache_read_tokens,
+        "cache_write_tokens": total_cache_write_tokens,
         "input_cost": total_input_cost,
         "output_cost": total_output_cost,
         "total_cost": total_input_cost + total_output_cost,
     }
 
 
-# ============================================================
-# 6. RUN ANALYSIS
-# ============================================================
+# Precomputed per-position costs, keyed by (model, cache strategy, mean gap)
+_position_costs = {}
 
-print("=" * 80)
-print("  KOINONIA BIBLE STUDY APP — AI COST ANALYSIS")
-print("  Claude Sonnet 4.6 | Adaptive Thinking | Effort: Medium")
-print("=" * 80)
-
-# --- Per-profile costs at different conversation positions ---
-print("\n\n📊 COST PER MESSAGE TYPE (at conversation position #1, #5, #10, #15)")
-print("-" * 80)
-
-for name, profile in profiles.items():
-    print(f"\n  {'─'*70}")
-    print(f"  📌 {name.upper()} ({int(profile['frequency']*100)}% of messages)")
-    print(f"     {profile['description']}")
-    print(f"     Rounds: {profile['rounds']}")
-
-    for pos in [1, 5, 10, 15]:
-        result = calculate_message_cost(profile, pos, "sonnet")
-        print(f"     Msg #{pos:2d}: ${result['total_cost']:.4f}  "
-              f"(in: {result['input_tokens']:,} tok → ${result['input_cost']:.4f} | "
-              f"out: {result['output_tokens']:,} tok → ${result['output_cost']:.4f})")
-
-
-# --- Weighted average cost per message ---
-print("\n\n" + "=" * 80)
-print("📈 WEIGHTED AVERAGE COST PER MESSAGE")
-print("=" * 80)
-
-for model_name, model_key in [("SONNET 4.6", "sonnet"), ("HAIKU 4.5", "haiku")]:
-    print(f"\n  Model: {model_name}")
-    print(f"  {'─'*60}")
-
-    for convo_len_label, positions in [
-        ("Short conversation (5 msgs)", range(1, 6)),
-        ("Medium conversation (10 msgs)", range(1, 11)),
-        ("Long conversation (15 msgs)", range(1, 16)),
-        ("Very long conversation (20 msgs)", range(1, 21)),
-    ]:
-        total_cost = 0
-        msg_count = 0
-        for pos in positions:
-            for name, profile in profiles.items():
-                cost = calculate_message_cost(profile, pos, model_key)
-                total_cost += cost["total_cost"] * profile["frequency"]
-                msg_count += profile["frequency"]
-
-        avg_cost = total_cost / (msg_count / len(profiles))
-        print(f"    {convo_len_label}: ${avg_cost:.4f}/msg  "
-              f"(total convo: ${total_cost:.3f})")
-
-
-# --- Session-level analysis ---
-print("\n\n" + "=" * 80)
-print("📖 TYPICAL BIBLE STUDY SESSION COSTS (Sonnet 4.6)")
-print("=" * 80)
-
-session_types = [
-    ("Quick devotional", 5, "5 messages — read a passage, ask a couple questions"),
-    ("Standard study", 12, "12 messages — deep dive into a chapter"),
-    ("Extended study", 20, "20 messages — full study with web search, journal entry"),
-    ("Teaching prep", 25, "25 messages — sermon prep with presentation creation"),
-]
-
-for session_name, msg_count, desc in session_types:
-    total_cost = 0
-    for pos in range(1, msg_count + 1):
-        for name, profile in profiles.items():
-            cost = calculate_message_cost(profile, pos, "sonnet")
-            total_cost += cost["total_cost"] * profile["frequency"]
-
-    avg_per_msg = total_cost / msg_count
-    print(f"\n  📖 {session_name} — {desc}")
-    print(f"     Total: ${total_cost:.3f}  |  Avg: ${avg_per_msg:.4f}/msg")
 
+def position_cost_table(model="sonnet", cache_strategy=None, mean_gap_minutes=MEAN_GAP_MINUTES):
+    """
+    Expected cost of the message at each position 1..MAX_CONVERSATION_LENGTH,
+    weighted by the chain's type marginals, and its prefix sums.
 
-# --- Monthly usage modeling ---
-print("\n\n" + "=" * 80)
-print("📅 MONTHLY COST PROJECTIONS (Sonnet 4.6)")
-print("=" * 80)
+    Returns (per_position, cumulative), both indexed by position (index 0 = 0).
+    Computed once per model/strategy/gap; every conversation length is then
+    a lookup.
+    """
+    key = (model, cache_strategy, mean_gap_minutes)
+    if key not in _position_costs:
+        table = composition_table()
+        per_position = [0.0]
+        cumulative = [0.0]
+        for pos in range(1, MAX_CONVERSATION_LENGTH + 1):
+            marginal = table[pos]["marginal"]
+            cost = sum(
+                marginal[name] * calculate_message_cost(
+                    profiles[name], pos, model, cache_strategy, mean_gap_minutes
+                )["total_cost"]
+                for name in profiles
+            )
+            per_position.append(cost)
+            cumulative.append(cumulative[-1] + cost)
+        _position_costs[key] = (per_position, cumulative)
+    return _position_costs[key]
+
+
+def conversation_cost(length, model="sonnet", cache_strategy=None, mean_gap_minutes=MEAN_GAP_MINUTES):
+    """Expected total cost of a conversation of `length` messages."""
+    if length > MAX_CONVERSATION_LENGTH:
+        raise ValueError(f"Conversation length {length} exceeds MAX_CONVERSATION_LENGTH "
+                         f"({MAX_CONVERSATION_LENGTH})")
+    return position_cost_table(model, cache_strategy, mean_gap_minutes)[1][length]
+
+
+def sampled_conversation_costs(length, samples=1000, model="sonnet", cache_strategy=None, seed=1):
+    """Total costs of `samples` conversations drawn from the chain, sorted ascending."""
+    rng = random.Random(seed)
+    costs = []
+    for _ in range(samples):
+        total = 0.0
+        for pos, (name, history, prev_history) in enumerate(sample_conversation(length, rng), start=1):
+            total += calculate_message_cost(
+                profiles[name], pos, model, cache_strategy,
+                history_tokens=history, prev_history_tokens=prev_history,
+            )["total_cost"]
+        costs.append(total)
+    return sorted(costs)
 
-# User personas
-personas = [
-    ("Casual reader", 3, 5, "3 sessions/week × 5 msgs"),
-    ("Daily devotional", 7, 8, "Daily × 8 msgs"),
-    ("Serious student", 5, 15, "5 sessions/week × 15 msgs"),
-    ("Pastor/teacher", 6, 20, "6 sessions/week × 20 msgs"),
-    ("Power user", 7, 25, "Daily × 25 msgs"),
-]
 
-print(f"\n  {'Persona':<22} {'Sessions':<28} {'Msgs/mo':>8} {'AI Cost/mo':>12} {'Haiku Cost':>12}")
-print(f"  {'─'*22} {'─'*28} {'─'*8} {'─'*12} {'─'*12}")
+# ============================================================
+# 5b. TIER LIMIT OPTIMIZER
+# ============================================================
+# Solves for the largest safe monthly message cap and the model per tier,
+# so the tier table is rendered from the engine instead of hand-tuned text.
+
+# Amortized infrastructure per user (see section 7)
+HOSTING_PER_USER = 2.00
+MISC_PER_USER = 1.00
+INFRA_COST_PER_USER = HOSTING_PER_USER + MISC_PER_USER
+
+# Margin kept back from each paid tier's AI budget
+TARGET_MARGIN = 0.15
+
+# Share of conversations by length (messages) for a user who hits the cap
+CONVERSATION_LENGTH_MIX = {5: 0.30, 10: 0.40, 15: 0.20, 20: 0.10}
+
+# Average share of the cap that paying users actually send
+AVG_USAGE_OF_CAP = 0.60
+
+# Tiers in server/lib/tierConfig.ts. Models are tried in order of preference;
+# the first one allowing at least min_messages wins. The free tier has no
+# revenue, so it gets a fixed acquisition budget instead.
+TIER_PLANS = {
+    "free": {
+        "label": "🆓 FREE TIER", "price": 0, "ai_budget": 0.50,
+        "models": ["haiku"], "min_messages": 0,
+        "purpose": "Try it out, get hooked",
+    },
+    "student": {
+        "label": "✝️  STUDENT", "price": 10,
+        "models": ["sonnet", "haiku"], "min_messages": 150,
+        "purpose": "Daily casual Bible reading with AI help",
+    },
+    "believer": {
+        "label": "📖 BELIEVER", "price": 25,
+        "models": ["sonnet", "haiku"], "min_messages": 150,
+        "purpose": "Serious daily Bible study",
+    },
+    "ministry": {
+        "label": "⛪ MINISTRY", "price": 50,
+        "models": ["sonnet", "haiku"], "min_messages": 400,
+        "purpose": "Pastors, teachers, sermon prep",
+    },
+    "seminary": {
+        "label": "🏛️  SEMINARY", "price": 100,
+        "models": ["sonnet", "haiku"], "min_messages": 800,
+        "purpose": "Full-time scholars, multi-hour daily study",
+    },
+}
 
-for persona_name, sessions_per_week, msgs_per_session, desc in personas:
-    sessions_per_month = sessions_per_week * 4.3  # avg weeks per month
-    msgs_per_month = int(sessions_per_month * msgs_per_session)
+MODEL_LABELS = {"sonnet": "Sonnet 4.6", "haiku": "Haiku 4.5"}
 
-    # Calculate with realistic conversation lengths
-    sonnet_total = 0
-    haiku_total = 0
-    for session in range(int(sessions_per_month)):
-        for pos in range(1, msgs_per_session + 1):
-            for name, profile in profiles.items():
-                sonnet_cost = calculate_message_cost(profile, pos, "sonnet")
-                haiku_cost = calculate_message_cost(profile, pos, "haiku")
-                sonnet_total += sonnet_cost["total_cost"] * profile["frequency"]
-                haiku_total += haiku_cost["total_cost"] * profile["frequency"]
+# (uncached input, cache read, cache write, output) tokens per message,
+# averaged over CONVERSATION_LENGTH_MIX — filled on first use
+_mix_token_vector = None
 
-    print(f"  {persona_name:<22} {desc:<28} {msgs_per_month:>8} ${sonnet_total:>10.2f} ${haiku_total:>10.2f}")
 
+def mix_token_vector(length_mix=None):
+    """
+    Average token usage per message for a conversation-length mix.
 
-# ============================================================
-# 7. PRICING RECOMMENDATIONS
-# ============================================================
+    Token counts do not depend on prices, so this is computed once and every
+    re-pricing is a 4-term dot product.
+    """
+    global _mix_token_vector
+    if length_mix is None and _mix_token_vector is not None:
+        return _mix_token_vector
+
+    mix = length_mix or CONVERSATION_LENGTH_MIX
+    longest = max(mix)
+
+    # Prefix sums of expected tokens over positions 1..N
+    table = composition_table()
+    cumulative = [(0.0, 0.0, 0.0, 0.0)]
+    for pos in range(1, longest + 1):
+        step = [0.0, 0.0, 0.0, 0.0]
+        for name, profile in profiles.items():
+            result = calculate_message_cost(profile, pos)
+            read = result["cache_read_tokens"]
+            write = result["cache_write_tokens"]
+            uncached = result["input_tokens"] - read - write
+            for i, n in enumerate((uncached, read, write, result["output_tokens"])):
+                step[i] += n * table[pos]["marginal"][name]
+        cumulative.append(tuple(c + s for c, s in zip(cumulative[-1], step)))
+
+    messages = sum(share * length for length, share in mix.items())
+    vector = tuple(
+        sum(share * cumulative[length][i] for length, share in mix.items()) / messages
+        for i in range(4)
+    )
+    if length_mix is None:
+        _mix_token_vector = vector
+    return vector
+
+
+def cost_per_message(model, length_mix=None, model_rates=None):
+    """Expected $/message for a model over a conversation-length mix."""
+    rates = (model_rates or MODEL_RATES)[model]
+    uncached, read, write, output = mix_token_vector(length_mix)
+    return (
+        uncached * rates["input"]
+        + read * rates["cache_read"]
+        + write * rates["cache_write"]
+        + output * rates["output"]
+    ) / 1_000_000
+
+
+def _round_cap(messages):
+    """Round a cap down to a number that reads well on a pricing page."""
+    step = 5 if messages < 50 else 10 if messages < 200 else 50 if messages < 1000 else 100
+    return messages // step * step
+
+
+def tier_ai_budget(plan, margin=TARGET_MARGIN):
+    """Monthly AI spend a tier can absorb: (price - infra) * (1 - margin), or the free tier's fixed budget."""
+    if plan["price"]:
+        return (plan["price"] - INFRA_COST_PER_USER) * (1 - margin)
+    return plan["ai_budget"]
+
+
+def optimize_tiers(plans=None, margin=TARGET_MARGIN, length_mix=None,
+                   avg_usage=AVG_USAGE_OF_CAP, model_rates=None):
+    """
+    Solve each tier's model and maximum safe message cap.
 
-print("\n\n" + "=" * 80)
-print("💰 PRICING RECOMMENDATIONS FOR $25/MONTH PLAN")
-print("=" * 80)
+    A cap is safe when a user who sends every message still leaves `margin`
+    of the price after AI and infrastructure costs:
+        cap * cost_per_message <= (price - infra) * (1 - margin)
+    """
+    plans = plans or TIER_PLANS
+    per_msg = {
+        model: cost_per_message(model, length_mix, model_rates)
+        for model in (model_rates or MODEL_RATES)
+    }
 
-# Infrastructure costs
-convex_cost = 0       # Free tier covers most dev/small apps
-server_cost = 5       # Small VPS/container for Bun server
-misc_cost = 2         # Domain, monitoring, etc.
-infra_per_user = 2    # Amortized infra per user at scale (shared server)
+    results = {}
+    for tier, plan in plans.items():
+        ai_budget = tier_ai_budget(plan, margin)
+
+        for model in plan["models"]:
+            cap = _round_cap(int(max(ai_budget, 0) / per_msg[model]))
+            if cap >= plan["min_messages"]:
+                break
+
+        max_ai_cost = cap * per_msg[model]
+        expected_ai_cost = max_ai_cost * avg_usage
+        infra = INFRA_COST_PER_USER if plan["price"] else 0.0
+        results[tier] = {
+            "model": model,
+            "messages": cap,
+            "cost_per_message": per_msg[model],
+            "ai_budget": ai_budget,
+            "max_ai_cost": max_ai_cost,
+            "expected_ai_cost": expected_ai_cost,
+            "breakeven_messages": int((plan["price"] - infra) / per_msg[model]) if plan["price"] else 0,
+            "margin_at_cap": plan["price"] - infra - max_ai_cost,
+            "margin_expected": plan["price"] - infra - expected_ai_cost,
+        }
+    return results
+
+
+def _display_width(text):
+    """Terminal columns taken by text (emoji count as two)."""
+    width = 0
+    last = 0
+    for ch in text:
+        if ch == "\ufe0f":
+            # Emoji presentation selector: the preceding symbol renders wide
+            width += 2 - last
+            last = 2
+        elif not unicodedata.combining(ch):
+            last = 2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1
+            width += last
+    return width
+
+
+def render_tier_table(results, plans=None):
+    """Render the recommended tier box from optimize_tiers() results."""
+    plans = plans or TIER_PLANS
+    width = 77
+    lines = [f"  ┌{'─' * width}┐", f"  │{'':<{width}}│"]
+    for tier, result in results.items():
+        plan = plans[tier]
+        title = plan["label"] if not plan["price"] else f"{plan['label']} — ${plan['price']}/month"
+        body = [
+            title,
+            f"   Model: {MODEL_LABELS.get(result['model'], result['model'])}",
+            f"   Messages: {result['messages']:,}/month",
+            f"   AI cost to you: ~${result['expected_ai_cost']:.2f}/month avg, "
+            f"${result['max_ai_cost']:.2f} if fully used",
+        ]
+        if plan["price"]:
+            # Same basis as the cap constraint in optimize_tiers(): the price less infrastructure
+            pct = result["margin_at_cap"] / (plan["price"] - INFRA_COST_PER_USER) * 100
+            body.append(f"   Margin: ${result['margin_at_cap']:.2f}/month at cap ({pct:.0f}% after infra), "
+                        f"${result['margin_expected']:.2f} at avg usage")
+        body.append(f"   Purpose: {plan['purpose']}")
+        for text in body:
+            lines.append(f"  │  {text}{' ' * (width - 2 - _display_width(text))}│")
+        lines.append(f"  │{'':<{width}}│")
+    lines.append(f"  └{'─' * width}┘")
+    return "\n".join(lines)
+
+
+def render_summary_box(rows, width=54):
+    """Render rows of text inside a single-line box."""
+    lines = [f"  ┌{'─' * width}┐", f"  │{'':<{width}}│"]
+    for text in rows:
+        text = f"   {text}" if text else ""
+        lines.append(f"  │{text}{' ' * (width - _display_width(text))}│")
+    lines.append(f"  │{'':<{width}}│")
+    lines.append(f"  └{'─' * width}┘")
+    return "\n".join(lines)
+
+
+def render_tier_config(results):
+    """TIER_CONFIG entries for server/lib/tierConfig.ts."""
+    lines = ["export const TIER_CONFIG: Record<Tier, { messageLimit: number; model: \"haiku\" | \"sonnet\" }> = {"]
+    for tier, result in results.items():
+        limit = f"{result['messages']},"
+        lines.append(f"  {tier + ':':<9} {{ messageLimit: {limit:<5} model: \"{result['model']}\" }},")
+    lines.append("};")
+    return "\n".join(lines)
+
+
+def print_report():
+    """Print the full cost analysis and tier recommendation report."""
+
+    # ============================================================
+    # 6. RUN ANALYSIS
+    # ============================================================
+
+    print("=" * 80)
+    print("  KOINONIA BIBLE STUDY APP — AI COST ANALYSIS")
+    print("  Claude Sonnet 4.6 | Adaptive Thinking | Effort: Medium")
+    print("=" * 80)
+
+    # --- Per-profile costs at different conversation positions ---
+    print("\n\n📊 COST PER MESSAGE TYPE (at conversation position #1, #5, #10, #15)")
+    print("-" * 80)
 
-print(f"""
+    for name, profile in profiles.items():
+        print(f"\n  {'─'*70}")
+        print(f"  📌 {name.upper()} ({int(profile['frequency']*100)}% of messages)")
+        print(f"     {profile['description']}")
+        print(f"     Rounds: {profile['rounds']}")
+
+        for pos in [1, 5, 10, 15]:
+            result = calculate_message_cost(profile, pos, "sonnet")
+            print(f"     Msg #{pos:2d}: ${result['total_cost']:.4f}  "
+                  f"(in: {result['input_tokens']:,} tok → ${result['input_cost']:.4f} | "
+                  f"out: {result['output_tokens']:,} tok → ${result['output_cost']:.4f})")
+
+
+    # --- Weighted average cost per message ---
+    print("\n\n" + "=" * 80)
+    print("📈 WEIGHTED AVERAGE COST PER MESSAGE")
+    print("=" * 80)
+
+    for model_name, model_key in [("SONNET 4.6", "sonnet"), ("HAIKU 4.5", "haiku")]:
+        print(f"\n  Model: {model_name}")
+        print(f"  {'─'*60}")
+
+        for convo_len_label, convo_len in [
+            ("Short conversation (5 msgs)", 5),
+            ("Medium conversation (10 msgs)", 10),
+            ("Long conversation (15 msgs)", 15),
+            ("Very long conversation (20 msgs)", 20),
+        ]:
+            total_cost = conversation_cost(convo_len, model_key)
+            avg_cost = total_cost / convo_len
+            print(f"    {convo_len_label}: ${avg_cost:.4f}/msg  "
+                  f"(total convo: ${total_cost:.3f})")
+
+    # --- Sampled conversations: spread around the expectation ---
+    sample_len = 15
+    sampled = sampled_conversation_costs(sample_len, samples=2000)
+    print(f"\n  Sampled {len(sampled):,} conversations of {sample_len} msgs (Sonnet 4.6, Markov mix):")
+    print(f"    Expected: ${conversation_cost(sample_len):.3f}  |  "
+          f"Median: ${sampled[len(sampled) // 2]:.3f}  |  "
+          f"p95: ${sampled[int(len(sampled) * 0.95)]:.3f}  |  "
+          f"Max: ${sampled[-1]:.3f}")
+
+
+    # --- Session-level analysis ---
+    print("\n\n" + "=" * 80)
+    print("📖 TYPICAL BIBLE STUDY SESSION COSTS (Sonnet 4.6)")
+    print("=" * 80)
+
+    session_types = [
+        ("Quick devotional", 5, "5 messages — read a passage, ask a couple questions"),
+        ("Standard study", 12, "12 messages — deep dive into a chapter"),
+        ("Extended study", 20, "20 messages — full study with web search, journal entry"),
+        ("Teaching prep", 25, "25 messages — sermon prep with presentation creation"),
+    ]
+
+    for session_name, msg_count, desc in session_types:
+        total_cost = conversation_cost(msg_count, "sonnet")
+
+        avg_per_msg = total_cost / msg_count
+        print(f"\n  📖 {session_name} — {desc}")
+        print(f"     Total: ${total_cost:.3f}  |  Avg: ${avg_per_msg:.4f}/msg")
+
+
+    # --- Monthly usage modeling ---
+    print("\n\n" + "=" * 80)
+    print("📅 MONTHLY COST PROJECTIONS (Sonnet 4.6)")
+    print("=" * 80)
+
+    # User personas
+    personas = [
+        ("Casual reader", 3, 5, "3 sessions/week × 5 msgs"),
+        ("Daily devotional", 7, 8, "Daily × 8 msgs"),
+        ("Serious student", 5, 15, "5 sessions/week × 15 msgs"),
+        ("Pastor/teacher", 6, 20, "6 sessions/week × 20 msgs"),
+        ("Power user", 7, 25, "Daily × 25 msgs"),
+    ]
+
+    print(f"\n  {'Persona':<22} {'Sessions':<28} {'Msgs/mo':>8} {'AI Cost/mo':>12} {'Haiku Cost':>12}")
+    print(f"  {'─'*22} {'─'*28} {'─'*8} {'─'*12} {'─'*12}")
+
+    for persona_name, sessions_per_week, msgs_per_session, desc in personas:
+        sessions_per_month = sessions_per_week * 4.3  # avg weeks per month
+        msgs_per_month = int(sessions_per_month * msgs_per_session)
+
+        # Calculate with realistic conversation lengths
+        sonnet_total = int(sessions_per_month) * conversation_cost(msgs_per_session, "sonnet")
+        haiku_total = int(sessions_per_month) * conversation_cost(msgs_per_session, "haiku")
+
+        print(f"  {persona_name:<22} {desc:<28} {msgs_per_month:>8} ${sonnet_total:>10.2f} ${haiku_total:>10.2f}")
+
+
+    # ============================================================
+    # 7. PRICING RECOMMENDATIONS
+    # ============================================================
+
+    print("\n\n" + "=" * 80)
+    print("💰 PRICING RECOMMENDATIONS FOR $25/MONTH PLAN")
+    print("=" * 80)
+
+    # Infrastructure costs
+    convex_cost = 0       # Free tier covers most dev/small apps
+    server_cost = 5       # Small VPS/container for Bun server
+    misc_cost = 2         # Domain, monitoring, etc.
+    infra_per_user = HOSTING_PER_USER  # Amortized infra per user at scale (shared server)
+
+    print(f"""
   Fixed infrastructure costs (amortized per user):
     Convex (free tier):           $0.00/mo
     Server hosting (amortized):   ${infra_per_user:.2f}/mo per user
-    Misc (domain, etc.):          $1.00/mo per user
+    Misc (domain, etc.):          ${MISC_PER_USER:.2f}/mo per user
     ─────────────────────────────────────
-    Total infra per user:         ${infra_per_user + 1:.2f}/mo
+    Total infra per user:         ${INFRA_COST_PER_USER:.2f}/mo
 """)
 
-ai_budget = 25 - (infra_per_user + 1)
-print(f"  AI budget per user: $25.00 - ${infra_per_user + 1:.2f} = ${ai_budget:.2f}/month")
+    ai_budget = 25 - INFRA_COST_PER_USER
+    print(f"  AI budget per user: $25.00 - ${INFRA_COST_PER_USER:.2f} = ${ai_budget:.2f}/month")
 
-# Calculate exact message limits for different scenarios
-print(f"\n  ┌{'─'*72}┐")
-print(f"  │ {'MESSAGE LIMITS AT $25/MONTH':^70} │")
-print(f"  ├{'─'*72}┤")
-print(f"  │ {'Avg Convo Length':<20} {'Avg $/msg':<14} {'Break-even msgs':<18} {'Recommended':<18} │")
-print(f"  ├{'─'*72}┤")
+    # Calculate exact message limits for different scenarios
+    print(f"\n  ┌{'─'*72}┐")
+    print(f"  │ {'MESSAGE LIMITS AT $25/MONTH':^70} │")
+    print(f"  ├{'─'*72}┤")
+    print(f"  │ {'Avg Convo Length':<20} {'Avg $/msg':<14} {'Break-even msgs':<18} {'Recommended':<18} │")
+    print(f"  ├{'─'*72}┤")
 
-for convo_len_label, convo_len in [("5 msgs/convo", 5), ("10 msgs/convo", 10), ("15 msgs/convo", 15), ("20 msgs/convo", 20)]:
-    # Calculate weighted average cost for this conversation length
-    total_cost = 0
-    for pos in range(1, convo_len + 1):
-        for name, profile in profiles.items():
-            cost = calculate_message_cost(profile, pos, "sonnet")
-            total_cost += cost["total_cost"] * profile["frequency"]
-    avg_cost = total_cost / convo_len
+    for convo_len_label, convo_len in [("5 msgs/convo", 5), ("10 msgs/convo", 10), ("15 msgs/convo", 15), ("20 msgs/convo", 20)]:
+        # Calculate weighted average cost for this conversation length
+        avg_cost = conversation_cost(convo_len, "sonnet") / convo_len
 
-    breakeven = int(ai_budget / avg_cost)
-    recommended = int(breakeven * 0.85)  # 15% margin
+        breakeven = int(ai_budget / avg_cost)
+        recommended = int(breakeven * 0.85)  # 15% margin
 
-    print(f"  │ {convo_len_label:<20} ${avg_cost:<13.4f} {breakeven:<18} {recommended:<18} │")
+        print(f"  │ {convo_len_label:<20} ${avg_cost:<13.4f} {breakeven:<18} {recommended:<18} │")
 
-print(f"  └{'─'*72}┘")
+    print(f"  └{'─'*72}┘")
 
 
-# ============================================================
-# 8. FINAL TIER RECOMMENDATIONS
-# ============================================================
+    # ============================================================
+    # 8. FINAL TIER RECOMMENDATIONS
+    # ============================================================
 
-print(f"""
+    tiers = optimize_tiers()
+    mix = ", ".join(f"{share:.0%} × {length}" for length, share in CONVERSATION_LENGTH_MIX.items())
+
+    print(f"""
 
 {'='*80}
 🏆 RECOMMENDED TIER STRUCTURE
 {'='*80}
 
-  Based on the analysis above, assuming average conversation length of 10-12 messages:
-
-  ┌─────────────────────────────────────────────────────────────────────────────┐
-  │                                                                             │
-  │  🆓 FREE TIER                                                              │
-  │     Model: Haiku 4.5                                                        │
-  │     Messages: 30/month                                                      │
-  │     AI cost to you: ~$0.45/month per free user                              │
-  │     Purpose: Try it out, get hooked                                         │
-  │                                                                             │
-  │  ✝️  STUDENT — $10/month                                                    │
-  │     Model: Haiku 4.5                                                        │
-  │     Messages: 200/month                                                     │
-  │     AI cost to you: ~$3.00/month                                            │
-  │     Margin: ~$6.00/month (60%)                                              │
-  │     Purpose: Daily casual Bible reading with AI help                        │
-  │                                                                             │
-  │  📖 BELIEVER — $25/month                                                    │
-  │     Model: Sonnet 4.6                                                       │
-  │     Messages: 300/month                                                     │
-  │     AI cost to you: ~$18-20/month (worst case)                              │
-  │     Margin: ~$3-5/month (safe break-even)                                   │
-  │     Purpose: Serious daily Bible study                                      │
-  │                                                                             │
-  │  ⛪ MINISTRY — $50/month                                                    │
-  │     Model: Sonnet 4.6                                                       │
-  │     Messages: 800/month                                                     │
-  │     AI cost to you: ~$40-48/month (if fully used)                           │
-  │     Margin: ~$2-10/month                                                    │
-  │     Purpose: Pastors, teachers, sermon prep                                 │
-  │                                                                             │
-  │  🏛️  SEMINARY — $100/month                                                  │
-  │     Model: Sonnet 4.6                                                       │
-  │     Messages: 2000/month                                                    │
-  │     AI cost to you: ~$80-95 (if fully used)                                 │
-  │     Margin: Thin but most won't hit 2000                                    │
-  │     Purpose: Full-time scholars, multi-hour daily study                     │
-  │                                                                             │
-  └─────────────────────────────────────────────────────────────────────────────┘
+  Solved by optimize_tiers(): largest cap that keeps {TARGET_MARGIN:.0%} of the price after infra when fully used.
+  Conversation lengths: {mix} msgs. Average usage: {AVG_USAGE_OF_CAP:.0%} of cap.
 """)
+    print(render_tier_table(tiers))
+    print()
 
 
-# ============================================================
-# 9. SENSITIVITY ANALYSIS
-# ============================================================
+    # ============================================================
+    # 9. SENSITIVITY ANALYSIS
+    # ============================================================
 
-print("=" * 80)
-print("⚠️  SENSITIVITY ANALYSIS — What if costs are higher than estimated?")
-print("=" * 80)
-
-# What if thinking tokens are 2x what we estimated?
-print("\n  If thinking tokens are 2× higher than estimated:")
-for name, profile in profiles.items():
-    heavy_profile = dict(profile)
-    heavy_profile["thinking_tokens_per_round"] = [t * 2 for t in profile["thinking_tokens_per_round"]]
-    cost_normal = calculate_message_cost(profile, 8, "sonnet")  # mid-conversation
-    cost_heavy = calculate_message_cost(heavy_profile, 8, "sonnet")
-    increase = (cost_heavy["total_cost"] / cost_normal["total_cost"] - 1) * 100
-    print(f"    {name:<20}: ${cost_normal['total_cost']:.4f} → ${cost_heavy['total_cost']:.4f} (+{increase:.0f}%)")
-
-# Calculate worst-case scenario for $25 plan
-print("\n\n  Worst-case $25/month plan (heavy thinking, long convos):")
-worst_case_total = 0
-for pos in range(1, 16):  # 15-msg conversations
+    print("=" * 80)
+    print("⚠️  SENSITIVITY ANALYSIS — What if costs are higher than estimated?")
+    print("=" * 80)
+
+    # What if thinking tokens are 2x what we estimated?
+    print("\n  If thinking tokens are 2× higher than estimated:")
     for name, profile in profiles.items():
-        heavy = dict(profile)
-        heavy["thinking_tokens_per_round"] = [t * 2 for t in profile["thinking_tokens_per_round"]]
-        cost = calculate_message_cost(heavy, pos, "sonnet")
-        worst_case_total += cost["total_cost"] * profile["frequency"]
+        heavy_profile = dict(profile)
+        heavy_profile["thinking_tokens_per_round"] = [t * 2 for t in profile["thinking_tokens_per_round"]]
+        cost_normal = calculate_message_cost(profile, 8, "sonnet")  # mid-conversation
+        cost_heavy = calculate_message_cost(heavy_profile, 8, "sonnet")
+        increase = (cost_heavy["total_cost"] / cost_normal["total_cost"] - 1) * 100
+        print(f"    {name:<20}: ${cost_normal['total_cost']:.4f} → ${cost_heavy['total_cost']:.4f} (+{increase:.0f}%)")
+
+    # Calculate worst-case scenario for $25 plan
+    print("\n\n  Worst-case $25/month plan (heavy thinking, long convos):")
+    worst_case_total = 0
+    for pos in range(1, 16):  # 15-msg conversations
+        for name, profile in profiles.items():
+            heavy = dict(profile)
+            heavy["thinking_tokens_per_round"] = [t * 2 for t in profile["thinking_tokens_per_round"]]
+            cost = calculate_message_cost(heavy, pos, "sonnet")
+            worst_case_total += cost["total_cost"] * profile["frequency"]
+
+    worst_avg = worst_case_total / 15
+    worst_msgs = int(ai_budget / worst_avg)
+    print(f"    Avg cost/msg: ${worst_avg:.4f}")
+    print(f"    Break-even messages: {worst_msgs}")
+    worst_safe = int(worst_msgs * (1 - TARGET_MARGIN))
+    believer_cap = tiers["believer"]["messages"]
+    print(f"    Safe limit ({TARGET_MARGIN:.0%} margin): {worst_safe}")
+    if believer_cap <= worst_safe:
+        print(f"    → Even worst case, the {believer_cap}-message believer cap is safe at $25/month")
+    else:
+        print(f"    → Worst case, the {believer_cap}-message believer cap exceeds the safe limit by "
+              f"{believer_cap - worst_safe} messages")
 
-worst_avg = worst_case_total / 15
-worst_msgs = int(ai_budget / worst_avg)
-print(f"    Avg cost/msg: ${worst_avg:.4f}")
-print(f"    Break-even messages: {worst_msgs}")
-print(f"    Safe limit (15% margin): {int(worst_msgs * 0.85)}")
-print(f"    → Even worst case, 250 messages is safe at $25/month")
 
+    # ============================================================
+    # 10. PROMPT CACHING STRATEGY
+    # ============================================================
 
-# ============================================================
-# 10. HAIKU vs SONNET COMPARISON
-# ============================================================
+    print("\n\n" + "=" * 80)
+    print("🗄️  PROMPT CACHING — history breakpoints vs. TTL expiry (Sonnet 4.6)")
+    print("=" * 80)
+
+    cache_convo_len = 12
+    gap_columns = [1, 3, 5, 10, 30]
+
+    print(f"\n  Avg $/msg over a {cache_convo_len}-message conversation, by mean gap between messages:\n")
+    header = "".join(f"{str(g) + ' min':>10}" for g in gap_columns)
+    print(f"  {'Strategy':<14}{header}")
+    print(f"  {'─'*14}{'─' * 10 * len(gap_columns)}")
 
-print("\n\n" + "=" * 80)
-print("🔄 HAIKU 4.5 vs SONNET 4.6 — DIRECT COMPARISON")
-print("=" * 80)
+    strategy_costs = {}
+    for strategy_name in CACHE_STRATEGIES:
+        row = []
+        for gap in gap_columns:
+            row.append(conversation_cost(cache_convo_len, "sonnet", strategy_name, gap) / cache_convo_len)
+        strategy_costs[strategy_name] = row
+        print(f"  {strategy_name:<14}" + "".join(f"   ${c:.4f}" for c in row))
 
-print(f"\n  {'Message Type':<22} {'Haiku Cost':>12} {'Sonnet Cost':>12} {'Sonnet/Haiku':>14}")
-print(f"  {'─'*22} {'─'*12} {'─'*12} {'─'*14}")
+    print(f"\n  Savings vs. prefix_only:")
+    for strategy_name, row in strategy_costs.items():
+        if strategy_name == "prefix_only":
+            continue
+        savings = [(1 - c / base) * 100 for c, base in zip(row, strategy_costs["prefix_only"])]
+        print(f"  {strategy_name:<14}" + "".join(f"{pct:>9.0f}%" for pct in savings))
 
-for name, profile in profiles.items():
-    haiku_cost = calculate_message_cost(profile, 8, "haiku")["total_cost"]
-    sonnet_cost = calculate_message_cost(profile, 8, "sonnet")["total_cost"]
-    ratio = sonnet_cost / haiku_cost if haiku_cost > 0 else 0
-    print(f"  {name:<22} ${haiku_cost:>10.4f} ${sonnet_cost:>10.4f} {ratio:>12.1f}×")
+    for strategy_name, strategy in CACHE_STRATEGIES.items():
+        p_expired = cache_expiry_probability(strategy["ttl_minutes"])
+        print(f"\n  {strategy_name}: {strategy['description']}")
+        print(f"     P(expired between messages) at {MEAN_GAP_MINUTES:g} min mean gap: {p_expired:.1%}")
 
-# Weighted average
-haiku_avg = sum(calculate_message_cost(p, 8, "haiku")["total_cost"] * p["frequency"] for p in profiles.values())
-sonnet_avg = sum(calculate_message_cost(p, 8, "sonnet")["total_cost"] * p["frequency"] for p in profiles.values())
-print(f"  {'─'*22} {'─'*12} {'─'*12} {'─'*14}")
-print(f"  {'WEIGHTED AVERAGE':<22} ${haiku_avg:>10.4f} ${sonnet_avg:>10.4f} {sonnet_avg/haiku_avg:>12.1f}×")
+    # Monthly impact for the "Serious student" persona
+    print(f"\n  Monthly AI cost, Serious student (5 sessions/week × 15 msgs, {MEAN_GAP_MINUTES:g} min gaps):")
+    for strategy_name in [None] + list(CACHE_STRATEGIES):
+        monthly = conversation_cost(15, "sonnet", strategy_name) * int(5 * 4.3)
+        label = strategy_name or "never expires (estimate above)"
+        print(f"     {label:<32} ${monthly:>7.2f}/month")
 
-print(f"""
+
+    # ============================================================
+    # 11. HAIKU vs SONNET COMPARISON
+    # ============================================================
+
+    print("\n\n" + "=" * 80)
+    print("🔄 HAIKU 4.5 vs SONNET 4.6 — DIRECT COMPARISON")
+    print("=" * 80)
+
+    print(f"\n  {'Message Type':<22} {'Haiku Cost':>12} {'Sonnet Cost':>12} {'Sonnet/Haiku':>14}")
+    print(f"  {'─'*22} {'─'*12} {'─'*12} {'─'*14}")
+
+    for name, profile in profiles.items():
+        haiku_cost = calculate_message_cost(profile, 8, "haiku")["total_cost"]
+        sonnet_cost = calculate_message_cost(profile, 8, "sonnet")["total_cost"]
+        ratio = sonnet_cost / haiku_cost if haiku_cost > 0 else 0
+        print(f"  {name:<22} ${haiku_cost:>10.4f} ${sonnet_cost:>10.4f} {ratio:>12.1f}×")
+
+    # Weighted average
+    haiku_avg = sum(calculate_message_cost(p, 8, "haiku")["total_cost"] * p["frequency"] for p in profiles.values())
+    sonnet_avg = sum(calculate_message_cost(p, 8, "sonnet")["total_cost"] * p["frequency"] for p in profiles.values())
+    print(f"  {'─'*22} {'─'*12} {'─'*12} {'─'*14}")
+    print(f"  {'WEIGHTED AVERAGE':<22} ${haiku_avg:>10.4f} ${sonnet_avg:>10.4f} {sonnet_avg/haiku_avg:>12.1f}×")
+
+    print(f"""
   → Sonnet 4.6 costs approximately {sonnet_avg/haiku_avg:.1f}× more than Haiku 4.5 per message
-  → For a $10 Haiku plan: 200 msgs costs ~${200 * haiku_avg:.2f} AI spend
-  → For a $25 Sonnet plan: 300 msgs costs ~${300 * sonnet_avg:.2f} AI spend
+  → For a $10 Haiku plan: {tiers["student"]["messages"]} msgs costs ~${tiers["student"]["messages"] * haiku_avg:.2f} AI spend
+  → For a $25 Sonnet plan: {tiers["believer"]["messages"]} msgs costs ~${tiers["believer"]["messages"] * sonnet_avg:.2f} AI spend
 """)
 
 
-# ============================================================
-# 11. REVENUE PROJECTIONS
-# ============================================================
+    # ============================================================
+    # 12. REVENUE PROJECTIONS
+    # ============================================================
 
-print("=" * 80)
-print("📊 REVENUE vs COST AT SCALE (100 paying users)")
-print("=" * 80)
+    print("=" * 80)
+    print("📊 REVENUE vs COST AT SCALE (100 paying users)")
+    print("=" * 80)
 
-# Assume usage distribution: not everyone hits their limit
-# Typical SaaS: ~40-60% of users use less than half their allocation
-usage_scenarios = [
-    ("Light usage (avg 40% of limit)", 0.40),
-    ("Medium usage (avg 60% of limit)", 0.60),
-    ("Heavy usage (avg 80% of limit)", 0.80),
-    ("Full usage (100% of limit)", 1.00),
-]
+    # Assume usage distribution: not everyone hits their limit
+    # Typical SaaS: ~40-60% of users use less than half their allocation
+    usage_scenarios = [
+        ("Light usage (avg 40% of limit)", 0.40),
+        ("Medium usage (avg 60% of limit)", 0.60),
+        ("Heavy usage (avg 80% of limit)", 0.80),
+        ("Full usage (100% of limit)", 1.00),
+    ]
 
-users = 100
-print(f"\n  100 users × $25/month = $2,500/month revenue\n")
+    users = 100
+    print(f"\n  100 users × $25/month = $2,500/month revenue\n")
 
-sonnet_cost_per_msg = sonnet_avg  # from weighted average above
-msgs_limit = 300
-infra_total = users * (infra_per_user + 1)
+    sonnet_cost_per_msg = sonnet_avg  # from weighted average above
+    msgs_limit = tiers["believer"]["messages"]
+    infra_total = users * INFRA_COST_PER_USER
 
-print(f"  Infrastructure: ${infra_total}/month")
-print(f"  Message limit: {msgs_limit}/month per user")
-print(f"  Avg cost per message: ${sonnet_cost_per_msg:.4f}\n")
+    print(f"  Infrastructure: ${infra_total:.0f}/month")
+    print(f"  Message limit: {msgs_limit}/month per user")
+    print(f"  Avg cost per message: ${sonnet_cost_per_msg:.4f}\n")
 
-print(f"  {'Scenario':<40} {'AI Cost':>10} {'Total Cost':>12} {'Profit':>10} {'Margin':>8}")
-print(f"  {'─'*40} {'─'*10} {'─'*12} {'─'*10} {'─'*8}")
+    print(f"  {'Scenario':<40} {'AI Cost':>10} {'Total Cost':>12} {'Profit':>10} {'Margin':>8}")
+    print(f"  {'─'*40} {'─'*10} {'─'*12} {'─'*10} {'─'*8}")
 
-revenue = users * 25
-for scenario_name, usage_pct in usage_scenarios:
-    total_msgs = int(users * msgs_limit * usage_pct)
-    ai_cost = total_msgs * sonnet_cost_per_msg
-    total_cost = ai_cost + infra_total
-    profit = revenue - total_cost
-    margin = profit / revenue * 100
-    print(f"  {scenario_name:<40} ${ai_cost:>8.0f} ${total_cost:>10.0f} ${profit:>8.0f} {margin:>6.1f}%")
+    revenue = users * 25
+    for scenario_name, usage_pct in usage_scenarios:
+        total_msgs = int(users * msgs_limit * usage_pct)
+        ai_cost = total_msgs * sonnet_cost_per_msg
+        total_cost = ai_cost + infra_total
+        profit = revenue - total_cost
+        margin = profit / revenue * 100
+        print(f"  {scenario_name:<40} ${ai_cost:>8.0f} ${total_cost:>10.0f} ${profit:>8.0f} {margin:>6.1f}%")
 
 
-print(f"""
+    believer = tiers["believer"]
+    believer_buffer = 1 - believer["messages"] / believer["breakeven_messages"]
+    print(f"""
 
 {'='*80}
 ✅ FINAL RECOMMENDATION
@@ -554,21 +1226,74 @@ print(f"""
 
   For the $25/month "Believer" plan with Claude Sonnet 4.6:
 
-  ┌──────────────────────────────────────────────────────┐
-  │                                                      │
-  │   MESSAGE LIMIT:  300 messages / month               │
-  │                                                      │
-  │   Cost per message:     ~$0.06 average               │
-  │   Max AI spend:         ~$18-20/month                │
-  │   Infrastructure:       ~$3/month per user           │
-  │   Break-even point:     ~370 messages                │
-  │   Safety margin:        ~20% buffer                  │
-  │                                                      │
-  │   At 60% avg usage:     ~$2.50 profit/user/month     │
-  │   At 100 users × 60%:  ~$250/month profit            │
-  │                                                      │
-  └──────────────────────────────────────────────────────┘
-
-  Key insight: Most users won't hit 300 messages.
+{render_summary_box([
+    f"MESSAGE LIMIT:  {believer['messages']} messages / month",
+    "",
+    f"Cost per message:     ~${believer['cost_per_message']:.3f} average",
+    f"Max AI spend:         ~${believer['max_ai_cost']:.2f}/month",
+    f"Infrastructure:       ~${INFRA_COST_PER_USER:.0f}/month per user",
+    f"Break-even point:     ~{believer['breakeven_messages']} messages",
+    f"Safety margin:        ~{believer_buffer:.0%} buffer",
+    "",
+    f"At {AVG_USAGE_OF_CAP:.0%} avg usage:     ~${believer['margin_expected']:.2f} profit/user/month",
+    f"At 100 users × {AVG_USAGE_OF_CAP:.0%}:  ~${believer['margin_expected'] * 100:,.0f}/month profit",
+])}
+
+  Key insight: Most users won't hit {believer['messages']} messages.
   The ones who do are your most engaged — they'll upgrade to Ministry ($50).
 """)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Koinonia AI cost analysis")
+    parser.add_argument(
+        "--replay", type=Path, nargs="+", metavar="LOG",
+        help="Replay JSONL usage logs through the engine instead of printing the estimate report"
+    )
+    parser.add_argument(
+        "--optimize", action="store_true",
+        help="Only solve the tier caps/models and print the tier table and tierConfig.ts entries"
+    )
+    parser.add_argument(
+        "--bible-db", type=Path, metavar="DB",
+        help="Derive read_passage result sizes from a bible.db with chapter_tokens"
+    )
+    parser.add_argument(
+        "--translation", default="KJV",
+        help="Translation whose passages --bible-db measures (default: KJV)"
+    )
+    parser.add_argument(
+        "--workers", "-j", type=int, default=None,
+        help="Worker processes for --replay (default: CPU count)"
+    )
+    args = parser.parse_args()
+
+    if args.replay:
+        # Imported lazily: pricing_replay imports this module for the rate tables
+        import pricing_replay
+        result = pricing_replay.replay(args.replay, workers=args.workers)
+        pricing_replay.print_replay_report(result)
+        return
+
+    if args.bible_db:
+        changes = apply_passage_sizes(args.bible_db, args.translation)
+        print(f"  Passage sizes from {args.bible_db} ({args.translation}):")
+        for name, (old, new) in changes.items():
+            print(f"    {name:20s} tool result {old:>6,} → {new:>6,} tokens")
+        print()
+
+    if args.optimize:
+        started = time.perf_counter()
+        tiers = optimize_tiers()
+        elapsed = time.perf_counter() - started
+        print(render_tier_table(tiers))
+        print(f"\n  server/lib/tierConfig.ts:\n")
+        print(render_tier_config(tiers))
+        print(f"\n  Solved in {elapsed * 1000:.1f} ms")
+        return
+
+    print_report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Koinonia Usage Log Replay
+=========================
+Replays real per-request token usage through the pricing engine's rate tables
+and fits the estimated profile parameters in pricing_analysis.py to the data.
+
+Each line of a usage log is one Anthropic API request (one tool round), as the
+chat server can emit it from `finalMessage.usage`:
+
+    {"ts": 1760000000.0, "user_id": "u_1", "conversation_id": "c_9",
+     "tier": "believer", "model": "claude-sonnet-4-6",
+     "message_index": 3, "round": 0, "profile": "standard_study",
+     "input_tokens": 1840, "output_tokens": 950,
+     "cache_read_input_tokens": 9200, "cache_creation_input_tokens": 0}
+
+`model` is optional (derived from `tier`), `profile` is optional (enables the
+per-profile fit). Files are split into byte ranges that are aggregated
+independently in worker processes and merged, so memory stays flat no matter
+how many records a log holds — only the per-user/per-conversation totals grow.
+
+Usage:
+    python pricing_replay.py logs/usage.jsonl               # Replay one log
+    python pricing_replay.py logs/*.jsonl -j 8 --top 20     # Many logs, 8 processes
+"""
+
+import argparse
+import json
+import os
+from multiprocessing import Pool
+from pathlib import Path
+
+from pricing_analysis import (
+    CACHED_PREFIX_TOKENS,
+    CONTEXT_BLOCK_TOKENS,
+    TIER_MODELS,
+    expected_history_per_msg,
+    get_rates,
+    profiles,
+)
+
+# Byte size of one unit of work handed to a worker process
+CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def _model_key(record) -> str:
+    """Map a record's model id (or its tier) to a MODEL_RATES key."""
+    model = record.get("model") or TIER_MODELS.get(record.get("tier"), "sonnet")
+    return "sonnet" if "sonnet" in model else "haiku"
+
+
+def record_cost(record) -> float:
+    """Dollar cost of one usage record."""
+    rates = get_rates(_model_key(record))
+    return (
+        record.get("input_tokens", 0) * rates["input"]
+        + record.get("output_tokens", 0) * rates["output"]
+        + record.get("cache_read_input_tokens", 0) * rates["cache_read"]
+        + record.get("cache_creation_input_tokens", 0) * rates["cache_write"]
+    ) / 1_000_000
+
+
+def _empty_aggregate() -> dict:
+    return {
+        "records": 0,
+        "malformed": 0,
+        "messages": 0,
+        "cost": 0.0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_read_tokens": 0,
+        "cache_write_tokens": 0,
+        # key -> [cost, requests, messages, tier]
+        "by_user": {},
+        "by_conversation": {},
+        # Cached prefix size: sum / count over requests that touched the cache
+        "prefix_sum": 0,
+        "prefix_n": 0,
+        # Least-squares sums for round-0 uncached input vs. message position
+        "reg_n": 0,
+        "reg_sx": 0.0,
+        "reg_sy": 0.0,
+        "reg_sxx": 0.0,
+        "reg_sxy": 0.0,
+        # profile -> [messages, requests, output_tokens]
+        "by_profile": {},
+    }
+
+
+def _add(table: dict, key, cost: float, is_message: int, tier):
+    entry = table.get(key)
+    if entry is None:
+        table[key] = [cost, 1, is_message, tier]
+    else:
+        entry[0] += cost
+        entry[1] += 1
+        entry[2] += is_message
+
+
+def _accumulate(agg: dict, record: dict):
+    """Fold one usage record into an aggregate."""
+    cost = record_cost(record)
+    input_tokens = record.get("input_tokens", 0)
+    output_tokens = record.get("output_tokens", 0)
+    cache_read = record.get("cache_read_input_tokens", 0)
+    cache_write = record.get("cache_creation_input_tokens", 0)
+    is_message = 1 if record.get("round", 0) == 0 else 0
+    tier = record.get("tier", "unknown")
+
+    agg["records"] += 1
+    agg["messages"] += is_message
+    agg["cost"] += cost
+    agg["input_tokens"] += input_tokens
+    agg["output_tokens"] += output_tokens
+    agg["cache_read_tokens"] += cache_read
+    agg["cache_write_tokens"] += cache_write
+
+    _add(agg["by_user"], record.get("user_id", "anonymous"), cost, is_message, tier)
+    _add(agg["by_conversation"], record.get("conversation_id", "unknown"), cost, is_message, tier)
+
+    if cache_read or cache_write:
+        agg["prefix_sum"] += cache_read + cache_write
+        agg["prefix_n"] += 1
+
+    position = record.get("message_index")
+    if is_message and position:
+        x = float(position)
+        y = float(input_tokens)
+        agg["reg_n"] += 1
+        agg["reg_sx"] += x
+        agg["reg_sy"] += y
+        agg["reg_sxx"] += x * x
+        agg["reg_sxy"] += x * y
+
+    profile = record.get("profile")
+    if profile:
+        entry = agg["by_profile"].setdefault(profile, [0, 0, 0])
+        entry[0] += is_message
+        entry[1] += 1
+        entry[2] += output_tokens
+
+
+def _merge_tables(into: dict, other: dict):
+    for key, (cost, requests, messages, tier) in other.items():
+        entry = into.get(key)
+        if entry is None:
+            into[key] = [cost, requests, messages, tier]
+        else:
+            entry[0] += cost
+            entry[1] += requests
+            entry[2] += messages
+
+
+def merge_aggregates(into: dict, other: dict) -> dict:
+    """Merge a partial aggregate into another (in place) and return it."""
+    for key, value in other.items():
+        if key in ("by_user", "by_conversation"):
+            _merge_tables(into[key], value)
+        elif key == "by_profile":
+            for name, counts in value.items():
+                entry = into["by_profile"].setdefault(name, [0, 0, 0])
+                for i, n in enumerate(counts):
+                    entry[i] += n
+        else:
+            into[key] += value
+    return into
+
+
+def _aggregate_chunk(chunk) -> dict:
+    """
+    Aggregate every record whose line starts inside (start, end] of a file.
+
+    The line covering byte `start` belongs to the previous chunk, so it is
+    skipped unless the chunk begins at offset 0.
+    """
+    path, start, end = chunk
+    agg = _empty_aggregate()
+    with open(path, "rb") as f:
+        f.seek(start)
+        pos = start
+        if start:
+            pos += len(f.readline())
+        while pos <= end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            if not line.strip():
+                continue
+            try:
+                _accumulate(agg, json.loads(line))
+            except (ValueError, TypeError, AttributeError):
+                agg["malformed"] += 1
+    return agg
+
+
+def split_chunks(paths, chunk_bytes: int = CHUNK_BYTES):
+    """Split log files into (path, start, end) byte ranges."""
+    chunks = []
+    for path in paths:
+        size = os.path.getsize(path)
+        start = 0
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            chunks.append((str(path), start, end))
+            start = end
+    return chunks
+
+
+def replay(paths, workers: int | None = None, chunk_bytes: int = CHUNK_BYTES) -> dict:
+    """Replay usage logs and return the merged aggregate."""
+    chunks = split_chunks(paths, chunk_bytes)
+    total = _empty_aggregate()
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            merge_aggregates(total, _aggregate_chunk(chunk))
+        return total
+
+    with Pool(min(workers, len(chunks))) as pool:
+        for partial in pool.imap_unordered(_aggregate_chunk, chunks):
+            merge_aggregates(total, partial)
+    return total
+
+
+def fit_parameters(agg: dict) -> dict:
+    """
+    Fit the engine's hand-set constants to replayed usage.
+
+    Returns the observed cached prefix, the per-message history growth
+    (slope of round-0 input tokens against message position), and per-profile
+    frequency / rounds / thinking tokens rescaled to the observed output.
+    """
+    fitted = {}
+
+    if agg["prefix_n"]:
+        fitted["cached_prefix_tokens"] = round(agg["prefix_sum"] / agg["prefix_n"])
+
+    n = agg["reg_n"]
+    denom = n * agg["reg_sxx"] - agg["reg_sx"] ** 2
+    if n >= 2 and denom:
+        slope = (n * agg["reg_sxy"] - agg["reg_sx"] * agg["reg_sy"]) / denom
+        intercept = (agg["reg_sy"] - slope * agg["reg_sx"]) / n
+        fitted["history_per_msg"] = round(slope)
+        # At position 1 there is no history: what remains is context + user message
+        fitted["first_msg_uncached_tokens"] = round(intercept + slope)
+
+    labelled = sum(m for m, _, _ in agg["by_profile"].values())
+    fitted_profiles = {}
+    for name, (messages, requests, output_tokens) in agg["by_profile"].items():
+        if not messages or name not in profiles:
+            continue
+        profile = profiles[name]
+        observed_output = output_tokens / messages
+        fixed_output = sum(profile["tool_use_output_tokens"]) + profile["text_output_tokens"]
+        thinking = profile["thinking_tokens_per_round"]
+        scale = (observed_output - fixed_output) / sum(thinking) if sum(thinking) else 0.0
+        fitted_profiles[name] = {
+            "frequency": messages / labelled,
+            "rounds": requests / messages,
+            "output_tokens_per_msg": observed_output,
+            "thinking_tokens_per_round": [max(0, round(t * scale)) for t in thinking],
+        }
+    fitted["profiles"] = fitted_profiles
+    return fitted
+
+
+def _summarize(table: dict) -> dict:
+    """Roll a per-user or per-conversation table up by tier."""
+    tiers = {}
+    for cost, requests, messages, tier in table.values():
+        entry = tiers.setdefault(tier, [0, 0.0, 0, 0])
+        entry[0] += 1
+        entry[1] += cost
+        entry[2] += requests
+        entry[3] += messages
+    return tiers
+
+
+def print_replay_report(agg: dict, top: int = 10):
+    """Print actual cost per tier, top users/conversations and fitted parameters."""
+    print("=" * 80)
+    print("  KOINONIA USAGE LOG REPLAY")
+    print("=" * 80)
+
+    messages = agg["messages"] or 1
+    print(f"\n  Requests:          {agg['records']:,}")
+    print(f"  Messages:          {agg['messages']:,}")
+    if agg["malformed"]:
+        print(f"  Malformed lines:   {agg['malformed']:,} (skipped)")
+    print(f"  Input tokens:      {agg['input_tokens']:,}")
+    print(f"  Output tokens:     {agg['output_tokens']:,}")
+    print(f"  Cache read:        {agg['cache_read_tokens']:,}")
+    print(f"  Cache write:       {agg['cache_write_tokens']:,}")
+    print(f"  Total AI cost:     ${agg['cost']:,.2f}  (${agg['cost'] / messages:.4f}/msg)")
+
+    print("\n\n📅 ACTUAL COST PER TIER")
+    print("-" * 80)
+    print(f"  {'Tier':<12} {'Users':>8} {'Messages':>10} {'AI Cost':>12} {'$/user':>10} {'$/msg':>9}")
+    print(f"  {'─'*12} {'─'*8} {'─'*10} {'─'*12} {'─'*10} {'─'*9}")
+    for tier, (users, cost, _, tier_messages) in sorted(_summarize(agg["by_user"]).items()):
+        per_msg = cost / tier_messages if tier_messages else 0
+        print(f"  {tier:<12} {users:>8,} {tier_messages:>10,} ${cost:>10.2f} ${cost / users:>8.2f} ${per_msg:>7.4f}")
+
+    for label, table in [("USERS", agg["by_user"]), ("CONVERSATIONS", agg["by_conversation"])]:
+        print(f"\n\n💸 TOP {top} {label} BY COST")
+        print("-" * 80)
+        ranked = sorted(table.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+        for key, (cost, requests, key_messages, tier) in ranked:
+            print(f"  {str(key):<36} {tier:<10} {key_messages:>6,} msgs {requests:>7,} req  ${cost:>9.2f}")
+
+    fitted = fit_parameters(agg)
+    print("\n\n🔧 FITTED PARAMETERS (observed vs. pricing_analysis.py)")
+    print("-" * 80)
+    if "cached_prefix_tokens" in fitted:
+        print(f"  Cached prefix tokens:     {fitted['cached_prefix_tokens']:>8,}  (assumed {CACHED_PREFIX_TOKENS:,})")
+    if "history_per_msg" in fitted:
+        print(f"  History tokens per msg:   {fitted['history_per_msg']:>8,}  (assumed {expected_history_per_msg():,.0f})")
+        print(f"  First-msg uncached input: {fitted['first_msg_uncached_tokens']:>8,}  "
+              f"(assumed {CONTEXT_BLOCK_TOKENS:,} + user message)")
+    for name, fit in fitted["profiles"].items():
+        profile = profiles[name]
+        print(f"\n  📌 {name}")
+        print(f"     frequency:   {fit['frequency']:.2f}  (assumed {profile['frequency']:.2f})")
+        print(f"     rounds:      {fit['rounds']:.2f}  (assumed {profile['rounds']})")
+        print(f"     thinking:    {fit['thinking_tokens_per_round']}  "
+              f"(assumed {profile['thinking_tokens_per_round']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay JSONL usage logs through the pricing engine")
+    parser.add_argument("logs", type=Path, nargs="+", help="Usage log files (JSONL)")
+    parser.add_argument(
+        "--workers", "-j", type=int, default=None,
+        help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument("--top", type=int, default=10, help="How many users/conversations to list")
+    args = parser.parse_args()
+
+    result = replay(args.logs, workers=args.workers)
+    print_replay_report(result, top=args.top)
+
+
+if __name__ == "__main__":
+    main()
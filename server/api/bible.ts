@@ -1,8 +1,20 @@
 import { Hono } from "hono";
-import { queries } from "../lib/db.js";
+import { cachedResponse, queries } from "../lib/db.js";
 
 const bible = new Hono();
 
+// Hot responses (scripts/hot_set.py) are served as stored, without running their queries
+bible.use("*", async (c, next) => {
+  if (cachedResponse && c.req.method === "GET") {
+    const url = new URL(c.req.url);
+    const row = cachedResponse.get(url.pathname + url.search) as { body: string } | null;
+    if (row) {
+      return c.body(row.body, 200, { "Content-Type": "application/json" });
+    }
+  }
+  await next();
+});
+
 // GET /api/bible/translations
 bible.get("/translations", (c) => {
   const rows = queries.translations.all();
@@ -17,37 +29,22 @@ const NC_MIN_BOOK_ID = 90;
 const DC_MIN_BOOK_ID = 67;
 
 function resolveTranslation(translation: string, bookId: number): string {
+  // translation_books already records which translation serves each listed book;
+  // on an older bible.db, bookSource checks the translation's own verses instead
+  const row = queries.bookSource.get(translation, bookId) as { source: string } | null;
+  if (row) return row.source;
   if (bookId >= NC_MIN_BOOK_ID) return NC_TRANSLATION;
-  // DC books (67-89): check if the translation actually has them, otherwise use KJV
-  if (bookId >= DC_MIN_BOOK_ID) {
-    const exists = queries.verse.get(translation, bookId, 1, 1);
-    if (!exists) return DC_FALLBACK;
-  }
+  if (bookId >= DC_MIN_BOOK_ID) return DC_FALLBACK;
   return translation;
 }
 
 // GET /api/bible/books/:translation
 bible.get("/books/:translation", (c) => {
   const { translation } = c.req.param();
-  const rows = queries.books.all(translation) as any[];
+  const rows = queries.books.all(translation);
   if (rows.length === 0) {
     return c.json({ error: "Translation not found" }, 404);
   }
-
-  // Check if this translation has DC books
-  const hasDC = rows.some((b: any) => b.testament === "DC");
-  if (!hasDC) {
-    // Append DC books from KJV as fallback
-    const dcRows = queries.dcBooks.all() as any[];
-    rows.push(...dcRows);
-  }
-
-  // Append non-canonical books (from ENC)
-  if (translation !== NC_TRANSLATION) {
-    const ncRows = queries.ncBooks.all() as any[];
-    rows.push(...ncRows);
-  }
-
   return c.json(rows);
 });
 
@@ -59,6 +56,19 @@ bible.get("/chapter/:translation/:bookId/:chapter", (c) => {
   return c.json(rows);
 });
 
+// GET /api/bible/parallel/:bookId/:chapter?translations=KJV,WLC — one chapter aligned
+// to KJV verse numbering across translations (Malachi 4 ↔ Hebrew 3:19-24, psalm titles
+// as verse 0), one row per (canonical_verse, translation)
+bible.get("/parallel/:bookId/:chapter", (c) => {
+  const { bookId, chapter } = c.req.param();
+  const translations = (c.req.query("translations") || "KJV")
+    .split(",")
+    .map((t) => t.trim())
+    .filter(Boolean);
+  const rows = queries.alignedChapter.all(JSON.stringify(translations), Number(bookId), Number(chapter));
+  return c.json(rows);
+});
+
 // GET /api/bible/search?q=...&translation=...
 bible.get("/search", (c) => {
   const q = c.req.query("q");
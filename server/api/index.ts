@@ -3,11 +3,20 @@ import { cors } from "hono/cors";
 import bible from "./bible.js";
 import chat from "./chat.js";
 import stripeRouter from "./stripe.js";
+import { logger } from "../lib/logger.js";
 
 const api = new Hono();
 
 api.use("*", cors());
 
+// One line per Bible API request — the access log scripts/hot_set.py ranks
+api.use("/api/bible/*", async (c, next) => {
+  const started = performance.now();
+  await next();
+  const url = new URL(c.req.url);
+  logger.http(`${c.req.method} ${url.pathname}${url.search} ${c.res.status} ${(performance.now() - started).toFixed(1)}ms`);
+});
+
 api.route("/api/bible", bible);
 api.route("/api/chat", chat);
 api.route("/api/stripe", stripeRouter);
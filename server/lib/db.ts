@@ -1,33 +1,117 @@
 import { Database } from "bun:sqlite";
 import { join, dirname } from "path";
 import { fileURLToPath } from "url";
+import { logger } from "./logger.js";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
 const DB_PATH = join(__dirname, "..", "bible.db");
 
+// bible.db is finalized for serving (scripts/finalize_db.py): clustered
+// WITHOUT ROWID verses in journal_mode=DELETE, so a read-only handle needs no WAL.
 const db = new Database(DB_PATH, { readonly: true });
-db.exec("PRAGMA journal_mode = WAL");
 db.exec("PRAGMA cache_size = -64000"); // 64MB cache
 
+function hasTable(name: string): boolean {
+  return !!db.prepare("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?").get(name);
+}
+
+// Tables written by the newer build stages. A bible.db built before them
+// keeps serving with the older lookups until it is rebuilt (scripts/build_db.py).
+const hasTranslationBooks = hasTable("translation_books");
+const hasBookAliases = hasTable("book_aliases");
+const hasVerseMap = hasTable("verse_map");
+const missingTables = ["translation_books", "book_aliases", "verse_map"].filter((name) => !hasTable(name));
+if (missingTables.length > 0) {
+  logger.warn(`bible.db has no ${missingTables.join(", ")} — rebuild it with scripts/build_db.py`);
+}
+
+// Same folding as scripts/book_aliases.py fold(): accents stripped, case-folded
+// (toLowerCase plus the folds Python's casefold() adds: final sigma, ß),
+// letters and digits only
+export function foldBookName(name: string): string {
+  return name
+    .normalize("NFKD")
+    .replace(/\p{M}/gu, "")
+    .toLowerCase()
+    .replace(/ς/g, "σ")
+    .replace(/ß/g, "ss")
+    .replace(/[^\p{L}\p{N}]/gu, "");
+}
+
+const bookByAlias = hasBookAliases
+  ? db.prepare(
+      `SELECT b.book_id, b.name, b.chapters
+       FROM book_aliases a
+       JOIN books b ON b.translation = ?1 AND b.book_id = a.book_id
+       WHERE a.alias = ?2
+       ORDER BY a.translation = ?1 DESC, a.translation = '' DESC
+       LIMIT 1`
+    )
+  : null;
+
+// Exact (case-insensitive) name match, for a bible.db without book_aliases
+const bookByExactName = db.prepare(
+  "SELECT book_id, name, chapters FROM books WHERE translation = ? AND name = ? COLLATE NOCASE LIMIT 1"
+);
+
+// Hot responses pre-rendered by scripts/hot_set.py, keyed by path + query string;
+// absent until that tool has run against this database
+export const cachedResponse = hasTable("response_cache")
+  ? db.prepare("SELECT body FROM response_cache WHERE path = ?")
+  : null;
+
+// Without translation_books: ENC for the non-canonical books, KJV for a
+// deuterocanonical book the translation does not have itself, else its own text
+function fallbackSource(translation: string, bookId: string): string {
+  return `CASE WHEN ${bookId} >= 90 THEN 'ENC'
+               WHEN ${bookId} >= 67 AND NOT EXISTS (
+                 SELECT 1 FROM verses WHERE translation = ${translation} AND book_id = ${bookId}
+                   AND chapter = 1 AND verse = 1
+               ) THEN 'KJV'
+               ELSE ${translation} END`;
+}
+
+// Translation serving book ?2 for each requested code (?1) in alignedChapter
+const pickedSources = hasTranslationBooks
+  ? `picked(translation, source, ord) AS (
+       SELECT j.value, COALESCE(tb.source, j.value), j.key
+       FROM json_each(?1) j
+       LEFT JOIN translation_books tb ON tb.translation = j.value AND tb.book_id = ?2
+     )`
+  : `picked(translation, source, ord) AS (
+       SELECT j.value, ${fallbackSource("j.value", "?2")}, j.key
+       FROM json_each(?1) j
+     )`;
+
 export const queries = {
   translations: db.prepare(
     "SELECT short_name, full_name, language, direction FROM translations ORDER BY language, short_name"
   ),
 
-  books: db.prepare(
-    "SELECT book_id, name, chapters, chron_order, testament FROM books WHERE translation = ? ORDER BY book_id"
-  ),
-
-  // Deuterocanonical books from KJV (fallback for translations that lack them)
-  dcBooks: db.prepare(
-    "SELECT book_id, name, chapters, chron_order, testament FROM books WHERE translation = 'KJV' AND testament = 'DC' ORDER BY book_id"
-  ),
+  // Book list with the KJV deuterocanonical and ENC non-canonical fallbacks
+  // already merged in (scripts/capabilities.py); without translation_books,
+  // the same merge done per request
+  books: hasTranslationBooks
+    ? db.prepare(
+        "SELECT book_id, name, chapters, chron_order, testament FROM translation_books WHERE translation = ? ORDER BY book_id"
+      )
+    : db.prepare(
+        `SELECT book_id, name, chapters, chron_order, testament FROM books WHERE translation = ?1
+         UNION ALL
+         SELECT f.book_id, f.name, f.chapters, f.chron_order, f.testament
+         FROM books f
+         WHERE ((f.translation = 'KJV' AND f.testament = 'DC') OR (f.translation = 'ENC' AND f.testament = 'NC'))
+           AND EXISTS (SELECT 1 FROM books t WHERE t.translation = ?1)
+           AND NOT EXISTS (SELECT 1 FROM books t WHERE t.translation = ?1 AND t.book_id = f.book_id)
+         ORDER BY book_id`
+      ),
 
-  // Non-canonical books (always from ENC translation, appended to any translation)
-  ncBooks: db.prepare(
-    "SELECT book_id, name, chapters, chron_order, testament FROM books WHERE translation = 'ENC' AND testament = 'NC' ORDER BY book_id"
-  ),
+  // Translation that holds a book's text for a given translation (without
+  // translation_books, worked out per request from the verses it has)
+  bookSource: hasTranslationBooks
+    ? db.prepare("SELECT source FROM translation_books WHERE translation = ? AND book_id = ?")
+    : db.prepare(`SELECT ${fallbackSource("?1", "?2")} AS source`),
 
   chapter: db.prepare(
     "SELECT verse, text FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? ORDER BY verse"
@@ -55,10 +139,43 @@ export const queries = {
     "SELECT text FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? AND verse = ?"
   ),
 
-  bookByName: db.prepare(
-    "SELECT book_id, name, chapters FROM books WHERE translation = ? AND name = ? COLLATE NOCASE LIMIT 1"
+  // One chapter in canonical (KJV) numbering across N translations (?1 = JSON
+  // array of codes), via verse_map — same SQL as scripts/versification.py.
+  // Rows are ordered by canonical verse, then the requested translation order.
+  // Without verse_map, each translation's own numbering is served as is.
+  alignedChapter: db.prepare(
+    hasVerseMap
+      ? `WITH ${pickedSources}
+         SELECT p.translation, v.verse AS canonical_verse, v.chapter, v.verse, v.text, p.ord
+         FROM picked p
+         JOIN verses v ON v.translation = p.source AND v.book_id = ?2 AND v.chapter = ?3
+         WHERE NOT EXISTS (
+           SELECT 1 FROM verse_map m
+           WHERE m.translation = v.translation AND m.book_id = v.book_id
+             AND m.chapter = v.chapter AND m.verse = v.verse
+         )
+         UNION ALL
+         SELECT p.translation, m.canonical_verse, m.chapter, m.verse, v.text, p.ord
+         FROM picked p
+         JOIN verse_map m ON m.translation = p.source AND m.book_id = ?2 AND m.canonical_chapter = ?3
+         JOIN verses v ON v.translation = m.translation AND v.book_id = m.book_id
+                      AND v.chapter = m.chapter AND v.verse = m.verse
+         ORDER BY 2, 6, 3, 4`
+      : `WITH ${pickedSources}
+         SELECT p.translation, v.verse AS canonical_verse, v.chapter, v.verse, v.text, p.ord
+         FROM picked p
+         JOIN verses v ON v.translation = p.source AND v.book_id = ?2 AND v.chapter = ?3
+         ORDER BY 2, 6, 3, 4`
   ),
 
+  // Any name or abbreviation ("1 Cor", "I Corinthiens", "ioan"), via the folded
+  // book_aliases keys (scripts/book_aliases.py) — the translation's own names
+  // first, then the standard English forms
+  bookByName: {
+    get: (translation: string, name: string) =>
+      bookByAlias ? bookByAlias.get(translation, foldBookName(name)) : bookByExactName.get(translation, name),
+  },
+
   verseRange: db.prepare(
     "SELECT verse, text FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? AND verse >= ? AND verse <= ? ORDER BY verse"
   ),
@@ -0,0 +1,59 @@
+import { Database } from "bun:sqlite";
+import { join, dirname } from "path";
+import { fileURLToPath } from "url";
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = dirname(__filename);
+
+// Output of scripts/shard_db.py: one DB per language plus catalog.db
+const SHARD_DIR = process.env.BIBLE_SHARD_DIR || join(__dirname, "..", "shards");
+
+let catalog: Database | null = null;
+let shardOf: Map<string, string> | null = null;
+const handles = new Map<string, Database>();
+
+function loadCatalog(): Map<string, string> {
+  if (!shardOf) {
+    catalog = new Database(join(SHARD_DIR, "catalog.db"), { readonly: true });
+    const rows = catalog
+      .prepare(
+        "SELECT t.translation, s.file FROM translation_shards t JOIN shards s ON s.name = t.shard"
+      )
+      .all() as Array<{ translation: string; file: string }>;
+    shardOf = new Map(rows.map((r) => [r.translation, r.file]));
+  }
+  return shardOf;
+}
+
+/**
+ * Path of the shard file holding a translation, or null if no shard has it.
+ */
+export function shardFile(translation: string): string | null {
+  const file = loadCatalog().get(translation);
+  return file ? join(SHARD_DIR, file) : null;
+}
+
+/**
+ * Read-only handle on the shard holding a translation (opened once, then cached).
+ * Resolve DC/NC fallbacks (KJV, ENC) before routing — those live in their own language's shard.
+ */
+export function shardFor(translation: string): Database | null {
+  const path = shardFile(translation);
+  if (!path) return null;
+
+  let db = handles.get(path);
+  if (!db) {
+    db = new Database(path, { readonly: true });
+    db.exec("PRAGMA cache_size = -16000"); // 16MB per shard
+    handles.set(path, db);
+  }
+  return db;
+}
+
+/**
+ * The catalog DB (translations + books for every shard) — for listing endpoints.
+ */
+export function catalogDb(): Database {
+  loadCatalog();
+  return catalog!;
+}
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Build the book_aliases table: every way a book can be named, folded for lookup.
+
+Covers each translation's own book names, the standard English names and
+abbreviations (SBL-style plus common short forms), and the roman-numeral /
+ordinal spellings of numbered books ("I Cor", "First Corinthians"). Every
+alias is stored folded — accents stripped, case-folded, punctuation and
+spaces removed — so "1 Cor.", "1cor" and "I  Cor" are the same key:
+
+    book_aliases(alias, translation, book_id, kind)   PRIMARY KEY (alias, translation, book_id)
+
+`translation` is the translation whose book list produced the alias, or ''
+for the standard English forms. Lookups prefer the requesting translation's
+own names, then the standard forms.
+
+reference_parser.py loads this table into a trie; server/lib/db.ts uses it
+for bookByName.
+
+Usage:
+    python book_aliases.py                          # Rebuild book_aliases
+    python book_aliases.py --db /path/to/bible.db   # Custom database path
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+import unicodedata
+from pathlib import Path
+
+import hot_set
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+
+# Standard English names and abbreviations by book_id (same ids as Bolls/KJV)
+STANDARD_ALIASES = {
+    1: ["Genesis", "Gen", "Ge", "Gn"],
+    2: ["Exodus", "Exod", "Exo", "Ex"],
+    3: ["Leviticus", "Lev", "Le", "Lv"],
+    4: ["Numbers", "Num", "Nu", "Nm", "Nb"],
+    5: ["Deuteronomy", "Deut", "De", "Dt"],
+    6: ["Joshua", "Josh", "Jos", "Jsh"],
+    7: ["Judges", "Judg", "Jdg", "Jg", "Jdgs"],
+    8: ["Ruth", "Rth", "Ru"],
+    9: ["1 Samuel", "1 Sam", "1 Sa", "1 Sm", "1 S"],
+    10: ["2 Samuel", "2 Sam", "2 Sa", "2 Sm", "2 S"],
+    11: ["1 Kings", "1 Kgs", "1 Ki", "1 Kin", "1 K"],
+    12: ["2 Kings", "2 Kgs", "2 Ki", "2 Kin", "2 K"],
+    13: ["1 Chronicles", "1 Chron", "1 Chr", "1 Ch"],
+    14: ["2 Chronicles", "2 Chron", "2 Chr", "2 Ch"],
+    15: ["Ezra", "Ezr", "Ez"],
+    16: ["Nehemiah", "Neh", "Ne"],
+    17: ["Esther", "Esth", "Est", "Es"],
+    18: ["Job", "Jb"],
+    19: ["Psalms", "Psalm", "Ps", "Psa", "Pss", "Psm"],
+    20: ["Proverbs", "Prov", "Pro", "Prv", "Pr"],
+    21: ["Ecclesiastes", "Eccles", "Eccl", "Ecc", "Ec", "Qoheleth"],
+    22: ["Song of Solomon", "Song of Songs", "Song", "Canticles", "Cant", "SOS", "Sg"],
+    23: ["Isaiah", "Isa", "Is"],
+    24: ["Jeremiah", "Jer", "Je", "Jr"],
+    25: ["Lamentations", "Lam", "La"],
+    26: ["Ezekiel", "Ezek", "Eze", "Ezk"],
+    27: ["Daniel", "Dan", "Da", "Dn"],
+    28: ["Hosea", "Hos", "Ho"],
+    29: ["Joel", "Jl"],
+    30: ["Amos", "Am"],
+    31: ["Obadiah", "Obad", "Ob"],
+    32: ["Jonah", "Jon", "Jnh"],
+    33: ["Micah", "Mic", "Mc"],
+    34: ["Nahum", "Nah", "Na"],
+    35: ["Habakkuk", "Hab", "Hb"],
+    36: ["Zephaniah", "Zeph", "Zep", "Zp"],
+    37: ["Haggai", "Hag", "Hg"],
+    38: ["Zechariah", "Zech", "Zec", "Zc"],
+    39: ["Malachi", "Mal", "Ml"],
+    40: ["Matthew", "Matt", "Mat", "Mt"],
+    41: ["Mark", "Mrk", "Mar", "Mk", "Mr"],
+    42: ["Luke", "Luk", "Lk"],
+    43: ["John", "Joh", "Jhn", "Jn"],
+    44: ["Acts", "Act", "Ac"],
+    45: ["Romans", "Rom", "Ro", "Rm"],
+    46: ["1 Corinthians", "1 Cor", "1 Co"],
+    47: ["2 Corinthians", "2 Cor", "2 Co"],
+    48: ["Galatians", "Gal", "Ga"],
+    49: ["Ephesians", "Eph", "Ephes"],
+    50: ["Philippians", "Phil", "Php", "Pp"],
+    51: ["Colossians", "Col", "Co"],
+    52: ["1 Thessalonians", "1 Thess", "1 Thes", "1 Th"],
+    53: ["2 Thessalonians", "2 Thess", "2 Thes", "2 Th"],
+    54: ["1 Timothy", "1 Tim", "1 Ti"],
+    55: ["2 Timothy", "2 Tim", "2 Ti"],
+    56: ["Titus", "Tit", "Ti"],
+    57: ["Philemon", "Philem", "Phm", "Pm"],
+    58: ["Hebrews", "Heb"],
+    59: ["James", "Jas", "Jm"],
+    60: ["1 Peter", "1 Pet", "1 Pe", "1 Pt", "1 P"],
+    61: ["2 Peter", "2 Pet", "2 Pe", "2 Pt", "2 P"],
+    62: ["1 John", "1 Jn", "1 Jhn", "1 Jo", "1 J"],
+    63: ["2 John", "2 Jn", "2 Jhn", "2 Jo", "2 J"],
+    64: ["3 John", "3 Jn", "3 Jhn", "3 Jo", "3 J"],
+    65: ["Jude", "Jud", "Jd"],
+    66: ["Revelation", "Revelations", "Rev", "Re", "Apocalypse", "Apoc"],
+    # Non-canonical (import_noncanonical.py)
+    90: ["1 Enoch", "1 En", "Enoch"],
+    91: ["Jubilees", "Jub"],
+    92: ["Psalm 151", "Ps 151", "Psa 151"],
+}
+
+# Spellings of the leading number of "1 Samuel", "2 Kings", "3 John", …
+ORDINALS = {
+    "1": ["I", "First", "1st"],
+    "2": ["II", "Second", "2nd"],
+    "3": ["III", "Third", "3rd"],
+    "4": ["IV", "Fourth", "4th"],
+}
+
+NUMBERED_NAME_RE = re.compile(r"^([1-4])\s*(\D.*)$")
+
+
+def fold(text: str) -> str:
+    """Lookup key: accents stripped, case-folded, only letters and digits kept."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if ch.isalnum()).casefold()
+
+
+def spellings(name: str) -> list[str]:
+    """A name plus its roman-numeral / ordinal variants ("1 Cor" → "I Cor", "First Cor", …)."""
+    forms = [name]
+    m = NUMBERED_NAME_RE.match(name.strip())
+    if m:
+        forms += [f"{ordinal} {m.group(2)}" for ordinal in ORDINALS[m.group(1)]]
+    return forms
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS book_aliases (
+            alias       TEXT    NOT NULL,
+            translation TEXT    NOT NULL,
+            book_id     INTEGER NOT NULL,
+            kind        TEXT    NOT NULL CHECK(kind IN ('name', 'standard')),
+            PRIMARY KEY (alias, translation, book_id)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_book_aliases_book ON book_aliases(book_id);
+    """)
+
+
+def build_book_aliases(conn: sqlite3.Connection) -> int:
+    """Rebuild book_aliases from every translation's books + the standard forms. Returns row count."""
+    ensure_schema(conn)
+    conn.execute("DELETE FROM book_aliases")
+
+    rows = set()
+    for translation, book_id, name in conn.execute("SELECT translation, book_id, name FROM books"):
+        for form in spellings(name):
+            key = fold(form)
+            if key:
+                rows.add((key, translation, book_id, "name"))
+    for book_id, names in STANDARD_ALIASES.items():
+        for name in names:
+            for form in spellings(name):
+                rows.add((fold(form), "", book_id, "standard"))
+
+    conn.executemany(
+        "INSERT OR IGNORE INTO book_aliases (alias, translation, book_id, kind) VALUES (?, ?, ?, ?)",
+        sorted(rows),
+    )
+    conn.commit()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the book_aliases table")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(str(args.db))
+    try:
+        print("Building book aliases...")
+        count = build_book_aliases(conn)
+        print(f"  {count:,} aliases.")
+        # Pre-rendered responses (hot_set.py) would otherwise keep serving the old data
+        rows = hot_set.refresh_response_cache(conn, args.db)
+        if rows is not None:
+            print(f"  Re-rendered {rows:,} cached responses.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+"""
+Build the Koinonia Bible database from every data source in one run.
+
+Replaces running import_bible.py, import_noncanonical.py and import-sblgnt.ts
+by hand (each reopening bible.db and patching the FTS index itself). The
+import is a dependency graph of stages:
+
+    bolls:<CODE> ─┐   fts ─> word_stats ─> vocabulary,
+    sblgnt ───────┼─> token_counts, content_hashes ─> columnar, versification,
+    noncanonical ─┘   capabilities ─> book_aliases, similar_verses ─┐
+    crossrefs ──────────────────────────────────────────────────────┴─> response_cache ─> optimize
+
+Source stages (one per Bolls translation, SBLGNT, the non-canonical books,
+the OpenBible cross-references) are independent: worker processes download
+and parse them in parallel, each into its own fragment database in
+CACHE_DIR. The parent is the only writer to bible.db — it merges fragments
+as they finish (ATTACH + replace the stage's rows), then runs the derived
+stages in dependency order. FTS and ANALYZE run exactly once, at the end.
+
+Every stage is cached by input hash, recorded in build_stages:
+
+  - a source's input hash covers its metadata and the server's ETag /
+    Last-Modified (HEAD) or the local files' SHA-256; an unchanged input
+    reuses the cached fragment without downloading
+  - a fragment whose content digest matches the one already merged is not
+    merged again, so a re-download of identical data changes nothing
+  - a derived stage's hash is that of its dependencies; it reruns only when
+    one changed, and then only for the translations that changed where the
+    stage allows it (token counts, content hashes, versification, word
+    stats, vocabulary, similar verses)
+
+Translations dropped from the selection are left in place.
+
+Usage:
+    python build_db.py                              # Everything: all Bolls translations, SBLGNT, ENC, cross-refs
+    python build_db.py -t KJV WEB TR                # Only these Bolls translations
+    python build_db.py --sblgnt-dir DIR             # SBLGNT text directory (default: /tmp/SBLGNT/...)
+    python build_db.py --crossrefs FILE             # Local cross_references.txt / .zip instead of downloading
+    python build_db.py --no-sblgnt --no-crossrefs   # Skip sources
+    python build_db.py -j 8                         # Worker processes for source stages
+    python build_db.py --force                      # Ignore the stage cache
+    python build_db.py --no-finalize --no-similar   # Same meaning as in import_bible.py
+    python build_db.py --columnar ../columnar       # Also export NumPy columns (columnar_export.py)
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from graphlib import TopologicalSorter
+from pathlib import Path
+
+import book_aliases
+import capabilities
+import content_hashes
+import downloads
+import finalize_db
+import hot_set
+import import_bible
+import import_crossrefs
+import import_noncanonical
+import import_sblgnt
+import strongs_index
+import token_counts
+import versification
+import vocabulary_index
+import word_stats
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+CACHE_DIR = Path(tempfile.gettempdir()) / "koinonia-build"
+
+# Bump to invalidate every cached stage (e.g. after changing strip_html)
+BUILD_VERSION = 1
+
+# Derived stage → the stages it reads. "text" stands for every source stage
+# that writes translations; "all" for every other stage.
+DERIVED_STAGES = {
+    "fts": {"text"},
+    "word_stats": {"fts"},
+    "vocabulary": {"word_stats"},
+    "token_counts": {"text"},
+    "capabilities": {"text"},
+    "book_aliases": {"capabilities"},
+    "versification": {"text"},
+    "content_hashes": {"text"},
+    "similar_verses": {"capabilities"},
+    "columnar": {"content_hashes"},
+    "response_cache": {"all"},
+    "optimize": {"all"},
+}
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS build_stages (
+            stage    TEXT    PRIMARY KEY,
+            digest   TEXT    NOT NULL,
+            rows     INTEGER NOT NULL,
+            seconds  REAL    NOT NULL,
+            built_at TEXT    NOT NULL
+        ) WITHOUT ROWID;
+    """)
+    strongs_index.ensure_schema(conn)
+    import_crossrefs.ensure_schema(conn)
+
+
+def sha256_of(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_digest(paths) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(path.name.encode() + b"\0")
+        if path.exists():
+            digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+# ============================================================
+# SOURCE STAGES (worker processes, one fragment database each)
+# ============================================================
+
+def bolls_input(params: dict) -> str | None:
+    code = params["translation"]["short_name"]
+    return downloads.validator(f"{import_bible.BOLLS_BASE}/static/translations/{code}.json")
+
+
+def bolls_source(conn: sqlite3.Connection, params: dict) -> str:
+    t = params["translation"]
+    code = t["short_name"]
+    books = params["books"] or import_bible.fetch_json(
+        f"{import_bible.BOLLS_BASE}/get-books/{code}/", f"books for {code}"
+    )
+    conn.execute(
+        "INSERT INTO translations (short_name, full_name, language, direction) VALUES (?, ?, ?, ?)",
+        (code, t["full_name"], t["language"], t["direction"]),
+    )
+    known_books = import_bible.insert_books(conn, code, books)
+    verses_data = import_bible.download_translation_verses(code)
+    extra = import_bible.insert_missing_books(conn, code, verses_data, known_books)
+    verses, postings = import_bible.insert_verses(conn, code, verses_data)
+    note = f"{len(known_books) + len(extra)} books, {verses:,} verses"
+    return note + (f", {postings:,} Strong's postings" if postings else "")
+
+
+def sblgnt_input(params: dict) -> str | None:
+    return file_digest(import_sblgnt.source_files(Path(params["dir"])))
+
+
+def sblgnt_source(conn: sqlite3.Connection, params: dict) -> str:
+    books, verses = import_sblgnt.insert_sblgnt(conn, Path(params["dir"]))
+    return f"{books} books, {verses:,} verses"
+
+
+def noncanonical_input(params: dict) -> str | None:
+    data_dir = Path(params["dir"])
+    return sha256_of(import_noncanonical.BOOKS, import_noncanonical.TRANSLATION,
+                     file_digest(data_dir / b["file"] for b in import_noncanonical.BOOKS))
+
+
+def noncanonical_source(conn: sqlite3.Connection, params: dict) -> str:
+    t = import_noncanonical.TRANSLATION
+    conn.execute(
+        "INSERT INTO translations (short_name, full_name, language, direction) VALUES (?, ?, ?, ?)",
+        (t["short_name"], t["full_name"], t["language"], t["direction"]),
+    )
+    verses = import_noncanonical.insert_noncanonical_books(conn, Path(params["dir"]))
+    return f"{verses:,} verses"
+
+
+def crossrefs_input(params: dict) -> str | None:
+    if params["file"]:
+        return file_digest([Path(params["file"])])
+    return downloads.validator(params["url"])
+
+
+def crossrefs_source(conn: sqlite3.Connection, params: dict) -> str:
+    source = Path(params["file"]) if params["file"] else import_crossrefs.download_source(params["url"])
+    count = import_crossrefs.insert_crossrefs(conn, import_crossrefs.load_source(source))
+    return f"{count:,} cross-references"
+
+
+# kind → (input hash, builder)
+SOURCES = {
+    "bolls": (bolls_input, bolls_source),
+    "sblgnt": (sblgnt_input, sblgnt_source),
+    "noncanonical": (noncanonical_input, noncanonical_source),
+    "crossrefs": (crossrefs_input, crossrefs_source),
+}
+
+FRAGMENT_TABLES = {
+    "translations": "short_name",
+    "books": "translation, book_id",
+    "verses": "translation, book_id, chapter, verse",
+    "verse_strongs": "lemma, translation, book_id, chapter, verse",
+    "cross_references": "from_book, from_chapter, from_verse, to_book, to_chapter, to_verse",
+}
+
+
+def fragment_digest(conn: sqlite3.Connection) -> tuple[str, int]:
+    """SHA-256 over every fragment row in key order, and the row count."""
+    digest = hashlib.sha256()
+    rows = 0
+    for table, order in FRAGMENT_TABLES.items():
+        digest.update(table.encode() + b"\0")
+        for row in conn.execute(f"SELECT * FROM {table} ORDER BY {order}"):
+            digest.update(repr(row).encode())
+            rows += 1
+    return digest.hexdigest(), rows
+
+
+def create_fragment(path: Path) -> sqlite3.Connection:
+    conn = import_bible.create_database(path)
+    # Scratch file, rebuilt from the source on any failure
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    strongs_index.ensure_schema(conn)
+    import_crossrefs.ensure_schema(conn)
+    conn.execute("CREATE TABLE fragment (stage TEXT, digest TEXT, rows INTEGER, note TEXT)")
+    return conn
+
+
+def build_fragment(task: tuple) -> dict:
+    """Worker: input hash → cached fragment, or download/parse into a new one."""
+    stage, kind, params, force, cache_dir = task
+    started = time.perf_counter()
+    result = {"stage": stage, "kind": kind}
+    input_for, build = SOURCES[kind]
+    try:
+        # No input hash (no validator, HEAD failed): always rebuild, the digest still dedups
+        key = input_for(params)
+        key = sha256_of(BUILD_VERSION, stage, params, key) if key else None
+        slug = stage.replace(":", "-")
+        cached = cache_dir / f"{slug}-{key[:16]}.db" if key else None
+
+        if cached and cached.exists() and not force:
+            result["cached"] = True
+            path = cached
+        else:
+            result["cached"] = False
+            tmp = cache_dir / f"{slug}-{os.getpid()}.tmp.db"
+            conn = create_fragment(tmp)
+            try:
+                note = build(conn, params)
+                conn.commit()
+                digest, rows = fragment_digest(conn)
+                conn.execute("INSERT INTO fragment VALUES (?, ?, ?, ?)", (stage, digest, rows, note))
+                conn.commit()
+            except Exception:
+                conn.close()
+                tmp.unlink(missing_ok=True)
+                raise
+            conn.close()
+            path = cached or cache_dir / f"{slug}-{digest[:16]}.db"
+            for old in cache_dir.glob(f"{slug}-*.db"):
+                if old != tmp and not old.name.endswith(".tmp.db"):
+                    old.unlink(missing_ok=True)
+            tmp.replace(path)
+
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            _, result["digest"], result["rows"], result["note"] = conn.execute("SELECT * FROM fragment").fetchone()
+        finally:
+            conn.close()
+        result["path"] = str(path)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+# ============================================================
+# MERGE (parent process — the only writer to bible.db)
+# ============================================================
+
+def merge_fragment(conn: sqlite3.Connection, path: Path, kind: str) -> list[str]:
+    """Replace the stage's rows in bible.db with the fragment's. Returns the translations it wrote."""
+    conn.execute("ATTACH DATABASE ? AS fragment", (str(path),))
+    try:
+        codes = [r[0] for r in conn.execute("SELECT short_name FROM fragment.translations")]
+        for code in codes:
+            # Children first (foreign keys)
+            conn.execute("DELETE FROM verse_strongs WHERE translation = ?", (code,))
+            conn.execute("DELETE FROM verses WHERE translation = ?", (code,))
+            conn.execute("DELETE FROM books WHERE translation = ?", (code,))
+            conn.execute("DELETE FROM translations WHERE short_name = ?", (code,))
+        conn.executescript("""
+            INSERT INTO main.translations (short_name, full_name, language, direction)
+            SELECT short_name, full_name, language, direction FROM fragment.translations;
+
+            INSERT INTO main.books (translation, book_id, name, chapters, chron_order, testament)
+            SELECT translation, book_id, name, chapters, chron_order, testament FROM fragment.books;
+
+            INSERT INTO main.verses (translation, book_id, chapter, verse, text)
+            SELECT translation, book_id, chapter, verse, text FROM fragment.verses
+            ORDER BY translation, book_id, chapter, verse;
+
+            INSERT INTO main.verse_strongs (lemma, translation, book_id, chapter, verse, positions)
+            SELECT lemma, translation, book_id, chapter, verse, positions FROM fragment.verse_strongs;
+        """)
+        if kind == "crossrefs":
+            conn.execute("DELETE FROM main.cross_references")
+            conn.execute("INSERT INTO main.cross_references SELECT * FROM fragment.cross_references")
+        conn.commit()
+    finally:
+        conn.execute("DETACH DATABASE fragment")
+    return codes
+
+
+def recorded(conn: sqlite3.Connection) -> dict:
+    return {stage: digest for stage, digest in conn.execute("SELECT stage, digest FROM build_stages")}
+
+
+def record(conn: sqlite3.Connection, stage: str, digest: str, rows: int, seconds: float):
+    conn.execute(
+        "INSERT OR REPLACE INTO build_stages (stage, digest, rows, seconds, built_at) VALUES (?, ?, ?, ?, ?)",
+        (stage, digest, rows, round(seconds, 3), datetime.now(timezone.utc).isoformat(timespec="seconds")),
+    )
+    conn.commit()
+
+
+# ============================================================
+# DERIVED STAGES (parent process, dependency order)
+# ============================================================
+
+def run_derived(conn: sqlite3.Connection, stage: str, scope: set | None, args) -> int | None:
+    """
+    Run one derived stage over `scope` (changed translations, or None for
+    all). Returns rows written, or None if the stage was skipped by a flag.
+    """
+    codes = sorted(scope) if scope is not None else None
+    if stage == "fts":
+        conn.execute("DROP TABLE IF EXISTS verses_fts")
+        import_bible.build_fts_index(conn)
+        conn.commit()
+        return conn.execute("SELECT COUNT(*) FROM verses").fetchone()[0]
+    if stage == "word_stats":
+        print("\nCounting terms per book...")
+        rows = word_stats.build_word_stats(conn, codes)
+        print(f"  {rows:,} rows.")
+        return rows
+    if stage == "vocabulary":
+        print("\nBuilding search vocabulary...")
+        terms = vocabulary_index.build_vocabulary(conn, codes)
+        print(f"  {terms:,} terms.")
+        return terms
+    if stage == "token_counts":
+        print("\nComputing per-chapter token counts...")
+        chapters = token_counts.build_chapter_tokens(conn, codes)
+        print(f"  {chapters:,} chapters.")
+        return chapters
+    if stage == "content_hashes":
+        print("\nHashing content...")
+        chapters = content_hashes.build_content_hashes(conn, codes)
+        print(f"  {chapters:,} chapters.")
+        return chapters
+    if stage == "capabilities":
+        print("\nResolving translation capabilities...")
+        return capabilities.build_capabilities(conn)
+    if stage == "book_aliases":
+        print("\nBuilding book aliases...")
+        aliases = book_aliases.build_book_aliases(conn)
+        print(f"  {aliases:,} aliases.")
+        return aliases
+    if stage == "versification":
+        print("\nMapping versification...")
+        # Every mapping is relative to the canonical translation's verse counts
+        if codes is not None and versification.load_rules().get("canonical", "KJV") in scope:
+            codes = None
+        renumbered = versification.build_verse_map(conn, codes)
+        print(f"  {sum(renumbered.values()):,} verses renumbered "
+              f"across {sum(1 for n in renumbered.values() if n)} translations.")
+        return sum(renumbered.values())
+    if stage == "similar_verses":
+        if args.no_similar:
+            print("\nSkipping similar verses (--no-similar).")
+            return None
+        # Imported here: it needs numpy, which only this and the columnar stage do
+        import similar_verses
+        print("\nFinding similar verses (MinHash LSH)...")
+        matches = similar_verses.build_similar_verses(
+            conn, similar_verses.borrower_scope(conn, scope) if scope is not None else None, workers=args.jobs
+        )
+        print(f"  {matches:,} matches.")
+        return matches
+    if stage == "columnar":
+        if not args.columnar:
+            return None
+        # Imported here: it needs numpy, which a build without --columnar does not
+        import columnar_export
+        # Unchanged translations (same content hash root) are not rewritten
+        print(f"\nExporting columns to {args.columnar}/ ...")
+        status = columnar_export.export_columnar(conn, args.columnar)
+        written = sum(1 for s in status.values() if s == "written")
+        print(f"  {written} written, {len(status) - written} unchanged.")
+        return written
+    if stage == "response_cache":
+        # Only re-renders paths hot_set.py already cached; skipped until it has run
+        rows = hot_set.refresh_response_cache(conn, args.db)
+        if rows is not None:
+            print(f"\nRe-rendered {rows:,} cached responses.")
+        return rows
+    if stage == "optimize":
+        if args.no_finalize:
+            print("\nOptimizing database...")
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA optimize")
+            conn.commit()
+        else:
+            # finalize_for_serving runs the (single) ANALYZE before its VACUUM
+            print("\nFinalizing database for serving...")
+            finalize_db.finalize_for_serving(conn)
+        return 0
+    raise ValueError(f"unknown stage {stage!r}")
+
+
+# ============================================================
+# PLAN + RUN
+# ============================================================
+
+def source_tasks(args) -> list[tuple]:
+    """(stage, kind, params) for every selected source."""
+    tasks = []
+    if not args.no_bolls:
+        all_translations = import_bible.fetch_translations()
+        if args.translations:
+            codes = {c.upper() for c in args.translations}
+            selected = [t for t in all_translations if t["short_name"] in codes]
+            not_found = codes - {t["short_name"] for t in selected}
+            if not_found:
+                print(f"\n  WARNING: Not found: {', '.join(sorted(not_found))}")
+        else:
+            selected = all_translations
+        all_books = import_bible.fetch_all_books() if selected else {}
+        for t in selected:
+            params = {"translation": t, "books": all_books.get(t["short_name"])}
+            tasks.append((f"bolls:{t['short_name']}", "bolls", params))
+    if not args.no_sblgnt:
+        if import_sblgnt.source_files(args.sblgnt_dir):
+            tasks.append(("sblgnt", "sblgnt", {"dir": str(args.sblgnt_dir)}))
+        else:
+            print(f"\n  WARNING: No SBLGNT files in {args.sblgnt_dir} — skipping "
+                  f"(git clone https://github.com/LogosBible/SBLGNT /tmp/SBLGNT)")
+    if not args.no_noncanonical:
+        tasks.append(("noncanonical", "noncanonical", {"dir": str(import_noncanonical.DATA_DIR)}))
+    if not args.no_crossrefs:
+        params = {"file": str(args.crossrefs) if args.crossrefs else None, "url": import_crossrefs.CROSSREFS_URL}
+        tasks.append(("crossrefs", "crossrefs", params))
+    return tasks
+
+
+def stage_graph(sources: list[str]) -> dict:
+    """{stage: {dependencies}} for TopologicalSorter."""
+    text = {s for s in sources if s != "crossrefs"}
+    graph = {s: set() for s in sources}
+    for stage, deps in DERIVED_STAGES.items():
+        resolved = set()
+        for dep in deps:
+            if dep == "text":
+                resolved |= text
+            elif dep == "all":
+                resolved |= set(graph) - {stage}
+            else:
+                resolved.add(dep)
+        graph[stage] = resolved
+    return graph
+
+
+def open_database(db_path: Path) -> sqlite3.Connection:
+    if db_path.exists():
+        conn = sqlite3.connect(str(db_path))
+        # Finalized databases are in DELETE mode; the final stage puts them back
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+    else:
+        conn = import_bible.create_database(db_path)
+    ensure_schema(conn)
+    return conn
+
+
+def build(db_path: Path, tasks: list[tuple], args) -> dict:
+    """Run the stage graph. Returns {stage: "built" | "cached" | "unchanged" | "skipped" | "failed"}."""
+    args.cache_dir.mkdir(parents=True, exist_ok=True)
+    conn = open_database(db_path)
+    kinds = {stage: kind for stage, kind, _ in tasks}
+    graph = stage_graph(list(kinds))
+    sorter = TopologicalSorter(graph)
+    sorter.prepare()
+
+    done = recorded(conn)
+    digests = {}        # stage → digest this run
+    changed = set()     # translations rewritten this run
+    status = {}
+
+    try:
+        # Sources: every one is a root of the graph — run them all in parallel
+        ready = set(sorter.get_ready())
+        work = [(stage, kinds[stage], params, args.force, args.cache_dir)
+                for stage, _, params in tasks if stage in ready]
+        print(f"\nRunning {len(work)} source stages ({args.jobs or multiprocessing.cpu_count()} workers)...")
+        with multiprocessing.Pool(min(args.jobs or multiprocessing.cpu_count(), max(len(work), 1))) as pool:
+            for result in pool.imap_unordered(build_fragment, work):
+                stage = result["stage"]
+                if "error" in result:
+                    print(f"  {stage:18s} FAILED — {result['error']}")
+                    status[stage] = "failed"
+                    # Keep what bible.db already has for it
+                    digests[stage] = done.get(stage, "failed")
+                elif result["digest"] == done.get(stage) and not args.force:
+                    digests[stage] = result["digest"]
+                    status[stage] = "unchanged"
+                    print(f"  {stage:18s} unchanged ({result['seconds']:.1f}s)")
+                else:
+                    started = time.perf_counter()
+                    codes = merge_fragment(conn, Path(result["path"]), result["kind"])
+                    changed.update(codes)
+                    seconds = result["seconds"] + time.perf_counter() - started
+                    record(conn, stage, result["digest"], result["rows"], seconds)
+                    digests[stage] = result["digest"]
+                    status[stage] = "cached" if result["cached"] else "built"
+                    print(f"  {stage:18s} {status[stage]:6s} {result['note']} ({seconds:.1f}s)")
+                sorter.done(stage)
+
+        # Derived stages, in dependency order, on this (single-writer) connection
+        while sorter.is_active():
+            for stage in sorter.get_ready():
+                digest = sha256_of(BUILD_VERSION, stage, sorted((d, digests[d]) for d in graph[stage]))
+                digests[stage] = digest
+                if digest == done.get(stage) and not args.force:
+                    status[stage] = "unchanged"
+                else:
+                    # A stage never built (or forced) covers every translation
+                    scope = changed if stage in done and not args.force else None
+                    started = time.perf_counter()
+                    rows = run_derived(conn, stage, scope, args)
+                    if rows is None:
+                        status[stage] = "skipped"
+                    else:
+                        record(conn, stage, digest, rows, time.perf_counter() - started)
+                        status[stage] = "built"
+                sorter.done(stage)
+    finally:
+        conn.close()
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build bible.db from all sources as a cached stage graph")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"Database path (default: {DEFAULT_DB})")
+    parser.add_argument(
+        "--translations", "-t", nargs="+", metavar="CODE",
+        help="Bolls translation codes to import (e.g., KJV VDCL NTR). Default: all"
+    )
+    parser.add_argument("--sblgnt-dir", type=Path, default=import_sblgnt.SBLGNT_DIR, help="SBLGNT text directory")
+    parser.add_argument("--crossrefs", type=Path, metavar="FILE", help="Local cross_references.txt or .zip")
+    parser.add_argument("--no-bolls", action="store_true", help="Skip the Bolls translations")
+    parser.add_argument("--no-sblgnt", action="store_true", help="Skip SBLGNT")
+    parser.add_argument("--no-noncanonical", action="store_true", help="Skip the non-canonical books (ENC)")
+    parser.add_argument("--no-crossrefs", action="store_true", help="Skip the cross-references")
+    parser.add_argument("--no-finalize", action="store_true", help="ANALYZE only — skip the clustered rebuild + VACUUM")
+    parser.add_argument("--no-similar", action="store_true", help="Skip the similar-verse stage")
+    parser.add_argument("--columnar", type=Path, metavar="DIR", help="Also export NumPy columns to DIR")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Rebuild every stage, ignoring the cache")
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR, help=f"Fragment cache (default: {CACHE_DIR})")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    tasks = source_tasks(args)
+    if not tasks:
+        print("No sources selected.")
+        sys.exit(1)
+
+    status = build(args.db, tasks, args)
+
+    counts = {}
+    for s in status.values():
+        counts[s] = counts.get(s, 0) + 1
+    db_size_mb = args.db.stat().st_size / (1024 * 1024)
+    print(f"\n{'=' * 50}")
+    print(f"Build complete in {time.perf_counter() - started:.1f}s")
+    print(f"  Database: {args.db} ({db_size_mb:.1f} MB)")
+    print(f"  Stages: " + ", ".join(f"{n} {s}" for s, n in sorted(counts.items())))
+    failed = sorted(stage for stage, s in status.items() if s == "failed")
+    if failed:
+        print(f"  Failed: {', '.join(failed)}")
+    print(f"{'=' * 50}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Materialize translation capabilities and resolved book lists in bible.db.
+
+The API appends fallback books to every translation: deuterocanonical books
+(67-89) come from KJV when a translation lacks them, and non-canonical books
+(90+) always come from ENC. Instead of working that out per request, this
+stage writes:
+
+  translation_capabilities  one row per translation: which book groups it has,
+                            verse counts, and its DC / NC fallback translations
+  translation_books         the fully resolved book list per translation,
+                            with `source` = the translation that holds each
+                            book's text
+
+so /api/bible/books is one range scan and chapter/verse routing is one
+primary-key lookup.
+
+Usage:
+    python capabilities.py                          # Rebuild both tables
+    python capabilities.py --db /path/to/bible.db   # Custom database path
+"""
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+import hot_set
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+
+# Must match server/api/bible.ts
+DC_FALLBACK = "KJV"
+NC_TRANSLATION = "ENC"
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS translation_capabilities (
+            translation TEXT    PRIMARY KEY,
+            has_ot      INTEGER NOT NULL,
+            has_nt      INTEGER NOT NULL,
+            has_dc      INTEGER NOT NULL,
+            has_nc      INTEGER NOT NULL,
+            books       INTEGER NOT NULL,
+            verses      INTEGER NOT NULL,
+            ot_verses   INTEGER NOT NULL,
+            nt_verses   INTEGER NOT NULL,
+            dc_verses   INTEGER NOT NULL,
+            nc_verses   INTEGER NOT NULL,
+            dc_fallback TEXT,
+            nc_fallback TEXT
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS translation_books (
+            translation TEXT    NOT NULL,
+            book_id     INTEGER NOT NULL,
+            source      TEXT    NOT NULL,
+            name        TEXT    NOT NULL,
+            chapters    INTEGER NOT NULL,
+            chron_order INTEGER NOT NULL,
+            testament   TEXT    NOT NULL,
+            PRIMARY KEY (translation, book_id)
+        ) WITHOUT ROWID;
+    """)
+
+
+def build_capabilities(conn: sqlite3.Connection) -> int:
+    """Rebuild both tables for every translation. Returns the translation count."""
+    ensure_schema(conn)
+    conn.execute("DELETE FROM translation_capabilities")
+    conn.execute("DELETE FROM translation_books")
+
+    # Verse counts per translation and testament, via the books that hold them
+    counts = {}
+    for translation, testament, verses in conn.execute("""
+        SELECT v.translation, b.testament, COUNT(*)
+        FROM verses v
+        JOIN books b ON b.translation = v.translation AND b.book_id = v.book_id
+        GROUP BY v.translation, b.testament
+    """):
+        counts.setdefault(translation, {})[testament] = verses
+
+    has_fallback = {
+        "DC": counts.get(DC_FALLBACK, {}).get("DC", 0) > 0,
+        "NC": counts.get(NC_TRANSLATION, {}).get("NC", 0) > 0,
+    }
+
+    listed_dc = {r[0] for r in conn.execute("SELECT DISTINCT translation FROM books WHERE testament = 'DC'")}
+
+    codes = [r[0] for r in conn.execute("SELECT short_name FROM translations ORDER BY short_name")]
+    for code in codes:
+        own = counts.get(code, {})
+        # Same test as the old /books handler: DC books listed for the translation
+        has_dc = code in listed_dc
+        dc_fallback = None if has_dc or not has_fallback["DC"] else DC_FALLBACK
+        nc_fallback = NC_TRANSLATION if code != NC_TRANSLATION and has_fallback["NC"] else None
+
+        # Own books. A listed DC book without text reads from KJV (the old verse 1:1
+        # probe in resolveTranslation); NC books always come from ENC.
+        conn.execute("""
+            INSERT INTO translation_books (translation, book_id, source, name, chapters, chron_order, testament)
+            SELECT b.translation, b.book_id,
+                   CASE WHEN b.testament = 'DC' AND :dc_ok AND NOT EXISTS (
+                            SELECT 1 FROM verses v WHERE v.translation = b.translation AND v.book_id = b.book_id
+                        ) THEN :dc ELSE b.translation END,
+                   b.name, b.chapters, b.chron_order, b.testament
+            FROM books b
+            WHERE b.translation = :code AND (b.testament != 'NC' OR :code = :nc)
+        """, {"code": code, "nc": NC_TRANSLATION, "dc": DC_FALLBACK, "dc_ok": has_fallback["DC"]})
+        for testament, fallback in (("DC", dc_fallback), ("NC", nc_fallback)):
+            if fallback is None:
+                continue
+            conn.execute("""
+                INSERT OR IGNORE INTO translation_books
+                    (translation, book_id, source, name, chapters, chron_order, testament)
+                SELECT ?, book_id, translation, name, chapters, chron_order, testament
+                FROM books WHERE translation = ? AND testament = ?
+            """, (code, fallback, testament))
+
+        conn.execute("""
+            INSERT INTO translation_capabilities
+                (translation, has_ot, has_nt, has_dc, has_nc, books, verses,
+                 ot_verses, nt_verses, dc_verses, nc_verses, dc_fallback, nc_fallback)
+            VALUES (?, ?, ?, ?, ?, (SELECT COUNT(*) FROM translation_books WHERE translation = ?),
+                    ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            code,
+            int(own.get("OT", 0) > 0), int(own.get("NT", 0) > 0), int(has_dc), int(own.get("NC", 0) > 0),
+            code, sum(own.values()),
+            own.get("OT", 0), own.get("NT", 0), own.get("DC", 0), own.get("NC", 0),
+            dc_fallback, nc_fallback,
+        ))
+
+    conn.commit()
+    return len(codes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild translation capability and book-list tables")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(str(args.db))
+    try:
+        print("Rebuilding translation capabilities...")
+        count = build_capabilities(conn)
+        print(f"  {count} translations.")
+        # Pre-rendered responses (hot_set.py) would otherwise keep serving the old data
+        rows = hot_set.refresh_response_cache(conn, args.db)
+        if rows is not None:
+            print(f"  Re-rendered {rows:,} cached responses.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Export the corpus as memory-mappable columnar arrays for batch analytics.
+
+Corpus-wide passes (length distributions, token budgets, similarity) that
+iterate `SELECT * FROM verses` row by row through sqlite3 spend their time
+building Python tuples. This stage writes every translation once as
+fixed-width NumPy key arrays plus an offsets + UTF-8 buffer pair for the
+text (layout in bible/columnar.py), which bible.columnar maps back in
+without copying.
+
+Output (default server/columnar/):
+
+    manifest.json                 per translation: version, verses, text bytes
+    <CODE>/{book_id,chapter,verse,tokens,offsets,text}.npy
+
+A translation's version is its content hash root (content_hashes.py) when
+the database has one; a translation whose version matches the manifest is
+not rewritten, so re-running after a partial re-import is cheap.
+
+Usage:
+    python columnar_export.py                       # Export every translation
+    python columnar_export.py -t KJV WEB            # Specific translations
+    python columnar_export.py --out DIR --force     # Custom directory, rewrite everything
+    python columnar_export.py --bench               # Length statistics: sqlite3 rows vs mapped arrays
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: 'numpy' package is required.")
+    print("Install it with: pip install numpy")
+    sys.exit(1)
+
+import token_counts
+
+# The read-side package lives at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bible import columnar  # noqa: E402
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+DEFAULT_OUT = columnar.DEFAULT_DIR
+
+
+def translation_version(conn: sqlite3.Connection, code: str) -> str:
+    """Content hash root of a translation, or (without content_hashes) a hash of its text."""
+    has_hashes = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'content_hashes'").fetchone()
+    row = conn.execute(
+        "SELECT hash FROM content_hashes WHERE translation = ? AND book_id = 0 AND chapter = 0", (code,)
+    ).fetchone() if has_hashes else None
+    if row:
+        return row[0].hex()
+    digest = hashlib.sha256()
+    for book_id, chapter, verse, text in conn.execute(
+        "SELECT book_id, chapter, verse, text FROM verses WHERE translation = ? ORDER BY book_id, chapter, verse",
+        (code,),
+    ):
+        digest.update(f"{book_id}:{chapter}:{verse}:{text}\n".encode())
+    return digest.hexdigest()[:32]
+
+
+def export_translation(conn: sqlite3.Connection, code: str, out_dir: Path) -> dict:
+    """Write one translation's arrays (atomically replacing the old directory). Returns its manifest entry."""
+    language = conn.execute("SELECT language FROM translations WHERE short_name = ?", (code,)).fetchone()
+    chars_per_token = token_counts.ascii_chars_per_token(language[0] if language else None)
+
+    rows = conn.execute(
+        "SELECT book_id, chapter, verse, text FROM verses WHERE translation = ? ORDER BY book_id, chapter, verse",
+        (code,),
+    ).fetchall()
+    encoded = [(text or "").encode("utf-8") for _, _, _, text in rows]
+    offsets = np.zeros(len(rows) + 1, dtype=columnar.COLUMNS["offsets"])
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    arrays = {
+        "book_id": np.fromiter((r[0] for r in rows), columnar.COLUMNS["book_id"], len(rows)),
+        "chapter": np.fromiter((r[1] for r in rows), columnar.COLUMNS["chapter"], len(rows)),
+        "verse": np.fromiter((r[2] for r in rows), columnar.COLUMNS["verse"], len(rows)),
+        "tokens": np.fromiter(
+            (min(token_counts.estimate_tokens(r[3], chars_per_token), 0xFFFF) for r in rows),
+            columnar.COLUMNS["tokens"], len(rows),
+        ),
+        "offsets": offsets,
+        "text": np.frombuffer(b"".join(encoded), dtype=columnar.COLUMNS["text"]),
+    }
+
+    final = out_dir / code
+    staging = out_dir / f".{code}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    for name, arr in arrays.items():
+        np.save(staging / f"{name}.npy", arr)
+    old = out_dir / f".{code}.old"
+    if final.exists():
+        shutil.rmtree(old, ignore_errors=True)
+        os.rename(final, old)
+    os.rename(staging, final)
+    shutil.rmtree(old, ignore_errors=True)
+    return {"verses": len(rows), "text_bytes": int(offsets[-1])}
+
+
+def export_columnar(conn: sqlite3.Connection, out_dir: Path, translations: list[str] | None = None,
+                    force: bool = False) -> dict:
+    """Export the given translations (default: all), skipping unchanged ones. Returns {code: status}."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = columnar.manifest(out_dir)
+    codes = [r[0] for r in conn.execute("SELECT short_name FROM translations ORDER BY short_name")]
+    if translations is not None:
+        codes = [c for c in codes if c in set(translations)]
+
+    status = {}
+    for code in codes:
+        version = translation_version(conn, code)
+        previous = manifest["translations"].get(code)
+        if not force and previous and previous["version"] == version and (out_dir / code).is_dir():
+            status[code] = "unchanged"
+            continue
+        entry = export_translation(conn, code, out_dir)
+        manifest["translations"][code] = {"version": version, **entry}
+        status[code] = "written"
+
+    manifest["columns"] = {name: np.dtype(dtype).str for name, dtype in columnar.COLUMNS.items()}
+    manifest["generated"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    (out_dir / columnar.MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+    return status
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def bench(db_path: Path, out_dir: Path):
+    """Per-translation verse length percentiles, from sqlite3 rows and from the mapped arrays."""
+    started = time.perf_counter()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    lengths = {}
+    for code, text in conn.execute("SELECT translation, text FROM verses"):
+        lengths.setdefault(code, []).append(len(text.encode("utf-8")))
+    slow = {code: np.percentile(v, [50, 95, 99]) for code, v in lengths.items()}
+    conn.close()
+    row_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    corpus = columnar.load_all(out_dir)
+    fast = {code: np.percentile(cols.byte_lengths(), [50, 95, 99]) for code, cols in corpus.items()}
+    tokens = sum(int(cols.tokens.sum(dtype=np.uint64)) for cols in corpus.values())
+    array_seconds = time.perf_counter() - started
+
+    verses = sum(len(cols) for cols in corpus.values())
+    assert all(np.allclose(slow[c], fast[c]) for c in fast), "columnar export is stale — re-run without --bench"
+    print(f"  {len(corpus)} translations, {verses:,} verses, ≈{tokens:,} tokens")
+    print(f"  sqlite3 rows:  {row_seconds * 1000:8.1f} ms")
+    print(f"  mapped arrays: {array_seconds * 1000:8.1f} ms  ({row_seconds / max(array_seconds, 1e-9):.0f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export verses as memory-mappable NumPy columns")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help=f"Output directory (default: {DEFAULT_OUT})")
+    parser.add_argument(
+        "--translations", "-t", nargs="+", metavar="CODE",
+        help="Translation codes to export (default: all)"
+    )
+    parser.add_argument("--force", action="store_true", help="Rewrite translations whose version is unchanged")
+    parser.add_argument("--bench", action="store_true", help="Compare a corpus-wide pass over sqlite3 and the arrays")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    if args.bench:
+        print("Length statistics over every verse...")
+        bench(args.db, args.out)
+        return
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        codes = [c.upper() for c in args.translations] if args.translations else None
+        print(f"Exporting columns to {args.out}/ ...")
+        status = export_columnar(conn, args.out, codes, args.force)
+    finally:
+        conn.close()
+    written = sorted(code for code, s in status.items() if s == "written")
+    print(f"  {len(written)} written, {len(status) - len(written)} unchanged "
+          f"in {time.perf_counter() - started:.1f}s")
+    if written:
+        print(f"  Written: {', '.join(written)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Merkle content hashes for the Koinonia Bible database.
+
+Every verse text is hashed, and the hashes roll up verse → chapter → book →
+translation in one table:
+
+    content_hashes(translation, book_id, chapter, hash, verses)
+        PRIMARY KEY (translation, book_id, chapter)
+
+    book_id = 0, chapter = 0   translation node: hash of its (book_id, hash) list
+    chapter = 0                book node: hash of its (chapter, hash) list
+    chapter > 0                chapter node: hash of `verses`, the packed
+                               (verse uint16, 8-byte verse hash) records
+
+A node's children are one primary-key range, so comparing two trees walks
+down only where hashes differ: a diff costs O(changed chapters) reads, and
+two replicas with the same root (the hash of every translation node) hold
+identical verse text.
+
+The other side of a diff is another bible.db (its stored tree, or one
+computed from its verses when it has none — e.g. a build_db.py fragment), a
+Bolls translation JSON, or Bolls itself. --apply then rewrites only the
+differing verses, their FTS rows, Strong's postings and chapter token counts,
+and the hash nodes above them. Other derived tables (similar_verses,
+verse_map, …) are left to build_db.py.
+
+Usage:
+    python content_hashes.py                          # Rebuild the tree for every translation
+    python content_hashes.py -t KJV WEB               # Rebuild specific translations
+    python content_hashes.py --root                   # Root + per-translation hashes
+    python content_hashes.py --verify replica.db      # Exit 1 (and list what differs) unless identical
+    python content_hashes.py --diff new.db            # Verses that differ from another database
+    python content_hashes.py --diff KJV.json -t KJV   # ...from a Bolls translation JSON file
+    python content_hashes.py --diff bolls -t KJV      # ...from the current Bolls download
+    python content_hashes.py --apply new.db           # Rewrite only the differing verses
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import struct
+import sys
+from itertools import groupby
+from pathlib import Path
+
+import hot_set
+import strongs_index
+import token_counts
+import vocabulary_index
+import word_stats
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+
+VERSE_RECORD = struct.Struct("<H8s")
+NODE_RECORD = struct.Struct("<H16s")
+
+
+# ============================================================
+# HASHING
+# ============================================================
+
+def verse_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+
+def pack_verses(records) -> bytes:
+    """(verse, digest) pairs in verse order → chapter `verses` blob."""
+    return b"".join(VERSE_RECORD.pack(v, d) for v, d in records)
+
+
+def unpack_verses(blob: bytes) -> dict:
+    return {v: d for v, d in VERSE_RECORD.iter_unpack(blob)}
+
+
+def node_hash(children) -> bytes:
+    """Hash of (number, 16-byte hash) children in number order."""
+    return hashlib.blake2b(b"".join(NODE_RECORD.pack(n, h) for n, h in children), digest_size=16).digest()
+
+
+def chapter_hash(verses_blob: bytes) -> bytes:
+    return hashlib.blake2b(verses_blob, digest_size=16).digest()
+
+
+def root_hash(translations: dict) -> str:
+    """Database root: hash of every (translation, hash) in code order."""
+    h = hashlib.blake2b(digest_size=16)
+    for code in sorted(translations):
+        h.update(code.encode() + b"\0" + translations[code])
+    return h.hexdigest()
+
+
+def tree_from_rows(rows) -> dict:
+    """
+    In-memory tree of one translation from (book_id, chapter, verse, text)
+    rows in key order: {"hash", "books": {book: hash},
+    "chapters": {(book, chapter): (hash, verses blob)}}.
+    """
+    chapters = {}
+    for key, group in groupby(rows, key=lambda r: (r[0], r[1])):
+        blob = pack_verses((v, verse_digest(text)) for _, _, v, text in group)
+        chapters[key] = (chapter_hash(blob), blob)
+    books = {
+        book: node_hash((c, chapters[(book, c)][0]) for _, c in group)
+        for book, group in groupby(sorted(chapters), key=lambda k: k[0])
+    }
+    return {"hash": node_hash(sorted(books.items())), "books": books, "chapters": chapters}
+
+
+# ============================================================
+# STORED TREE
+# ============================================================
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS content_hashes (
+            translation TEXT    NOT NULL,
+            book_id     INTEGER NOT NULL,
+            chapter     INTEGER NOT NULL,
+            hash        BLOB    NOT NULL,
+            verses      BLOB,
+            PRIMARY KEY (translation, book_id, chapter)
+        ) WITHOUT ROWID;
+    """)
+
+
+def verse_rows(conn: sqlite3.Connection, translation: str, schema: str = "main"):
+    return conn.execute(
+        f"SELECT book_id, chapter, verse, text FROM {schema}.verses WHERE translation = ? "
+        "ORDER BY book_id, chapter, verse",
+        (translation,),
+    )
+
+
+def write_tree(conn: sqlite3.Connection, translation: str, tree: dict):
+    conn.execute("DELETE FROM content_hashes WHERE translation = ?", (translation,))
+    conn.execute("INSERT INTO content_hashes VALUES (?, 0, 0, ?, NULL)", (translation, tree["hash"]))
+    conn.executemany(
+        "INSERT INTO content_hashes VALUES (?, ?, 0, ?, NULL)",
+        [(translation, book, h) for book, h in tree["books"].items()],
+    )
+    conn.executemany(
+        "INSERT INTO content_hashes VALUES (?, ?, ?, ?, ?)",
+        [(translation, book, chapter, h, blob) for (book, chapter), (h, blob) in tree["chapters"].items()],
+    )
+
+
+def build_content_hashes(conn: sqlite3.Connection, translations: list[str] | None = None) -> int:
+    """Rebuild the tree for the given translations (default: all). Returns chapter count."""
+    ensure_schema(conn)
+    if translations is None:
+        translations = [r[0] for r in conn.execute("SELECT short_name FROM translations ORDER BY short_name")]
+    chapters = 0
+    for code in translations:
+        tree = tree_from_rows(verse_rows(conn, code))
+        write_tree(conn, code, tree)
+        chapters += len(tree["chapters"])
+    conn.commit()
+    return chapters
+
+
+def update_nodes(conn: sqlite3.Connection, translation: str, chapters: set):
+    """Re-hash the given (book, chapter) nodes from the stored verses, then their books and the translation."""
+    for book, chapter in chapters:
+        rows = conn.execute(
+            "SELECT verse, text FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? ORDER BY verse",
+            (translation, book, chapter),
+        ).fetchall()
+        if rows:
+            blob = pack_verses((v, verse_digest(text)) for v, text in rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO content_hashes VALUES (?, ?, ?, ?, ?)",
+                (translation, book, chapter, chapter_hash(blob), blob),
+            )
+        else:
+            conn.execute(
+                "DELETE FROM content_hashes WHERE translation = ? AND book_id = ? AND chapter = ?",
+                (translation, book, chapter),
+            )
+    for book in {b for b, _ in chapters}:
+        children = conn.execute(
+            "SELECT chapter, hash FROM content_hashes WHERE translation = ? AND book_id = ? AND chapter > 0 "
+            "ORDER BY chapter",
+            (translation, book),
+        ).fetchall()
+        if children:
+            conn.execute("INSERT OR REPLACE INTO content_hashes VALUES (?, ?, 0, ?, NULL)",
+                         (translation, book, node_hash(children)))
+        else:
+            conn.execute("DELETE FROM content_hashes WHERE translation = ? AND book_id = ? AND chapter = 0",
+                         (translation, book))
+    books = conn.execute(
+        "SELECT book_id, hash FROM content_hashes WHERE translation = ? AND book_id > 0 AND chapter = 0 "
+        "ORDER BY book_id",
+        (translation,),
+    ).fetchall()
+    conn.execute("INSERT OR REPLACE INTO content_hashes VALUES (?, 0, 0, ?, NULL)", (translation, node_hash(books)))
+
+
+# ============================================================
+# TREE SOURCES
+# ============================================================
+# Both expose the same four levels, read lazily so a diff only touches the
+# nodes it descends into.
+
+class StoredTree:
+    """The content_hashes table of a database (main or an ATTACHed schema)."""
+
+    def __init__(self, conn: sqlite3.Connection, schema: str = "main"):
+        self.conn = conn
+        self.schema = schema
+
+    def translations(self) -> dict:
+        return dict(self.conn.execute(
+            f"SELECT translation, hash FROM {self.schema}.content_hashes WHERE book_id = 0 AND chapter = 0"
+        ))
+
+    def books(self, translation: str) -> dict:
+        return dict(self.conn.execute(
+            f"SELECT book_id, hash FROM {self.schema}.content_hashes "
+            "WHERE translation = ? AND book_id > 0 AND chapter = 0",
+            (translation,),
+        ))
+
+    def chapters(self, translation: str, book: int) -> dict:
+        return dict(self.conn.execute(
+            f"SELECT chapter, hash FROM {self.schema}.content_hashes "
+            "WHERE translation = ? AND book_id = ? AND chapter > 0",
+            (translation, book),
+        ))
+
+    def verses(self, translation: str, book: int, chapter: int) -> dict:
+        row = self.conn.execute(
+            f"SELECT verses FROM {self.schema}.content_hashes WHERE translation = ? AND book_id = ? AND chapter = ?",
+            (translation, book, chapter),
+        ).fetchone()
+        return unpack_verses(row[0]) if row else {}
+
+    def text(self, translation: str, book: int, chapter: int, verse: int) -> str | None:
+        row = self.conn.execute(
+            f"SELECT text FROM {self.schema}.verses WHERE translation = ? AND book_id = ? AND chapter = ? AND verse = ?",
+            (translation, book, chapter, verse),
+        ).fetchone()
+        return row[0] if row else None
+
+
+class MemoryTree:
+    """Trees computed from verse rows: a database without content_hashes, or source JSON."""
+
+    def __init__(self, trees: dict, texts: dict, raw: dict | None = None):
+        self.trees = trees      # {translation: tree_from_rows(...)}
+        self.texts = texts      # {(translation, book, chapter, verse): text}
+        self.raw = raw or {}    # {(translation, book, chapter, verse): raw Bolls text} for Strong's tags
+        self.by_book = {}       # {(translation, book): {chapter: hash}}
+        for code, tree in trees.items():
+            for (book, chapter), (h, _) in tree["chapters"].items():
+                self.by_book.setdefault((code, book), {})[chapter] = h
+
+    def translations(self) -> dict:
+        return {code: tree["hash"] for code, tree in self.trees.items()}
+
+    def books(self, translation: str) -> dict:
+        return self.trees[translation]["books"] if translation in self.trees else {}
+
+    def chapters(self, translation: str, book: int) -> dict:
+        return self.by_book.get((translation, book), {})
+
+    def verses(self, translation: str, book: int, chapter: int) -> dict:
+        node = self.trees.get(translation, {"chapters": {}})["chapters"].get((book, chapter))
+        return unpack_verses(node[1]) if node else {}
+
+    def text(self, translation: str, book: int, chapter: int, verse: int) -> str | None:
+        return self.texts.get((translation, book, chapter, verse))
+
+
+def tree_from_database(conn: sqlite3.Connection, schema: str, translations: list[str] | None = None):
+    """A StoredTree if the database has content_hashes, else one computed from its verses."""
+    has_table = conn.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = 'content_hashes'"
+    ).fetchone()
+    if has_table:
+        return StoredTree(conn, schema)
+    if translations is None:
+        translations = [r[0] for r in conn.execute(f"SELECT short_name FROM {schema}.translations")]
+    trees, texts = {}, {}
+    for code in translations:
+        rows = verse_rows(conn, code, schema).fetchall()
+        trees[code] = tree_from_rows(rows)
+        texts.update(((code, b, c, v), text) for b, c, v, text in rows)
+    return MemoryTree(trees, texts)
+
+
+def tree_from_bolls(code: str, verses_data: list) -> MemoryTree:
+    """Tree of one Bolls translation JSON, cleaned exactly as import_bible stores it."""
+    import import_bible  # imports this module
+
+    texts, raw = {}, {}
+    for v in verses_data:
+        key = (code, v["book"], v["chapter"], v["verse"])
+        clean = import_bible.strip_html(v.get("text", ""))
+        if clean:
+            texts[key] = clean
+            raw[key] = v.get("text", "")
+    rows = sorted((b, c, vs, text) for (_, b, c, vs), text in texts.items())
+    return MemoryTree({code: tree_from_rows(rows)}, texts, raw)
+
+
+# ============================================================
+# DIFF + APPLY
+# ============================================================
+
+def diff(ours, theirs, translations: list[str] | None = None, stats: dict | None = None) -> list[tuple]:
+    """
+    (translation, book, chapter, verse, change) for every verse that differs,
+    change being "changed", "added" (only theirs) or "removed" (only ours).
+    Descends only into nodes whose hashes differ.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault("chapters", 0)
+    changes = []
+    a, b = ours.translations(), theirs.translations()
+    codes = translations if translations is not None else sorted(a.keys() | b.keys())
+    for code in codes:
+        if a.get(code) == b.get(code):
+            continue
+        books_a, books_b = ours.books(code), theirs.books(code)
+        for book in sorted(books_a.keys() | books_b.keys()):
+            if books_a.get(book) == books_b.get(book):
+                continue
+            ch_a, ch_b = ours.chapters(code, book), theirs.chapters(code, book)
+            for chapter in sorted(ch_a.keys() | ch_b.keys()):
+                if ch_a.get(chapter) == ch_b.get(chapter):
+                    continue
+                stats["chapters"] += 1
+                va, vb = ours.verses(code, book, chapter), theirs.verses(code, book, chapter)
+                for verse in sorted(va.keys() | vb.keys()):
+                    if verse not in vb:
+                        changes.append((code, book, chapter, verse, "removed"))
+                    elif verse not in va:
+                        changes.append((code, book, chapter, verse, "added"))
+                    elif va[verse] != vb[verse]:
+                        changes.append((code, book, chapter, verse, "changed"))
+    return changes
+
+
+def fts_rowids(conn: sqlite3.Connection, translation: str, book: int, chapter: int, verse: int,
+               text: str | None) -> list[int]:
+    """
+    verses_fts rowids of one verse, found through a phrase match on its text
+    instead of a scan. Falls back to the scan when the phrase finds nothing
+    (text with no tokens, such as "— —", or a tokenizer mismatch).
+    """
+    sql = ("SELECT rowid FROM verses_fts WHERE {} translation = ? AND book_id = ? AND chapter = ? AND verse = ?")
+    if text and text.strip():
+        phrase = '"' + text.replace('"', '""') + '"'
+        try:
+            rowids = [r[0] for r in conn.execute(sql.format("verses_fts MATCH ? AND"),
+                                                 (phrase, translation, book, chapter, verse))]
+            if rowids:
+                return rowids
+        except sqlite3.OperationalError:
+            pass
+    return [r[0] for r in conn.execute(sql.format(""), (translation, book, chapter, verse))]
+
+
+def apply(conn: sqlite3.Connection, theirs, changes: list[tuple], source_conn_schema: str | None = None) -> dict:
+    """
+    Make this database's verses match `theirs` for the given changes:
+    verses, verses_fts, verse_strongs, chapter_tokens, word_stats and
+    content_hashes are rewritten for the changed verses only, and the
+    search vocabulary of the changed languages is rebuilt. Returns counts per change kind.
+    """
+    has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'verses_fts'").fetchone()
+    has_word_stats = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'word_stats'").fetchone()
+    strongs_index.ensure_schema(conn)
+    counts = {"changed": 0, "added": 0, "removed": 0}
+    touched = {}
+    for code, book, chapter, verse, change in changes:
+        key = (code, book, chapter, verse)
+        old = conn.execute(
+            "SELECT text FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? AND verse = ?", key
+        ).fetchone()
+        new = theirs.text(*key) if change != "removed" else None
+
+        if has_fts:
+            for rowid in fts_rowids(conn, *key, old[0] if old else None):
+                conn.execute("DELETE FROM verses_fts WHERE rowid = ?", (rowid,))
+        conn.execute("DELETE FROM verse_strongs WHERE translation = ? AND book_id = ? AND chapter = ? AND verse = ?",
+                     key)
+        if new is None:
+            conn.execute("DELETE FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? AND verse = ?", key)
+        else:
+            ensure_book(conn, theirs, code, book, chapter, source_conn_schema)
+            conn.execute("INSERT OR REPLACE INTO verses (translation, book_id, chapter, verse, text) "
+                         "VALUES (?, ?, ?, ?, ?)", (*key, new))
+            if has_fts:
+                conn.execute("INSERT INTO verses_fts (text, translation, book_id, chapter, verse) "
+                             "VALUES (?, ?, ?, ?, ?)", (new, *key))
+            strongs_index.insert_postings(conn, strongs_rows(conn, theirs, key, source_conn_schema))
+        counts[change] += 1
+        touched.setdefault(code, set()).add((book, chapter))
+
+    for code, chapters in touched.items():
+        token_counts.update_chapters(conn, code, chapters)
+        if has_word_stats:
+            word_stats.update_books(conn, code, sorted({book for book, _ in chapters}))
+        update_nodes(conn, code, chapters)
+    if has_word_stats and touched and conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'vocabulary'").fetchone():
+        for language in vocabulary_index.languages_of(conn, sorted(touched)):
+            vocabulary_index.build_language(conn, language)
+    conn.commit()
+    return counts
+
+
+def ensure_book(conn: sqlite3.Connection, theirs, code: str, book: int, chapter: int, schema: str | None):
+    """Verses need their books row (foreign key): copy it from the source, or create a placeholder."""
+    exists = conn.execute("SELECT chapters FROM books WHERE translation = ? AND book_id = ?", (code, book)).fetchone()
+    if exists and exists[0] >= chapter:
+        return
+    if exists:
+        conn.execute("UPDATE books SET chapters = ? WHERE translation = ? AND book_id = ?", (chapter, code, book))
+        return
+    if schema and not conn.execute("SELECT 1 FROM translations WHERE short_name = ?", (code,)).fetchone():
+        conn.execute(f"INSERT INTO translations SELECT * FROM {schema}.translations WHERE short_name = ?", (code,))
+    if schema:
+        conn.execute(
+            f"INSERT OR IGNORE INTO books (translation, book_id, name, chapters, chron_order, testament) "
+            f"SELECT translation, book_id, name, chapters, chron_order, testament FROM {schema}.books "
+            f"WHERE translation = ? AND book_id = ?",
+            (code, book),
+        )
+    if not conn.execute("SELECT 1 FROM books WHERE translation = ? AND book_id = ?", (code, book)).fetchone():
+        import import_bible  # imports this module
+
+        import_bible.insert_missing_books(conn, code, [{"book": book, "chapter": chapter}], {})
+
+
+def strongs_rows(conn: sqlite3.Connection, theirs, key: tuple, schema: str | None) -> list[tuple]:
+    if isinstance(theirs, MemoryTree) and key in theirs.raw:
+        return strongs_index.posting_rows(*key, theirs.raw[key])
+    if schema and conn.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = 'verse_strongs'"
+    ).fetchone():
+        return conn.execute(
+            f"SELECT lemma, translation, book_id, chapter, verse, positions FROM {schema}.verse_strongs "
+            "WHERE translation = ? AND book_id = ? AND chapter = ? AND verse = ?",
+            key,
+        ).fetchall()
+    return []
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def open_source(conn: sqlite3.Connection, source: str, translations: list[str] | None):
+    """(tree, attached schema or None) for a .db path, a Bolls .json file or "bolls"."""
+    if source == "bolls" or source.endswith(".json"):
+        if not translations or (source.endswith(".json") and len(translations) != 1):
+            print("ERROR: --translations is required for a JSON / Bolls source (one code per JSON file)")
+            sys.exit(1)
+        if source.endswith(".json"):
+            with open(source, encoding="utf-8") as f:
+                return tree_from_bolls(translations[0], json.load(f)), None
+        import import_bible  # imports this module
+
+        trees, texts, raw = {}, {}, {}
+        for code in translations:
+            one = tree_from_bolls(code, import_bible.download_translation_verses(code))
+            trees.update(one.trees)
+            texts.update(one.texts)
+            raw.update(one.raw)
+        return MemoryTree(trees, texts, raw), None
+
+    path = Path(source)
+    if not path.exists():
+        print(f"ERROR: Database not found at {path}")
+        sys.exit(1)
+    conn.execute("ATTACH DATABASE ? AS theirs", (str(path),))
+    return tree_from_database(conn, "theirs", translations), "theirs"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merkle content hashes: build, verify, diff and apply")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument("--translations", "-t", nargs="+", help="Only these translations")
+    parser.add_argument("--root", action="store_true", help="Print the root and per-translation hashes")
+    parser.add_argument("--verify", metavar="DB", help="Compare with another database's tree")
+    parser.add_argument("--diff", metavar="SOURCE", help="List verses differing from SOURCE (.db, .json or 'bolls')")
+    parser.add_argument("--apply", metavar="SOURCE", help="Rewrite the verses differing from SOURCE")
+    parser.add_argument("--limit", type=int, default=50, help="Max differences to print (default: 50)")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    codes = [t.upper() for t in args.translations] if args.translations else None
+    read_only = args.root or args.verify or args.diff
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro" if read_only else str(args.db), uri=bool(read_only))
+    try:
+        if args.root:
+            translations = StoredTree(conn).translations()
+            for code in sorted(translations):
+                print(f"  {code:12s} {translations[code].hex()}")
+            print(f"  {'root':12s} {root_hash(translations)}")
+            return
+
+        source = args.verify or args.diff or args.apply
+        if not source:
+            print("Building content hashes...")
+            chapters = build_content_hashes(conn, codes)
+            print(f"  {chapters:,} chapters.  root {root_hash(StoredTree(conn).translations())}")
+            return
+
+        ours = StoredTree(conn)
+        theirs, schema = open_source(conn, source, codes)
+        if args.verify:
+            a, b = ours.translations(), theirs.translations()
+            if root_hash(a) == root_hash(b):
+                print(f"  Identical: root {root_hash(a)}")
+                return
+            for code in sorted(a.keys() | b.keys()):
+                if a.get(code) != b.get(code):
+                    state = "missing here" if code not in a else "missing there" if code not in b else "differs"
+                    print(f"  {code:12s} {state}")
+
+        # Translations the source does not have are left alone (verify compared them above)
+        stats = {}
+        changes = diff(ours, theirs, codes or sorted(theirs.translations()), stats)
+        if args.apply:
+            counts = apply(conn, theirs, changes, schema)
+            print(f"  {counts['changed']:,} changed, {counts['added']:,} added, {counts['removed']:,} removed "
+                  f"({stats['chapters']:,} chapters compared)")
+            # Pre-rendered responses (hot_set.py) would otherwise keep serving the old text
+            rows = hot_set.refresh_response_cache(conn, args.db) if changes else None
+            if rows is not None:
+                print(f"  Re-rendered {rows:,} cached responses.")
+            return
+        for code, book, chapter, verse, change in changes[:args.limit]:
+            print(f"  {change:8s} {code:10s} {book:>3d} {chapter:>3d}:{verse}")
+        if len(changes) > args.limit:
+            print(f"  ... {len(changes) - args.limit:,} more")
+        print(f"  {len(changes):,} verses differ in {stats['chapters']:,} chapters.")
+        if args.verify:
+            sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
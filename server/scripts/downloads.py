@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Pooled, resumable HTTP downloads for the Koinonia import scripts.
+
+  - one keep-alive session per thread (a pooled requests.Session), asking for
+    gzip — and brotli when the `brotli` package is installed
+  - the body is streamed, still encoded, to a .part file in DOWNLOAD_DIR; after
+    a failure the next attempt sends `Range: bytes=<have>-` with `If-Range`, so
+    a dropped 20 MB download continues where it stopped instead of restarting
+  - the decoded result is checked against the announced length and, when the
+    caller knows it, a SHA-256 checksum
+  - retries back off with full jitter from a per-thread random generator, so
+    parallel workers hitting the same outage do not retry in lockstep
+
+A .part file survives a crashed import: rerunning resumes it if the server's
+validator (ETag / Last-Modified) still matches.
+
+Usage:
+    python downloads.py URL [URL ...]               # Download, print size + sha256
+    python downloads.py URL --sha256 HEX            # Verify against a known checksum
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.exceptions import HTTPError as Urllib3Error
+except ImportError:
+    print("ERROR: 'requests' package is required.")
+    print("Install it with: pip install requests")
+    sys.exit(1)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DOWNLOAD_DIR = Path(tempfile.gettempdir()) / "koinonia-downloads"
+
+ACCEPT_ENCODING = "gzip, br" if brotli else "gzip"
+TIMEOUT = (15, 120)     # connect, read (seconds)
+CHUNK = 256 * 1024
+POOL_SIZE = 8
+
+# Failures in a row without new bytes before giving up; progress resets the count
+MAX_STALLS = 5
+BACKOFF_BASE = 1.0      # seconds, doubled per stall
+BACKOFF_CAP = 60.0
+
+CONTENT_RANGE_RE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+_local = threading.local()
+
+
+class DownloadError(Exception):
+    pass
+
+
+# ============================================================
+# SESSION + BACKOFF
+# ============================================================
+
+def session() -> requests.Session:
+    """This thread's keep-alive session (requests.Session is not safe to share across threads)."""
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+        s.mount("http://", adapter)
+        s.mount("https://", adapter)
+        s.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        _local.session = s
+    return s
+
+
+def backoff(stalls: int) -> float:
+    """Full-jitter delay for the n-th stall, from this thread's own generator."""
+    rng = getattr(_local, "rng", None)
+    if rng is None:
+        rng = _local.rng = random.Random()  # seeded from os.urandom — differs per worker
+    return rng.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** stalls))
+
+
+# ============================================================
+# DOWNLOAD
+# ============================================================
+
+def _paths(url: str) -> tuple[Path, Path]:
+    key = hashlib.sha1(url.encode()).hexdigest()
+    return DOWNLOAD_DIR / f"{key}.part", DOWNLOAD_DIR / f"{key}.json"
+
+
+def _load_meta(meta_path: Path, url: str) -> dict:
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return meta if meta.get("url") == url else {}
+
+
+def _attempt(url: str, part: Path, meta: dict):
+    """
+    One request, appending to `part` and updating `meta` (validator, encoding,
+    total). Returns once the whole encoded body is on disk; raises otherwise.
+    """
+    have = part.stat().st_size if part.exists() else 0
+    headers = {}
+    validator = meta.get("etag") or meta.get("last_modified")
+    if have and validator:
+        headers["Range"] = f"bytes={have}-"
+        headers["If-Range"] = validator
+
+    with session().get(url, headers=headers, stream=True, timeout=TIMEOUT) as resp:
+        if resp.status_code == 416 and have and have == meta.get("total"):
+            return
+        resp.raise_for_status()
+
+        if resp.status_code == 206:
+            m = CONTENT_RANGE_RE.match(resp.headers.get("Content-Range", ""))
+            if not m or int(m.group(1)) != have:
+                raise DownloadError(f"unexpected Content-Range {resp.headers.get('Content-Range')!r}")
+            if m.group(3) != "*":
+                meta["total"] = int(m.group(3))
+            mode = "ab"
+        else:
+            # Full response: new representation (or no Range support) — start over
+            meta.update(
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+                encoding=resp.headers.get("Content-Encoding", "identity").lower(),
+                total=int(resp.headers["Content-Length"]) if "Content-Length" in resp.headers else None,
+            )
+            mode = "wb"
+
+        with open(part, mode) as f:
+            # Raw bytes: Range offsets count the encoded body, so decode only at the end
+            for chunk in resp.raw.stream(CHUNK, decode_content=False):
+                f.write(chunk)
+
+    size = part.stat().st_size
+    if meta.get("total") is not None and size != meta["total"]:
+        raise DownloadError(f"connection closed at {size:,} of {meta['total']:,} bytes")
+
+
+def _decode(part: Path, dest: Path, encoding: str) -> str:
+    """Write the decoded body to dest. Returns its SHA-256."""
+    digest = hashlib.sha256()
+    with open(part, "rb") as src, open(dest, "wb") as out:
+        if encoding == "gzip":
+            reader = gzip.GzipFile(fileobj=src)
+            feed = None
+        elif encoding == "deflate":
+            reader, feed = src, zlib.decompressobj().decompress
+        elif encoding == "br":
+            if brotli is None:
+                raise DownloadError("server sent brotli but the 'brotli' package is not installed")
+            reader, feed = src, brotli.Decompressor().process
+        elif encoding in ("identity", ""):
+            reader, feed = src, None
+        else:
+            raise DownloadError(f"unsupported Content-Encoding {encoding!r}")
+        while chunk := reader.read(CHUNK):
+            if feed:
+                chunk = feed(chunk)
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()
+
+
+def download(url: str, dest: Path, sha256: str | None = None, label: str = "") -> str:
+    """
+    Download `url` to `dest` (decoded), resuming across failures. Returns the
+    SHA-256 of the decoded content; raises DownloadError if it does not match
+    `sha256`, or once MAX_STALLS attempts in a row bring no new bytes.
+    """
+    display = label or url
+    DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    part, meta_path = _paths(url)
+    meta = _load_meta(meta_path, url) if part.exists() else {}
+    meta["url"] = url
+
+    stalls = 0
+    while True:
+        before = part.stat().st_size if part.exists() else 0
+        try:
+            _attempt(url, part, meta)
+            break
+        except (requests.exceptions.RequestException, Urllib3Error, DownloadError, OSError) as e:
+            meta_path.write_text(json.dumps(meta))
+            after = part.stat().st_size if part.exists() else 0
+            stalls = 0 if after > before else stalls + 1
+            if stalls >= MAX_STALLS:
+                print(f"  FAILED to fetch {display}: {e}")
+                raise DownloadError(f"{display}: {e}") from e
+            wait = backoff(stalls)
+            got = f"{after:,} bytes so far, " if after else ""
+            print(f"  Retry for {display} ({got}waiting {wait:.1f}s): {e}")
+            time.sleep(wait)
+
+    try:
+        digest = _decode(part, dest, meta.get("encoding") or "identity")
+    except (OSError, EOFError, zlib.error) as e:
+        # Corrupt body: drop it so the next call starts clean
+        part.unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+        raise DownloadError(f"{display}: could not decode body — {e}") from e
+    part.unlink(missing_ok=True)
+    meta_path.unlink(missing_ok=True)
+
+    if sha256 and digest != sha256.lower():
+        dest.unlink(missing_ok=True)
+        raise DownloadError(f"{display}: checksum mismatch (expected {sha256}, got {digest})")
+    return digest
+
+
+def fetch_json(url: str, label: str = "", sha256: str | None = None):
+    """Download and parse a JSON document (see download())."""
+    DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=DOWNLOAD_DIR, suffix=".json", delete=False) as tmp:
+        dest = Path(tmp.name)
+    try:
+        download(url, dest, sha256, label)
+        with open(dest, "rb") as f:
+            return json.load(f)
+    finally:
+        dest.unlink(missing_ok=True)
+
+
+def validator(url: str) -> str | None:
+    """
+    The server's current validator for `url` (ETag, Last-Modified, length) from
+    a HEAD request — a cache key that changes when the document does. None if
+    the server sends neither ETag nor Last-Modified, or the request fails.
+    """
+    try:
+        resp = session().head(url, timeout=TIMEOUT, allow_redirects=True)
+        resp.raise_for_status()
+    except requests.exceptions.RequestException:
+        return None
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return None
+    return f"{etag or ''}|{last_modified or ''}|{resp.headers.get('Content-Length', '')}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download URLs with pooling, resume and checksums")
+    parser.add_argument("urls", nargs="+", help="URLs to download")
+    parser.add_argument("--out", type=Path, default=Path("."), help="Output directory (default: .)")
+    parser.add_argument("--sha256", help="Expected SHA-256 of the (single) decoded download")
+    args = parser.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    for url in args.urls:
+        dest = args.out / (url.rstrip("/").rsplit("/", 1)[-1] or "download")
+        started = time.perf_counter()
+        try:
+            digest = download(url, dest, args.sha256)
+        except DownloadError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+        print(f"  {dest}  {dest.stat().st_size:,} bytes  sha256 {digest}  "
+              f"({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Finalize the Koinonia Bible database for read-only serving.
+
+The importers insert verses in download order into a rowid table, with the
+(translation, book_id, chapter, verse) primary key and idx_verses_chapter as
+two separate indexes — so one chapter read walks an index and then hops to
+table pages scattered across the file. This stage:
+
+  1. rebuilds `verses` as a WITHOUT ROWID table clustered on its primary key
+     (a chapter becomes one contiguous run of b-tree entries)
+  2. drops idx_verses_chapter, which the clustered key now covers
+  3. picks a page_size from the chapter size distribution
+  4. ANALYZEs and VACUUMs, then leaves the file in journal_mode=DELETE so the
+     server can open it read-only / immutable
+
+and reports the pages touched per chapter read before and after.
+
+Usage:
+    python finalize_db.py                          # Finalize server/bible.db
+    python finalize_db.py --db /path/to/bible.db   # Custom database path
+    python finalize_db.py --page-size 16384        # Override the page size choice
+    python finalize_db.py --report                 # Only report pages per chapter
+"""
+
+import argparse
+import sqlite3
+import sys
+from bisect import bisect_right
+from pathlib import Path
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+
+PAGE_SIZES = [4096, 8192, 16384, 32768, 65536]
+
+# Page size is chosen so that this share of chapters fits in one page's worth
+# of entries — any such chapter then spans at most 2 leaf pages.
+CHAPTER_PERCENTILE = 0.90
+
+# ...and so that this share of verses is stored without overflow pages.
+VERSE_PERCENTILE = 0.99
+
+# Record overhead per verse beyond text + translation code: record header,
+# three integer keys and the b-tree cell header.
+RECORD_OVERHEAD = 12
+
+CHAPTER_QUERY = "SELECT verse, text FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? ORDER BY verse"
+
+
+def is_clustered(conn: sqlite3.Connection) -> bool:
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'verses'").fetchone()[0]
+    return "WITHOUT ROWID" in sql.upper()
+
+
+# ============================================================
+# PAGE LOCALITY REPORT
+# ============================================================
+
+def btree_map(conn: sqlite3.Connection, name: str, interior_entries: bool):
+    """
+    Map entry rank → page number for one b-tree, using dbstat.
+
+    Walks the tree in key order. Index b-trees (indexes and WITHOUT ROWID
+    tables) also store entries in interior pages, between child subtrees;
+    those map to None, since interior pages are on every lookup's descent
+    path anyway (counted by depth). Rowid tables only store rows in leaves.
+    Returns (starts, pagenos, depth) for bisecting a rank.
+    """
+    pages = {
+        path: (pageno, pagetype, ncell)
+        for path, pageno, pagetype, ncell in conn.execute(
+            "SELECT path, pageno, pagetype, ncell FROM dbstat WHERE name = ? AND pagetype != 'overflow'",
+            (name,),
+        )
+    }
+    starts = []
+    pagenos = []
+    depth = 0
+    position = 0
+    stack = [("/", 1)]
+    # Iterative in-order walk: ("/path/", depth) visits a page, None is one interior entry
+    while stack:
+        item = stack.pop()
+        if item is None:
+            starts.append(position)
+            pagenos.append(None)
+            position += 1
+            continue
+        path, level = item
+        pageno, pagetype, ncell = pages[path]
+        depth = max(depth, level)
+        if pagetype == "leaf":
+            if ncell:
+                starts.append(position)
+                pagenos.append(pageno)
+                position += ncell
+            continue
+        children = []
+        for i in range(ncell + 1):
+            children.append((f"{path}{i:03x}/", level + 1))
+            if interior_entries and i < ncell:
+                children.append(None)
+        stack.extend(reversed(children))
+    return starts, pagenos, depth
+
+
+def chapter_index_name(conn: sqlite3.Connection) -> str | None:
+    """Index the planner uses for a chapter read of a rowid `verses` table."""
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {CHAPTER_QUERY}", ("KJV", 1, 1)).fetchall()
+    for row in plan:
+        detail = row[-1]
+        if "USING INDEX" in detail:
+            return detail.split("USING INDEX", 1)[1].split()[0]
+    return None
+
+
+def chapter_page_report(conn: sqlite3.Connection) -> dict | None:
+    """
+    Distinct leaf pages holding each chapter's entries — the pages a chapter
+    read fetches besides the interior levels it descends through. Returns
+    summary stats, or None if this SQLite build has no dbstat.
+    """
+    try:
+        conn.execute("SELECT 1 FROM dbstat LIMIT 1")
+    except sqlite3.OperationalError:
+        return None
+
+    key_order = "ROW_NUMBER() OVER (ORDER BY translation, book_id, chapter, verse) - 1"
+    if is_clustered(conn):
+        trees = [btree_map(conn, "verses", interior_entries=True)]
+        query = f"SELECT translation, book_id, chapter, {key_order} FROM verses"
+        layout = "verses WITHOUT ROWID (clustered)"
+    else:
+        index = chapter_index_name(conn)
+        trees = [btree_map(conn, index, interior_entries=True), btree_map(conn, "verses", interior_entries=False)]
+        query = f"SELECT translation, book_id, chapter, {key_order}, ROW_NUMBER() OVER (ORDER BY rowid) - 1 FROM verses"
+        layout = f"verses rowid table via {index}"
+
+    chapters = {}
+    for row in conn.execute(query):
+        touched = chapters.setdefault(row[:3], set())
+        for (starts, pagenos, _), rank in zip(trees, row[3:]):
+            touched.add(pagenos[bisect_right(starts, rank) - 1])
+
+    counts = sorted(len(pages - {None}) for pages in chapters.values())
+    n = len(counts)
+    return {
+        "layout": layout,
+        "page_size": conn.execute("PRAGMA page_size").fetchone()[0],
+        "file_pages": conn.execute("PRAGMA page_count").fetchone()[0],
+        "depth": max(depth for _, _, depth in trees),
+        "chapters": n,
+        "mean": sum(counts) / n if n else 0.0,
+        "p50": counts[n // 2] if n else 0,
+        "p95": counts[min(n - 1, int(n * 0.95))] if n else 0,
+        "max": counts[-1] if n else 0,
+        "within_2": sum(1 for c in counts if c <= 2) / n if n else 0.0,
+    }
+
+
+def print_page_report(label: str, report: dict | None):
+    if report is None:
+        print(f"  {label}: dbstat not available in this SQLite build — skipping page report.")
+        return
+    print(f"  {label}: {report['layout']}, page_size {report['page_size']:,}, "
+          f"{report['file_pages']:,} pages, b-tree depth {report['depth']}")
+    print(f"    leaf pages per chapter read: mean {report['mean']:.2f}, p50 {report['p50']}, "
+          f"p95 {report['p95']}, max {report['max']} "
+          f"({report['within_2']:.1%} of {report['chapters']:,} chapters in ≤2 pages)")
+
+
+# ============================================================
+# PAGE SIZE
+# ============================================================
+
+def max_local_payload(page_size: int) -> int:
+    """Largest index b-tree cell payload stored without overflow pages."""
+    return (page_size - 12) * 64 // 255 - 23
+
+
+def _percentile(conn: sqlite3.Connection, values_sql: str, fraction: float) -> int:
+    count = conn.execute(f"SELECT COUNT(*) FROM ({values_sql})").fetchone()[0]
+    if not count:
+        return 0
+    offset = min(count - 1, int(count * fraction))
+    return conn.execute(f"SELECT v FROM ({values_sql}) ORDER BY v LIMIT 1 OFFSET ?", (offset,)).fetchone()[0]
+
+
+def choose_page_size(conn: sqlite3.Connection) -> int:
+    """
+    Smallest page size whose page holds the CHAPTER_PERCENTILE chapter and
+    stores the VERSE_PERCENTILE verse inline. Smaller pages waste less of
+    each read on neighbouring chapters; larger pages keep long chapters
+    (Psalm 119, Ezra lists) and long verses out of extra pages.
+    """
+    record = f"length(CAST(text AS BLOB)) + length(translation) + {RECORD_OVERHEAD}"
+    chapter_bytes = _percentile(
+        conn, f"SELECT SUM({record}) AS v FROM verses GROUP BY translation, book_id, chapter", CHAPTER_PERCENTILE
+    )
+    verse_bytes = _percentile(conn, f"SELECT {record} AS v FROM verses", VERSE_PERCENTILE)
+    for page_size in PAGE_SIZES:
+        # Leaf pages keep an 8-byte header and a 2-byte pointer per cell
+        if chapter_bytes <= page_size - 8 and verse_bytes <= max_local_payload(page_size):
+            return page_size
+    return PAGE_SIZES[-1]
+
+
+# ============================================================
+# FINALIZE
+# ============================================================
+
+def cluster_verses(conn: sqlite3.Connection):
+    """Rebuild verses as WITHOUT ROWID in key order and drop idx_verses_chapter."""
+    conn.execute("PRAGMA foreign_keys=OFF")
+    conn.executescript("""
+        DROP TABLE IF EXISTS verses_clustered;
+
+        CREATE TABLE verses_clustered (
+            translation TEXT    NOT NULL,
+            book_id     INTEGER NOT NULL,
+            chapter     INTEGER NOT NULL,
+            verse       INTEGER NOT NULL,
+            text        TEXT    NOT NULL,
+            PRIMARY KEY (translation, book_id, chapter, verse),
+            FOREIGN KEY (translation, book_id) REFERENCES books(translation, book_id)
+        ) WITHOUT ROWID;
+
+        INSERT INTO verses_clustered (translation, book_id, chapter, verse, text)
+        SELECT translation, book_id, chapter, verse, text FROM verses
+        ORDER BY translation, book_id, chapter, verse;
+
+        DROP TABLE verses;
+        ALTER TABLE verses_clustered RENAME TO verses;
+    """)
+    conn.execute("PRAGMA foreign_keys=ON")
+
+
+def finalize_for_serving(conn: sqlite3.Connection, page_size: int | None = None, report: bool = True):
+    """Cluster verses, repage, ANALYZE, VACUUM and switch to journal_mode=DELETE."""
+    conn.commit()
+    # page_size can only change outside WAL mode
+    conn.execute("PRAGMA journal_mode=DELETE")
+
+    if report:
+        print_page_report("Before", chapter_page_report(conn))
+
+    if is_clustered(conn):
+        print("  verses is already clustered (WITHOUT ROWID).")
+    else:
+        print("  Rebuilding verses as WITHOUT ROWID...")
+        cluster_verses(conn)
+        conn.commit()
+    conn.execute("DROP INDEX IF EXISTS idx_verses_chapter")
+
+    page_size = page_size or choose_page_size(conn)
+    print(f"  page_size {page_size:,} — VACUUM...")
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.execute(f"PRAGMA page_size = {int(page_size)}")
+    conn.execute("VACUUM")
+
+    if report:
+        print_page_report("After", chapter_page_report(conn))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Finalize bible.db for read-only serving")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument(
+        "--page-size", type=int, choices=PAGE_SIZES,
+        help="Page size to rebuild with (default: chosen from chapter sizes)"
+    )
+    parser.add_argument("--report", action="store_true", help="Only report pages per chapter read")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(str(args.db))
+    try:
+        if args.report:
+            print_page_report(str(args.db), chapter_page_report(conn))
+            return
+        print("Finalizing database for serving...")
+        finalize_for_serving(conn, args.page_size)
+    finally:
+        conn.close()
+
+    print(f"  Size: {args.db.stat().st_size / (1024 * 1024):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Find the hot set of Bible API requests in the access logs and pre-render it.
+
+Reading traffic is heavily skewed (John 3, Psalm 23, Romans 8, Genesis 1 and
+a handful of searches), yet a fresh replica starts with a cold page cache.
+This tool:
+
+  1. streams the request logs (server/logs/*/server.log, as written by the
+     request logger in server/api/index.ts, and their .gz rotations; nginx
+     access logs given as files work too) in constant
+     memory — each group keeps a Space-Saving top-k summary of at most
+     --capacity keys, however long the logs
+  2. ranks the hot chapters, verses and searches and writes a JSON manifest
+  3. renders those responses exactly as server/api/bible.ts would into the
+     `response_cache` table, which the API serves before running any query
+
+and, with --warm, reads every cached response and reruns its query so the
+pages behind them are in the OS page cache before the replica takes
+traffic. build_db.py re-renders the cached paths whenever their data
+changes, and so does every script that writes served data on its own
+(import_noncanonical.py, import_sblgnt.py, import_crossrefs.py,
+capabilities.py, versification.py, book_aliases.py, content_hashes.py
+--apply); import_bible.py starts a fresh database.
+
+Usage:
+    python hot_set.py                               # Scan server/logs, write manifest + response_cache
+    python hot_set.py LOG_OR_DIR [...]              # Specific log files / directories
+    python hot_set.py --top 500                     # Entries kept per group (default: 200)
+    python hot_set.py --manifest-only               # Rank only, leave the database alone
+    python hot_set.py --from-manifest FILE          # Render a manifest built elsewhere (e.g. on production logs)
+    python hot_set.py --warm                        # Touch the pages behind every cached response
+"""
+
+import argparse
+import gzip
+import heapq
+import json
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# The read-side package lives at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bible import Bible  # noqa: E402
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+DEFAULT_LOGS = Path(__file__).resolve().parent.parent / "logs"
+DEFAULT_MANIFEST = Path(__file__).resolve().parent.parent / "hot_set.json"
+
+CAPACITY = 10_000       # keys tracked per group while streaming
+TOP = 200               # entries kept per group
+MIN_HITS = 2            # guaranteed count (hits - error) for a manifest entry
+
+# `[ts] [HTTP] GET /api/bible/... 200 1.2ms` (winston) or `"GET /api/bible/... HTTP/1.1" 200` (nginx)
+REQUEST_RE = re.compile(r'"?GET (/api/bible/[^\s"]+)(?: HTTP/[\d.]+")? (\d{3})\b')
+
+# Route → (pattern, group). Mirrors server/api/bible.ts.
+ROUTES = {
+    "translations": (re.compile(r"/api/bible/translations"), "catalog"),
+    "books": (re.compile(r"/api/bible/books/(?P<translation>[^/]+)"), "catalog"),
+    "chapter": (re.compile(r"/api/bible/chapter/(?P<translation>[^/]+)/(?P<book>\d+)/(?P<chapter>\d+)"), "chapters"),
+    "parallel": (re.compile(r"/api/bible/parallel/(?P<book>\d+)/(?P<chapter>\d+)"), "chapters"),
+    "chapter_crossrefs": (re.compile(r"/api/bible/crossrefs/(?P<book>\d+)/(?P<chapter>\d+)"), "chapters"),
+    "verse": (re.compile(
+        r"/api/bible/verse/(?P<translation>[^/]+)/(?P<book>\d+)/(?P<chapter>\d+)/(?P<verse>\d+)"), "verses"),
+    "crossrefs": (re.compile(r"/api/bible/crossrefs/(?P<book>\d+)/(?P<chapter>\d+)/(?P<verse>\d+)"), "verses"),
+    "search": (re.compile(r"/api/bible/search"), "searches"),
+}
+GROUPS = ["chapters", "verses", "searches", "catalog"]
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS response_cache (
+            path TEXT PRIMARY KEY,      -- request path + query string, as logged
+            translation TEXT NOT NULL,  -- '' for /translations
+            route TEXT NOT NULL,
+            hits INTEGER NOT NULL,
+            body TEXT NOT NULL          -- JSON, byte-identical to the API's response
+        )
+    """)
+
+
+# ============================================================
+# STREAMING TOP-K
+# ============================================================
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters (Metwally et al.): counts a stream with at most
+    `capacity` keys. A key that displaces the minimum inherits its count, so
+    each count overestimates by at most `errors[key]`; every key more frequent
+    than len(stream) / capacity is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int = CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []     # (count, key), lazily refreshed — counts only grow
+
+    def add(self, key):
+        counts = self.counts
+        if key in counts:
+            counts[key] += 1
+        elif len(counts) < self.capacity:
+            counts[key] = 1
+            self.errors[key] = 0
+        else:
+            floor = self._evict_min()
+            counts[key] = floor + 1
+            self.errors[key] = floor
+            heapq.heappush(self._heap, (floor + 1, key))
+
+    def _evict_min(self) -> int:
+        heap = self._heap
+        if not heap:
+            heap.extend((c, k) for k, c in self.counts.items())
+            heapq.heapify(heap)
+        while True:
+            count, key = heapq.heappop(heap)
+            current = self.counts.get(key)
+            if current == count:
+                del self.counts[key]
+                del self.errors[key]
+                return count
+            if current is not None:
+                heapq.heappush(heap, (current, key))
+
+    def top(self, n: int) -> list[tuple]:
+        """(key, count, error) for the n highest counts."""
+        ranked = heapq.nlargest(n, self.counts.items(), key=lambda kv: kv[1])
+        return [(key, count, self.errors[key]) for key, count in ranked]
+
+
+# ============================================================
+# LOGS
+# ============================================================
+
+def log_files(sources: list[Path]) -> list[Path]:
+    """
+    Log files under the given files / directories. Directories contribute only
+    server.log and its rotations: the logger also copies every line into
+    convex.log, so scanning all *.log would count each request twice.
+    """
+    files = []
+    for source in sources:
+        if source.is_dir():
+            files.extend(sorted(p for p in source.rglob("server.log*") if p.is_file()))
+        elif source.exists():
+            files.append(source)
+    return files
+
+
+def read_lines(path: Path):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        yield from f
+
+
+def route_of(path: str) -> tuple[str, dict] | None:
+    """(route, path parameters) for an API path (query string included), or None."""
+    route_path = urlsplit(path).path
+    for route, (pattern, _) in ROUTES.items():
+        m = pattern.fullmatch(route_path)
+        if m:
+            return route, m.groupdict()
+    return None
+
+
+def scan_logs(files: list[Path], capacity: int = CAPACITY) -> tuple[dict, dict]:
+    """Stream the logs. Returns ({group: SpaceSaving}, stats)."""
+    sketches = {group: SpaceSaving(capacity) for group in GROUPS}
+    stats = {"lines": 0, "requests": 0}
+    for path in files:
+        for line in read_lines(path):
+            stats["lines"] += 1
+            m = REQUEST_RE.search(line)
+            if not m or m.group(2) != "200":
+                continue
+            request = m.group(1)
+            routed = route_of(request)
+            if routed is None:
+                continue
+            stats["requests"] += 1
+            sketches[ROUTES[routed[0]][1]].add(request)
+    return sketches, stats
+
+
+def build_manifest(sketches: dict, stats: dict, files: list[Path], top: int = TOP, min_hits: int = MIN_HITS) -> dict:
+    groups = {}
+    for group, sketch in sketches.items():
+        groups[group] = [{"path": path, "hits": hits, "error": error}
+                         for path, hits, error in sketch.top(top) if hits - error >= min_hits]
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "sources": [str(p) for p in files],
+        "lines": stats["lines"],
+        "requests": stats["requests"],
+        "groups": groups,
+    }
+
+
+# ============================================================
+# RENDER
+# ============================================================
+
+def to_json(value) -> str:
+    """Same bytes as Hono's c.json() (JSON.stringify)."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def rows_json(rows) -> str:
+    return to_json([dict(r) for r in rows])
+
+
+def render(bible: Bible, path: str) -> tuple[str, str, str] | None:
+    """
+    (translation, route, body) of the API response for `path`, or None if
+    it is not a cacheable 200 response. Follows server/api/bible.ts.
+    """
+    routed = route_of(path)
+    if routed is None:
+        return None
+    route, params = routed
+    query = {k: v[0] for k, v in parse_qs(urlsplit(path).query, keep_blank_values=True).items()}
+    translation = unquote(params["translation"]) if "translation" in params else (query.get("translation") or "KJV")
+    book = int(params["book"]) if "book" in params else None
+    chapter = int(params["chapter"]) if "chapter" in params else None
+
+    try:
+        if route == "translations":
+            return "", route, rows_json(bible.translations())
+        if route == "books":
+            rows = bible.books(translation)
+            return (translation, route, rows_json(rows)) if rows else None
+        if route == "chapter":
+            return translation, route, rows_json(bible.chapter(translation, book, chapter))
+        if route == "parallel":
+            codes = [t.strip() for t in (query.get("translations") or "KJV").split(",") if t.strip()]
+            return ",".join(codes), route, rows_json(bible.aligned_chapter(codes, book, chapter))
+        if route == "chapter_crossrefs":
+            return translation, route, rows_json(bible.chapter_cross_refs(translation, book, chapter))
+        if route == "verse":
+            text = bible.verse(translation, book, chapter, int(params["verse"]))
+            return translation, route, to_json({"text": text if text is not None else ""})
+        if route == "crossrefs":
+            return translation, route, rows_json(bible.cross_refs(translation, book, chapter, int(params["verse"])))
+        if route == "search":
+            q = query.get("q")
+            if not q or len(q) < 2:
+                return None
+            return translation, route, rows_json(bible.search(translation, q))
+    except sqlite3.OperationalError:
+        # e.g. FTS syntax errors — the API answers those with an error, not a cacheable body
+        return None
+    return None
+
+
+def render_into(conn: sqlite3.Connection, bible: Bible, entries) -> int:
+    """Replace response_cache with renders of `entries` ((path, hits) pairs). Returns rows written."""
+    ensure_schema(conn)
+    rows = []
+    for path, hits in entries:
+        rendered = render(bible, path)
+        if rendered:
+            translation, route, body = rendered
+            rows.append((path, translation, route, hits, body))
+    conn.execute("DELETE FROM response_cache")
+    conn.executemany(
+        "INSERT OR REPLACE INTO response_cache (path, translation, route, hits, body) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    return len(rows)
+
+
+def manifest_entries(manifest: dict):
+    for entries in manifest["groups"].values():
+        for entry in entries:
+            yield entry["path"], entry["hits"]
+
+
+def refresh_response_cache(conn: sqlite3.Connection, db_path: Path) -> int | None:
+    """
+    Re-render every cached path after the data changed (build_db.py). None if
+    bible.db has no response_cache yet.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'response_cache'").fetchone()
+    if not exists:
+        return None
+    entries = conn.execute("SELECT path, hits FROM response_cache").fetchall()
+    with Bible(db_path) as bible:
+        return render_into(conn, bible, entries)
+
+
+# ============================================================
+# WARM
+# ============================================================
+
+def warm(db_path: Path) -> tuple[int, int]:
+    """Read every cached response and rerun its query. Returns (responses, bytes)."""
+    with Bible(db_path) as bible:
+        conn = bible.connection()
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'response_cache'").fetchone()
+        if not exists:
+            return 0, 0
+        count = size = 0
+        for path, body in conn.execute("SELECT path, body FROM response_cache ORDER BY hits DESC").fetchall():
+            render(bible, path)
+            count += 1
+            size += len(body)
+    return count, size
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+def print_manifest(manifest: dict, show: int = 10):
+    print(f"  {manifest['lines']:,} log lines, {manifest['requests']:,} Bible API requests")
+    total = manifest["requests"] or 1
+    for group in GROUPS:
+        entries = manifest["groups"].get(group, [])
+        if not entries:
+            continue
+        share = sum(e["hits"] for e in entries) / total
+        print(f"\n  {group} — top {len(entries)} = {share:.0%} of requests")
+        for entry in entries[:show]:
+            bound = f" (±{entry['error']})" if entry["error"] else ""
+            print(f"    {entry['hits']:>8,}{bound}  {entry['path']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank hot Bible API requests from the logs and pre-render them")
+    parser.add_argument("logs", nargs="*", type=Path, help=f"Log files or directories (default: {DEFAULT_LOGS})")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"Database path (default: {DEFAULT_DB})")
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST, help="Manifest to write")
+    parser.add_argument("--top", type=int, default=TOP, help=f"Entries kept per group (default: {TOP})")
+    parser.add_argument("--capacity", type=int, default=CAPACITY, help=f"Keys tracked per group (default: {CAPACITY})")
+    parser.add_argument("--manifest-only", action="store_true", help="Write the manifest, leave bible.db alone")
+    parser.add_argument("--from-manifest", type=Path, metavar="FILE", help="Render this manifest instead of scanning")
+    parser.add_argument("--warm", action="store_true", help="Touch the pages behind every cached response")
+    args = parser.parse_args()
+
+    if not args.db.exists() and not args.manifest_only:
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    if args.warm:
+        started = time.perf_counter()
+        count, size = warm(args.db)
+        if not count:
+            print("No response_cache in the database — run hot_set.py first.")
+            sys.exit(1)
+        print(f"Warmed {count:,} responses ({size / 1024:.0f} KB) in {time.perf_counter() - started:.2f}s")
+        return
+
+    started = time.perf_counter()
+    if args.from_manifest:
+        manifest = json.loads(args.from_manifest.read_text())
+        print(f"Loaded manifest {args.from_manifest}")
+    else:
+        files = log_files(args.logs or [DEFAULT_LOGS])
+        if not files:
+            print(f"ERROR: No log files found in {', '.join(str(p) for p in args.logs or [DEFAULT_LOGS])}")
+            sys.exit(1)
+        print(f"Scanning {len(files)} log files...")
+        sketches, stats = scan_logs(files, args.capacity)
+        manifest = build_manifest(sketches, stats, files, args.top)
+        args.manifest.write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+        print(f"  Manifest: {args.manifest} ({time.perf_counter() - started:.1f}s)")
+    print_manifest(manifest)
+
+    if args.manifest_only:
+        return
+
+    print("\nRendering responses...")
+    conn = sqlite3.connect(str(args.db))
+    try:
+        with Bible(args.db) as bible:
+            rows = render_into(conn, bible, manifest_entries(manifest))
+        size = conn.execute("SELECT COALESCE(SUM(length(body)), 0) FROM response_cache").fetchone()[0]
+    finally:
+        conn.close()
+    print(f"  {rows:,} responses cached ({size / 1024:.0f} KB) in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,11 @@ Usage:
     python import_bible.py --list                   # List available translations
     python import_bible.py -t KJV VDCL NTR          # Import specific translations
     python import_bible.py --db /path/to/bible.db   # Custom output path
+    python import_bible.py --no-finalize            # Skip the clustered rebuild + VACUUM
+    python import_bible.py --no-similar             # Skip the similar-verse (MinHash LSH) stage
+    python import_bible.py --shards ../shards       # Also write per-language shards (see shard_db.py)
+    python import_bible.py --packs ../packs         # Also refresh offline packs (see offline_packs.py)
+    python import_bible.py --columnar ../columnar   # Also export NumPy columns (see columnar_export.py)
 """
 
 import argparse
@@ -15,17 +20,22 @@ import json
 import os
 import re
 import sqlite3
-import sys
 import time
 from html import unescape
 from pathlib import Path
 
-try:
-    import requests
-except ImportError:
-    print("ERROR: 'requests' package is required.")
-    print("Install it with: pip install requests")
-    sys.exit(1)
+import book_aliases
+import capabilities
+import content_hashes
+import downloads
+import finalize_db
+import offline_packs
+import shard_db
+import strongs_index
+import token_counts
+import versification
+import vocabulary_index
+import word_stats
 
 
 BOLLS_BASE = "https://bolls.life"
@@ -69,21 +79,8 @@ def strip_html(text: str) -> str:
 
 
 def fetch_json(url: str, label: str = ""):
-    """Fetch JSON from a URL with retries."""
-    display = label or url
-    for attempt in range(3):
-        try:
-            resp = requests.get(url, timeout=120)
-            resp.raise_for_status()
-            return resp.json()
-        except requests.exceptions.RequestException as e:
-            if attempt < 2:
-                wait = 2 ** (attempt + 1)
-                print(f"  Retry {attempt + 1}/2 for {display}: {e}")
-                time.sleep(wait)
-            else:
-                print(f"  FAILED to fetch {display}: {e}")
-                raise
+    """Fetch JSON from a URL (pooled session, resumable, jittered retries — see downloads.py)."""
+    return downloads.fetch_json(url, label)
 
 
 def create_database(db_path: Path) -> sqlite3.Connection:
@@ -195,6 +192,92 @@ def download_translation_verses(code: str):
     )
 
 
+def insert_books(conn: sqlite3.Connection, code: str, books: list) -> dict:
+    """Insert a translation's book metadata. Returns {book_id: book}."""
+    known_books = {}
+    for book in books:
+        book_id = book["bookid"]
+        known_books[book_id] = book
+        conn.execute(
+            "INSERT OR REPLACE INTO books (translation, book_id, name, chapters, chron_order, testament) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                code,
+                book_id,
+                book["name"],
+                book["chapters"],
+                book.get("chronorder", book_id),
+                get_testament(book_id),
+            )
+        )
+    return known_books
+
+
+def insert_missing_books(conn: sqlite3.Connection, code: str, verses_data: list, known_books: dict) -> set:
+    """Auto-create book entries for book IDs in verses that aren't in metadata. Returns the new IDs."""
+    extra_book_ids = set()
+    max_chapter = {}  # track max chapter per book_id for auto-created entries
+    for v in verses_data:
+        bid = v["book"]
+        ch = v["chapter"]
+        if bid not in known_books:
+            extra_book_ids.add(bid)
+            if bid not in max_chapter or ch > max_chapter[bid]:
+                max_chapter[bid] = ch
+
+    for bid in extra_book_ids:
+        conn.execute(
+            "INSERT OR REPLACE INTO books (translation, book_id, name, chapters, chron_order, testament) VALUES (?, ?, ?, ?, ?, ?)",
+            (code, bid, f"Book {bid}", max_chapter[bid], bid, get_testament(bid))
+        )
+        known_books[bid] = True
+    return extra_book_ids
+
+
+def insert_verses(conn: sqlite3.Connection, code: str, verses_data: list) -> tuple[int, int]:
+    """Insert cleaned verses (+ Strong's postings) in batches. Returns (verses, postings)."""
+    verse_count = 0
+    strongs_count = 0
+    batch = []
+    strongs_batch = []
+    for v in verses_data:
+        raw_text = v.get("text", "")
+        clean_text = strip_html(raw_text)
+        if not clean_text:
+            continue
+        batch.append((
+            code,
+            v["book"],
+            v["chapter"],
+            v["verse"],
+            clean_text,
+        ))
+        verse_count += 1
+        # Strong's tags are dropped from the text — keep them in verse_strongs
+        strongs_batch += strongs_index.posting_rows(code, v["book"], v["chapter"], v["verse"], raw_text)
+
+        if len(batch) >= 5000:
+            conn.executemany(
+                "INSERT OR REPLACE INTO verses (translation, book_id, chapter, verse, text) VALUES (?, ?, ?, ?, ?)",
+                batch
+            )
+            batch.clear()
+        if len(strongs_batch) >= 5000:
+            strongs_index.insert_postings(conn, strongs_batch)
+            strongs_count += len(strongs_batch)
+            strongs_batch.clear()
+
+    # Flush remaining
+    if batch:
+        conn.executemany(
+            "INSERT OR REPLACE INTO verses (translation, book_id, chapter, verse, text) VALUES (?, ?, ?, ?, ?)",
+            batch
+        )
+    if strongs_batch:
+        strongs_index.insert_postings(conn, strongs_batch)
+        strongs_count += len(strongs_batch)
+    return verse_count, strongs_count
+
+
 def list_translations(translations):
     """Print a formatted list of all available translations."""
     # Group by language
@@ -230,6 +313,26 @@ def main():
         "--db", type=Path, default=DEFAULT_DB,
         help=f"Output database path (default: {DEFAULT_DB})"
     )
+    parser.add_argument(
+        "--no-finalize", action="store_true",
+        help="Skip the finalize-for-serving stage (clustered rebuild + VACUUM)"
+    )
+    parser.add_argument(
+        "--no-similar", action="store_true",
+        help="Skip the similar-verse / parallel-passage stage (MinHash LSH, see similar_verses.py)"
+    )
+    parser.add_argument(
+        "--shards", type=Path, metavar="DIR",
+        help="Also split the database into per-language shards + catalog.db in DIR"
+    )
+    parser.add_argument(
+        "--packs", type=Path, metavar="DIR",
+        help="Also build/refresh per-translation offline packs (with deltas) in DIR"
+    )
+    parser.add_argument(
+        "--columnar", type=Path, metavar="DIR",
+        help="Also export memory-mappable NumPy columns per translation in DIR (see columnar_export.py)"
+    )
     args = parser.parse_args()
 
     # Step 1: Fetch translations
@@ -263,6 +366,7 @@ def main():
     # Step 4: Create database
     print(f"\nCreating database at: {args.db}")
     conn = create_database(args.db)
+    strongs_index.ensure_schema(conn)
 
     total_verses = 0
     total_books = 0
@@ -294,23 +398,7 @@ def main():
                     failed.append(code)
                     continue
 
-            # Build a set of known books from metadata
-            known_books = {}
-            for book in books:
-                book_id = book["bookid"]
-                known_books[book_id] = book
-                conn.execute(
-                    "INSERT OR REPLACE INTO books (translation, book_id, name, chapters, chron_order, testament) VALUES (?, ?, ?, ?, ?, ?)",
-                    (
-                        code,
-                        book_id,
-                        book["name"],
-                        book["chapters"],
-                        book.get("chronorder", book_id),
-                        get_testament(book_id),
-                    )
-                )
-
+            known_books = insert_books(conn, code, books)
             total_books += len(known_books)
             print(f"  {len(known_books)} books")
 
@@ -324,61 +412,17 @@ def main():
                 conn.commit()
                 continue
 
-            # Scan for book IDs in verses that aren't in metadata and auto-create them
-            extra_book_ids = set()
-            max_chapter = {}  # track max chapter per book_id for auto-created entries
-            for v in verses_data:
-                bid = v["book"]
-                ch = v["chapter"]
-                if bid not in known_books:
-                    extra_book_ids.add(bid)
-                    if bid not in max_chapter or ch > max_chapter[bid]:
-                        max_chapter[bid] = ch
-
-            for bid in extra_book_ids:
-                conn.execute(
-                    "INSERT OR REPLACE INTO books (translation, book_id, name, chapters, chron_order, testament) VALUES (?, ?, ?, ?, ?, ?)",
-                    (code, bid, f"Book {bid}", max_chapter[bid], bid, get_testament(bid))
-                )
-                known_books[bid] = True
-                total_books += 1
-
+            extra_book_ids = insert_missing_books(conn, code, verses_data, known_books)
+            total_books += len(extra_book_ids)
             if extra_book_ids:
                 print(f"  Auto-created {len(extra_book_ids)} missing book entries: {sorted(extra_book_ids)}")
 
-            # Insert verses in batches
-            verse_count = 0
-            batch = []
-            for v in verses_data:
-                clean_text = strip_html(v.get("text", ""))
-                if not clean_text:
-                    continue
-                batch.append((
-                    code,
-                    v["book"],
-                    v["chapter"],
-                    v["verse"],
-                    clean_text,
-                ))
-                verse_count += 1
-
-                if len(batch) >= 5000:
-                    conn.executemany(
-                        "INSERT OR REPLACE INTO verses (translation, book_id, chapter, verse, text) VALUES (?, ?, ?, ?, ?)",
-                        batch
-                    )
-                    batch.clear()
-
-            # Flush remaining
-            if batch:
-                conn.executemany(
-                    "INSERT OR REPLACE INTO verses (translation, book_id, chapter, verse, text) VALUES (?, ?, ?, ?, ?)",
-                    batch
-                )
-
+            verse_count, strongs_count = insert_verses(conn, code, verses_data)
             conn.commit()
             total_verses += verse_count
             print(f"  {verse_count:,} verses")
+            if strongs_count:
+                print(f"  {strongs_count:,} Strong's lemma postings")
 
             # Brief pause between downloads to be polite
             if i < len(selected) - 1:
@@ -388,12 +432,60 @@ def main():
         build_fts_index(conn)
         conn.commit()
 
-        # Step 6: Optimize
+        # Step 6: Token prefix sums (read_passage budgeting, pricing model)
+        print("\nComputing per-chapter token counts...")
+        chapters = token_counts.build_chapter_tokens(conn)
+        print(f"  {chapters:,} chapters.")
+
+        # Step 7: Translation capabilities + resolved book lists (DC/NC fallbacks)
+        print("\nResolving translation capabilities...")
+        capabilities.build_capabilities(conn)
+
+        # Step 8: Book-name aliases (bookByName, reference_parser.py)
+        print("\nBuilding book aliases...")
+        aliases = book_aliases.build_book_aliases(conn)
+        print(f"  {aliases:,} aliases.")
+
+        # Step 9: Versification map onto KJV numbering (data/versification.json)
+        print("\nMapping versification...")
+        renumbered = versification.build_verse_map(conn)
+        print(f"  {sum(renumbered.values()):,} verses renumbered "
+              f"across {sum(1 for n in renumbered.values() if n)} translations.")
+
+        # Step 10: Merkle content hashes (content_hashes.py --diff / --verify)
+        print("\nHashing content...")
+        chapters = content_hashes.build_content_hashes(conn)
+        print(f"  {chapters:,} chapters.")
+
+        # Step 11: Per-book word frequencies from the FTS index (word_stats.py --count)
+        print("\nCounting terms per book...")
+        rows = word_stats.build_word_stats(conn)
+        print(f"  {rows:,} rows.")
+
+        # Step 12: Search vocabulary — autocomplete + spelling index (bible.Bible.complete / suggest)
+        print("\nBuilding search vocabulary...")
+        terms = vocabulary_index.build_vocabulary(conn)
+        print(f"  {terms:,} terms.")
+
+        # Step 13: Similar verses / parallel passages (MinHash LSH, worker processes)
+        if not args.no_similar:
+            # Imported here: it needs numpy, which nothing else in the import does
+            import similar_verses
+            print("\nFinding similar verses (MinHash LSH)...")
+            matches = similar_verses.build_similar_verses(conn)
+            print(f"  {matches:,} matches.")
+
+        # Step 14: Optimize
         print("\nOptimizing database...")
         conn.execute("ANALYZE")
         conn.execute("PRAGMA optimize")
         conn.commit()
 
+        # Step 15: Finalize for serving (clustered verses, page size, VACUUM)
+        if not args.no_finalize:
+            print("\nFinalizing database for serving...")
+            finalize_db.finalize_for_serving(conn)
+
     finally:
         conn.close()
 
@@ -410,6 +502,29 @@ def main():
         print(f"  Failed: {', '.join(failed)}")
     print(f"{'=' * 50}")
 
+    # Step 16: Language shards
+    if args.shards:
+        print(f"\nSharding by language into {args.shards}/ ...")
+        shard_db.build_shards(args.db, args.shards)
+
+    # Step 17: Offline packs
+    if args.packs:
+        print(f"\nBuilding offline packs in {args.packs}/ ...")
+        offline_packs.build_packs(args.db, args.packs, deltas=True)
+
+    # Step 18: Columnar export
+    if args.columnar:
+        # Imported here: it needs numpy, which nothing else in the import does
+        import columnar_export
+        print(f"\nExporting columns to {args.columnar}/ ...")
+        conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+        try:
+            status = columnar_export.export_columnar(conn, args.columnar)
+        finally:
+            conn.close()
+        written = sum(1 for s in status.values() if s == "written")
+        print(f"  {written} written, {len(status) - written} unchanged.")
+
 
 if __name__ == "__main__":
     main()
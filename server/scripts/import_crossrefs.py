@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Import the OpenBible.info cross-references into the Koinonia Bible database.
+Source: https://www.openbible.info/labs/cross-references/ (CC-BY)
+
+cross_references.txt has one tab-separated line per reference, with OSIS
+verse IDs and the number of votes it received:
+
+    From Verse    To Verse                  Votes
+    Gen.1.1       Prov.8.22-Prov.8.30       59
+
+References are keyed by book ID (1-66, the same numbering as Bolls) so they
+apply to every translation; the votes become `relevance`. A single-verse
+target leaves the to_end_* columns NULL.
+
+Usage:
+    python import_crossrefs.py                           # Download from openbible.info
+    python import_crossrefs.py --file cross_references.txt
+    python import_crossrefs.py --db /path/to/bible.db
+"""
+
+import argparse
+import io
+import sqlite3
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+import downloads
+import hot_set
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+CROSSREFS_URL = "https://a.openbible.info/data/cross-references.zip"
+
+# OSIS book abbreviations in canonical order → book_id 1-66
+OSIS_BOOKS = [
+    "Gen", "Exod", "Lev", "Num", "Deut", "Josh", "Judg", "Ruth", "1Sam", "2Sam",
+    "1Kgs", "2Kgs", "1Chr", "2Chr", "Ezra", "Neh", "Esth", "Job", "Ps", "Prov",
+    "Eccl", "Song", "Isa", "Jer", "Lam", "Ezek", "Dan", "Hos", "Joel", "Amos",
+    "Obad", "Jonah", "Mic", "Nah", "Hab", "Zeph", "Hag", "Zech", "Mal",
+    "Matt", "Mark", "Luke", "John", "Acts", "Rom", "1Cor", "2Cor", "Gal", "Eph",
+    "Phil", "Col", "1Thess", "2Thess", "1Tim", "2Tim", "Titus", "Phlm", "Heb", "Jas",
+    "1Pet", "2Pet", "1John", "2John", "3John", "Jude", "Rev",
+]
+OSIS_IDS = {abbr: i + 1 for i, abbr in enumerate(OSIS_BOOKS)}
+
+
+def parse_osis(ref: str) -> tuple[int, int, int] | None:
+    """'1Cor.13.4' → (46, 13, 4). None for unknown books or malformed IDs."""
+    parts = ref.strip().split(".")
+    if len(parts) != 3 or parts[0] not in OSIS_IDS:
+        return None
+    try:
+        return OSIS_IDS[parts[0]], int(parts[1]), int(parts[2])
+    except ValueError:
+        return None
+
+
+def parse_line(line: str) -> tuple | None:
+    """One cross_references.txt line → a cross_references row (None for headers / bad lines)."""
+    fields = line.rstrip("\n").split("\t")
+    if len(fields) < 3:
+        return None
+    source = parse_osis(fields[0])
+    start, _, end = fields[1].partition("-")
+    target = parse_osis(start)
+    target_end = parse_osis(end) if end else None
+    try:
+        votes = int(fields[2])
+    except ValueError:
+        return None
+    if source is None or target is None or (end and target_end is None):
+        return None
+    return (*source, *target, *(target_end or (None, None, None)), votes)
+
+
+def read_crossrefs(lines) -> list[tuple]:
+    return [row for line in lines if (row := parse_line(line)) is not None]
+
+
+def load_source(path: Path) -> list[tuple]:
+    """Rows from a cross_references.txt, or the .zip it is distributed in."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            name = next(n for n in zf.namelist() if n.endswith(".txt"))
+            with zf.open(name) as f:
+                return read_crossrefs(io.TextIOWrapper(f, encoding="utf-8"))
+    with open(path, encoding="utf-8") as f:
+        return read_crossrefs(f)
+
+
+def download_source(url: str = CROSSREFS_URL) -> Path:
+    dest = Path(tempfile.gettempdir()) / "koinonia-cross-references.zip"
+    downloads.download(url, dest, label="cross-references")
+    return dest
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS cross_references (
+            from_book      INTEGER NOT NULL,
+            from_chapter   INTEGER NOT NULL,
+            from_verse     INTEGER NOT NULL,
+            to_book        INTEGER NOT NULL,
+            to_chapter     INTEGER NOT NULL,
+            to_verse       INTEGER NOT NULL,
+            to_end_book    INTEGER,
+            to_end_chapter INTEGER,
+            to_end_verse   INTEGER,
+            relevance      INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_cross_references_from
+            ON cross_references(from_book, from_chapter, from_verse);
+    """)
+
+
+def insert_crossrefs(conn: sqlite3.Connection, rows: list[tuple]) -> int:
+    """Replace every cross-reference with rows. Returns the row count."""
+    ensure_schema(conn)
+    conn.execute("DELETE FROM cross_references")
+    conn.executemany(
+        "INSERT INTO cross_references (from_book, from_chapter, from_verse, to_book, to_chapter, to_verse, "
+        "to_end_book, to_end_chapter, to_end_verse, relevance) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        sorted(rows, key=lambda r: r[:6]),
+    )
+    conn.commit()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import OpenBible.info cross-references")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument("--file", type=Path, help="Local cross_references.txt or .zip (default: download)")
+    parser.add_argument("--url", default=CROSSREFS_URL, help=f"Download URL (default: {CROSSREFS_URL})")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    source = args.file or download_source(args.url)
+    rows = load_source(source)
+    conn = sqlite3.connect(str(args.db))
+    try:
+        count = insert_crossrefs(conn, rows)
+        print(f"  {count:,} cross-references.")
+        # Pre-rendered responses (hot_set.py) would otherwise keep serving the old data
+        rows = hot_set.refresh_response_cache(conn, args.db)
+        if rows is not None:
+            print(f"  Re-rendered {rows:,} cached responses.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ These are books with strong historical evidence:
 Usage:
     python import_noncanonical.py
     python import_noncanonical.py --db /path/to/bible.db
+    python import_noncanonical.py --no-similar      # Skip the similar-verse (MinHash LSH) stage
 """
 
 import argparse
@@ -18,6 +19,14 @@ import sqlite3
 import sys
 from pathlib import Path
 
+import book_aliases
+import capabilities
+import content_hashes
+import hot_set
+import token_counts
+import vocabulary_index
+import word_stats
+
 DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
@@ -141,43 +150,12 @@ def migrate_check_constraint(conn: sqlite3.Connection):
     print("  Migration complete.")
 
 
-def import_books(db_path: Path):
-    """Import non-canonical books into the database."""
-    if not db_path.exists():
-        print(f"ERROR: Database not found at {db_path}")
-        sys.exit(1)
-
-    conn = sqlite3.connect(str(db_path))
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
-
-    # Step 1: Migrate CHECK constraint
-    print("\n=== Step 1: Migrate CHECK constraint ===")
-    migrate_check_constraint(conn)
-
-    # Step 2: Insert translation (if not exists)
-    print("\n=== Step 2: Register translation ===")
-    existing = conn.execute(
-        "SELECT short_name FROM translations WHERE short_name = ?",
-        (TRANSLATION["short_name"],)
-    ).fetchone()
-
-    if existing:
-        print(f"  Translation '{TRANSLATION['short_name']}' already exists.")
-    else:
-        conn.execute(
-            "INSERT INTO translations (short_name, full_name, language, direction) VALUES (?, ?, ?, ?)",
-            (TRANSLATION["short_name"], TRANSLATION["full_name"],
-             TRANSLATION["language"], TRANSLATION["direction"]),
-        )
-        print(f"  Registered translation: {TRANSLATION['short_name']} — {TRANSLATION['full_name']}")
-
-    # Step 3: Parse and import each book
-    print("\n=== Step 3: Import books ===")
+def insert_noncanonical_books(conn: sqlite3.Connection, data_dir: Path = DATA_DIR) -> int:
+    """Parse and (re)insert each book under the ENC translation. Returns the verse count."""
     total_verses = 0
 
     for book_def in BOOKS:
-        filepath = DATA_DIR / book_def["file"]
+        filepath = data_dir / book_def["file"]
         if not filepath.exists():
             print(f"  SKIP: {book_def['name']} — file not found: {filepath}")
             continue
@@ -218,6 +196,45 @@ def import_books(db_path: Path):
         total_verses += len(verses)
         print(f"  ✓ {book_def['name']}: {chapters} chapters, {len(verses)} verses")
 
+    return total_verses
+
+
+def import_books(db_path: Path, no_similar: bool = False):
+    """Import non-canonical books into the database."""
+    if not db_path.exists():
+        print(f"ERROR: Database not found at {db_path}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(str(db_path))
+    # Finalized databases are served in DELETE mode (see finalize_db.py) — restore it afterwards
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+
+    # Step 1: Migrate CHECK constraint
+    print("\n=== Step 1: Migrate CHECK constraint ===")
+    migrate_check_constraint(conn)
+
+    # Step 2: Insert translation (if not exists)
+    print("\n=== Step 2: Register translation ===")
+    existing = conn.execute(
+        "SELECT short_name FROM translations WHERE short_name = ?",
+        (TRANSLATION["short_name"],)
+    ).fetchone()
+
+    if existing:
+        print(f"  Translation '{TRANSLATION['short_name']}' already exists.")
+    else:
+        conn.execute(
+            "INSERT INTO translations (short_name, full_name, language, direction) VALUES (?, ?, ?, ?)",
+            (TRANSLATION["short_name"], TRANSLATION["full_name"],
+             TRANSLATION["language"], TRANSLATION["direction"]),
+        )
+        print(f"  Registered translation: {TRANSLATION['short_name']} — {TRANSLATION['full_name']}")
+
+    # Step 3: Parse and import each book
+    print("\n=== Step 3: Import books ===")
+    total_verses = insert_noncanonical_books(conn)
     conn.commit()
 
     # Step 4: Update FTS index
@@ -236,7 +253,55 @@ def import_books(db_path: Path):
     conn.commit()
     print("  FTS index updated.")
 
-    # Step 5: Verify
+    # Step 5: Token prefix sums
+    print("\n=== Step 5: Update token counts ===")
+    chapters = token_counts.build_chapter_tokens(conn, [TRANSLATION["short_name"]])
+    print(f"  {chapters} chapters.")
+
+    # Step 6: Translation capabilities — every translation's book list gains ENC's books
+    print("\n=== Step 6: Update translation capabilities ===")
+    count = capabilities.build_capabilities(conn)
+    print(f"  {count} translations.")
+
+    # Step 7: Book aliases — ENC's book names
+    print("\n=== Step 7: Update book aliases ===")
+    aliases = book_aliases.build_book_aliases(conn)
+    print(f"  {aliases:,} aliases.")
+
+    # Step 8: Similar verses — every book list that borrows ENC's books now includes them
+    # (Jude 1:14 ↔ 1 Enoch 1:9), in every language
+    if no_similar:
+        print("\n=== Step 8: Skip similar verses (--no-similar) ===")
+    else:
+        # Imported here: it needs numpy, which nothing else in the import does
+        import similar_verses
+        print("\n=== Step 8: Update similar verses ===")
+        codes = similar_verses.borrower_scope(conn, [TRANSLATION["short_name"]])
+        matches = similar_verses.build_similar_verses(conn, codes)
+        print(f"  {matches:,} matches.")
+
+    # Step 9: Content hashes — ENC's tree
+    print("\n=== Step 9: Update content hashes ===")
+    chapters = content_hashes.build_content_hashes(conn, [TRANSLATION["short_name"]])
+    print(f"  {chapters} chapters.")
+
+    # Step 10: Word statistics — ENC's terms
+    print("\n=== Step 10: Update word statistics ===")
+    rows = word_stats.build_word_stats(conn, [TRANSLATION["short_name"]])
+    print(f"  {rows:,} rows.")
+
+    # Step 11: Search vocabulary — English gains ENC's terms
+    print("\n=== Step 11: Update search vocabulary ===")
+    terms = vocabulary_index.build_vocabulary(conn, [TRANSLATION["short_name"]])
+    print(f"  {terms:,} terms.")
+
+    # Step 12: Pre-rendered responses (hot_set.py) — /books lists and ENC chapters changed
+    rows = hot_set.refresh_response_cache(conn, db_path)
+    if rows is not None:
+        print("\n=== Step 12: Re-render cached responses ===")
+        print(f"  {rows:,} responses.")
+
+    # Step 13: Verify
     print("\n=== Verification ===")
     for book_def in BOOKS:
         count = conn.execute(
@@ -248,6 +313,7 @@ def import_books(db_path: Path):
     print(f"\n  Total: {total_verses} verses imported across {len(BOOKS)} books.")
 
     conn.execute("PRAGMA optimize")
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
     conn.close()
     print("\nDone!")
 
@@ -255,5 +321,9 @@ def import_books(db_path: Path):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Import non-canonical books")
     parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument(
+        "--no-similar", action="store_true",
+        help="Skip the similar-verse / parallel-passage stage (MinHash LSH, see similar_verses.py)"
+    )
     args = parser.parse_args()
-    import_books(args.db)
+    import_books(args.db, no_similar=args.no_similar)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Import SBLGNT (SBL Greek New Testament) into the Koinonia Bible database.
+Source: https://github.com/LogosBible/SBLGNT (CC-BY-4.0)
+
+Python port of import-sblgnt.ts, so build_db.py can run it as a stage. Books
+keep their English names (the AI looks them up the same way as KJV/TR) and
+the textual apparatus markers (⸀ ⸁ ⸂ …) are stripped.
+
+Usage:
+    python import_sblgnt.py                                   # From /tmp/SBLGNT
+    python import_sblgnt.py --dir /path/to/SBLGNT/data/sblgnt/text
+    python import_sblgnt.py --db /path/to/bible.db
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+import hot_set
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+SBLGNT_DIR = Path("/tmp/SBLGNT/data/sblgnt/text")
+
+TRANSLATION = {
+    "short_name": "SBLGNT",
+    "full_name": "SBL Greek New Testament",
+    "language": "Greek Ελληνικά",
+    "direction": "ltr",
+}
+
+# SBLGNT filename → (book_id, English name), same IDs as KJV/TR
+BOOK_MAP = {
+    "Matt.txt": (40, "Matthew"),
+    "Mark.txt": (41, "Mark"),
+    "Luke.txt": (42, "Luke"),
+    "John.txt": (43, "John"),
+    "Acts.txt": (44, "Acts"),
+    "Rom.txt": (45, "Romans"),
+    "1Cor.txt": (46, "1 Corinthians"),
+    "2Cor.txt": (47, "2 Corinthians"),
+    "Gal.txt": (48, "Galatians"),
+    "Eph.txt": (49, "Ephesians"),
+    "Phil.txt": (50, "Philippians"),
+    "Col.txt": (51, "Colossians"),
+    "1Thess.txt": (52, "1 Thessalonians"),
+    "2Thess.txt": (53, "2 Thessalonians"),
+    "1Tim.txt": (54, "1 Timothy"),
+    "2Tim.txt": (55, "2 Timothy"),
+    "Titus.txt": (56, "Titus"),
+    "Phlm.txt": (57, "Philemon"),
+    "Heb.txt": (58, "Hebrews"),
+    "Jas.txt": (59, "James"),
+    "1Pet.txt": (60, "1 Peter"),
+    "2Pet.txt": (61, "2 Peter"),
+    "1John.txt": (62, "1 John"),
+    "2John.txt": (63, "2 John"),
+    "3John.txt": (64, "3 John"),
+    "Jude.txt": (65, "Jude"),
+    "Rev.txt": (66, "Revelation"),
+}
+
+REF_RE = re.compile(r"(\d+):(\d+)$")
+APPARATUS_RE = re.compile(r"[⸀⸁⸂⸃⸄⸅⸆⸇⸈⸉]")
+
+
+def parse_book(filepath: Path) -> list[dict]:
+    """Parse "Rom 1:1<TAB>text" lines; title lines (no tab) are skipped."""
+    verses = []
+    for line in filepath.read_text(encoding="utf-8").splitlines():
+        if "\t" not in line:
+            continue
+        ref, text = line.split("\t", 1)
+        m = REF_RE.search(ref.strip())
+        text = APPARATUS_RE.sub("", text).strip()
+        if not m or not text:
+            continue
+        verses.append({"chapter": int(m.group(1)), "verse": int(m.group(2)), "text": text})
+    return verses
+
+
+def source_files(sblgnt_dir: Path = SBLGNT_DIR) -> list[Path]:
+    """The book files present in sblgnt_dir, in canonical order."""
+    return sorted(
+        (p for p in sblgnt_dir.glob("*.txt") if p.name in BOOK_MAP),
+        key=lambda p: BOOK_MAP[p.name][0],
+    )
+
+
+def insert_sblgnt(conn: sqlite3.Connection, sblgnt_dir: Path = SBLGNT_DIR) -> tuple[int, int]:
+    """Replace the SBLGNT translation with the files in sblgnt_dir. Returns (books, verses)."""
+    code = TRANSLATION["short_name"]
+    conn.execute("DELETE FROM verses WHERE translation = ?", (code,))
+    conn.execute("DELETE FROM books WHERE translation = ?", (code,))
+    conn.execute("DELETE FROM translations WHERE short_name = ?", (code,))
+    conn.execute(
+        "INSERT INTO translations (short_name, full_name, language, direction) VALUES (?, ?, ?, ?)",
+        (code, TRANSLATION["full_name"], TRANSLATION["language"], TRANSLATION["direction"]),
+    )
+
+    books = verses_total = 0
+    for filepath in source_files(sblgnt_dir):
+        book_id, name = BOOK_MAP[filepath.name]
+        verses = parse_book(filepath)
+        if not verses:
+            print(f"  SKIP: {name} — no verses parsed")
+            continue
+        chapters = max(v["chapter"] for v in verses)
+        conn.execute(
+            "INSERT INTO books (translation, book_id, name, chapters, chron_order, testament) VALUES (?, ?, ?, ?, ?, ?)",
+            (code, book_id, name, chapters, book_id, "NT"),
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO verses (translation, book_id, chapter, verse, text) VALUES (?, ?, ?, ?, ?)",
+            [(code, book_id, v["chapter"], v["verse"], v["text"]) for v in verses],
+        )
+        books += 1
+        verses_total += len(verses)
+    conn.commit()
+    return books, verses_total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the SBL Greek New Testament")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument("--dir", type=Path, default=SBLGNT_DIR, help=f"SBLGNT text directory (default: {SBLGNT_DIR})")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+    if not source_files(args.dir):
+        print(f"ERROR: No SBLGNT book files in {args.dir}")
+        print("Clone it with: git clone https://github.com/LogosBible/SBLGNT /tmp/SBLGNT")
+        sys.exit(1)
+
+    conn = sqlite3.connect(str(args.db))
+    try:
+        books, verses = insert_sblgnt(conn, args.dir)
+        print(f"  Imported {books} books, {verses:,} verses as \"{TRANSLATION['short_name']}\"")
+        print("  Run build_db.py (or rebuild verses_fts) to make them searchable.")
+        # Pre-rendered responses (hot_set.py) would otherwise keep serving the old data
+        rows = hot_set.refresh_response_cache(conn, args.db)
+        if rows is not None:
+            print(f"  Re-rendered {rows:,} cached responses.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Build per-translation offline packs for the Koinonia mobile app.
+
+One gzip-compressed binary pack per translation, plus manifest.json listing
+each pack's version, sizes and hashes. Packs are built in parallel from
+bible.db; a pack whose content hash matches the manifest is left untouched,
+so re-running after a re-import only rewrites translations that changed.
+With --deltas, a binary delta from the previous version is written next to
+each changed pack, so clients that have it download kilobytes instead of
+the full text.
+
+Pack layout (uncompressed, little-endian):
+
+    "KPK1"
+    u32 header length, header JSON (translation metadata + books)
+    u32 chapter count, per chapter: u16 book_id, u16 chapter, u32 first verse, u16 verses
+    u32 verse count,   per verse:   u16 verse, u32 byte length of its text
+    u32 text length,   UTF-8 text of every verse, in (book, chapter, verse) order
+
+Verse entries hold lengths rather than offsets (the app prefix-sums them on
+load), so editing one verse changes one entry and deltas stay small.
+
+version = first 16 hex digits of sha256(uncompressed pack). Clients verify a
+download (or an applied delta) by hashing the result.
+
+Delta layout (gzip-compressed): "KPD1", from/to version (16 bytes ASCII each),
+then ops — b"C" u32 offset u32 length (copy from the old pack) or
+b"A" u32 length + bytes (literal).
+
+Usage:
+    python offline_packs.py                          # Build/refresh every pack
+    python offline_packs.py -t KJV VDCL              # Specific translations
+    python offline_packs.py --deltas                 # Also write deltas from the previous versions
+    python offline_packs.py --db bible.db --out packs/ -j 4
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import multiprocessing
+import sqlite3
+import struct
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+DEFAULT_OUT = Path(__file__).resolve().parent.parent / "packs"
+MANIFEST_NAME = "manifest.json"
+
+PACK_MAGIC = b"KPK1"
+DELTA_MAGIC = b"KPD1"
+PACK_FORMAT = 1
+
+CHAPTER_ENTRY = struct.Struct("<HHIH")
+VERSE_ENTRY = struct.Struct("<HI")
+U32 = struct.Struct("<I")
+
+# Delta matching granularity: smaller finds more matches, larger scans faster
+DELTA_BLOCK = 64
+
+
+# ============================================================
+# PACKS
+# ============================================================
+
+def build_pack(conn: sqlite3.Connection, code: str) -> tuple[bytes, dict]:
+    """Uncompressed pack bytes for one translation, and its stats."""
+    full_name, language, direction = conn.execute(
+        "SELECT full_name, language, direction FROM translations WHERE short_name = ?", (code,)
+    ).fetchone()
+    books = conn.execute(
+        "SELECT book_id, name, chapters, chron_order, testament FROM books WHERE translation = ? ORDER BY book_id",
+        (code,),
+    ).fetchall()
+    header = json.dumps({
+        "translation": code,
+        "full_name": full_name,
+        "language": language,
+        "direction": direction,
+        "books": [list(b) for b in books],
+    }, ensure_ascii=False, separators=(",", ":")).encode()
+
+    chapters = []
+    verses = []
+    texts = []
+    current = None
+    for book_id, chapter, verse, text in conn.execute(
+        "SELECT book_id, chapter, verse, text FROM verses WHERE translation = ? ORDER BY book_id, chapter, verse",
+        (code,),
+    ):
+        if (book_id, chapter) != current:
+            current = (book_id, chapter)
+            chapters.append([book_id, chapter, len(verses), 0])
+        chapters[-1][3] += 1
+        encoded = text.encode()
+        texts.append(encoded)
+        verses.append(VERSE_ENTRY.pack(verse, len(encoded)))
+
+    text = b"".join(texts)
+    pack = b"".join([
+        PACK_MAGIC,
+        U32.pack(len(header)), header,
+        U32.pack(len(chapters)), b"".join(CHAPTER_ENTRY.pack(*c) for c in chapters),
+        U32.pack(len(verses)), b"".join(verses),
+        U32.pack(len(text)), text,
+    ])
+    return pack, {"books": len(books), "chapters": len(chapters), "verses": len(verses)}
+
+
+def pack_version(pack: bytes) -> str:
+    return hashlib.sha256(pack).hexdigest()[:16]
+
+
+def read_pack(path: Path) -> bytes:
+    with gzip.open(path, "rb") as f:
+        return f.read()
+
+
+def compress(data: bytes) -> bytes:
+    # mtime=0 keeps the output byte-identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+# ============================================================
+# DELTAS
+# ============================================================
+
+def make_delta(old: bytes, new: bytes, block: int = DELTA_BLOCK) -> list:
+    """
+    Copy/add ops turning `old` into `new`.
+
+    Indexes every aligned block of `old`, then walks `new`: at a block match
+    the copy is extended as far as the bytes agree and the walk jumps past
+    it; elsewhere it advances one byte. Unchanged stretches cost one lookup
+    per block, and an edit re-aligns within one block.
+    """
+    blocks = {}
+    for pos in range(0, len(old) - block + 1, block):
+        blocks.setdefault(old[pos:pos + block], pos)
+
+    ops = []
+    literal_start = 0
+    i = 0
+    end = len(new) - block
+    while i <= end:
+        src = blocks.get(new[i:i + block])
+        if src is None:
+            i += 1
+            continue
+        # Extend the match backwards into pending literal bytes, then forwards
+        back = 0
+        while back < i - literal_start and src - back > 0 and old[src - back - 1] == new[i - back - 1]:
+            back += 1
+        length = block + back
+        start_new, start_old = i - back, src - back
+        while start_new + length < len(new) and start_old + length < len(old) \
+                and new[start_new + length] == old[start_old + length]:
+            length += 1
+        if start_new > literal_start:
+            ops.append(("A", new[literal_start:start_new]))
+        if ops and ops[-1][0] == "C" and ops[-1][1] + ops[-1][2] == start_old:
+            ops[-1] = ("C", ops[-1][1], ops[-1][2] + length)
+        else:
+            ops.append(("C", start_old, length))
+        i = literal_start = start_new + length
+    if literal_start < len(new):
+        ops.append(("A", new[literal_start:]))
+    return ops
+
+
+def encode_delta(from_version: str, to_version: str, ops: list) -> bytes:
+    parts = [DELTA_MAGIC, from_version.encode(), to_version.encode()]
+    for op in ops:
+        if op[0] == "C":
+            parts.append(b"C" + U32.pack(op[1]) + U32.pack(op[2]))
+        else:
+            parts.append(b"A" + U32.pack(len(op[1])) + op[1])
+    return b"".join(parts)
+
+
+def apply_delta(old: bytes, delta: bytes) -> bytes:
+    """Reference decoder for clients: rebuild the new pack and verify both versions."""
+    if delta[:4] != DELTA_MAGIC:
+        raise ValueError("Not a pack delta")
+    from_version, to_version = delta[4:20].decode(), delta[20:36].decode()
+    if pack_version(old) != from_version:
+        raise ValueError(f"Delta applies to {from_version}, have {pack_version(old)}")
+    out = []
+    pos = 36
+    while pos < len(delta):
+        kind = delta[pos:pos + 1]
+        if kind == b"C":
+            offset, length = U32.unpack_from(delta, pos + 1)[0], U32.unpack_from(delta, pos + 5)[0]
+            out.append(old[offset:offset + length])
+            pos += 9
+        else:
+            length = U32.unpack_from(delta, pos + 1)[0]
+            out.append(delta[pos + 5:pos + 5 + length])
+            pos += 5 + length
+    new = b"".join(out)
+    if pack_version(new) != to_version:
+        raise ValueError("Delta produced the wrong pack")
+    return new
+
+
+# ============================================================
+# BUILD
+# ============================================================
+
+def pack_file(code: str, version: str) -> str:
+    return f"{code}.{version}.kpk.gz"
+
+
+def delta_file(code: str, from_version: str, to_version: str) -> str:
+    return f"{code}.{from_version}-{to_version}.kpd.gz"
+
+
+def refresh_pack(task) -> dict:
+    """
+    Worker: rebuild one translation's pack if its content changed.
+    task = (db path, out dir, code, previous manifest entry or None, write deltas)
+    """
+    db_path, out_dir, code, previous, deltas = task
+    started = time.perf_counter()
+    out_dir = Path(out_dir)
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        pack, stats = build_pack(conn, code)
+    finally:
+        conn.close()
+    version = pack_version(pack)
+
+    if previous and previous["version"] == version and (out_dir / previous["file"]).exists():
+        return {**previous, "status": "unchanged", "seconds": time.perf_counter() - started}
+
+    compressed = compress(pack)
+    file = pack_file(code, version)
+    (out_dir / file).write_bytes(compressed)
+    entry = {
+        "version": version,
+        "file": file,
+        "bytes": len(compressed),
+        "raw_bytes": len(pack),
+        "sha256": hashlib.sha256(compressed).hexdigest(),
+        **stats,
+        "deltas": {},
+    }
+
+    if deltas and previous and (out_dir / previous["file"]).exists():
+        ops = make_delta(read_pack(out_dir / previous["file"]), pack)
+        delta = compress(encode_delta(previous["version"], version, ops))
+        name = delta_file(code, previous["version"], version)
+        (out_dir / name).write_bytes(delta)
+        entry["deltas"][previous["version"]] = {
+            "file": name,
+            "bytes": len(delta),
+            "sha256": hashlib.sha256(delta).hexdigest(),
+        }
+
+    entry["status"] = "updated" if previous else "new"
+    entry["previous_file"] = previous["file"] if previous else None
+    entry["seconds"] = time.perf_counter() - started
+    return entry
+
+
+def load_manifest(out_dir: Path) -> dict:
+    path = out_dir / MANIFEST_NAME
+    if path.exists():
+        return json.loads(path.read_text())
+    return {"format": PACK_FORMAT, "packs": {}}
+
+
+def build_packs(db_path: Path, out_dir: Path, translations: list[str] | None = None,
+                deltas: bool = False, workers: int | None = None) -> dict:
+    """Refresh packs in parallel and rewrite the manifest. Returns the manifest."""
+    db_path = Path(db_path).resolve()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(out_dir)
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    codes = [r[0] for r in conn.execute("SELECT short_name FROM translations ORDER BY short_name")]
+    conn.close()
+    if translations:
+        codes = [c for c in codes if c in set(translations)]
+
+    tasks = [(str(db_path), str(out_dir), code, manifest["packs"].get(code), deltas) for code in codes]
+    workers = workers or multiprocessing.cpu_count()
+    started = time.perf_counter()
+    with multiprocessing.Pool(max(1, min(workers, len(tasks)))) as pool:
+        results = pool.map(refresh_pack, tasks, chunksize=1)
+    elapsed = time.perf_counter() - started
+
+    report = []
+    for code, entry in zip(codes, results):
+        status = entry.pop("status")
+        seconds = entry.pop("seconds")
+        previous_file = entry.pop("previous_file", None)
+        # Keep only the current pack; the previous one is superseded by its delta
+        if previous_file and previous_file != entry["file"] and (out_dir / previous_file).exists():
+            (out_dir / previous_file).unlink()
+        for stale in manifest["packs"].get(code, {}).get("deltas", {}).values():
+            if status != "unchanged" and (out_dir / stale["file"]).exists():
+                (out_dir / stale["file"]).unlink()
+        manifest["packs"][code] = entry
+        report.append((code, status, entry, seconds))
+
+    manifest["format"] = PACK_FORMAT
+    manifest["generated"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+
+    print_pack_report(report, elapsed)
+    return manifest
+
+
+def print_pack_report(report: list, elapsed: float):
+    print(f"\n  {'Pack':<10s} {'Status':<10s} {'Version':<17s} {'Raw':>9s} {'Packed':>9s} {'Delta':>9s}")
+    print(f"  {'─' * 10} {'─' * 10} {'─' * 17} {'─' * 9} {'─' * 9} {'─' * 9}")
+    for code, status, entry, _ in report:
+        delta = next(iter(entry["deltas"].values()), None) if status != "unchanged" else None
+        delta_text = f"{delta['bytes'] / 1024:.1f}KB" if delta else "—"
+        print(f"  {code:<10s} {status:<10s} {entry['version']:<17s} {entry['raw_bytes'] / 1024:>7.0f}KB "
+              f"{entry['bytes'] / 1024:>7.0f}KB {delta_text:>9s}")
+    changed = sum(1 for _, status, _, _ in report if status != "unchanged")
+    total = sum(entry["bytes"] for _, _, entry, _ in report)
+    print(f"\n  {changed} of {len(report)} packs rebuilt, {total / (1024 * 1024):.1f} MB total, "
+          f"{elapsed:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-translation offline packs")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Source bible.db")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help=f"Output directory (default: {DEFAULT_OUT})")
+    parser.add_argument(
+        "--translations", "-t", nargs="+", metavar="CODE",
+        help="Translation codes to pack (default: all)"
+    )
+    parser.add_argument("--deltas", action="store_true", help="Write binary deltas from the previous versions")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    codes = [c.upper() for c in args.translations] if args.translations else None
+    print(f"Building offline packs from {args.db} into {args.out}/ ...")
+    build_packs(args.db, args.out, codes, args.deltas, args.workers)
+
+
+if __name__ == "__main__":
+    main()
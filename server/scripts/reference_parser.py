@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Parse Bible references ("1 Cor 13:4", "Jn 3:16-18", "I Sam. 17", "Gen 1:1-2:3").
+
+Book names resolve through an in-memory trie built from the book_aliases
+table (book_aliases.py): an exact alias wins — preferring the requesting
+translation's own names, then the standard English forms — and otherwise
+any prefix that only one book's aliases share ("Deuter", "Phile") resolves
+to that book.
+
+Throughput (--bench): resolving book names runs at thousands per ms, but a
+first-time full parse (regex, trie walk, result dict) is ~400-500 per ms in
+CPython, short of thousands. References repeat in practice, so whole parses
+are cached as typed, and a repeated reference costs a lookup and a copy
+(~1,500 per ms).
+
+Usage:
+    python reference_parser.py "1 Cor 13:4" "Jn 3:16" "Rom 8:28-39"
+    python reference_parser.py -t VDCL "Ioan 3:16"
+    python reference_parser.py --bench 100000      # Parse throughput
+"""
+
+import argparse
+import random
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from book_aliases import STANDARD_ALIASES, fold
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+
+# book, then optional chapter[:verse][-[chapter:]verse]
+# (the book group keeps trailing spaces; fold() drops them)
+REFERENCE_RE = re.compile(
+    r"\s*([1-4]?\s*[^\d\s][^\d]*)"
+    r"(?:(\d+)(?:\s*[:.,]\s*(\d+))?(?:\s*[-–—]\s*(\d+)(?:\s*[:.]\s*(\d+))?)?)?\s*$"
+)
+
+# Names and whole references as typed → result; each cache is cleared when it
+# grows past this (free-form input)
+CACHE_LIMIT = 50_000
+
+# Trie node keys that cannot collide with folded characters
+EXACT = 0   # {translation: book_id} for aliases ending at this node
+BOOKS = 1   # set of book_ids of every alias below this node
+
+
+# ============================================================
+# INDEX
+# ============================================================
+
+def build_trie(aliases) -> dict:
+    """Trie over folded aliases from (alias, translation, book_id) rows."""
+    root = {BOOKS: set()}
+    for alias, translation, book_id in aliases:
+        node = root
+        node[BOOKS].add(book_id)
+        for ch in alias:
+            node = node.setdefault(ch, {BOOKS: set()})
+            node[BOOKS].add(book_id)
+        node.setdefault(EXACT, {})[translation] = book_id
+    return root
+
+
+def load_index(conn: sqlite3.Connection) -> dict:
+    """Reference-parsing index: alias trie + chapter count per book."""
+    trie = build_trie(conn.execute("SELECT alias, translation, book_id FROM book_aliases"))
+    chapters = dict(conn.execute("SELECT book_id, MAX(chapters) FROM books GROUP BY book_id"))
+    return {"trie": trie, "chapters": chapters, "cache": {}, "references": {}}
+
+
+def resolve_key(index: dict, key: str, translation: str = "") -> int | None:
+    """book_id for a folded book key, or None if unknown or ambiguous."""
+    node = index["trie"]
+    for ch in key:
+        node = node.get(ch)
+        if node is None:
+            return None
+    exact = node.get(EXACT)
+    if exact:
+        if translation in exact:
+            return exact[translation]
+        if "" in exact:
+            return exact[""]
+        books = set(exact.values())
+        return books.pop() if len(books) == 1 else None
+    books = node[BOOKS]
+    return next(iter(books)) if len(books) == 1 else None
+
+
+def resolve_book(index: dict, name: str, translation: str = "") -> int | None:
+    """book_id for a book name or abbreviation as typed."""
+    cache = index["cache"]
+    key = (name, translation)
+    if key not in cache:
+        if len(cache) >= CACHE_LIMIT:
+            cache.clear()
+        cache[key] = resolve_key(index, fold(name), translation)
+    return cache[key]
+
+
+# ============================================================
+# PARSER
+# ============================================================
+
+def parse_reference(index: dict, text: str, translation: str = "") -> dict | None:
+    """
+    Parse one reference. Returns {"book_id", "chapter", "verse", "end_chapter",
+    "end_verse"} (None for parts not given), or None if the book is unknown.
+    """
+    references = index["references"]
+    key = (text, translation)
+    if key in references:
+        parsed = references[key]
+        return dict(parsed) if parsed is not None else None
+    if len(references) >= CACHE_LIMIT:
+        references.clear()
+    parsed = references[key] = _parse(index, text, translation)
+    return dict(parsed) if parsed is not None else None
+
+
+def _parse(index: dict, text: str, translation: str) -> dict | None:
+    m = REFERENCE_RE.match(text)
+    if m is None:
+        return None
+    name, chapter, verse, end_a, end_b = m.groups()
+    book_id = resolve_book(index, name, translation)
+
+    chapter = int(chapter) if chapter else None
+    # "Psalm 151" is a book of its own once the number exceeds Psalms' chapters
+    if chapter is not None and verse is None and end_a is None:
+        if book_id is None or chapter > index["chapters"].get(book_id, chapter):
+            whole = resolve_book(index, f"{name}{chapter}", translation)
+            if whole is not None:
+                return {"book_id": whole, "chapter": None, "verse": None, "end_chapter": None, "end_verse": None}
+    if book_id is None:
+        return None
+
+    verse = int(verse) if verse else None
+    end_chapter = end_verse = None
+    if end_b is not None:
+        end_chapter, end_verse = int(end_a), int(end_b)
+    elif end_a is not None:
+        if verse is None:
+            end_chapter = int(end_a)    # "Gen 1-3": chapter range
+        else:
+            end_verse = int(end_a)      # "John 3:16-18": verse range
+    return {"book_id": book_id, "chapter": chapter, "verse": verse, "end_chapter": end_chapter, "end_verse": end_verse}
+
+
+def parse_references(index: dict, texts, translation: str = "") -> list:
+    return [parse_reference(index, text, translation) for text in texts]
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def benchmark(index: dict, conn: sqlite3.Connection, count: int):
+    """Parse `count` references drawn from real book names and standard abbreviations."""
+    rng = random.Random(1)
+    names = [r[0] for r in conn.execute("SELECT DISTINCT name FROM books")]
+    names += [n for forms in STANDARD_ALIASES.values() for n in forms]
+    refs = []
+    for _ in range(count):
+        name = rng.choice(names)
+        shape = rng.random()
+        if shape < 0.5:
+            refs.append(f"{name} {rng.randint(1, 20)}:{rng.randint(1, 30)}")
+        elif shape < 0.8:
+            refs.append(f"{name} {rng.randint(1, 20)}:{rng.randint(1, 10)}-{rng.randint(11, 30)}")
+        else:
+            refs.append(f"{name} {rng.randint(1, 20)}")
+
+    # Cold: every reference parsed from scratch; warm: the same references again
+    index["cache"].clear()
+    index["references"].clear()
+    for label in ("cold", "warm"):
+        started = time.perf_counter()
+        results = parse_references(index, refs)
+        elapsed = time.perf_counter() - started
+        resolved = sum(1 for r in results if r)
+        print(f"  {count:,} references ({label} cache) in {elapsed * 1000:.1f} ms — "
+              f"{count / (elapsed * 1000):,.0f}/ms ({resolved / count:.1%} resolved)")
+
+    # Book-name resolution alone (trie walk, then the typed-name cache)
+    typed = [rng.choice(names) for _ in range(count)]
+    for label in ("cold", "warm"):
+        if label == "cold":
+            index["cache"].clear()
+        started = time.perf_counter()
+        for name in typed:
+            resolve_book(index, name)
+        elapsed = time.perf_counter() - started
+        print(f"  {count:,} book names ({label} cache) in {elapsed * 1000:.1f} ms — "
+              f"{count / (elapsed * 1000):,.0f}/ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse Bible references via the book_aliases trie")
+    parser.add_argument("references", nargs="*", help="References to parse")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument("--translation", "-t", default="", help="Prefer this translation's book names")
+    parser.add_argument("--bench", type=int, metavar="N", help="Benchmark parsing N generated references")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        started = time.perf_counter()
+        index = load_index(conn)
+        print(f"  Index loaded in {(time.perf_counter() - started) * 1000:.0f} ms")
+        for text in args.references:
+            print(f"  {text!r:32s} → {parse_reference(index, text, args.translation.upper())}")
+        if args.bench:
+            benchmark(index, conn, args.bench)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Split the Koinonia Bible database into per-language shards.
+
+Builds, from an imported bible.db:
+  - one SQLite file per language (or per translation, or per custom group),
+    each holding that group's translations with the full serving schema
+    (verses, books, FTS index, token counts, …), finalized like bible.db
+  - catalog.db: every translation and book, plus which shard holds each
+    translation — small enough for every replica to ship, and what
+    server/lib/shardRouter.ts reads to route a translation to its shard
+
+Tables with a `translation` column are split by translation, and tables
+keyed by `language` (the search vocabulary) by the shard's languages; the
+rest (cross_references) are copied into every shard, since the chapter
+queries join them against the shard's own books/verses.
+
+Shards are built in parallel worker processes.
+
+Usage:
+    python shard_db.py                                  # One shard per language
+    python shard_db.py --by translation                 # One shard per translation
+    python shard_db.py --group core=KJV,WEB,SBLGNT,WLC  # Pin translations to a named shard
+    python shard_db.py --db bible.db --out shards/ -j 4
+    python shard_db.py --which KJV                      # Print the shard holding a translation
+"""
+
+import argparse
+import multiprocessing
+import re
+import sqlite3
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+import finalize_db
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+DEFAULT_OUT = Path(__file__).resolve().parent.parent / "shards"
+CATALOG_NAME = "catalog.db"
+
+# Copied into the catalog as-is (every translation)
+CATALOG_TABLES = ["translations", "books"]
+
+
+def shard_slug(label: str) -> str:
+    """Filesystem-safe ASCII name for a shard ('Română' → 'romana')."""
+    ascii_label = unicodedata.normalize("NFKD", label).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", ascii_label.lower()).strip("-")
+
+
+def plan_shards(conn: sqlite3.Connection, by: str = "language", groups: dict | None = None) -> dict:
+    """
+    Assign every translation to a shard. Returns {shard name: [codes]}.
+
+    `groups` pins translation codes or whole languages to a named shard
+    ({"core": ["KJV", "WEB"], "slavic": ["Українська", "Русский"]});
+    everything else is split `by` language or translation.
+    """
+    pinned = {}
+    for name, members in (groups or {}).items():
+        for member in members:
+            pinned[member] = shard_slug(name)
+
+    shards = {}
+    for code, language in conn.execute("SELECT short_name, language FROM translations ORDER BY short_name"):
+        name = pinned.get(code) or pinned.get(language)
+        if name is None:
+            label = language if by == "language" else code
+            # Languages written only in non-Latin script slug to nothing — fall back to the code
+            name = shard_slug(label) or shard_slug(code)
+        shards.setdefault(name, []).append(code)
+    return shards
+
+
+def source_tables(conn: sqlite3.Connection, schema: str = "main"):
+    """
+    (name, create sql, split column, is virtual) for every table to copy. The
+    split column is "translation" when the table has one, "language" when its
+    primary key leads with language, else None. Skips SQLite internals and FTS
+    shadow tables; virtual tables are recreated empty and repopulated from verses.
+    """
+    rows = conn.execute(
+        f"SELECT name, sql FROM {schema}.sqlite_master "
+        f"WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+    ).fetchall()
+    virtual = {name for name, sql in rows if sql.upper().startswith("CREATE VIRTUAL")}
+    tables = []
+    for name, sql in rows:
+        if any(name.startswith(f"{v}_") for v in virtual):
+            continue
+        info = conn.execute(f"PRAGMA {schema}.table_info({name})").fetchall()
+        columns = [r[1] for r in info]
+        key = [r[1] for r in sorted(info, key=lambda r: r[5]) if r[5]]
+        if "translation" in columns:
+            split = "translation"
+        elif key[:1] == ["language"]:
+            split = "language"
+        else:
+            split = None
+        tables.append((name, sql, split, name in virtual))
+    return tables
+
+
+def _fresh(path: Path):
+    for stale in (path, Path(f"{path}-wal"), Path(f"{path}-shm"), Path(f"{path}-journal")):
+        if stale.exists():
+            stale.unlink()
+
+
+def build_shard(task) -> dict:
+    """Worker: build one shard file. task = (source db, shard path, translation codes)."""
+    source, path, codes = task
+    started = time.perf_counter()
+    path = Path(path)
+    _fresh(path)
+
+    # URI mode so the read-only ATTACH below is honoured
+    conn = sqlite3.connect(f"file:{path}", uri=True)
+    # Scratch file until the final VACUUM — no journal needed
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("ATTACH DATABASE ? AS src", (f"file:{source}?mode=ro",))
+
+    tables = source_tables(conn, "src")
+    for _, sql, _, _ in tables:
+        conn.execute(sql)
+    for (sql,) in conn.execute(
+        "SELECT sql FROM src.sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+    ).fetchall():
+        conn.execute(sql)
+
+    # translation = '' marks rows shared by every translation (book_aliases' standard names)
+    keep = {"translation": list(codes) + [""]}
+    keep["language"] = [r[0] for r in conn.execute(
+        f"SELECT DISTINCT language FROM src.translations WHERE short_name IN ({', '.join('?' * len(codes))})", codes
+    )]
+    for name, _, split, is_virtual in tables:
+        if is_virtual:
+            continue
+        if split:
+            values = keep[split]
+            conn.execute(
+                f"INSERT INTO main.{name} SELECT * FROM src.{name} WHERE {split} IN ({', '.join('?' * len(values))})",
+                values,
+            )
+        else:
+            conn.execute(f"INSERT INTO main.{name} SELECT * FROM src.{name}")
+    if any(name == "verses_fts" for name, *_ in tables):
+        conn.execute("""
+            INSERT INTO verses_fts(text, translation, book_id, chapter, verse)
+            SELECT text, translation, book_id, chapter, verse FROM verses
+        """)
+    conn.commit()
+    conn.execute("DETACH DATABASE src")
+
+    verses = conn.execute("SELECT COUNT(*) FROM verses").fetchone()[0]
+    page_size = finalize_db.choose_page_size(conn)
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.execute(f"PRAGMA page_size = {page_size}")
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+
+    return {
+        "file": path.name,
+        "translations": list(codes),
+        "verses": verses,
+        "bytes": path.stat().st_size,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def build_catalog(source: Path, out_dir: Path, shards: dict):
+    """Write catalog.db: translations, books and the translation → shard map."""
+    path = out_dir / CATALOG_NAME
+    _fresh(path)
+    conn = sqlite3.connect(f"file:{path}", uri=True)
+    conn.execute("ATTACH DATABASE ? AS src", (f"file:{source}?mode=ro",))
+    for name, sql, _, _ in source_tables(conn, "src"):
+        if name in CATALOG_TABLES:
+            conn.execute(sql)
+            conn.execute(f"INSERT INTO main.{name} SELECT * FROM src.{name}")
+    conn.executescript("""
+        CREATE TABLE shards (
+            name         TEXT    PRIMARY KEY,
+            file         TEXT    NOT NULL,
+            translations INTEGER NOT NULL,
+            verses       INTEGER NOT NULL,
+            bytes        INTEGER NOT NULL
+        );
+
+        CREATE TABLE translation_shards (
+            translation TEXT PRIMARY KEY,
+            shard       TEXT NOT NULL REFERENCES shards(name)
+        );
+    """)
+    for name, info in shards.items():
+        conn.execute(
+            "INSERT INTO shards (name, file, translations, verses, bytes) VALUES (?, ?, ?, ?, ?)",
+            (name, info["file"], len(info["translations"]), info["verses"], info["bytes"]),
+        )
+        conn.executemany(
+            "INSERT INTO translation_shards (translation, shard) VALUES (?, ?)",
+            [(code, name) for code in info["translations"]],
+        )
+    conn.commit()
+    conn.execute("DETACH DATABASE src")
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+    return path
+
+
+def build_shards(source: Path, out_dir: Path, by: str = "language", groups: dict | None = None,
+                 workers: int | None = None) -> dict:
+    """Plan, build (in parallel) and catalog the shards. Returns {shard: info}."""
+    source = Path(source).resolve()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    plan = plan_shards(conn, by, groups)
+    conn.close()
+
+    # Largest shards first so one big language does not start last
+    tasks = sorted(
+        ((str(source), str(out_dir / f"{name}.db"), codes) for name, codes in plan.items()),
+        key=lambda t: -len(t[2]),
+    )
+    workers = workers or multiprocessing.cpu_count()
+    started = time.perf_counter()
+    with multiprocessing.Pool(min(workers, len(tasks)) or 1) as pool:
+        results = pool.map(build_shard, tasks, chunksize=1)
+    shards = {Path(r["file"]).stem: r for r in results}
+    catalog = build_catalog(source, out_dir, shards)
+    elapsed = time.perf_counter() - started
+
+    print_shard_report(shards, catalog, elapsed, source)
+    return shards
+
+
+def print_shard_report(shards: dict, catalog: Path, elapsed: float, source: Path):
+    mb = 1024 * 1024
+    print(f"\n  {'Shard':<24s} {'Translations':>12s} {'Verses':>10s} {'Size':>10s} {'Build':>8s}")
+    print(f"  {'─' * 24} {'─' * 12} {'─' * 10} {'─' * 10} {'─' * 8}")
+    for name, info in sorted(shards.items(), key=lambda kv: -kv[1]["bytes"]):
+        print(f"  {name:<24s} {len(info['translations']):>12d} {info['verses']:>10,} "
+              f"{info['bytes'] / mb:>8.1f}MB {info['seconds']:>7.1f}s")
+    total = sum(info["bytes"] for info in shards.values())
+    busy = sum(info["seconds"] for info in shards.values())
+    print(f"  {'─' * 24} {'─' * 12} {'─' * 10} {'─' * 10} {'─' * 8}")
+    print(f"  {'Total (' + str(len(shards)) + ' shards)':<24s} "
+          f"{sum(len(i['translations']) for i in shards.values()):>12d} "
+          f"{sum(i['verses'] for i in shards.values()):>10,} {total / mb:>8.1f}MB {busy:>7.1f}s")
+    print(f"\n  Catalog: {catalog} ({catalog.stat().st_size / 1024:.0f} KB)")
+    print(f"  Source:  {source} ({source.stat().st_size / mb:.1f} MB)")
+    print(f"  Built in {elapsed:.1f}s wall ({busy:.1f}s of shard work)")
+
+
+def parse_groups(values: list[str] | None) -> dict:
+    """--group name=KJV,WEB,English → {"name": ["KJV", "WEB", "English"]}."""
+    groups = {}
+    for value in values or []:
+        name, _, members = value.partition("=")
+        if not name or not members:
+            raise argparse.ArgumentTypeError(f"--group expects NAME=CODE,CODE,… (got {value!r})")
+        groups[name] = [m.strip() for m in members.split(",") if m.strip()]
+    return groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split bible.db into per-language shards")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Source bible.db")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help=f"Output directory (default: {DEFAULT_OUT})")
+    parser.add_argument(
+        "--by", choices=["language", "translation"], default="language",
+        help="Shard granularity for translations not pinned by --group (default: language)"
+    )
+    parser.add_argument(
+        "--group", action="append", metavar="NAME=CODE,…",
+        help="Pin translation codes or languages to a named shard (repeatable)"
+    )
+    parser.add_argument("--workers", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--which", metavar="CODE", help="Print the shard file holding a translation and exit")
+    args = parser.parse_args()
+
+    if args.which:
+        catalog = args.out / CATALOG_NAME
+        if not catalog.exists():
+            print(f"ERROR: No catalog at {catalog}")
+            sys.exit(1)
+        conn = sqlite3.connect(f"file:{catalog}?mode=ro", uri=True)
+        row = conn.execute(
+            "SELECT s.file FROM translation_shards t JOIN shards s ON s.name = t.shard WHERE t.translation = ?",
+            (args.which.upper(),),
+        ).fetchone()
+        conn.close()
+        if row is None:
+            print(f"{args.which}: not in any shard")
+            sys.exit(1)
+        print(args.out / row[0])
+        return
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    print(f"Sharding {args.db} by {args.by} into {args.out}/ ...")
+    build_shards(args.db, args.out, args.by, parse_groups(args.group), args.workers)
+
+
+if __name__ == "__main__":
+    main()
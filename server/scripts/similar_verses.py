@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Precompute similar verses / parallel passages for the Koinonia Bible database.
+
+For every translation, over the book list the API serves for it
+(translation_books — so KJV's list includes ENC's 1 Enoch, and Jude 1:14
+can find its quotation), this stage:
+
+  1. shingles each verse (word bigrams; character trigrams for scripts
+     written without spaces),
+  2. builds a MinHash signature per verse with NumPy,
+  3. buckets signatures with banded locality-sensitive hashing, scores the
+     candidate pairs by signature agreement (estimated Jaccard similarity),
+  4. keeps the top-k matches per verse:
+
+    similar_verses(translation, book_id, chapter, verse, rank,
+                   similar_book, similar_chapter, similar_verse, score)
+        PRIMARY KEY (translation, book_id, chapter, verse, rank)
+
+Translations are processed in parallel worker processes; no network or
+models are involved.
+
+Usage:
+    python similar_verses.py                          # Rebuild for every translation
+    python similar_verses.py -t KJV WEB               # Rebuild specific translations
+    python similar_verses.py -k 10 -j 8               # Top-10 per verse, 8 workers
+    python similar_verses.py --verse KJV 41 1 2       # Show matches for Mark 1:2
+"""
+
+import argparse
+import multiprocessing
+import re
+import sqlite3
+import sys
+import time
+import zlib
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: 'numpy' package is required.")
+    print("Install it with: pip install numpy")
+    sys.exit(1)
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+
+TOP_K = 5
+MIN_SIMILARITY = 0.3
+
+# 32 bands x 4 rows: pairs at Jaccard 0.3 become candidates ~23% of the time,
+# at 0.5 ~87%, at 0.7 ~100%
+NUM_PERM = 128
+BAND_ROWS = 4
+# Each verse is paired with at most this many neighbours per bucket, so
+# formulaic lines ("And the LORD spake unto Moses, saying") stay linear
+BUCKET_WINDOW = 32
+
+SEED = 1
+# Shingle hashes per MinHash block (x NUM_PERM x 8 bytes of scratch)
+CHUNK_SHINGLES = 8192
+
+WORD_RE = re.compile(r"\w+")
+
+
+# ============================================================
+# SHINGLING + MINHASH
+# ============================================================
+
+def shingles(text: str) -> set[int]:
+    """Hashed word bigrams; character trigrams when the text has no word breaks (CJK)."""
+    words = WORD_RE.findall(text.casefold())
+    if not words:
+        return set()
+    if len(words) * 8 < len(text):
+        joined = "".join(words)
+        grams = [joined[i:i + 3] for i in range(max(len(joined) - 2, 1))]
+    elif len(words) == 1:
+        grams = words
+    else:
+        grams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return {zlib.crc32(g.encode()) for g in grams}
+
+
+def permutations(num_perm: int = NUM_PERM):
+    """Multiply-shift hash functions h(x) = (a*x + b) >> 32 over uint64, a odd."""
+    rng = np.random.default_rng(SEED)
+    top = np.iinfo(np.uint64).max
+    a = rng.integers(0, top, num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+    b = rng.integers(0, top, num_perm, dtype=np.uint64, endpoint=True)
+    return a[:, None], b[:, None]
+
+
+def minhash_signatures(shingle_sets: list[set[int]], num_perm: int = NUM_PERM) -> np.ndarray:
+    """(verses, num_perm) uint32 MinHash signatures. Every set must be non-empty."""
+    lengths = np.fromiter((len(s) for s in shingle_sets), dtype=np.int64, count=len(shingle_sets))
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    hashes = np.fromiter((h for s in shingle_sets for h in s), dtype=np.uint64, count=int(offsets[-1]))
+    a, b = permutations(num_perm)
+
+    # Permutation-major, so each block's scratch stays in cache and the
+    # per-verse minimum runs along contiguous rows
+    signatures = np.empty((num_perm, len(lengths)), dtype=np.uint32)
+    start = 0
+    while start < len(lengths):
+        # Whole verses per block, about CHUNK_SHINGLES hashes each
+        end = int(np.searchsorted(offsets, offsets[start] + CHUNK_SHINGLES, side="right")) - 1
+        end = min(max(end, start + 1), len(lengths))
+        lo, hi = offsets[start], offsets[end]
+        permuted = np.multiply(a, hashes[None, lo:hi])   # wraps mod 2^64
+        permuted += b
+        permuted >>= np.uint64(32)
+        signatures[:, start:end] = np.minimum.reduceat(permuted, offsets[start:end] - lo, axis=1)
+        start = end
+    return np.ascontiguousarray(signatures.T)
+
+
+# ============================================================
+# LOCALITY-SENSITIVE HASHING
+# ============================================================
+
+def candidate_pairs(signatures: np.ndarray, rows: int = BAND_ROWS, window: int = BUCKET_WINDOW) -> np.ndarray:
+    """Unique (i, j), i < j, sharing at least one band bucket. Shape (pairs, 2)."""
+    n, num_perm = signatures.shape
+    found = []
+    for band in range(num_perm // rows):
+        cols = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = cols[:, 0]
+        for c in range(1, rows):
+            keys = keys * np.uint64(0x100000001B3) ^ cols[:, c]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        for d in range(1, min(window, n - 1) + 1):
+            same = sorted_keys[d:] == sorted_keys[:-d]
+            if not same.any():
+                break
+            i, j = order[:-d][same], order[d:][same]
+            found.append(np.minimum(i, j) * n + np.maximum(i, j))
+    if not found:
+        return np.empty((0, 2), dtype=np.int64)
+    packed = np.unique(np.concatenate(found))
+    return np.stack([packed // n, packed % n], axis=1)
+
+
+def score_pairs(signatures: np.ndarray, pairs: np.ndarray, chunk: int = 200_000) -> np.ndarray:
+    """Estimated Jaccard similarity (fraction of equal MinHash slots) per pair."""
+    scores = np.empty(len(pairs), dtype=np.float32)
+    for s in range(0, len(pairs), chunk):
+        p = pairs[s:s + chunk]
+        scores[s:s + chunk] = (signatures[p[:, 0]] == signatures[p[:, 1]]).mean(axis=1)
+    return scores
+
+
+def top_k(pairs: np.ndarray, scores: np.ndarray, k: int):
+    """Both directions of each pair, best k per source verse. Returns (src, dst, score, rank)."""
+    src = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    dst = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    sc = np.concatenate([scores, scores])
+    # By source, then best score first (ties: earlier verse first)
+    order = np.lexsort((dst, -sc, src))
+    src, dst, sc = src[order], dst[order], sc[order]
+    group_start = np.r_[0, np.flatnonzero(np.diff(src)) + 1]
+    rank = np.arange(len(src)) - np.repeat(group_start, np.diff(np.r_[group_start, len(src)]))
+    keep = rank < k
+    return src[keep], dst[keep], sc[keep], rank[keep]
+
+
+# ============================================================
+# BUILD
+# ============================================================
+
+def _signed_verses(conn: sqlite3.Connection, sql: str, params) -> tuple:
+    """(refs, signatures) for the (book_id, chapter, verse, text) rows of a query; refs is (n, 3)."""
+    refs, sets = [], []
+    for book_id, chapter, verse, text in conn.execute(sql, params):
+        s = shingles(text)
+        if s:
+            refs.append((book_id, chapter, verse))
+            sets.append(s)
+    refs = np.array(refs, dtype=np.int64).reshape(-1, 3)
+    signatures = minhash_signatures(sets) if sets else np.empty((0, NUM_PERM), dtype=np.uint32)
+    return refs, signatures
+
+
+def sign_source(task) -> tuple:
+    """Worker: signatures of the books a source lends to other translations. task = (db path, source, book ids)."""
+    db_path, source, books = task
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        refs, signatures = _signed_verses(conn, f"""
+            SELECT book_id, chapter, verse, text FROM verses
+            WHERE translation = ? AND book_id IN ({",".join("?" * len(books))})
+        """, [source, *books])
+    finally:
+        conn.close()
+    return source, refs, signatures
+
+
+def similar_for_translation(task) -> tuple:
+    """
+    Worker: all similar_verses rows for one translation. task = (db path,
+    code, k, min similarity, {source: (refs, signatures)} of borrowed books).
+    """
+    db_path, code, k, min_similarity, lent = task
+    started = time.perf_counter()
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        own_refs, own_signatures = _signed_verses(conn, """
+            SELECT v.book_id, v.chapter, v.verse, v.text
+            FROM translation_books tb
+            JOIN verses v ON v.translation = tb.source AND v.book_id = tb.book_id
+            WHERE tb.translation = ? AND tb.source = tb.translation
+        """, (code,))
+        borrowed = conn.execute(
+            "SELECT source, book_id FROM translation_books WHERE translation = ? AND source != translation", (code,)
+        ).fetchall()
+    finally:
+        conn.close()
+
+    # The translation's own verses plus the borrowed books' (signed once per source)
+    parts_refs, parts_signatures = [own_refs], [own_signatures]
+    for source in sorted({source for source, _ in borrowed}):
+        refs, signatures = lent[source]
+        keep = np.isin(refs[:, 0], [b for s, b in borrowed if s == source])
+        parts_refs.append(refs[keep])
+        parts_signatures.append(signatures[keep])
+    refs = np.concatenate(parts_refs)
+    # Book list order, as the API serves it
+    order = np.lexsort((refs[:, 2], refs[:, 1], refs[:, 0]))
+    refs = [tuple(r) for r in refs[order].tolist()]
+    signatures = np.concatenate(parts_signatures)[order]
+    if len(refs) < 2:
+        return code, [], len(refs), time.perf_counter() - started
+
+    pairs = candidate_pairs(signatures)
+    scores = score_pairs(signatures, pairs)
+    good = scores >= min_similarity
+    src, dst, sc, rank = top_k(pairs[good], scores[good], k)
+
+    rows = [
+        (code, *refs[s], int(r) + 1, *refs[d], round(float(score), 3))
+        for s, d, score, r in zip(src.tolist(), dst.tolist(), sc.tolist(), rank.tolist())
+    ]
+    return code, rows, len(refs), time.perf_counter() - started
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS similar_verses (
+            translation     TEXT    NOT NULL,
+            book_id         INTEGER NOT NULL,
+            chapter         INTEGER NOT NULL,
+            verse           INTEGER NOT NULL,
+            rank            INTEGER NOT NULL,
+            similar_book    INTEGER NOT NULL,
+            similar_chapter INTEGER NOT NULL,
+            similar_verse   INTEGER NOT NULL,
+            score           REAL    NOT NULL,
+            PRIMARY KEY (translation, book_id, chapter, verse, rank)
+        ) WITHOUT ROWID;
+    """)
+
+
+def borrower_scope(conn: sqlite3.Connection, changed) -> list[str]:
+    """Changed translations + those whose resolved book lists borrow from one (e.g. ENC's books)."""
+    if not changed:
+        return []
+    placeholders = ",".join("?" * len(changed))
+    borrowers = {r[0] for r in conn.execute(
+        f"SELECT DISTINCT translation FROM translation_books WHERE source IN ({placeholders})", sorted(changed)
+    )}
+    return sorted(set(changed) | borrowers)
+
+
+def database_path(conn: sqlite3.Connection) -> str:
+    return next(r[2] for r in conn.execute("PRAGMA database_list") if r[1] == "main")
+
+
+def build_similar_verses(conn: sqlite3.Connection, translations: list[str] | None = None,
+                         k: int = TOP_K, min_similarity: float = MIN_SIMILARITY,
+                         workers: int | None = None) -> int:
+    """
+    Rebuild similar_verses for the given translations (default: all) in
+    worker processes reading the committed database. Returns rows written.
+    """
+    ensure_schema(conn)
+    conn.commit()
+    if translations is None:
+        translations = [r[0] for r in conn.execute("SELECT short_name FROM translations ORDER BY short_name")]
+    if not translations:
+        return 0
+    db_path = database_path(conn)
+
+    # Books served from another translation (ENC's non-canonical books, KJV's
+    # deuterocanon) are shingled and signed once per source, not per borrower
+    placeholders = ",".join("?" * len(translations))
+    lent, sources_of = {}, {}
+    for code, source, book_id in conn.execute(f"""
+        SELECT translation, source, book_id FROM translation_books
+        WHERE translation IN ({placeholders}) AND source != translation
+    """, translations):
+        lent.setdefault(source, set()).add(book_id)
+        sources_of.setdefault(code, set()).add(source)
+
+    # Largest first so one big translation does not start last
+    sizes = dict(conn.execute("SELECT translation, verses FROM translation_capabilities"))
+    workers = min(workers or multiprocessing.cpu_count(), len(translations))
+    total = 0
+    with multiprocessing.Pool(workers) as pool:
+        signed = {
+            source: (refs, signatures)
+            for source, refs, signatures in pool.imap_unordered(
+                sign_source, [(db_path, source, sorted(books)) for source, books in lent.items()]
+            )
+        }
+        tasks = sorted(
+            ((db_path, code, k, min_similarity, {s: signed[s] for s in sources_of.get(code, ())})
+             for code in translations),
+            key=lambda t: -sizes.get(t[1], 0),
+        )
+        for code, rows, verses, seconds in pool.imap_unordered(similar_for_translation, tasks):
+            conn.execute("DELETE FROM similar_verses WHERE translation = ?", (code,))
+            conn.executemany(
+                "INSERT INTO similar_verses (translation, book_id, chapter, verse, rank, "
+                "similar_book, similar_chapter, similar_verse, score) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+            total += len(rows)
+            print(f"  {code:12s} {verses:>7,} verses → {len(rows):>8,} matches ({seconds:.1f}s)")
+    return total
+
+
+def similar(conn: sqlite3.Connection, translation: str, book_id: int, chapter: int, verse: int) -> list[dict]:
+    return [
+        {"book_id": b, "chapter": c, "verse": v, "score": score}
+        for b, c, v, score in conn.execute("""
+            SELECT similar_book, similar_chapter, similar_verse, score FROM similar_verses
+            WHERE translation = ? AND book_id = ? AND chapter = ? AND verse = ?
+            ORDER BY rank
+        """, (translation, book_id, chapter, verse))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute similar verses with MinHash LSH")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument("--translations", "-t", nargs="+", help="Only these translations (default: all)")
+    parser.add_argument("-k", type=int, default=TOP_K, help=f"Matches kept per verse (default: {TOP_K})")
+    parser.add_argument(
+        "--min-similarity", type=float, default=MIN_SIMILARITY,
+        help=f"Minimum estimated Jaccard similarity (default: {MIN_SIMILARITY})"
+    )
+    parser.add_argument("--workers", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--verse", nargs=4, metavar=("CODE", "BOOK", "CH", "V"), help="Print matches for one verse")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    if args.verse:
+        conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+        code, book, chapter, verse = args.verse[0].upper(), *map(int, args.verse[1:])
+        for row in similar(conn, code, book, chapter, verse):
+            print(f"  {row['book_id']:>3d} {row['chapter']:>3d}:{row['verse']:<3d}  {row['score']:.3f}")
+        conn.close()
+        return
+
+    conn = sqlite3.connect(str(args.db))
+    try:
+        translations = [t.upper() for t in args.translations] if args.translations else None
+        print("Finding similar verses (MinHash LSH)...")
+        started = time.perf_counter()
+        total = build_similar_verses(conn, translations, args.k, args.min_similarity, args.workers)
+        print(f"  {total:,} rows in {time.perf_counter() - started:.1f}s.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Strong's-number lemma index for the Koinonia Bible database.
+
+Bolls tags the original-language lemma after each word of some translations
+(KJV: "In the beginning<S>7225</S> God<S>430</S> created<S>1254</S> …").
+strip_html() removes those tags from the stored text; the importer passes the
+raw verse through extract_strongs() first and keeps them here as an inverted
+index, clustered by lemma:
+
+    verse_strongs(lemma, translation, book_id, chapter, verse, positions)
+        PRIMARY KEY (lemma, translation, book_id, chapter, verse)
+
+`lemma` is the prefixed Strong's number — H for Old Testament books, G for
+the rest — and `positions` the 0-based indexes of the words it tags in the
+stored verse text (little-endian uint16). Every occurrence of a lemma is one
+contiguous primary-key range, so word studies ("where else is G26 used?")
+are index lookups instead of FTS scans of English renderings.
+
+The raw tags are not kept anywhere else: the index is built during
+import_bible.py and rebuilt only by re-importing.
+
+Usage:
+    python strongs_index.py G26                     # Occurrences of a lemma
+    python strongs_index.py G26 -t KJV --limit 20
+    python strongs_index.py --count H430            # Verse / occurrence counts per translation
+    python strongs_index.py --verse KJV 43 3 16     # Lemmas tagged in one verse
+    python strongs_index.py --bench 200             # Index lookups vs FTS on the English rendering
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+import time
+from array import array
+from collections import Counter
+from html import unescape
+from pathlib import Path
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+
+STRONGS_TAG_RE = re.compile(r"<S>(\d+)</S>")
+LEMMA_RE = re.compile(r"^\s*([HG])?\s*0*(\d+)\s*$", re.IGNORECASE)
+
+# Same removals as import_bible.strip_html, so word positions line up with the stored text
+SUP_RE = re.compile(r"<sup>.*?</sup>", re.DOTALL)
+BR_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+TAG_RE = re.compile(r"<[^>]+>")
+WORD_RE = re.compile(r"\w+")
+
+
+# ============================================================
+# EXTRACTION (import time)
+# ============================================================
+
+def lemma_prefix(book_id: int) -> str:
+    """H for the Hebrew Old Testament, G for the NT and Greek deuterocanon."""
+    return "H" if book_id <= 39 else "G"
+
+
+def normalize_lemma(text: str, default_prefix: str = "G") -> str | None:
+    """'g0026' / 'G26' / '26' → 'G26'. None if not a Strong's number."""
+    m = LEMMA_RE.match(text or "")
+    if m is None:
+        return None
+    return f"{(m.group(1) or default_prefix).upper()}{int(m.group(2))}"
+
+
+def _clean(fragment: str) -> str:
+    return unescape(TAG_RE.sub("", SUP_RE.sub("", BR_RE.sub("\n", fragment))))
+
+
+def extract_strongs(raw_text: str, book_id: int) -> dict:
+    """
+    {lemma: [word positions]} for one raw (tagged) verse. A tag belongs to
+    the word before it; several tags after one word all point at that word.
+
+    Positions index the whitespace-separated words of the stored text, so text
+    right after a tag with no space before it ("said<S>559</S>, Let") stays
+    part of the tagged word ("said,") instead of counting as a word.
+    """
+    if not raw_text or "<S>" not in raw_text:
+        return {}
+    prefix = lemma_prefix(book_id)
+    postings = {}
+    words = 0
+    # Whether the text so far ends between words (a fragment's first token starts a new one)
+    at_break = True
+    last = 0
+    for m in STRONGS_TAG_RE.finditer(raw_text):
+        fragment = _clean(raw_text[last:m.start()])
+        last = m.end()
+        tokens = len(fragment.split())
+        if tokens:
+            glued = not at_break and not fragment[0].isspace()
+            words += tokens - glued
+            at_break = fragment[-1].isspace()
+        elif fragment:
+            at_break = True
+        postings.setdefault(f"{prefix}{int(m.group(1))}", []).append(max(words - 1, 0))
+    return postings
+
+
+def encode_positions(positions) -> bytes:
+    arr = array("H", positions)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def decode_positions(blob: bytes) -> list[int]:
+    arr = array("H")
+    arr.frombytes(blob)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tolist()
+
+
+def posting_rows(translation: str, book_id: int, chapter: int, verse: int, raw_text: str) -> list[tuple]:
+    """verse_strongs rows for one raw verse (empty if it carries no tags)."""
+    return [
+        (lemma, translation, book_id, chapter, verse, encode_positions(positions))
+        for lemma, positions in extract_strongs(raw_text, book_id).items()
+    ]
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS verse_strongs (
+            lemma       TEXT    NOT NULL,
+            translation TEXT    NOT NULL,
+            book_id     INTEGER NOT NULL,
+            chapter     INTEGER NOT NULL,
+            verse       INTEGER NOT NULL,
+            positions   BLOB    NOT NULL,
+            PRIMARY KEY (lemma, translation, book_id, chapter, verse)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_verse_strongs_verse
+            ON verse_strongs(translation, book_id, chapter, verse);
+    """)
+
+
+def insert_postings(conn: sqlite3.Connection, rows: list[tuple]):
+    conn.executemany(
+        "INSERT OR REPLACE INTO verse_strongs (lemma, translation, book_id, chapter, verse, positions) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def occurrences(conn: sqlite3.Connection, lemma: str, translation: str | None = None,
+                limit: int | None = None) -> list[dict]:
+    """Every verse tagged with a lemma, in canonical order, with word positions."""
+    lemma = normalize_lemma(lemma) or lemma
+    sql = "SELECT translation, book_id, chapter, verse, positions FROM verse_strongs WHERE lemma = ?"
+    params = [lemma]
+    if translation:
+        sql += " AND translation = ?"
+        params.append(translation)
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return [
+        {"translation": t, "book_id": b, "chapter": c, "verse": v, "positions": decode_positions(p)}
+        for t, b, c, v, p in conn.execute(sql, params)
+    ]
+
+
+def lemma_counts(conn: sqlite3.Connection, lemma: str) -> dict:
+    """{translation: {"verses", "occurrences"}} for a lemma."""
+    lemma = normalize_lemma(lemma) or lemma
+    return {
+        t: {"verses": verses, "occurrences": occ}
+        for t, verses, occ in conn.execute("""
+            SELECT translation, COUNT(*), SUM(length(positions)) / 2
+            FROM verse_strongs WHERE lemma = ?
+            GROUP BY translation
+        """, (lemma,))
+    }
+
+
+def verse_lemmas(conn: sqlite3.Connection, translation: str, book_id: int, chapter: int, verse: int) -> list[dict]:
+    """Lemmas tagged in one verse, in word order."""
+    rows = [
+        {"lemma": lemma, "positions": decode_positions(p)}
+        for lemma, p in conn.execute(
+            "SELECT lemma, positions FROM verse_strongs "
+            "WHERE translation = ? AND book_id = ? AND chapter = ? AND verse = ?",
+            (translation, book_id, chapter, verse),
+        )
+    ]
+    return sorted(rows, key=lambda r: r["positions"][0])
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def rendering(conn: sqlite3.Connection, lemma: str, translation: str, sample: int = 200) -> str | None:
+    """Most common word a translation uses at a lemma's tagged positions."""
+    words = Counter()
+    for occ in occurrences(conn, lemma, translation, limit=sample):
+        row = conn.execute(
+            "SELECT text FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? AND verse = ?",
+            (translation, occ["book_id"], occ["chapter"], occ["verse"]),
+        ).fetchone()
+        if row is None:
+            continue
+        tokens = row[0].split()
+        for pos in occ["positions"]:
+            if pos < len(tokens):
+                found = WORD_RE.findall(tokens[pos].lower())
+                if found:
+                    words[found[0]] += 1
+    return words.most_common(1)[0][0] if words else None
+
+
+def benchmark(conn: sqlite3.Connection, translation: str, lemmas: int):
+    """
+    Time an index lookup of each lemma against the FTS search the AI would
+    otherwise run for its English rendering, and compare the verse sets.
+    """
+    top = [r[0] for r in conn.execute("""
+        SELECT lemma FROM verse_strongs WHERE translation = ?
+        GROUP BY lemma ORDER BY COUNT(*) DESC LIMIT ?
+    """, (translation, lemmas))]
+    cases = [(lemma, word) for lemma in top if (word := rendering(conn, lemma, translation))]
+    if not cases:
+        print(f"  No Strong's-tagged verses for {translation}.")
+        return
+
+    index_time = fts_time = 0.0
+    index_rows = fts_rows = shared = 0
+    for lemma, word in cases:
+        started = time.perf_counter()
+        tagged = {(o["book_id"], o["chapter"], o["verse"]) for o in occurrences(conn, lemma, translation)}
+        index_time += time.perf_counter() - started
+
+        started = time.perf_counter()
+        matched = {
+            (b, c, v) for b, c, v in conn.execute(
+                "SELECT book_id, chapter, verse FROM verses_fts WHERE verses_fts MATCH ? AND translation = ?",
+                (f'"{word}"', translation),
+            )
+        }
+        fts_time += time.perf_counter() - started
+
+        index_rows += len(tagged)
+        fts_rows += len(matched)
+        shared += len(tagged & matched)
+
+    n = len(cases)
+    print(f"  {n} lemmas in {translation} (most frequent first, FTS on each lemma's commonest rendering)")
+    print(f"  {'':14s} {'ms/query':>10s} {'verses':>10s}")
+    print(f"  {'verse_strongs':14s} {index_time / n * 1000:>10.3f} {index_rows:>10,}")
+    print(f"  {'FTS5':14s} {fts_time / n * 1000:>10.3f} {fts_rows:>10,}")
+    print(f"  Speed-up: {fts_time / index_time:.1f}x   "
+          f"FTS recall {shared / index_rows:.1%}, precision {shared / max(fts_rows, 1):.1%}")
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the Strong's-number lemma index")
+    parser.add_argument("lemma", nargs="?", help="Strong's number (G26, H430)")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument("--translation", "-t", default=None, help="Restrict to one translation")
+    parser.add_argument("--limit", type=int, default=50, help="Max occurrences to print (default: 50)")
+    parser.add_argument("--count", metavar="LEMMA", help="Verse / occurrence counts per translation")
+    parser.add_argument("--verse", nargs=4, metavar=("CODE", "BOOK", "CH", "V"), help="Lemmas in one verse")
+    parser.add_argument("--bench", type=int, metavar="N", help="Benchmark the N most frequent lemmas against FTS")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        if args.count:
+            for translation, counts in lemma_counts(conn, args.count).items():
+                print(f"  {translation:10s} {counts['verses']:>6,} verses  {counts['occurrences']:>6,} occurrences")
+        elif args.verse:
+            code, book, chapter, verse = args.verse[0].upper(), *map(int, args.verse[1:])
+            for row in verse_lemmas(conn, code, book, chapter, verse):
+                print(f"  {row['lemma']:8s} words {row['positions']}")
+        elif args.bench:
+            benchmark(conn, (args.translation or "KJV").upper(), args.bench)
+        elif args.lemma:
+            translation = args.translation.upper() if args.translation else None
+            for occ in occurrences(conn, args.lemma, translation, args.limit):
+                print(f"  {occ['translation']:8s} {occ['book_id']:>3d} {occ['chapter']:>3d}:{occ['verse']:<3d} "
+                      f"words {occ['positions']}")
+        else:
+            parser.print_help()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the book-name folding shared by book_aliases.py fold(),
+bible.fold_book_name() and server/lib/db.ts foldBookName() (no database).
+
+Aliases are stored with fold() and looked up with the other two, so all
+three must give the same key. db.ts's function is run with node when it is
+on PATH.
+Run: python server/scripts/test_book_aliases.py
+"""
+
+import json
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from book_aliases import fold
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bible import fold_book_name  # noqa: E402
+
+DB_TS = Path(__file__).resolve().parent.parent / "lib" / "db.ts"
+
+CASES = {
+    "1 Cor.": "1cor",
+    "I  Corinthiens": "icorinthiens",
+    "Ioan": "ioan",
+    "Ιωάννης": "ιωαννησ",
+    "ΙΩΆΝΝΗΣ Α΄": "ιωαννησα",
+    "Κατὰ Ματθαῖον": "καταματθαιον",
+    "Straße": "strasse",
+    "GROẞE": "grosse",
+    "Євангелія від Івана": "євангеліявідівана",
+    "Bereșit": "beresit",
+    "Ⅱ Kings": "iikings",
+    "1 Иоанна": "1иоанна",
+}
+
+passed = failed = 0
+
+
+def check(name: str, ok: bool, detail: str = ""):
+    global passed, failed
+    if ok:
+        passed += 1
+        print(f"  PASS  {name}")
+    else:
+        failed += 1
+        print(f"  FAIL  {name} {detail}")
+
+
+def fold_with_node(names: list[str]) -> list[str] | None:
+    """db.ts foldBookName() over the names, or None without node."""
+    node = shutil.which("node")
+    if node is None:
+        return None
+    source = DB_TS.read_text()
+    body = re.search(r"export function foldBookName\(name: string\): string \{(.*?)\n\}", source, re.S).group(1)
+    script = (f"function foldBookName(name) {{{body}\n}}\n"
+              f"console.log(JSON.stringify({json.dumps(names)}.map(foldBookName)));")
+    out = subprocess.run([node, "-e", script], capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+def main():
+    print("\n=== book_aliases.fold() ===")
+    for name, key in CASES.items():
+        check(f"{name!r} -> {key!r}", fold(name) == key, repr(fold(name)))
+
+    print("\n=== bible.fold_book_name() ===")
+    for name in CASES:
+        check(f"{name!r}", fold_book_name(name) == fold(name), repr(fold_book_name(name)))
+
+    print("\n=== db.ts foldBookName() ===")
+    folded = fold_with_node(list(CASES))
+    if folded is None:
+        print("  SKIP  node not found")
+    else:
+        for name, key in zip(CASES, folded):
+            check(f"{name!r}", key == fold(name), f"{key!r} != {fold(name)!r}")
+
+    print(f"\n{passed} passed, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test script for downloads.py against a local flaky HTTP server (no network).
+
+The stand-in serves a ~3 MB JSON document (gzip when asked, with an ETag and
+Range support) and drops the connection mid-body on the first requests.
+Run: python server/scripts/test_downloads.py
+"""
+
+import gzip
+import hashlib
+import json
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import downloads
+
+PAYLOAD = json.dumps([
+    {"pk": i, "translation": "TEST", "book": 1 + i % 66, "chapter": 1 + i % 50, "verse": 1 + i % 30,
+     "text": f"Verse {i} — in the beginning was the Word, and the Word was with God. {i * 7919 % 104729}"}
+    for i in range(25_000)
+]).encode()
+GZIPPED = gzip.compress(PAYLOAD, mtime=0)
+ETAG = '"' + hashlib.sha256(GZIPPED).hexdigest()[:16] + '"'
+
+
+class FlakyServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, drops: int = 0, ranges: bool = True, gzip_ok: bool = True):
+        super().__init__(("127.0.0.1", 0), FlakyHandler)
+        self.drops = drops          # GETs to cut off mid-body
+        self.ranges = ranges
+        self.gzip_ok = gzip_ok
+        self.requests = []          # (Range header, bytes sent)
+        self.connections = set()
+        self.lock = threading.Lock()
+
+    def url(self, path: str = "/static/translations/TEST.json") -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        use_gzip = server.gzip_ok and "gzip" in self.headers.get("Accept-Encoding", "")
+        body = GZIPPED if use_gzip else PAYLOAD
+        start = 0
+        range_header = self.headers.get("Range")
+        if server.ranges and range_header and self.headers.get("If-Range") == ETAG:
+            start = int(range_header.split("=")[1].split("-")[0])
+
+        with server.lock:
+            server.connections.add(self.client_address)
+            drop = server.drops > 0
+            server.drops -= 1
+
+        if start:
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body) - start))
+        self.send_header("ETag", ETAG)
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+
+        chunk = body[start:]
+        if drop:
+            # Cut the connection partway through the body
+            chunk = chunk[:max(len(chunk) // 3, 1)]
+            self.wfile.write(chunk)
+            self.wfile.flush()
+            self.close_connection = True
+            with server.lock:
+                server.requests.append((range_header, len(chunk)))
+            return
+        self.wfile.write(chunk)
+        with server.lock:
+            server.requests.append((range_header, len(chunk)))
+
+
+def serve(**kwargs) -> FlakyServer:
+    server = FlakyServer(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+passed = failed = 0
+
+
+def check(name: str, ok: bool, detail: str = ""):
+    global passed, failed
+    if ok:
+        passed += 1
+        print(f"  PASS  {name}")
+    else:
+        failed += 1
+        print(f"  FAIL  {name} {detail}")
+
+
+def main():
+    downloads.DOWNLOAD_DIR = Path(tempfile.mkdtemp(prefix="koinonia-downloads-test-"))
+    downloads.BACKOFF_BASE = 0.01
+    expected = json.loads(PAYLOAD)
+
+    print("\n=== Resume after mid-body drops (gzip) ===")
+    server = serve(drops=3)
+    data = downloads.fetch_json(server.url(), "TEST")
+    check("payload intact", data == expected)
+    ranges = [r for r, _ in server.requests]
+    check("first request is a full GET", ranges[0] is None, str(ranges))
+    check("retries resume with Range", all(r and r.startswith("bytes=") for r in ranges[1:]), str(ranges))
+    sent = sum(n for _, n in server.requests)
+    check("no byte sent twice", sent == len(GZIPPED), f"{sent:,} sent for {len(GZIPPED):,}")
+    server.shutdown()
+
+    print("\n=== Checksum ===")
+    server = serve()
+    digest = hashlib.sha256(PAYLOAD).hexdigest()
+    check("matching sha256 accepted", downloads.fetch_json(server.url(), "TEST", sha256=digest) == expected)
+    try:
+        downloads.fetch_json(server.url(), "TEST", sha256="0" * 64)
+        check("wrong sha256 rejected", False)
+    except downloads.DownloadError:
+        check("wrong sha256 rejected", True)
+    server.shutdown()
+
+    print("\n=== Keep-alive pooling ===")
+    server = serve()
+    for _ in range(5):
+        downloads.fetch_json(server.url(), "TEST")
+    check("5 downloads over 1 connection", len(server.connections) == 1, f"{len(server.connections)} connections")
+    server.shutdown()
+
+    print("\n=== Server without Range support (identity) ===")
+    server = serve(drops=2, ranges=False, gzip_ok=False)
+    check("restarts from zero and completes", downloads.fetch_json(server.url(), "TEST") == expected)
+    check("three full GETs", len(server.requests) == 3, str(len(server.requests)))
+    server.shutdown()
+
+    print("\n=== Persistent failure ===")
+    server = serve(drops=10 ** 6, ranges=False)
+    downloads.MAX_STALLS = 3
+    try:
+        downloads.fetch_json(server.url(), "TEST")
+        check("gives up after MAX_STALLS attempts without progress", False)
+    except downloads.DownloadError:
+        check("gives up after MAX_STALLS attempts without progress", len(server.requests) == 4,
+              f"{len(server.requests)} requests")
+    server.shutdown()
+
+    print("\n=== Jittered backoff ===")
+    delays = []
+    worker = threading.Thread(target=lambda: delays.append([downloads.backoff(3) for _ in range(3)]))
+    worker.start()
+    worker.join()
+    mine = [downloads.backoff(3) for _ in range(3)]
+    check("within the cap", all(0 <= d <= downloads.BACKOFF_BASE * 8 for d in mine + delays[0]))
+    check("per-thread generators differ", mine != delays[0])
+
+    print(f"\n{passed} passed, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
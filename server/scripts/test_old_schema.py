@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for serving a bible.db built before translation_books,
+book_aliases and verse_map (no network, no Bun).
+
+Builds a small database with the old schema and runs server/lib/db.ts's
+fallback statements (books, bookSource, alignedChapter) against it with
+sqlite3, then the bible package and hot_set.py's renders, which mirror them.
+Run: python server/scripts/test_old_schema.py
+"""
+
+import re
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+import hot_set
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bible import Bible  # noqa: E402
+
+DB_TS = Path(__file__).resolve().parent.parent / "lib" / "db.ts"
+
+passed = failed = 0
+
+
+def check(name: str, ok: bool, detail: str = ""):
+    global passed, failed
+    if ok:
+        passed += 1
+        print(f"  PASS  {name}")
+    else:
+        failed += 1
+        print(f"  FAIL  {name} {detail}")
+
+
+# ============================================================
+# FIXTURE
+# ============================================================
+
+def old_schema_db() -> sqlite3.Connection:
+    """KJV and VDCL with their own Tobit, WEB without it, ENC with 1 Enoch."""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE translations (short_name TEXT PRIMARY KEY, full_name TEXT, language TEXT, direction TEXT);
+        CREATE TABLE books (translation TEXT, book_id INTEGER, name TEXT, chapters INTEGER,
+                            chron_order INTEGER, testament TEXT, PRIMARY KEY (translation, book_id));
+        CREATE TABLE verses (translation TEXT, book_id INTEGER, chapter INTEGER, verse INTEGER, text TEXT,
+                             PRIMARY KEY (translation, book_id, chapter, verse));
+    """)
+    books = {
+        "KJV": [(1, "Genesis", "OT"), (67, "Tobit", "DC")],
+        "VDCL": [(1, "Geneza", "OT"), (67, "Tobit", "DC")],
+        "WEB": [(1, "Genesis", "OT")],
+        "ENC": [(90, "1 Enoch", "NC")],
+    }
+    for code, listed in books.items():
+        conn.execute("INSERT INTO translations VALUES (?, ?, ?, 'ltr')", (code, code, "English"))
+        for book_id, name, testament in listed:
+            conn.execute("INSERT INTO books VALUES (?, ?, ?, 1, ?, ?)", (code, book_id, name, book_id, testament))
+            for verse in (1, 2):
+                conn.execute("INSERT INTO verses VALUES (?, ?, 1, ?, ?)",
+                             (code, book_id, verse, f"{code} {name} 1:{verse}"))
+    conn.commit()
+    return conn
+
+
+# ============================================================
+# db.ts STATEMENTS
+# ============================================================
+
+def fallback_statement(source: str, key: str) -> str:
+    """The statement db.ts prepares for `key` when the newer tables are missing."""
+    helper = re.search(r"function fallbackSource\(translation: string, bookId: string\): string \{\s*return `(.*?)`;",
+                       source, re.S).group(1)
+    picked = re.search(r"const pickedSources = \w+\s*\?\s*`.*?`\s*:\s*`(.*?)`;", source, re.S).group(1)
+    body = re.search(rf"\n  {key}: (.*?)(?=\n\n  //|\n\n  \w+:|\n}};)", source, re.S).group(1)
+    literals = re.findall(r"`[^`]*`|\"[^\"]*\"", body)
+    sql = literals[-1][1:-1]        # `flag ? newer : fallback` — the fallback comes last
+    sql = sql.replace("${pickedSources}", picked)
+
+    def expand(match):
+        translation, book_id = match.group(1), match.group(2)
+        return helper.replace("${translation}", translation).replace("${bookId}", book_id)
+
+    return re.sub(r'\$\{fallbackSource\("([^"]+)", "([^"]+)"\)\}', expand, sql)
+
+
+def main():
+    source = DB_TS.read_text()
+    conn = old_schema_db()
+
+    print("\n=== bookSource without translation_books ===")
+    book_source = fallback_statement(source, "bookSource")
+    for translation, book_id, expected in [
+        ("VDCL", 67, "VDCL"), ("KJV", 67, "KJV"), ("WEB", 67, "KJV"),
+        ("WEB", 90, "ENC"), ("VDCL", 1, "VDCL"),
+    ]:
+        row = conn.execute(book_source, (translation, book_id)).fetchone()
+        check(f"{translation} book {book_id} from {expected}", row == (expected,), str(row))
+
+    print("\n=== /books lists what /chapter serves ===")
+    books = fallback_statement(source, "books")
+    for translation in ("VDCL", "WEB"):
+        listed = conn.execute(books, (translation,)).fetchall()
+        served = {book_id: conn.execute(book_source, (translation, book_id)).fetchone()[0]
+                  for book_id, *_ in listed}
+        own = {r[0] for r in conn.execute("SELECT book_id FROM books WHERE translation = ?", (translation,))}
+        check(f"{translation}: own books served as its own", all(served[b] == translation for b in own), str(served))
+        check(f"{translation}: every book listed once", len(listed) == len(served), str(listed))
+    check("WEB borrows Tobit and 1 Enoch", [r[0] for r in conn.execute(books, ("WEB",))] == [1, 67, 90])
+
+    print("\n=== /parallel without verse_map ===")
+    aligned = fallback_statement(source, "alignedChapter")
+    rows = conn.execute(aligned, ('["VDCL", "WEB", "KJV"]', 67, 1)).fetchall()
+    check("each translation's own numbering", [r[:4] for r in rows] == [
+        ("VDCL", 1, 1, 1), ("WEB", 1, 1, 1), ("KJV", 1, 1, 1),
+        ("VDCL", 2, 1, 2), ("WEB", 2, 1, 2), ("KJV", 2, 1, 2),
+    ], str(rows))
+    texts = {r[0]: r[4] for r in rows if r[1] == 1}
+    check("VDCL Tobit is its own text", texts["VDCL"] == "VDCL Tobit 1:1", str(texts))
+    check("WEB Tobit is KJV's text", texts["WEB"] == "KJV Tobit 1:1", str(texts))
+    rows = conn.execute(aligned, ('["WEB"]', 90, 1)).fetchall()
+    check("1 Enoch from ENC", [r[4] for r in rows] == ["ENC 1 Enoch 1:1", "ENC 1 Enoch 1:2"], str(rows))
+
+    print("\n=== bible package ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bible.db"
+        disk = sqlite3.connect(path)
+        conn.backup(disk)
+        disk.close()
+        with Bible(path) as bible:
+            check("books() as /books", [tuple(r) for r in bible.books("WEB")] ==
+                  conn.execute(books, ("WEB",)).fetchall())
+            check("chapter() of VDCL's own Tobit", [r["text"] for r in bible.chapter("VDCL", 67, 1)] ==
+                  ["VDCL Tobit 1:1", "VDCL Tobit 1:2"])
+            check("chapter() of WEB's borrowed Tobit", bible.verse("WEB", 67, 1, 2) == "KJV Tobit 1:2")
+            check("aligned_chapter() as /parallel", [tuple(r) for r in bible.aligned_chapter(["VDCL", "WEB", "KJV"], 67, 1)]
+                  == conn.execute(aligned, ('["VDCL", "WEB", "KJV"]', 67, 1)).fetchall())
+            found = bible.book_by_name("VDCL", "geneza")
+            check("book_by_name() by exact name", found is not None and tuple(found) == (1, "Geneza", 1), str(found))
+            check("book_by_name() without a match", bible.book_by_name("VDCL", "Gen") is None)
+            check("passages()", bible.passages([("WEB", 67, 1, 2, 2), ("VDCL", 67, 1), ("WEB", 90, 1, 2)]) == [
+                [(2, "KJV Tobit 1:2")],
+                [(1, "VDCL Tobit 1:1"), (2, "VDCL Tobit 1:2")],
+                [(2, "ENC 1 Enoch 1:2")],
+            ])
+            rendered = hot_set.render(bible, "/api/bible/chapter/VDCL/67/1")
+            check("hot_set renders on the old schema", rendered is not None and "VDCL Tobit" in rendered[2], str(rendered))
+
+    print(f"\n{passed} passed, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for strongs_index.extract_strongs word positions (no database).
+
+Every position must index the tagged word in the stored text, i.e. in
+import_bible.strip_html(raw).split(), including where punctuation or markup
+follows a tag with no space in between.
+Run: python server/scripts/test_strongs_index.py
+"""
+
+import sys
+
+from import_bible import strip_html
+from strongs_index import extract_strongs
+
+passed = failed = 0
+
+
+def check(name: str, ok: bool, detail: str = ""):
+    global passed, failed
+    if ok:
+        passed += 1
+        print(f"  PASS  {name}")
+    else:
+        failed += 1
+        print(f"  FAIL  {name} {detail}")
+
+
+def words_at(raw: str, book_id: int) -> dict:
+    """{lemma: [stored words]} the extracted positions point at."""
+    words = strip_html(raw).split()
+    return {lemma: [words[p] for p in positions] for lemma, positions in extract_strongs(raw, book_id).items()}
+
+
+def reference_positions(raw: str, book_id: int) -> dict:
+    """Positions from the stripped text before each tag (quadratic, but plainly right)."""
+    prefix = "H" if book_id <= 39 else "G"
+    postings = {}
+    start = 0
+    while (at := raw.find("<S>", start)) != -1:
+        end = raw.index("</S>", at)
+        lemma = f"{prefix}{int(raw[at + 3:end])}"
+        position = max(len(strip_html(raw[:at]).split()) - 1, 0)
+        postings.setdefault(lemma, []).append(position)
+        start = end + 4
+    return postings
+
+
+def main():
+    print("\n=== Punctuation after a tag ===")
+    raw = ("And God<S>430</S> said<S>559</S>, Let there be<S>1961</S> light<S>216</S>: "
+           "and there was<S>1961</S> light<S>216</S>.")
+    found = words_at(raw, 1)
+    check("'be' (H1961) is word 5", extract_strongs(raw, 1)["H1961"][0] == 5, str(extract_strongs(raw, 1)))
+    check("tags point at their words", found == {
+        "H430": ["God"], "H559": ["said,"], "H1961": ["be", "was"], "H216": ["light:", "light."],
+    }, str(found))
+
+    print("\n=== Line break and markup after a tag ===")
+    raw = "Jesus<S>2424</S> wept<S>1145</S>.<br/>Then<S>3767</S> said<S>3004</S> the Jews<S>2453</S>"
+    found = words_at(raw, 43)
+    check("positions survive '.<br/>'", found == {
+        "G2424": ["Jesus"], "G1145": ["wept."], "G3767": ["Then"], "G3004": ["said"], "G2453": ["Jews"],
+    }, str(found))
+    raw = "the <i>Lord</i><S>3068</S>'s <sup>a</sup>word<S>1697</S>; <S>853</S>and he"
+    check("italics, footnotes, apostrophes", words_at(raw, 1) == {
+        "H3068": ["Lord's"], "H1697": ["word;"], "H853": ["word;"],
+    }, str(words_at(raw, 1)))
+
+    print("\n=== Several tags on one word ===")
+    raw = "created<S>1254</S><S>853</S> the heaven<S>8064</S>"
+    check("stacked tags share a word", words_at(raw, 1) == {
+        "H1254": ["created"], "H853": ["created"], "H8064": ["heaven"],
+    }, str(words_at(raw, 1)))
+
+    print("\n=== Agrees with positions from the stripped prefix ===")
+    samples = [
+        "In the beginning<S>7225</S> God<S>430</S> created<S>1254</S><S>853</S> the heaven<S>8064</S>.",
+        "<S>1</S>Start, then<S>2</S>,<S>3</S> commas&amp;<S>4</S> entities &quot;quoted<S>5</S>&quot; end",
+        "word<S>1</S> <br>next<S>2</S>  double  spaces<S>3</S> <sup>12</sup> after<S>4</S>",
+    ]
+    for raw in samples:
+        check(f"{raw[:40]!r}", extract_strongs(raw, 1) == reference_positions(raw, 1),
+              f"{extract_strongs(raw, 1)} != {reference_positions(raw, 1)}")
+
+    print(f"\n{passed} passed, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Per-verse / per-chapter token estimates for the Koinonia Bible database.
+
+Estimates how many model tokens every verse costs, using a local tokenizer
+approximation that varies by language and script, and stores the result as one
+cumulative array per chapter:
+
+    chapter_tokens.cumulative[v] = tokens of verses 0..v   (little-endian uint32)
+
+so the token cost of any verse range is a single prefix-sum difference:
+
+    tokens(v1..v2) = cumulative[v2] - cumulative[v1 - 1]
+
+Usage:
+    python token_counts.py                          # Rebuild for every translation
+    python token_counts.py -t KJV ENC               # Rebuild specific translations
+    python token_counts.py --db /path/to/bible.db   # Custom database path
+    python token_counts.py --range KJV 43 3 16 21   # Token cost of John 3:16-21
+"""
+
+import argparse
+import math
+import re
+import sqlite3
+import sys
+from array import array
+from itertools import groupby
+from pathlib import Path
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+
+# ============================================================
+# TOKENIZER APPROXIMATION
+# ============================================================
+
+# Characters per token for plain ASCII text. English BPE vocabularies cover
+# whole English words; other Latin-script languages split into more pieces.
+ENGLISH_CHARS_PER_TOKEN = 4.0
+LATIN_CHARS_PER_TOKEN = 3.2
+
+# Tokens per character for non-ASCII scripts (BPE vocabularies have few merges
+# for these, so most characters cost a byte-level piece or two).
+SCRIPT_TOKENS_PER_CHAR = [
+    ("latin", re.compile(r"[\u00c0-\u024f\u1e00-\u1eff]"), 0.5),     # ă ș é ñ …
+    ("greek", re.compile(r"[\u0370-\u03ff\u1f00-\u1fff]"), 0.55),   # incl. polytonic
+    ("cyrillic", re.compile(r"[\u0400-\u052f]"), 0.4),
+    ("hebrew", re.compile(r"[\u0590-\u05ff\ufb1d-\ufb4f]"), 0.6),   # incl. vowel points
+    ("arabic", re.compile(r"[\u0600-\u06ff\u0750-\u077f]"), 0.45),
+    ("indic", re.compile(r"[\u0900-\u0dff]"), 0.6),
+    ("cjk", re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]"), 0.8),
+]
+OTHER_TOKENS_PER_CHAR = 0.5
+
+ASCII_RE = re.compile(r"[\x00-\x7f]+")
+
+
+def ascii_chars_per_token(language: str) -> float:
+    """Chars/token for the ASCII part of a translation's text."""
+    return ENGLISH_CHARS_PER_TOKEN if "english" in (language or "").lower() else LATIN_CHARS_PER_TOKEN
+
+
+def estimate_tokens(text: str, chars_per_token: float = ENGLISH_CHARS_PER_TOKEN) -> int:
+    """Approximate model token count of one verse."""
+    if not text:
+        return 0
+    if text.isascii():
+        return math.ceil(len(text) / chars_per_token)
+
+    rest = ASCII_RE.sub("", text)
+    tokens = (len(text) - len(rest)) / chars_per_token
+    classified = 0
+    for _, pattern, per_char in SCRIPT_TOKENS_PER_CHAR:
+        n = len(pattern.findall(rest))
+        tokens += n * per_char
+        classified += n
+    tokens += (len(rest) - classified) * OTHER_TOKENS_PER_CHAR
+    return math.ceil(tokens)
+
+
+# ============================================================
+# CUMULATIVE ARRAYS
+# ============================================================
+
+def encode_cumulative(values) -> bytes:
+    """Pack a cumulative array as little-endian uint32."""
+    arr = array("I", values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def decode_cumulative(blob: bytes) -> array:
+    arr = array("I")
+    arr.frombytes(blob)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def chapter_cumulative(verses) -> list[int]:
+    """
+    Build the cumulative array for one chapter from (verse, tokens) pairs.
+    Indexed by verse number, so gaps in the numbering simply repeat the
+    previous total.
+    """
+    last = max(v for v, _ in verses)
+    per_verse = [0] * (last + 1)
+    for v, tokens in verses:
+        per_verse[v] += tokens
+    cumulative = []
+    running = 0
+    for tokens in per_verse:
+        running += tokens
+        cumulative.append(running)
+    return cumulative
+
+
+def range_from_cumulative(cumulative, from_verse: int | None = None, to_verse: int | None = None) -> int:
+    """Token cost of verses from_verse..to_verse (inclusive; None = chapter start/end)."""
+    last = len(cumulative) - 1
+    end = last if to_verse is None else min(to_verse, last)
+    start = 1 if from_verse is None else max(from_verse, 0)
+    if start > end:
+        return 0
+    return cumulative[end] - (cumulative[start - 1] if start > 0 else 0)
+
+
+# ============================================================
+# DATABASE
+# ============================================================
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS chapter_tokens (
+            translation TEXT    NOT NULL,
+            book_id     INTEGER NOT NULL,
+            chapter     INTEGER NOT NULL,
+            verses      INTEGER NOT NULL,
+            total       INTEGER NOT NULL,
+            cumulative  BLOB    NOT NULL,
+            PRIMARY KEY (translation, book_id, chapter)
+        ) WITHOUT ROWID;
+    """)
+
+
+def build_chapter_tokens(conn: sqlite3.Connection, translations: list[str] | None = None) -> int:
+    """(Re)compute chapter_tokens for the given translations (default: all). Returns chapter count."""
+    ensure_schema(conn)
+
+    languages = dict(conn.execute("SELECT short_name, language FROM translations"))
+    codes = sorted(languages) if translations is None else [c for c in translations if c in languages]
+
+    chapters = 0
+    for code in codes:
+        chars_per_token = ascii_chars_per_token(languages[code])
+        conn.execute("DELETE FROM chapter_tokens WHERE translation = ?", (code,))
+
+        rows = conn.execute(
+            "SELECT book_id, chapter, verse, text FROM verses WHERE translation = ? ORDER BY book_id, chapter, verse",
+            (code,),
+        )
+        batch = []
+        for (book_id, chapter), group in groupby(rows, key=lambda r: (r[0], r[1])):
+            verses = [(verse, estimate_tokens(text, chars_per_token)) for _, _, verse, text in group]
+            cumulative = chapter_cumulative(verses)
+            batch.append((code, book_id, chapter, len(verses), cumulative[-1], encode_cumulative(cumulative)))
+
+        conn.executemany(
+            "INSERT INTO chapter_tokens (translation, book_id, chapter, verses, total, cumulative) VALUES (?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        chapters += len(batch)
+    conn.commit()
+    return chapters
+
+
+def update_chapters(conn: sqlite3.Connection, translation: str, chapters) -> int:
+    """Recompute chapter_tokens for some (book_id, chapter) pairs of one translation."""
+    ensure_schema(conn)
+    language = conn.execute("SELECT language FROM translations WHERE short_name = ?", (translation,)).fetchone()
+    chars_per_token = ascii_chars_per_token(language[0] if language else None)
+    for book_id, chapter in chapters:
+        conn.execute(
+            "DELETE FROM chapter_tokens WHERE translation = ? AND book_id = ? AND chapter = ?",
+            (translation, book_id, chapter),
+        )
+        verses = [
+            (verse, estimate_tokens(text, chars_per_token))
+            for verse, text in conn.execute(
+                "SELECT verse, text FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? ORDER BY verse",
+                (translation, book_id, chapter),
+            )
+        ]
+        if verses:
+            cumulative = chapter_cumulative(verses)
+            conn.execute(
+                "INSERT INTO chapter_tokens (translation, book_id, chapter, verses, total, cumulative) VALUES (?, ?, ?, ?, ?, ?)",
+                (translation, book_id, chapter, len(verses), cumulative[-1], encode_cumulative(cumulative)),
+            )
+    return len(chapters)
+
+
+def range_tokens(conn: sqlite3.Connection, translation: str, book_id: int, chapter: int,
+                 from_verse: int | None = None, to_verse: int | None = None) -> int | None:
+    """Token cost of a verse range, or None if the chapter is unknown."""
+    row = conn.execute(
+        "SELECT cumulative FROM chapter_tokens WHERE translation = ? AND book_id = ? AND chapter = ?",
+        (translation, book_id, chapter),
+    ).fetchone()
+    if row is None:
+        return None
+    return range_from_cumulative(decode_cumulative(row[0]), from_verse, to_verse)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute per-chapter token prefix sums")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument(
+        "--translations", "-t", nargs="+", metavar="CODE",
+        help="Translation codes to rebuild (default: all)"
+    )
+    parser.add_argument(
+        "--range", nargs=5, metavar=("CODE", "BOOK", "CHAPTER", "FROM", "TO"),
+        help="Print the token cost of one verse range instead of rebuilding"
+    )
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    conn = sqlite3.connect(str(args.db))
+    try:
+        if args.range:
+            code, book_id, chapter, from_verse, to_verse = args.range
+            tokens = range_tokens(conn, code.upper(), int(book_id), int(chapter), int(from_verse), int(to_verse))
+            if tokens is None:
+                print(f"No token data for {code} {book_id} {chapter} — run without --range first.")
+                sys.exit(1)
+            print(f"{code} {book_id} {chapter}:{from_verse}-{to_verse} ≈ {tokens:,} tokens")
+            return
+
+        codes = [c.upper() for c in args.translations] if args.translations else None
+        print("Computing token prefix sums...")
+        chapters = build_chapter_tokens(conn, codes)
+        print(f"  {chapters:,} chapters written to chapter_tokens.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
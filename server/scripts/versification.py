@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Versification alignment for the Koinonia Bible database.
+
+Bolls translations follow different verse numbering — Hebrew-numbered Old
+Testaments (Malachi 3:19-24 for KJV 4:1-6, Joel 4, psalm superscriptions
+counted as verse 1), Romans' doxology after chapter 14, … This stage maps
+every translation's verses onto the canonical (KJV) numbering, driven by the
+verse counts per chapter and the rules in data/versification.json, and stores
+only the verses whose canonical key differs:
+
+    verse_map(translation, book_id, chapter, verse, canonical_chapter, canonical_verse)
+        PRIMARY KEY (translation, book_id, chapter, verse)
+
+A verse not in verse_map keeps its own number. Psalm superscriptions map to
+canonical verse 0. ALIGNED_CHAPTER_SQL returns one canonical chapter for N
+translations in a single query, rows ordered by canonical verse then the
+requested translation order — what server/lib/db.ts runs for
+/api/bible/parallel.
+
+Usage:
+    python versification.py                          # Rebuild verse_map for every translation
+    python versification.py -t WLC VDCL              # Rebuild specific translations
+    python versification.py --align KJV,WLC 39 4     # Malachi 4 across translations
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import hot_set
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+DEFAULT_RULES = Path(__file__).resolve().parent.parent / "data" / "versification.json"
+
+ALIGNED_CHAPTER_SQL = """
+    WITH picked(translation, source, ord) AS (
+        SELECT j.value, COALESCE(tb.source, j.value), j.key
+        FROM json_each(?1) j
+        LEFT JOIN translation_books tb ON tb.translation = j.value AND tb.book_id = ?2
+    )
+    SELECT p.translation, v.verse AS canonical_verse, v.chapter, v.verse, v.text, p.ord
+    FROM picked p
+    JOIN verses v ON v.translation = p.source AND v.book_id = ?2 AND v.chapter = ?3
+    WHERE NOT EXISTS (
+        SELECT 1 FROM verse_map m
+        WHERE m.translation = v.translation AND m.book_id = v.book_id
+          AND m.chapter = v.chapter AND m.verse = v.verse
+    )
+    UNION ALL
+    SELECT p.translation, m.canonical_verse, m.chapter, m.verse, v.text, p.ord
+    FROM picked p
+    JOIN verse_map m ON m.translation = p.source AND m.book_id = ?2 AND m.canonical_chapter = ?3
+    JOIN verses v ON v.translation = m.translation AND v.book_id = m.book_id
+                 AND v.chapter = m.chapter AND v.verse = m.verse
+    ORDER BY 2, 6, 3, 4
+"""
+
+
+def load_rules(path: Path = DEFAULT_RULES) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verse_counts(conn: sqlite3.Connection, translation: str) -> dict:
+    """{book_id: {chapter: highest verse number}} for one translation."""
+    counts = {}
+    for book_id, chapter, last in conn.execute(
+        "SELECT book_id, chapter, MAX(verse) FROM verses WHERE translation = ? GROUP BY book_id, chapter",
+        (translation,),
+    ):
+        counts.setdefault(book_id, {})[chapter] = last
+    return counts
+
+
+def rule_applies(when: dict, chapters: dict) -> bool:
+    """`when` holds {"chapters": n} and/or {"verses": {chapter: highest verse}}."""
+    if "chapters" in when and len(chapters) != when["chapters"]:
+        return False
+    return all(chapters.get(int(ch)) == last for ch, last in when.get("verses", {}).items())
+
+
+def map_translation(counts: dict, canonical: dict, rules: dict) -> dict:
+    """{(book_id, chapter, verse): (canonical chapter, canonical verse)} for verses that move."""
+    mapping = {}
+
+    titles = rules.get("psalm_titles")
+    if titles and canonical:
+        book = titles["book"]
+        own, base = counts.get(book, {}), canonical.get(book, {})
+        for extra in ("1", "2"):
+            t = int(extra)
+            for chapter in titles.get(extra, []):
+                if chapter in own and chapter in base and own[chapter] == base[chapter] + t:
+                    for verse in range(1, own[chapter] + 1):
+                        mapping[(book, chapter, verse)] = (chapter, max(verse - t, 0))
+
+    for rule in rules.get("rules", []):
+        chapters = counts.get(rule["book"])
+        if not chapters or not rule_applies(rule.get("when", {}), chapters):
+            continue
+        for chapter, first, last, to_chapter, to_verse in rule["map"]:
+            for verse in range(first, last + 1):
+                mapping[(rule["book"], chapter, verse)] = (to_chapter, to_verse + verse - first)
+
+    # Identity entries (e.g. a psalm title rule that shifts nothing) are not stored
+    return {key: target for key, target in mapping.items() if target != key[1:]}
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS verse_map (
+            translation       TEXT    NOT NULL,
+            book_id           INTEGER NOT NULL,
+            chapter           INTEGER NOT NULL,
+            verse             INTEGER NOT NULL,
+            canonical_chapter INTEGER NOT NULL,
+            canonical_verse   INTEGER NOT NULL,
+            PRIMARY KEY (translation, book_id, chapter, verse)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_verse_map_canonical
+            ON verse_map(translation, book_id, canonical_chapter, canonical_verse);
+    """)
+
+
+def build_verse_map(conn: sqlite3.Connection, translations: list[str] | None = None,
+                    rules_path: Path = DEFAULT_RULES) -> dict:
+    """Rebuild verse_map for the given translations (default: all). Returns {code: rows}."""
+    ensure_schema(conn)
+    rules = load_rules(rules_path)
+    canonical_code = rules.get("canonical", "KJV")
+    canonical = verse_counts(conn, canonical_code)
+    if translations is None:
+        translations = [r[0] for r in conn.execute("SELECT short_name FROM translations ORDER BY short_name")]
+
+    written = {}
+    for code in translations:
+        conn.execute("DELETE FROM verse_map WHERE translation = ?", (code,))
+        if code == canonical_code:
+            written[code] = 0
+            continue
+        # Only verses that exist — a rule range may run past a short chapter
+        counts = verse_counts(conn, code)
+        existing = {
+            (b, c, v) for b, c, v in conn.execute(
+                "SELECT book_id, chapter, verse FROM verses WHERE translation = ?", (code,)
+            )
+        }
+        mapping = map_translation(counts, canonical, rules)
+        rows = [(code, *key, *target) for key, target in sorted(mapping.items()) if key in existing]
+        conn.executemany(
+            "INSERT INTO verse_map (translation, book_id, chapter, verse, canonical_chapter, canonical_verse) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        written[code] = len(rows)
+    conn.commit()
+    return written
+
+
+def aligned_chapter(conn: sqlite3.Connection, translations: list[str], book_id: int, chapter: int) -> list[dict]:
+    """One canonical chapter across translations: one row per (canonical verse, translation)."""
+    return [
+        {"translation": t, "canonical_verse": cv, "chapter": c, "verse": v, "text": text}
+        for t, cv, c, v, text, _ in conn.execute(ALIGNED_CHAPTER_SQL, (json.dumps(translations), book_id, chapter))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the verse_map versification table")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument("--rules", type=Path, default=DEFAULT_RULES, help=f"Rules file (default: {DEFAULT_RULES})")
+    parser.add_argument("--translations", "-t", nargs="+", help="Only these translations (default: all)")
+    parser.add_argument(
+        "--align", nargs=3, metavar=("CODES", "BOOK", "CH"),
+        help="Print a chapter aligned across comma-separated translations"
+    )
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    if args.align:
+        conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+        codes = [c.strip().upper() for c in args.align[0].split(",") if c.strip()]
+        for row in aligned_chapter(conn, codes, int(args.align[1]), int(args.align[2])):
+            print(f"  {row['canonical_verse']:>3d}  {row['translation']:8s} "
+                  f"{row['chapter']:>3d}:{row['verse']:<3d} {row['text'][:70]}")
+        conn.close()
+        return
+
+    conn = sqlite3.connect(str(args.db))
+    try:
+        translations = [t.upper() for t in args.translations] if args.translations else None
+        print("Building versification map...")
+        written = build_verse_map(conn, translations, args.rules)
+        moved = {code: n for code, n in written.items() if n}
+        for code, n in sorted(moved.items()):
+            print(f"  {code:12s} {n:>6,} verses renumbered")
+        print(f"  {len(written) - len(moved)} translations already in canonical numbering.")
+        # Pre-rendered responses (hot_set.py) would otherwise keep serving the old data
+        rows = hot_set.refresh_response_cache(conn, args.db)
+        if rows is not None:
+            print(f"  Re-rendered {rows:,} cached responses.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
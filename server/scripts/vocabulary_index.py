@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Per-language search vocabulary: autocomplete and spelling suggestions.
+
+Every term of the full-text index, with its frequency (fts5vocab instance
+counts, summed per language from word_stats), becomes:
+
+    vocabulary(language, term, freq)
+        PRIMARY KEY (language, term)
+    term_prefixes(language, prefix, rank, term, freq)
+        PRIMARY KEY (language, prefix, rank)      -- top completions of 1..3-char prefixes
+    term_deletes(language, variant, term)
+        PRIMARY KEY (language, variant, term)     -- symmetric-delete spelling index
+
+The spelling index maps every deletion of up to MAX_DISTANCE characters from
+a term's first PREFIX_LENGTH characters back to the term. A misspelled query
+looks up its own deletions and checks the few candidates it finds, instead
+of running a MATCH that returns nothing. The lookups are in the bible
+package (Bible.complete, Bible.suggest).
+
+Usage:
+    python vocabulary_index.py                          # Rebuild for every language
+    python vocabulary_index.py -t KJV                   # Rebuild the languages of these translations
+    python vocabulary_index.py --complete gr -t KJV     # Completions for a prefix
+    python vocabulary_index.py --suggest grase -t KJV   # Spelling suggestions for a word
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# The read-side package lives at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bible.vocabulary import (  # noqa: E402
+    MAX_DISTANCE, PREFIX_TABLE_LENGTH, TOP_COMPLETIONS, Vocabulary, deletes, fold_term,
+)
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS vocabulary (
+            language TEXT    NOT NULL,
+            term     TEXT    NOT NULL,
+            freq     INTEGER NOT NULL,
+            PRIMARY KEY (language, term)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS term_prefixes (
+            language TEXT    NOT NULL,
+            prefix   TEXT    NOT NULL,
+            rank     INTEGER NOT NULL,
+            term     TEXT    NOT NULL,
+            freq     INTEGER NOT NULL,
+            PRIMARY KEY (language, prefix, rank)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS term_deletes (
+            language TEXT NOT NULL,
+            variant  TEXT NOT NULL,
+            term     TEXT NOT NULL,
+            PRIMARY KEY (language, variant, term)
+        ) WITHOUT ROWID;
+    """)
+
+
+def languages_of(conn: sqlite3.Connection, translations: list[str]) -> list[str]:
+    placeholders = ",".join("?" * len(translations))
+    return sorted(r[0] for r in conn.execute(
+        f"SELECT DISTINCT language FROM translations WHERE short_name IN ({placeholders})", translations
+    ))
+
+
+def build_language(conn: sqlite3.Connection, language: str) -> int:
+    """Rebuild one language's three tables from word_stats. Returns its term count."""
+    for table in ("vocabulary", "term_prefixes", "term_deletes"):
+        conn.execute(f"DELETE FROM {table} WHERE language = ?", (language,))
+    terms = conn.execute("""
+        SELECT w.term, SUM(w.count)
+        FROM word_stats w JOIN translations t ON t.short_name = w.translation
+        WHERE t.language = ?
+        GROUP BY w.term
+    """, (language,)).fetchall()
+    conn.executemany(
+        "INSERT INTO vocabulary (language, term, freq) VALUES (?, ?, ?)",
+        ((language, term, freq) for term, freq in terms),
+    )
+
+    # Most frequent first, so each prefix's list fills in rank order
+    by_freq = sorted(terms, key=lambda tf: (-tf[1], tf[0]))
+    prefixes = {}
+    for term, freq in by_freq:
+        for n in range(1, min(len(term), PREFIX_TABLE_LENGTH) + 1):
+            ranked = prefixes.setdefault(term[:n], [])
+            if len(ranked) < TOP_COMPLETIONS:
+                ranked.append((term, freq))
+    conn.executemany(
+        "INSERT INTO term_prefixes (language, prefix, rank, term, freq) VALUES (?, ?, ?, ?, ?)",
+        ((language, prefix, rank, term, freq)
+         for prefix, ranked in prefixes.items() for rank, (term, freq) in enumerate(ranked)),
+    )
+
+    conn.executemany(
+        "INSERT INTO term_deletes (language, variant, term) VALUES (?, ?, ?)",
+        ((language, variant, term) for term, _ in terms for variant in deletes(term, MAX_DISTANCE)),
+    )
+    return len(terms)
+
+
+def build_vocabulary(conn: sqlite3.Connection, translations: list[str] | None = None) -> int:
+    """(Re)build the vocabulary of the given translations' languages (default: all). Returns term count."""
+    ensure_schema(conn)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'word_stats'").fetchone():
+        return 0
+    if translations is None:
+        languages = [r[0] for r in conn.execute("SELECT DISTINCT language FROM translations ORDER BY language")]
+        for table in ("vocabulary", "term_prefixes", "term_deletes"):
+            conn.execute(f"DELETE FROM {table}")
+    else:
+        languages = languages_of(conn, translations)
+    terms = sum(build_language(conn, language) for language in languages)
+    conn.commit()
+    return terms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the per-language autocomplete and spelling index")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument(
+        "--translations", "-t", nargs="+", metavar="CODE",
+        help="Rebuild only these translations' languages (with --complete / --suggest: the first one's)"
+    )
+    parser.add_argument("--complete", metavar="PREFIX", help="Print completions for a prefix")
+    parser.add_argument("--suggest", metavar="WORD", help="Print spelling suggestions for a word")
+    parser.add_argument("-k", type=int, default=10, help="Results for --complete / --suggest (default: 10)")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    codes = [c.upper() for c in args.translations] if args.translations else None
+    conn = sqlite3.connect(str(args.db))
+    try:
+        if args.complete or args.suggest:
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'vocabulary'").fetchone():
+                print("No vocabulary table — run without --complete / --suggest first.")
+                sys.exit(1)
+            language = languages_of(conn, codes[:1])[0] if codes else "English"
+            vocabulary = Vocabulary(conn, language)
+            word = args.complete or args.suggest
+            term = fold_term(word)
+            started = time.perf_counter()
+            if args.complete:
+                results = vocabulary.complete(term, args.k) if term else []
+            else:
+                results = vocabulary.correct(term, args.k) if term else []
+            elapsed = (time.perf_counter() - started) * 1e6
+            print(f"{language}: {len(vocabulary):,} terms; '{word}' → {term!r} ({elapsed:.0f} µs)")
+            for result in results:
+                print("  " + "  ".join(f"{v:,}" if isinstance(v, int) else v for v in result))
+            return
+
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'word_stats'").fetchone():
+            print("No word_stats table — run word_stats.py first.")
+            sys.exit(1)
+        print("Building search vocabulary...")
+        started = time.perf_counter()
+        terms = build_vocabulary(conn, codes)
+        deletes_count = conn.execute("SELECT COUNT(*) FROM term_deletes").fetchone()[0]
+        print(f"  {terms:,} terms, {deletes_count:,} spelling variants in {time.perf_counter() - started:.1f}s.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
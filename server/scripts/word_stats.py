@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Word-frequency concordance for the Koinonia Bible database.
+
+Counts every term of the full-text index per translation and book, straight
+from the index itself (fts5vocab over verses_fts, so a "term" is exactly what
+a MATCH query matches — case and diacritics folded by unicode61):
+
+    word_stats(term, translation, book_id, count, chapters)
+        PRIMARY KEY (term, translation, book_id)
+
+`chapters` is the term's per-chapter frequency array for that book, stored
+sparsely as little-endian uint16 (chapter, count) pairs. "How often does
+'grace' occur in Paul's letters, per translation?" is then one index range
+read instead of paging through search results:
+
+    SELECT translation, SUM(count) FROM word_stats
+    WHERE term = 'grace' AND book_id BETWEEN 45 AND 57 GROUP BY translation
+
+A full build reads the existing index once; rebuilding some translations
+re-tokenizes just their verses into a scratch FTS table.
+
+Usage:
+    python word_stats.py                            # Rebuild for every translation
+    python word_stats.py -t KJV ENC                 # Rebuild specific translations
+    python word_stats.py --count grace              # Occurrences per translation
+    python word_stats.py --count grace --books 45-57 -t KJV WEB
+    python word_stats.py --chapters grace KJV 45    # Per-chapter counts in Romans
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from array import array
+from itertools import groupby
+from pathlib import Path
+
+DEFAULT_DB = Path(__file__).resolve().parent.parent / "bible.db"
+
+# Same tokenizer as verses_fts (import_bible.build_fts_index)
+TOKENIZE = "unicode61"
+
+SCRATCH = "word_stats_fts"
+
+# Index instances in term order, each with its verse's location. fts5vocab
+# streams (term, doc) in order; the location comes from a plain temp table,
+# far cheaper to probe than the FTS table's UNINDEXED columns.
+SCAN_SQL = """
+    SELECT v.term, k.translation, k.book_id, k.chapter
+    FROM temp.{vocab} v JOIN temp.word_stats_docs k ON k.doc = v.doc
+"""
+
+# ============================================================
+# CHAPTER ARRAYS
+# ============================================================
+
+def encode_chapters(pairs) -> bytes:
+    """Pack (chapter, count) pairs as little-endian uint16."""
+    arr = array("H")
+    for chapter, count in pairs:
+        arr.append(chapter)
+        arr.append(min(count, 0xFFFF))
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def decode_chapters(blob: bytes) -> dict:
+    """{chapter: count} from a packed array."""
+    arr = array("H")
+    arr.frombytes(blob)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return dict(zip(arr[0::2], arr[1::2]))
+
+
+# ============================================================
+# DATABASE
+# ============================================================
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS word_stats (
+            term        TEXT    NOT NULL,
+            translation TEXT    NOT NULL,
+            book_id     INTEGER NOT NULL,
+            count       INTEGER NOT NULL,
+            chapters    BLOB    NOT NULL,
+            PRIMARY KEY (term, translation, book_id)
+        ) WITHOUT ROWID
+    """)
+
+
+def _instance_vocab(conn: sqlite3.Connection, schema: str, fts: str) -> str:
+    vocab = f"{fts}_instance"
+    conn.execute(f"DROP TABLE IF EXISTS temp.{vocab}")
+    conn.execute(f"CREATE VIRTUAL TABLE temp.{vocab} USING fts5vocab({schema}, {fts}, 'instance')")
+    return vocab
+
+
+def _scratch_index(conn: sqlite3.Connection, where: str, params) -> None:
+    """Tokenize the selected verses into a temp FTS table (no commit — safe inside a transaction)."""
+    conn.execute(f"DROP TABLE IF EXISTS temp.{SCRATCH}")
+    conn.execute(
+        f"CREATE VIRTUAL TABLE temp.{SCRATCH} USING fts5("
+        f"text, translation UNINDEXED, book_id UNINDEXED, chapter UNINDEXED, tokenize='{TOKENIZE}')"
+    )
+    conn.execute(
+        f"INSERT INTO temp.{SCRATCH} (text, translation, book_id, chapter) "
+        f"SELECT text, translation, book_id, chapter FROM verses WHERE {where}",
+        params,
+    )
+
+
+def _write(conn: sqlite3.Connection, schema: str, fts: str) -> int:
+    """Aggregate an index's instances into word_stats rows. Returns rows written."""
+    vocab = _instance_vocab(conn, schema, fts)
+    conn.execute("DROP TABLE IF EXISTS temp.word_stats_docs")
+    conn.execute(
+        "CREATE TEMP TABLE word_stats_docs (doc INTEGER PRIMARY KEY, translation TEXT, book_id INTEGER, chapter INTEGER)"
+    )
+    conn.execute(f"INSERT INTO temp.word_stats_docs SELECT rowid, translation, book_id, chapter FROM {schema}.{fts}")
+
+    rows = conn.execute(SCAN_SQL.format(vocab=vocab))
+    written = 0
+    batch = []
+    # One term at a time: memory is bounded by the commonest term's postings
+    for term, group in groupby(rows, key=lambda r: r[0]):
+        counts = {}
+        for _, translation, book_id, chapter in group:
+            key = (translation, book_id, chapter)
+            counts[key] = counts.get(key, 0) + 1
+        for (translation, book_id), chapters in groupby(sorted(counts.items()), key=lambda kv: kv[0][:2]):
+            pairs = [(key[2], count) for key, count in chapters]
+            batch.append((term, translation, book_id, sum(c for _, c in pairs), encode_chapters(pairs)))
+        if len(batch) >= 50_000:
+            conn.executemany("INSERT INTO word_stats VALUES (?, ?, ?, ?, ?)", batch)
+            written += len(batch)
+            batch = []
+    conn.executemany("INSERT INTO word_stats VALUES (?, ?, ?, ?, ?)", batch)
+    written += len(batch)
+    conn.execute(f"DROP TABLE temp.{vocab}")
+    conn.execute("DROP TABLE temp.word_stats_docs")
+    return written
+
+
+def build_word_stats(conn: sqlite3.Connection, translations: list[str] | None = None) -> int:
+    """(Re)build word_stats for the given translations (default: all). Returns rows written."""
+    ensure_schema(conn)
+    if translations is None:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'verses_fts'").fetchone():
+            return 0
+        conn.execute("DELETE FROM word_stats")
+        written = _write(conn, "main", "verses_fts")
+    else:
+        written = 0
+        for code in translations:
+            conn.execute("DELETE FROM word_stats WHERE translation = ?", (code,))
+            _scratch_index(conn, "translation = ?", (code,))
+            written += _write(conn, "temp", SCRATCH)
+        conn.execute(f"DROP TABLE IF EXISTS temp.{SCRATCH}")
+    conn.commit()
+    return written
+
+
+def update_books(conn: sqlite3.Connection, translation: str, books) -> int:
+    """Recount word_stats for some books of one translation (after verses changed)."""
+    ensure_schema(conn)
+    written = 0
+    for book_id in books:
+        conn.execute("DELETE FROM word_stats WHERE translation = ? AND book_id = ?", (translation, book_id))
+        _scratch_index(conn, "translation = ? AND book_id = ?", (translation, book_id))
+        written += _write(conn, "temp", SCRATCH)
+    conn.execute(f"DROP TABLE IF EXISTS temp.{SCRATCH}")
+    return written
+
+
+# ============================================================
+# LOOKUPS
+# ============================================================
+
+def fold_term(conn: sqlite3.Connection, word: str) -> str | None:
+    """The index term for `word`, tokenized exactly as verses_fts would (None if it has no token)."""
+    conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS temp.term_probe USING fts5(text, tokenize='{TOKENIZE}')")
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.term_probe_instance USING fts5vocab(temp, term_probe, 'instance')")
+    conn.execute("DELETE FROM temp.term_probe")
+    conn.execute("INSERT INTO temp.term_probe (text) VALUES (?)", (word,))
+    row = conn.execute("SELECT term FROM temp.term_probe_instance ORDER BY offset LIMIT 1").fetchone()
+    return row[0] if row else None
+
+
+def term_counts(conn: sqlite3.Connection, word: str, translations: list[str] | None = None,
+                books: tuple[int, int] | None = None) -> dict:
+    """{translation: occurrences} of a word, optionally within a book_id range (inclusive)."""
+    term = fold_term(conn, word)
+    if term is None:
+        return {}
+    sql = "SELECT translation, SUM(count) FROM word_stats WHERE term = ?"
+    params = [term]
+    if books:
+        sql += " AND book_id BETWEEN ? AND ?"
+        params += list(books)
+    if translations:
+        sql += f" AND translation IN ({','.join('?' * len(translations))})"
+        params += translations
+    sql += " GROUP BY translation ORDER BY 2 DESC"
+    return dict(conn.execute(sql, params).fetchall())
+
+
+def chapter_counts(conn: sqlite3.Connection, word: str, translation: str, book_id: int) -> dict:
+    """{chapter: occurrences} of a word in one book of a translation."""
+    term = fold_term(conn, word)
+    row = conn.execute(
+        "SELECT chapters FROM word_stats WHERE term = ? AND translation = ? AND book_id = ?",
+        (term, translation, book_id),
+    ).fetchone() if term else None
+    return decode_chapters(row[0]) if row else {}
+
+
+def parse_books(value: str) -> tuple[int, int]:
+    low, _, high = value.partition("-")
+    return int(low), int(high or low)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-book word-frequency statistics from the FTS index")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="Path to bible.db")
+    parser.add_argument(
+        "--translations", "-t", nargs="+", metavar="CODE",
+        help="Translation codes to rebuild or report (default: all)"
+    )
+    parser.add_argument("--count", metavar="WORD", help="Print occurrences of a word per translation")
+    parser.add_argument("--books", type=parse_books, metavar="FROM-TO", help="Book id range for --count (e.g. 45-57)")
+    parser.add_argument(
+        "--chapters", nargs=3, metavar=("WORD", "CODE", "BOOK"),
+        help="Print a word's per-chapter counts in one book"
+    )
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"ERROR: Database not found at {args.db}")
+        sys.exit(1)
+
+    codes = [c.upper() for c in args.translations] if args.translations else None
+    conn = sqlite3.connect(str(args.db))
+    try:
+        if args.count or args.chapters:
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'word_stats'").fetchone():
+                print("No word_stats table — run without --count / --chapters first.")
+                sys.exit(1)
+        if args.count:
+            counts = term_counts(conn, args.count, codes, args.books)
+            if not counts:
+                print(f"'{args.count}' does not occur.")
+            for code, count in counts.items():
+                print(f"  {code:10s} {count:>8,}")
+            return
+        if args.chapters:
+            word, code, book_id = args.chapters
+            counts = chapter_counts(conn, word, code.upper(), int(book_id))
+            if not counts:
+                print(f"'{word}' does not occur in {code} book {book_id}.")
+            for chapter, count in sorted(counts.items()):
+                print(f"  {chapter:>4}  {count:>6,}")
+            return
+
+        print("Counting terms per book...")
+        started = time.perf_counter()
+        rows = build_word_stats(conn, codes)
+        print(f"  {rows:,} (term, translation, book) rows in {time.perf_counter() - started:.1f}s.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()